@@ -0,0 +1,24 @@
+"""
+Reproducible benchmarks for the test lifecycle hot paths.
+
+    data       seeded synthetic datasets (students, question bank, test history)
+    harness    timing/query capture, p50/p95 summaries, JSON results, comparison
+    lifecycle  the scenarios: start (rule engine and adaptive), autosave, time
+               logging, submit, compute_results_task and dashboard loads
+
+Run with `python manage.py run_benchmarks`; it builds a throwaway test database,
+so production data is never touched.
+"""
+from .data import DatasetSpec, seed_dataset
+from .harness import BenchmarkRecorder, compare_results, load_results, write_results
+from .lifecycle import run_lifecycle_benchmark
+
+__all__ = [
+    'DatasetSpec',
+    'seed_dataset',
+    'BenchmarkRecorder',
+    'compare_results',
+    'load_results',
+    'write_results',
+    'run_lifecycle_benchmark',
+]
@@ -0,0 +1,129 @@
+"""
+Seeded synthetic data for benchmarks.
+
+The same DatasetSpec (including seed) always produces the same topics,
+questions, answer keys and test history, so results from different commits
+are measured against identical data.
+"""
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import Dict, List
+
+from django.utils import timezone
+
+from neet_app.models import Question, StudentProfile, TestAnswer, TestSession, Topic
+
+SUBJECTS = ('Physics', 'Chemistry', 'Botany', 'Zoology')
+DIFFICULTIES = ('Easy', 'Moderate', 'Hard')
+OPTIONS = ('A', 'B', 'C', 'D')
+
+
+@dataclass
+class DatasetSpec:
+    students: int = 50
+    questions: int = 2000
+    topics_per_subject: int = 10
+    history_depth: int = 5        # completed tests per student
+    history_questions: int = 30   # questions per historical test
+    seed: int = 1
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    student_ids: List[str] = field(default_factory=list)
+    topic_ids: List[int] = field(default_factory=list)
+    question_ids: List[int] = field(default_factory=list)
+
+
+def _student_id(n: int) -> str:
+    return f'STU250101B{n:05d}'
+
+
+def seed_dataset(spec: DatasetSpec) -> Dataset:
+    """Create the dataset described by spec with bulk inserts (signals are not fired)."""
+    rng = random.Random(spec.seed)
+    dataset = Dataset(spec=spec)
+
+    topics = Topic.objects.bulk_create([
+        Topic(name=f'{subject} Topic {n}', subject=subject, icon='bench', chapter=f'{subject} Chapter {n // 3}')
+        for subject in SUBJECTS for n in range(spec.topics_per_subject)
+    ])
+    dataset.topic_ids = [t.id for t in topics]
+
+    questions = Question.objects.bulk_create([
+        Question(
+            topic=topics[n % len(topics)],
+            question=f'Benchmark question {n}: which option is correct?',
+            option_a='alpha', option_b='beta', option_c='gamma', option_d='delta',
+            correct_answer=rng.choice(OPTIONS),
+            explanation=f'Explanation {n}',
+            difficulty=rng.choice(DIFFICULTIES),
+            question_type='MCQ',
+        )
+        for n in range(spec.questions)
+    ], batch_size=1000)
+    dataset.question_ids = [q.id for q in questions]
+
+    students = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            student_id=_student_id(n), full_name=f'Benchmark Student {n}', email=f'bench{n}@example.com',
+            phone_number=f'9{n:09d}', date_of_birth='2006-01-01', password_hash='!',
+        )
+        for n in range(spec.students)
+    ], batch_size=1000)
+    dataset.student_ids = [s.student_id for s in students]
+
+    _seed_history(spec, rng, dataset.student_ids, questions)
+    return dataset
+
+
+def _seed_history(spec: DatasetSpec, rng: random.Random, student_ids: List[str], questions: List[Question]):
+    """Completed sessions with scored answers, oldest first, one day apart."""
+    if not spec.history_depth or not questions:
+        return
+    now = timezone.now()
+    per_test = min(spec.history_questions, len(questions))
+    plan = []
+    sessions = []
+    for student_id in student_ids:
+        for depth in range(spec.history_depth):
+            picked = rng.sample(questions, per_test)
+            answers = [(q, rng.choice(OPTIONS + (None,))) for q in picked]
+            correct = sum(1 for q, choice in answers if choice == q.correct_answer)
+            unanswered = sum(1 for _q, choice in answers if choice is None)
+            start = now - timedelta(days=spec.history_depth - depth, hours=1)
+            sessions.append(TestSession(
+                student_id=student_id,
+                selected_topics=sorted({q.topic_id for q in picked}),
+                total_questions=per_test,
+                question_count=per_test,
+                time_limit=per_test,
+                start_time=start,
+                end_time=start + timedelta(minutes=per_test),
+                is_completed=True,
+                test_type='custom',
+                correct_answers=correct,
+                incorrect_answers=per_test - correct - unanswered,
+                unanswered=unanswered,
+            ))
+            plan.append(answers)
+
+    sessions = TestSession.objects.bulk_create(sessions, batch_size=500)
+    TestAnswer.objects.bulk_create([
+        TestAnswer(
+            session=session,
+            question=question,
+            selected_answer=choice,
+            is_correct=choice == question.correct_answer,
+            time_taken=rng.randint(5, 180),
+            answered_at=session.start_time if choice else None,
+            visit_count=1,
+        )
+        for session, answers in zip(sessions, plan)
+        for question, choice in answers
+    ], batch_size=2000)
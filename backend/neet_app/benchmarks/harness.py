@@ -0,0 +1,162 @@
+"""
+Measurement, external-service stubs and result files for benchmarks.
+
+BenchmarkRecorder times each call of a scenario and counts its queries with
+CaptureQueriesContext; summary() reports samples, p50/p95/mean/max latency and
+p50/max query counts per scenario. Results are JSON documents keyed by commit
+so two runs can be diffed with compare_results().
+"""
+import json
+import math
+import platform
+import subprocess
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+RESULTS_VERSION = 1
+STUB_LLM_RESPONSE = '{"insights": ["Benchmark stub insight."], "summary": "Benchmark stub response."}'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class BenchmarkRecorder:
+    """Collects latency and query-count samples per scenario."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.notes = defaultdict(lambda: defaultdict(int))
+
+    @contextmanager
+    def measure(self, scenario: str):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            yield
+            elapsed = time.perf_counter() - start
+        self.latencies[scenario].append(elapsed * 1000)
+        self.queries[scenario].append(len(captured.captured_queries))
+
+    def note(self, scenario: str, label: str):
+        """Count an outcome (status code, task status) seen while measuring a scenario."""
+        self.notes[scenario][str(label)] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        results = {}
+        for scenario, samples in self.latencies.items():
+            queries = self.queries[scenario]
+            results[scenario] = {
+                'samples': len(samples),
+                'p50_ms': round(percentile(samples, 50), 3),
+                'p95_ms': round(percentile(samples, 95), 3),
+                'mean_ms': round(sum(samples) / len(samples), 3),
+                'max_ms': round(max(samples), 3),
+                'queries_p50': percentile(queries, 50),
+                'queries_max': max(queries),
+                'outcomes': dict(self.notes.get(scenario, {})),
+            }
+        return results
+
+
+@contextmanager
+def stubbed_external_services(llm_latency: float = 0.0):
+    """
+    Replace Gemini and the TTS service with local stubs and run Celery tasks
+    inline, so benchmarks never leave the process. Yields call counters.
+    """
+    from celery import current_app
+
+    calls = {'llm': 0, 'tts': 0}
+
+    def fake_llm(self, prompt, *args, **kwargs):
+        calls['llm'] += 1
+        if llm_latency:
+            time.sleep(llm_latency)
+        return STUB_LLM_RESPONSE
+
+    def fake_tts(text, test_id=None, institution_name=None):
+        calls['tts'] += 1
+        return f'/audio/benchmark-{test_id or 0}.mp3'
+
+    conf = current_app.conf
+    eager = (conf.task_always_eager, conf.task_eager_propagates)
+    conf.task_always_eager, conf.task_eager_propagates = True, False
+    try:
+        with mock.patch('neet_app.services.ai.gemini_client.GeminiClient.generate_response', fake_llm), \
+                mock.patch('neet_app.utils.tts_helper.generate_insight_audio', fake_tts), \
+                mock.patch.object(current_app.control, 'ping', return_value=[]):
+            yield calls
+    finally:
+        conf.task_always_eager, conf.task_eager_propagates = eager
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def build_results(scenarios: Dict[str, Dict], dataset: Dict, iterations: int, extra: Optional[Dict] = None) -> Dict:
+    return {
+        'version': RESULTS_VERSION,
+        'commit': current_commit(),
+        'recorded_at': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'database': connection.vendor,
+        },
+        'dataset': dataset,
+        'iterations': iterations,
+        'scenarios': scenarios,
+        **(extra or {}),
+    }
+
+
+def write_results(results: Dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True))
+    return path
+
+
+def load_results(path) -> Dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Scenarios that regressed against baseline: p95 latency up by more than
+    `threshold` (fraction) or more queries per call at p50. A dataset mismatch
+    makes latency comparisons meaningless, so it is reported as its own entry.
+    """
+    regressions = []
+    if baseline.get('dataset') != current.get('dataset'):
+        regressions.append({'scenario': '*', 'metric': 'dataset',
+                            'baseline': baseline.get('dataset'), 'current': current.get('dataset')})
+
+    for scenario, now in current.get('scenarios', {}).items():
+        before = baseline.get('scenarios', {}).get(scenario)
+        if not before:
+            continue
+        if before['p95_ms'] and now['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append({'scenario': scenario, 'metric': 'p95_ms',
+                                'baseline': before['p95_ms'], 'current': now['p95_ms']})
+        if now['queries_p50'] > before['queries_p50']:
+            regressions.append({'scenario': scenario, 'metric': 'queries_p50',
+                                'baseline': before['queries_p50'], 'current': now['queries_p50']})
+    return regressions
@@ -0,0 +1,131 @@
+"""
+Test-lifecycle benchmark scenarios.
+
+Each iteration takes one synthetic student through a full test over the real
+HTTP stack (APIClient -> middleware -> DRF views):
+
+    test_start / test_start_adaptive   POST /api/test-sessions/ (rule engine; adaptive on odd iterations)
+    autosave                            POST /api/test-answers/autosave/, one call per answer batch
+    time_log_batch                      POST /api/time-tracking/log_time_batch/, one call per answer batch
+    submit                              POST /api/test-sessions/<id>/submit/
+    compute_results_task                the Celery task, run inline
+    dashboard_analytics                 GET /api/dashboard/analytics/
+    dashboard_comprehensive             GET /api/dashboard/comprehensive-analytics/
+
+Answers, topics and timings come from a Random seeded with the dataset seed,
+so every run issues the same requests.
+"""
+import math
+import random
+from typing import Dict, Optional
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from neet_app.models import TestAnswer, TestSession
+
+from .data import OPTIONS, DatasetSpec, seed_dataset
+from .harness import BenchmarkRecorder, build_results, stubbed_external_services
+
+MIN_TOPICS_PER_TEST = 3
+
+
+def topics_per_test(dataset, question_count: int) -> int:
+    """Enough topics that the selection pool holds about twice the questions asked for."""
+    per_topic = max(len(dataset.question_ids) // max(len(dataset.topic_ids), 1), 1)
+    wanted = max(MIN_TOPICS_PER_TEST, math.ceil(2 * question_count / per_topic))
+    return min(wanted, len(dataset.topic_ids))
+
+
+def student_client(student_id: str) -> APIClient:
+    """APIClient authenticated as the student with a freshly minted access token."""
+    refresh = RefreshToken()
+    refresh['student_id'] = student_id
+    refresh['user_id'] = student_id
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    return client
+
+
+def _take_test(client: APIClient, dataset, rng: random.Random, recorder: BenchmarkRecorder,
+               question_count: int, batch_size: int, adaptive: bool):
+    from neet_app.tasks import compute_results_task
+
+    start_scenario = 'test_start_adaptive' if adaptive else 'test_start'
+    with recorder.measure(start_scenario):
+        response = client.post('/api/test-sessions/', {
+            'selected_topics': rng.sample(dataset.topic_ids, topics_per_test(dataset, question_count)),
+            'question_count': question_count,
+            'time_limit': question_count,
+            'adaptive_selection': adaptive,
+        }, format='json')
+    recorder.note(start_scenario, response.status_code)
+    if response.status_code != 201:
+        return
+    session_id = response.json()['id']
+
+    question_ids = list(
+        TestAnswer.objects.filter(session_id=session_id).order_by('id').values_list('question_id', flat=True)
+    )
+    for seq, offset in enumerate(range(0, len(question_ids), batch_size), start=1):
+        batch = question_ids[offset:offset + batch_size]
+        with recorder.measure('autosave'):
+            response = client.post('/api/test-answers/autosave/', {
+                'session_id': session_id,
+                'seq': seq,
+                'answers': [{'question_id': qid, 'selected_answer': rng.choice(OPTIONS)} for qid in batch],
+            }, format='json')
+        recorder.note('autosave', response.status_code)
+
+        with recorder.measure('time_log_batch'):
+            response = client.post('/api/time-tracking/log_time_batch/', {
+                'session_id': session_id,
+                'events': [{'question_id': qid, 'time_spent': rng.randint(5, 120)} for qid in batch],
+            }, format='json')
+        recorder.note('time_log_batch', response.status_code)
+
+    with recorder.measure('submit'):
+        response = client.post(f'/api/test-sessions/{session_id}/submit/', {}, format='json')
+    recorder.note('submit', response.status_code)
+
+    # Submit already scores the session; clear the subject-score marker so the
+    # task's scoring stage does real work instead of only its idempotency check
+    TestSession.objects.filter(id=session_id).update(subject_scores_computed_at=None)
+    with recorder.measure('compute_results_task'):
+        result = compute_results_task.apply(args=[session_id]).get()
+    recorder.note('compute_results_task', result.get('status'))
+
+    for scenario, url in (('dashboard_analytics', '/api/dashboard/analytics/'),
+                          ('dashboard_comprehensive', '/api/dashboard/comprehensive-analytics/')):
+        with recorder.measure(scenario):
+            response = client.get(url)
+        recorder.note(scenario, response.status_code)
+
+
+def run_lifecycle_benchmark(spec: Optional[DatasetSpec] = None, iterations: int = 20, question_count: int = 20,
+                            autosave_batch: int = 5, warmup: int = 1, llm_latency: float = 0.0) -> Dict:
+    """
+    Seed a dataset, run `warmup` unrecorded iterations then `iterations`
+    recorded ones, and return the results document (see harness.build_results).
+    Must run against a disposable database; the management command provides one.
+    """
+    spec = spec or DatasetSpec()
+    dataset = seed_dataset(spec)
+    rng = random.Random(spec.seed)
+    recorder = BenchmarkRecorder()
+
+    with stubbed_external_services(llm_latency=llm_latency) as calls:
+        for n in range(warmup + iterations):
+            student_id = dataset.student_ids[n % len(dataset.student_ids)]
+            _take_test(
+                student_client(student_id), dataset, rng,
+                recorder if n >= warmup else BenchmarkRecorder(),
+                question_count=question_count, batch_size=autosave_batch, adaptive=bool(n % 2),
+            )
+
+    return build_results(
+        recorder.summary(),
+        dataset={**spec.as_dict(), 'question_count': question_count, 'autosave_batch': autosave_batch},
+        iterations=iterations,
+        extra={'stub_calls': dict(calls)},
+    )
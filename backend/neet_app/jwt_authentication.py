@@ -1,12 +1,16 @@
 """
 Custom JWT Authentication for Student Profile
 """
+import logging
+
 import sentry_sdk
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth.models import AnonymousUser
 from .models import StudentProfile
 
+logger = logging.getLogger(__name__)
+
 
 class StudentJWTAuthentication(JWTAuthentication):
     """
@@ -27,7 +31,7 @@ class StudentJWTAuthentication(JWTAuthentication):
                         "JWT Authentication - No student_id in token payload",
                         level="warning"
                     )
-                print(f"❌ JWT Authentication - No student_id in token payload")
+                logger.warning("❌ JWT Authentication - No student_id in token payload")
                 return None
                 
             sentry_sdk.add_breadcrumb(
@@ -36,7 +40,7 @@ class StudentJWTAuthentication(JWTAuthentication):
                 level="info",
                 data={"student_id": student_id}
             )
-            print(f"🔍 JWT Authentication - Looking for student: {student_id}")
+            logger.debug("🔍 JWT Authentication - Looking for student: %s", student_id)
             
             # Get the actual student profile
             student = StudentProfile.objects.get(student_id=student_id)
@@ -48,7 +52,7 @@ class StudentJWTAuthentication(JWTAuthentication):
                         "JWT Authentication - Student account not active",
                         level="warning"
                     )
-                print(f"❌ JWT Authentication - Student {student_id} is not active")
+                logger.warning("❌ JWT Authentication - Student %s is not active", student_id)
                 return None
             
             sentry_sdk.add_breadcrumb(
@@ -57,7 +61,7 @@ class StudentJWTAuthentication(JWTAuthentication):
                 level="info",
                 data={"student_id": student_id, "full_name": student.full_name}
             )
-            print(f"✅ JWT Authentication - Found student: {student_id} - {student.full_name}")
+            logger.debug("✅ JWT Authentication - Found student: %s - %s", student_id, student.full_name)
             
             # Create a StudentUser object that mimics Django's User model
             class StudentUser:
@@ -98,12 +102,12 @@ class StudentJWTAuthentication(JWTAuthentication):
                     "JWT Authentication - Student not found in database",
                     level="warning"
                 )
-            print(f"❌ JWT Authentication - Student {student_id} not found in database")
+            logger.warning("❌ JWT Authentication - Student %s not found in database", student_id)
             return None
         except (KeyError, TypeError) as e:
             with sentry_sdk.push_scope() as scope:
                 scope.set_extra("action", "jwt_token_validation")
                 scope.set_extra("token_payload", str(validated_token))
                 sentry_sdk.capture_exception(e)
-            print(f"❌ JWT Authentication - Token format error: {e}")
+            logger.warning("❌ JWT Authentication - Token format error: %s", e)
             return None
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+
+from ...benchmarks import DatasetSpec, compare_results, load_results, run_lifecycle_benchmark, write_results
+from ...benchmarks.harness import current_commit
+
+# Features that need Redis; --no-redis turns them off so the suite runs on a laptop
+NO_REDIS_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'TIME_TRACKING_BUFFER_ENABLED': False,
+    'LIVE_PRESENCE_REDIS_ENABLED': False,
+    'REQUEST_PROFILER_REDIS_BUFFER': False,
+}
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the test lifecycle (start, autosave, time logging, submit, results, dashboards) '
+            'on a throwaway database seeded with synthetic data, and write p50/p95 latency and query counts as JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50, help='Synthetic students')
+        parser.add_argument('--questions', type=int, default=2000, help='Synthetic question bank size')
+        parser.add_argument('--topics-per-subject', type=int, default=10)
+        parser.add_argument('--history', type=int, default=5, help='Completed tests per student before the run')
+        parser.add_argument('--history-questions', type=int, default=30, help='Questions per historical test')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=20, help='Recorded test lifecycles')
+        parser.add_argument('--warmup', type=int, default=1, help='Unrecorded lifecycles run first')
+        parser.add_argument('--question-count', type=int, default=20, help='Questions per benchmarked test')
+        parser.add_argument('--autosave-batch', type=int, default=5, help='Answers per autosave/time-log call')
+        parser.add_argument('--llm-latency', type=float, default=0.0, help='Seconds the stubbed LLM sleeps per call')
+        parser.add_argument('--output', help='Results file (default: benchmark_results/<commit>.json)')
+        parser.add_argument('--compare', help='Baseline results file to check for regressions')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 increase as a fraction')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit non-zero if --compare finds regressions')
+        parser.add_argument('--no-redis', action='store_true', help='Use in-process cache and disable Redis buffers')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database between runs')
+
+    def handle(self, *args, **options):
+        spec = DatasetSpec(
+            students=options['students'],
+            questions=options['questions'],
+            topics_per_subject=options['topics_per_subject'],
+            history_depth=options['history'],
+            history_questions=options['history_questions'],
+            seed=options['seed'],
+        )
+        if spec.students < 1 or spec.questions < options['question_count']:
+            raise CommandError('Need at least one student and --questions >= --question-count')
+
+        verbosity = options['verbosity']
+        setup_test_environment()
+        old_config = setup_databases(verbosity=verbosity, interactive=False, keepdb=options['keepdb'])
+        try:
+            with override_settings(DEBUG=False, **(NO_REDIS_SETTINGS if options['no_redis'] else {})):
+                results = run_lifecycle_benchmark(
+                    spec,
+                    iterations=options['iterations'],
+                    question_count=options['question_count'],
+                    autosave_batch=options['autosave_batch'],
+                    warmup=options['warmup'],
+                    llm_latency=options['llm_latency'],
+                )
+        finally:
+            teardown_databases(old_config, verbosity=verbosity, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        output = options['output'] or Path(settings.BASE_DIR) / 'benchmark_results' / f'{current_commit()}.json'
+        path = write_results(results, output)
+
+        self.stdout.write(f"{'scenario':<26}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}")
+        for name, row in sorted(results['scenarios'].items()):
+            self.stdout.write(f"{name:<26}{row['samples']:>5}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['queries_p50']:>9}")
+        self.stdout.write(self.style.SUCCESS(f'Results written to {path}'))
+
+        if options['compare']:
+            regressions = compare_results(load_results(options['compare']), results, options['threshold'])
+            for r in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f"Regression in {r['scenario']} {r['metric']}: {r['baseline']} -> {r['current']}"
+                ))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+            elif options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} benchmark regressions')
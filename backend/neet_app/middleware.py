@@ -1,3 +1,7 @@
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from .models import UserActivity, StudentActivity, StudentProfile
@@ -8,6 +12,8 @@ try:
     from rest_framework_simplejwt.authentication import JWTAuthentication
 except Exception:
     JWTAuthentication = None
+from .utils import profiler
+from .utils.query_budget import get_query_budget
 
 class UpdateLastSeenMiddleware:
     """Middleware that updates UserActivity.last_seen for authenticated users.
@@ -106,3 +112,79 @@ class UpdateLastSeenMiddleware:
             except Exception:
                 logger.exception('UpdateLastSeenMiddleware failed to write StudentActivity')
         return self.get_response(request)
+
+
+class RequestProfilerMiddleware:
+    """Profile opted-in requests (signed X-Profile-Token header or sampled) into the profile ring buffer.
+
+    Place first in settings.MIDDLEWARE so the report covers the whole middleware stack.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        profiler.install_http_timer()
+
+    def __call__(self, request):
+        trigger = profiler.profile_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        response, report = profiler.profile_call(self.get_response, request)
+        user = getattr(request, 'user', None)
+        report.update({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'trigger': trigger,
+            'user': str(getattr(user, 'pk', '') or '') if getattr(user, 'is_authenticated', False) else '',
+        })
+        try:
+            profiler.store_report(report)
+        except Exception:
+            logger.exception('RequestProfilerMiddleware failed to store report')
+        if trigger == 'header':
+            response[profiler.PROFILE_ID_HEADER] = report['id']
+        return response
+
+
+class QueryCountMiddleware:
+    """DEBUG-only: report X-Query-Count and X-Query-Time-Ms, and warn when an endpoint exceeds its query budget.
+
+    Removed from the stack (MiddlewareNotUsed) when DEBUG is off.
+    """
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {'count': 0, 'seconds': 0.0}
+
+        def count(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['count'] += 1
+                stats['seconds'] += time.perf_counter() - start
+
+        wrappers = [conn.execute_wrapper(count) for conn in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        response['X-Query-Count'] = str(stats['count'])
+        response['X-Query-Time-Ms'] = f"{stats['seconds'] * 1000:.1f}"
+        match = getattr(request, 'resolver_match', None)
+        budget = get_query_budget(getattr(match, 'url_name', None))
+        if budget:
+            response['X-Query-Budget'] = str(budget.max_queries)
+            if stats['count'] > budget.max_queries:
+                logger.warning(
+                    'Query budget exceeded for %s: %s queries (budget %s) on %s',
+                    budget.url_name, stats['count'], budget.max_queries, request.path,
+                )
+        return response
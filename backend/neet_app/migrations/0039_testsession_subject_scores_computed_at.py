@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0038_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='subject_scores_computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0039_testsession_subject_scores_computed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testanswer',
+            name='client_seq',
+            field=models.BigIntegerField(blank=True, help_text='Last applied client autosave sequence number', null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0040_testanswer_client_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentMistakeLedger',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('topic_id', models.IntegerField()),
+                ('subject', models.CharField(max_length=20)),
+                ('selected_answer', models.CharField(max_length=1)),
+                ('misconception', models.TextField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('question', models.ForeignKey(db_column='question_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='neet_app.question')),
+                ('student', models.ForeignKey(db_column='student_id', on_delete=django.db.models.deletion.CASCADE, related_name='mistake_ledger', to='neet_app.studentprofile')),
+                ('test_session', models.ForeignKey(db_column='test_session_id', on_delete=django.db.models.deletion.CASCADE, related_name='mistake_ledger_entries', to='neet_app.testsession')),
+            ],
+            options={
+                'verbose_name': 'Student Mistake Ledger Entry',
+                'verbose_name_plural': 'Student Mistake Ledger',
+                'db_table': 'student_mistake_ledger',
+                'indexes': [models.Index(fields=['student', '-occurred_at'], name='mistake_ledger_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('test_session', 'question'), name='uniq_mistake_ledger_session_question')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprint questions that already carry misconceptions so they can be reused."""
+    from neet_app.utils.question_fingerprint import question_fingerprint
+
+    Question = apps.get_model('neet_app', 'Question')
+    batch = []
+    for question in Question.objects.filter(misconceptions__isnull=False).iterator(chunk_size=500):
+        question.content_fingerprint = question_fingerprint(question)
+        batch.append(question)
+        if len(batch) >= 500:
+            Question.objects.bulk_update(batch, ['content_fingerprint'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['content_fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0041_student_mistake_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
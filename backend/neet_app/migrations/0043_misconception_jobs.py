@@ -0,0 +1,69 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0042_question_content_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MisconceptionJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('partial', 'Partially failed')], default='running', max_length=20)),
+                ('batch_size', models.IntegerField(default=20)),
+                ('total_questions', models.IntegerField(default=0)),
+                ('reused_questions', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('platform_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='misconception_jobs', to='neet_app.platformtest')),
+            ],
+            options={
+                'verbose_name': 'Misconception Job',
+                'verbose_name_plural': 'Misconception Jobs',
+                'db_table': 'misconception_jobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='MisconceptionBatch',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('subject', models.CharField(max_length=50)),
+                ('sequence', models.IntegerField()),
+                ('question_ids', models.JSONField(default=list)),
+                ('sibling_ids', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('processed_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='neet_app.misconceptionjob')),
+            ],
+            options={
+                'verbose_name': 'Misconception Batch',
+                'verbose_name_plural': 'Misconception Batches',
+                'db_table': 'misconception_batches',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='misconceptionjob',
+            index=models.Index(fields=['platform_test', '-created_at'], name='misconception_job_test_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='misconceptionbatch',
+            index=models.Index(fields=['job', 'status'], name='misconception_batch_status_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='misconceptionbatch',
+            unique_together={('job', 'sequence')},
+        ),
+    ]
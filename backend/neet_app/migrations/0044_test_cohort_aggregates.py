@@ -0,0 +1,82 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0043_misconception_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestCohortSummary',
+            fields=[
+                ('platform_test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cohort_summary', serialize=False, to='neet_app.platformtest')),
+                ('sessions', models.IntegerField(default=0)),
+                ('max_score', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_sq_sum', models.FloatField(default=0)),
+                ('score_min', models.FloatField(blank=True, null=True)),
+                ('score_max', models.FloatField(blank=True, null=True)),
+                ('correct_sum', models.BigIntegerField(default=0)),
+                ('incorrect_sum', models.BigIntegerField(default=0)),
+                ('unanswered_sum', models.BigIntegerField(default=0)),
+                ('time_sum', models.BigIntegerField(default=0)),
+                ('score_histogram', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Test Cohort Summary',
+                'verbose_name_plural': 'Test Cohort Summaries',
+                'db_table': 'test_cohort_summaries',
+            },
+        ),
+        migrations.AddField(
+            model_name='testsession',
+            name='cohort_aggregated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TestQuestionCohortStat',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('attempts', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('incorrect', models.IntegerField(default=0)),
+                ('unanswered', models.IntegerField(default=0)),
+                ('time_sum', models.BigIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('correct_score_sum', models.FloatField(default=0)),
+                ('platform_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_cohort_stats', to='neet_app.platformtest')),
+                ('question', models.ForeignKey(db_column='question_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='neet_app.question')),
+            ],
+            options={
+                'verbose_name': 'Test Question Cohort Stat',
+                'verbose_name_plural': 'Test Question Cohort Stats',
+                'db_table': 'test_question_cohort_stats',
+                'unique_together': {('platform_test', 'question')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TestTopicCohortStat',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('topic_id', models.IntegerField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('incorrect', models.IntegerField(default=0)),
+                ('unanswered', models.IntegerField(default=0)),
+                ('time_sum', models.BigIntegerField(default=0)),
+                ('platform_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topic_cohort_stats', to='neet_app.platformtest')),
+            ],
+            options={
+                'verbose_name': 'Test Topic Cohort Stat',
+                'verbose_name_plural': 'Test Topic Cohort Stats',
+                'db_table': 'test_topic_cohort_stats',
+                'unique_together': {('platform_test', 'topic_id')},
+            },
+        ),
+    ]
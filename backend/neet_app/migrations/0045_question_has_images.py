@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:43
+
+from django.db import migrations, models
+
+IMAGE_FIELDS = (
+    'question_image', 'option_a_image', 'option_b_image',
+    'option_c_image', 'option_d_image', 'explanation_image',
+)
+
+
+def backfill_has_images(apps, schema_editor):
+    Question = apps.get_model('neet_app', 'Question')
+    with_images = models.Q()
+    for field in IMAGE_FIELDS:
+        with_images |= models.Q(**{f'{field}__isnull': False}) & ~models.Q(**{field: ''})
+    Question.objects.filter(with_images).update(has_images=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0044_test_cohort_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='has_images',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_has_images, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('has_images', False)), fields=['topic'], name='questions_text_only_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('has_images', False)), fields=['institution'], name='questions_text_only_inst_idx'),
+        ),
+    ]
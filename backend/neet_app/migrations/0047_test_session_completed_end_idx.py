@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0046_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['student_id', 'end_time'], name='test_session_completed_end_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:10
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Concat, Left, Length
+from django.db.models.lookups import GreaterThan
+
+PREVIEW_LENGTH = 100
+
+
+def backfill_message_summary(apps, schema_editor):
+    ChatSession = apps.get_model('neet_app', 'ChatSession')
+    ChatMessage = apps.get_model('neet_app', 'ChatMessage')
+    messages = ChatMessage.objects.filter(chat_session=models.OuterRef('pk'))
+    count = messages.order_by().values('chat_session').annotate(n=models.Count('id')).values('n')
+    last = messages.order_by('-created_at', '-id')
+    preview = models.Case(
+        models.When(
+            GreaterThan(Length('message_content'), PREVIEW_LENGTH),
+            then=Concat(Left('message_content', PREVIEW_LENGTH), models.Value('...')),
+        ),
+        default=models.F('message_content'),
+        output_field=models.TextField(),
+    )
+    ChatSession.objects.update(
+        message_count=Coalesce(models.Subquery(count), 0),
+        last_message_at=models.Subquery(last.values('created_at')[:1]),
+        last_message_preview=models.Subquery(last.annotate(preview=preview).values('preview')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neet_app', '0047_test_session_completed_end_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_preview',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_message_summary, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['student_id', 'is_active', '-updated_at', '-id'], name='chat_session_recent_idx'),
+        ),
+    ]
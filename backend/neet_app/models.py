@@ -6,6 +6,8 @@ from django.contrib.auth.hashers import make_password, check_password
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 
+from neet_app.utils.question_fingerprint import FINGERPRINT_FIELDS, question_fingerprint
+
 class Topic(models.Model):
     """
     Replicates the 'topics' table from the Drizzle ORM schema.
@@ -58,6 +60,9 @@ class Question(models.Model):
     option_d_image = models.TextField(null=True, blank=True)
     # Optional image for explanation (kept separate from explanation text)
     explanation_image = models.TextField(null=True, blank=True)
+    # True when any image field is non-empty (maintained in save()); text-only selection
+    # filters on this flag so the large base64 columns are never read
+    has_images = models.BooleanField(default=False)
     
     # Misconceptions for each wrong option (JSON field storing option->misconception mapping)
     misconceptions = models.JSONField(
@@ -66,6 +71,9 @@ class Question(models.Model):
         default=None,
         help_text='JSON mapping of wrong options to misconceptions: {"option_a": "misconception text", ...}'
     )
+    # Hash of the normalized stem, options and images (see compute_content_fingerprint);
+    # lets misconceptions be reused across tests/institutions sharing a question
+    content_fingerprint = models.CharField(max_length=64, null=True, blank=True, db_index=True)
     
     # Institution-specific fields (nullable for backward compatibility)
     institution = models.ForeignKey('Institution', on_delete=models.SET_NULL, null=True, blank=True, db_index=True, related_name='questions')
@@ -81,11 +89,39 @@ class Question(models.Model):
         indexes = [
             models.Index(fields=['institution', 'institution_test_name']),
             models.Index(fields=['institution', 'exam_type']),
+            # Text-only pools: custom/random tests by topic, question of the day (global questions)
+            models.Index(fields=['topic'], name='questions_text_only_topic_idx', condition=models.Q(has_images=False)),
+            models.Index(fields=['institution'], name='questions_text_only_inst_idx', condition=models.Q(has_images=False)),
         ]
 
+    IMAGE_FIELDS = (
+        'question_image', 'option_a_image', 'option_b_image',
+        'option_c_image', 'option_d_image', 'explanation_image',
+    )
+
     def __str__(self):
         return f"Q{self.id}: {self.question[:50]}..."
 
+    def compute_content_fingerprint(self):
+        return question_fingerprint(self)
+
+    def compute_has_images(self):
+        return any(getattr(self, field) for field in self.IMAGE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # Keep derived columns in step with content edits (bulk_update/update() bypass this)
+        update_fields = kwargs.get('update_fields')
+        derived = set()
+        if update_fields is None or set(update_fields) & set(FINGERPRINT_FIELDS):
+            self.content_fingerprint = self.compute_content_fingerprint()
+            derived.add('content_fingerprint')
+        if update_fields is None or set(update_fields) & set(self.IMAGE_FIELDS):
+            self.has_images = self.compute_has_images()
+            derived.add('has_images')
+        if update_fields is not None and derived:
+            kwargs['update_fields'] = set(update_fields) | derived
+        super().save(*args, **kwargs)
+
 class PlatformTest(models.Model):
     """
     Represents standardized tests provided by the platform (e.g., NEET 2024 Official Paper).
@@ -359,6 +395,10 @@ class TestSession(models.Model):
     zoology_score = models.FloatField(null=True, blank=True)  # Zoology percentage
     biology_score = models.FloatField(null=True, blank=True)  # Biology percentage
     math_score = models.FloatField(null=True, blank=True)  # Math percentage
+    # Idempotency marker: set in the same UPDATE that persists the subject scores
+    subject_scores_computed_at = models.DateTimeField(null=True, blank=True)
+    # Set when the session has been folded into its platform test's cohort aggregates
+    cohort_aggregated_at = models.DateTimeField(null=True, blank=True)
     # TTS audio URL for checkpoint insights (demo tests only)
     insights_audio_url = models.CharField(max_length=255, null=True, blank=True)  # Audio file path for insights
     # Activity tracking for admin metrics
@@ -374,6 +414,9 @@ class TestSession(models.Model):
             models.Index(fields=['is_completed', 'start_time']),
             models.Index(fields=['test_type', 'start_time']),
             models.Index(fields=['platform_test', 'start_time']),
+            # Latest completed session per student (inactivity cohort)
+            models.Index(fields=['student_id', 'end_time'], name='test_session_completed_end_idx',
+                         condition=models.Q(is_completed=True)),
         ]
 
     def __str__(self):
@@ -434,162 +477,106 @@ class TestSession(models.Model):
         if not topics_to_classify:
             return
         
-    # Reset subject topic lists
-        self.physics_topics = []
-        self.chemistry_topics = []
-        self.botany_topics = []
-        self.zoology_topics = []
-        self.biology_topics = []
+        # Classify selected topics by their actual subject field (cached taxonomy, no query)
+        from .utils.topic_taxonomy import get_topic_taxonomy
+
+        buckets = get_topic_taxonomy(topic_ids=topics_to_classify).classify_by_bucket(topics_to_classify)
+        self.physics_topics = buckets['physics']
+        self.chemistry_topics = buckets['chemistry']
+        self.botany_topics = buckets['botany']
+        self.zoology_topics = buckets['zoology']
+        self.biology_topics = buckets['biology']
         self.math_topics = []
-        
-        # Get topic objects for selected topic IDs with their subjects
-        selected_topic_objects = Topic.objects.filter(id__in=topics_to_classify)
-        
-        # Classify selected topics by their actual subject field
-        for topic in selected_topic_objects:
-            topic_name = topic.name
-            subject = topic.subject
-            
-            # Normalize subject names and classify
-            if subject.lower() in ['physics']:
-                self.physics_topics.append(topic_name)
-            elif subject.lower() in ['chemistry']:
-                self.chemistry_topics.append(topic_name)
-            elif subject.lower() in ['botany', 'plant biology']:
-                self.botany_topics.append(topic_name)
-            elif subject.lower() in ['zoology', 'animal biology']:
-                self.zoology_topics.append(topic_name)
-            elif subject.lower() in ['biology']:
-                self.biology_topics.append(topic_name)
-            else:
-                # Handle edge cases - try to map based on common patterns
-                if 'physics' in subject.lower():
-                    self.physics_topics.append(topic_name)
-                elif 'chemistry' in subject.lower() or 'chemical' in subject.lower():
-                    self.chemistry_topics.append(topic_name)
-                elif 'plant' in subject.lower() or 'botany' in subject.lower():
-                    self.botany_topics.append(topic_name)
-                elif 'animal' in subject.lower() or 'zoology' in subject.lower():
-                    self.zoology_topics.append(topic_name)
-                elif 'biology' in subject.lower() or 'bio' in subject.lower():
-                    self.biology_topics.append(topic_name)
-                # If no match, the topic won't be classified (which is fine)
-
-    def calculate_and_update_subject_scores(self):
+        # If no match, the topic won't be classified (which is fine)
+
+    # Subject bucket -> score field on this model
+    SUBJECT_SCORE_FIELDS = {
+        'physics': 'physics_score',
+        'chemistry': 'chemistry_score',
+        'botany': 'botany_score',
+        'zoology': 'zoology_score',
+        'biology': 'biology_score',
+        'math': 'math_score',
+    }
+
+    def compute_subject_scores(self):
         """
-        Calculate and update subject-wise scores based on test answers.
+        Compute subject-wise score percentages with one grouped aggregate.
         Scoring: Correct = +4, Wrong = -1, Unanswered = 0
         Uses TestAnswer -> Question -> Topic -> Subject path
+
+        Returns:
+            (scores, subject_stats): scores maps score field -> percentage (None when the
+            subject has no questions); subject_stats maps bucket -> answer counts
         """
-        from django.db.models import Q
-        
-        # Initialize subject scores
-        subject_scores = {
-            'Physics': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0},
-            'Chemistry': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0},
-            'Botany': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0},
-            'Zoology': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0},
-            'Biology': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0},
-            'Math': {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0}
+        from django.db.models import Count, Q
+        from .utils.topic_taxonomy import normalize_subject_bucket
+
+        subject_stats = {
+            bucket: {'correct': 0, 'wrong': 0, 'unanswered': 0, 'total_questions': 0}
+            for bucket in self.SUBJECT_SCORE_FIELDS
         }
-        
-        # Get all test answers for this session with related data
-        test_answers = TestAnswer.objects.filter(session=self).select_related(
-            'question__topic'
+
+        rows = TestAnswer.objects.filter(session_id=self.id).values('question__topic__subject').annotate(
+            total=Count('id'),
+            correct=Count('id', filter=Q(is_correct=True)),
+            wrong=Count('id', filter=Q(is_correct=False)),
         )
-        
-        # Group answers by subject
-        for answer in test_answers:
-            subject = answer.question.topic.subject
-            
-            # Normalize subject names to match our scoring dict
-            if subject.lower() in ['physics']:
-                subject_key = 'Physics'
-            elif subject.lower() in ['chemistry']:
-                subject_key = 'Chemistry'
-            elif subject.lower() in ['botany', 'plant biology']:
-                subject_key = 'Botany'
-            elif subject.lower() in ['zoology', 'animal biology']:
-                subject_key = 'Zoology'
-            elif subject.lower() in ['biology']:
-                subject_key = 'Biology'
-            elif subject.lower() in ['math', 'mathematics', 'maths']:
-                subject_key = 'Math'
-            else:
-                # Handle edge cases - try to map based on common patterns
-                if 'physics' in subject.lower():
-                    subject_key = 'Physics'
-                elif 'chemistry' in subject.lower() or 'chemical' in subject.lower():
-                    subject_key = 'Chemistry'
-                elif 'plant' in subject.lower() or 'botany' in subject.lower():
-                    subject_key = 'Botany'
-                elif 'animal' in subject.lower() or 'zoology' in subject.lower():
-                    subject_key = 'Zoology'
-                elif 'biology' in subject.lower() or 'bio' in subject.lower():
-                    subject_key = 'Biology'
-                elif 'math' in subject.lower() or 'algebra' in subject.lower() or 'geometry' in subject.lower():
-                    subject_key = 'Math'
-                else:
-                    continue  # Skip if subject cannot be classified
-            
-            # Count the answer type
-            subject_scores[subject_key]['total_questions'] += 1
-            
-            if answer.is_correct is True:
-                subject_scores[subject_key]['correct'] += 1
-            elif answer.is_correct is False:
-                subject_scores[subject_key]['wrong'] += 1
-            else:  # is_correct is None (unanswered)
-                subject_scores[subject_key]['unanswered'] += 1
-        
-        # Calculate scores for each subject
+        for row in rows:
+            bucket = normalize_subject_bucket(row['question__topic__subject'], include_math=True)
+            if bucket is None:
+                continue  # Skip if subject cannot be classified
+            stats = subject_stats[bucket]
+            stats['total_questions'] += row['total']
+            stats['correct'] += row['correct']
+            stats['wrong'] += row['wrong']
+            stats['unanswered'] += row['total'] - row['correct'] - row['wrong']
+
         # Score = (Correct * 4) + (Wrong * -1) + (Unanswered * 0)
-        # Percentage = (Score / Max_Possible_Score) * 100
-        
-        for subject, stats in subject_scores.items():
+        # Percentage = (Score / Max_Possible_Score) * 100, never below 0
+        scores = {}
+        for bucket, field in self.SUBJECT_SCORE_FIELDS.items():
+            stats = subject_stats[bucket]
             if stats['total_questions'] > 0:
-                # Calculate raw score
                 raw_score = (stats['correct'] * 4) + (stats['wrong'] * -1)
-                
-                # Calculate maximum possible score (all correct)
                 max_possible_score = stats['total_questions'] * 4
-                
-                # Calculate percentage (ensuring it doesn't go below 0)
-                percentage = max(0, (raw_score / max_possible_score) * 100) if max_possible_score > 0 else 0
-                
-                # Update the respective field
-                if subject == 'Physics':
-                    self.physics_score = round(percentage, 2)
-                elif subject == 'Chemistry':
-                    self.chemistry_score = round(percentage, 2)
-                elif subject == 'Botany':
-                    self.botany_score = round(percentage, 2)
-                elif subject == 'Zoology':
-                    self.zoology_score = round(percentage, 2)
-                elif subject == 'Biology':
-                    self.biology_score = round(percentage, 2)
-                elif subject == 'Math':
-                    self.math_score = round(percentage, 2)
+                scores[field] = round(max(0, (raw_score / max_possible_score) * 100), 2)
             else:
-                # No questions for this subject
-                if subject == 'Physics':
-                    self.physics_score = None
-                elif subject == 'Chemistry':
-                    self.chemistry_score = None
-                elif subject == 'Botany':
-                    self.botany_score = None
-                elif subject == 'Zoology':
-                    self.zoology_score = None
-                elif subject == 'Biology':
-                    self.biology_score = None
-                elif subject == 'Math':
-                    self.math_score = None
-        
-        # Save the updated scores (include biology and math)
-        update_fields = ['physics_score', 'chemistry_score', 'botany_score', 'zoology_score', 'biology_score', 'math_score']
-        self.save(update_fields=update_fields)
-        
-        return subject_scores  # Return for debugging/logging purposes
+                scores[field] = None
+        return scores, subject_stats
+
+    def calculate_and_update_subject_scores(self, only_if_missing=False):
+        """
+        Compute and persist subject-wise scores plus the subject_scores_computed_at marker.
+
+        Persisted with a single queryset UPDATE (no post_save re-entry). With
+        only_if_missing=True the UPDATE is conditional on the marker still being
+        empty, so concurrent or repeated pipeline runs write at most once.
+
+        Returns:
+            Per-subject answer counts, or None when skipped because scores already exist
+        """
+        if only_if_missing and self.subject_scores_computed_at is not None:
+            return None
+
+        scores, subject_stats = self.compute_subject_scores()
+        computed_at = timezone.now()
+
+        queryset = TestSession.objects.filter(id=self.id)
+        if only_if_missing:
+            queryset = queryset.filter(subject_scores_computed_at__isnull=True)
+        if not queryset.update(subject_scores_computed_at=computed_at, **scores):
+            return None
+
+        for field, value in scores.items():
+            setattr(self, field, value)
+        self.subject_scores_computed_at = computed_at
+
+        # Scored platform/institution test sessions feed the per-test cohort aggregates
+        if self.platform_test_id:
+            from .tasks import schedule_cohort_update
+            schedule_cohort_update(self.id)
+        return subject_stats  # Return for debugging/logging purposes
 
     @staticmethod
     def get_recent_question_ids_for_student(student_id, recent_tests_count=3):
@@ -658,6 +645,8 @@ class TestAnswer(models.Model):
     visit_count = models.IntegerField(default=1, null=False) # Tracks how many times student visited this question
     # When the answer was submitted
     answered_at = models.DateTimeField(null=True, blank=True) # timestamp("answered_at")
+    # Highest client autosave sequence applied to this row; older deltas are dropped
+    client_seq = models.BigIntegerField(null=True, blank=True, help_text='Last applied client autosave sequence number')
 
     class Meta:
         db_table = 'test_answers' # Ensures the table name in DB is 'test_answers'
@@ -935,6 +924,10 @@ class ChatSession(models.Model):
     # Session metadata
     session_title = models.TextField(null=True, blank=True)  # Optional title for the chat session
     is_active = models.BooleanField(default=True, null=False)
+    # Denormalized from ChatMessage (maintained by ChatMessage.save()) so listings read one row per session
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.TextField(null=True, blank=True)
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, null=False)
     updated_at = models.DateTimeField(auto_now=True, null=False)
@@ -946,6 +939,8 @@ class ChatSession(models.Model):
         indexes = [
             models.Index(fields=['student_id', 'created_at']),
             models.Index(fields=['is_active', 'updated_at']),
+            # Keyset pagination of a student's active sessions, most recently used first
+            models.Index(fields=['student_id', 'is_active', '-updated_at', '-id'], name='chat_session_recent_idx'),
         ]
     
     def __str__(self):
@@ -988,9 +983,36 @@ class ChatMessage(models.Model):
             models.Index(fields=['message_type', 'created_at']),
         ]
     
+    PREVIEW_LENGTH = 100
+
     def __str__(self):
         return f"{self.message_type}: {self.message_content[:50]}..."
 
+    @classmethod
+    def preview(cls, content):
+        return content[:cls.PREVIEW_LENGTH] + "..." if len(content) > cls.PREVIEW_LENGTH else content
+
+    def save(self, *args, **kwargs):
+        # New messages bump the session's denormalized counters in one UPDATE
+        # (bulk_create bypasses this)
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        if not is_new:
+            return
+        preview = self.preview(self.message_content)
+        ChatSession.objects.filter(pk=self.chat_session_id).update(
+            message_count=models.F('message_count') + 1,
+            last_message_at=self.created_at,
+            last_message_preview=preview,
+            updated_at=self.created_at,
+        )
+        if ChatMessage.chat_session.is_cached(self):
+            # Keep the caller's instance current so a later full save() does not write stale counters
+            session = self.chat_session
+            session.message_count += 1
+            session.last_message_at = session.updated_at = self.created_at
+            session.last_message_preview = preview
+
 
 # StudentInsight model removed — student-level insights feature deprecated.
 # The corresponding database table should be dropped via a migration.
@@ -1079,28 +1101,102 @@ class TestSubjectZoneInsight(models.Model):
         return len(self.checkpoints)
 
 
+class StudentMistakeLedger(models.Model):
+    """
+    Rolling per-student ledger of wrong answers in completed platform tests.
+    Appended once per test after scoring and compacted by recency and per-topic
+    frequency (see services/mistake_ledger_service.py), so repeated-mistake
+    generation reads one small indexed slice instead of rescanning history.
+    """
+    id = models.BigAutoField(primary_key=True)
+    student = models.ForeignKey(
+        StudentProfile,
+        on_delete=models.CASCADE,
+        to_field='student_id',
+        db_column='student_id',
+        related_name='mistake_ledger'
+    )
+    test_session = models.ForeignKey(
+        TestSession,
+        on_delete=models.CASCADE,
+        db_column='test_session_id',
+        related_name='mistake_ledger_entries'
+    )
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_column='question_id',
+        related_name='+'
+    )
+    topic_id = models.IntegerField()
+    # Subject label the topic was tested under ('Physics', 'Chemistry', ...)
+    subject = models.CharField(max_length=20)
+    selected_answer = models.CharField(max_length=1)
+    misconception = models.TextField(null=True, blank=True)
+    # When the mistake was made (session end time)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'student_mistake_ledger'
+        verbose_name = 'Student Mistake Ledger Entry'
+        verbose_name_plural = 'Student Mistake Ledger'
+        indexes = [
+            models.Index(fields=['student', '-occurred_at'], name='mistake_ledger_recent_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['test_session', 'question'], name='uniq_mistake_ledger_session_question'),
+        ]
+
+    def __str__(self):
+        return f"Mistake Q{self.question_id} in test {self.test_session_id} - {self.student_id}"
+
+
 class Notification(models.Model):
     """
-    Tracks outgoing notifications for auditing, retries and admin visibility.
+    Outbox row for an outgoing email and the source of truth for its delivery.
+
+    Dispatchers in notifications.py render the message and insert a pending row;
+    deliver_notifications_task claims due rows and sends them over one mail
+    connection, retrying failures with exponential backoff via next_attempt_at.
     """
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('sending', 'sending'),
+        ('sent', 'sent'),
+        ('failed', 'failed'),
+    ]
+
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, null=True, blank=True, db_column='user_id')
     notification_type = models.CharField(max_length=50)  # e.g. welcome, password_reset_request, test_submission
     subject = models.CharField(max_length=255)
     payload = models.JSONField(default=dict, blank=True)
-    status = models.CharField(max_length=20, default='pending', choices=[('pending','pending'),('sent','sent'),('failed','failed')])
+    to_email = models.EmailField(max_length=254, blank=True, default='')
+    body_text = models.TextField(blank=True, default='')
+    body_html = models.TextField(null=True, blank=True)
+    # Optional idempotency key (e.g. "test_result:<session_id>") so repeated dispatches queue one email
+    dedupe_key = models.CharField(max_length=120, null=True, blank=True, unique=True)
+    status = models.CharField(max_length=20, default='pending', choices=STATUS_CHOICES)
+    attempts = models.IntegerField(default=0)
+    # Earliest time the row may be (re)claimed: retry backoff for pending rows, claim lease for sending rows
+    next_attempt_at = models.DateTimeField(default=timezone.now)
     error = models.TextField(null=True, blank=True)
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'notifications'
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
-        indexes = [models.Index(fields=['user', 'notification_type', 'status', 'created_at'])]
+        indexes = [
+            models.Index(fields=['user', 'notification_type', 'status', 'created_at']),
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_outbox_due_idx'),
+        ]
 
     def __str__(self):
-        target = self.user.email if self.user else self.payload.get('to')
+        target = self.to_email or (self.user.email if self.user else self.payload.get('to'))
         return f"Notification {self.notification_type} -> {target} [{self.status}]"
 
 
@@ -1526,3 +1622,205 @@ class QuestionFeedback(models.Model):
     def __str__(self):
         qid = getattr(self, 'question_id', 'NULL')
         return f"Feedback {self.id} - {self.student.student_id} - Q{qid} - {self.feedback_type}"
+
+
+class CacheVersion(models.Model):
+    """
+    Durable version counters for process-local caches (e.g. the topic taxonomy).
+    Writers bump the counter; each process compares its cached version against
+    the stored one and reloads when it has moved.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'cache_versions'
+        verbose_name = 'Cache Version'
+        verbose_name_plural = 'Cache Versions'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def get_version(cls, name):
+        """Current version for `name` (0 if never bumped)"""
+        return cls.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, name):
+        """Atomically increment the version for `name`, creating the row if needed"""
+        from django.db import IntegrityError, transaction
+        from django.db.models import F
+
+        updated = cls.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(name=name, version=1)
+            except IntegrityError:
+                cls.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+class MisconceptionJob(models.Model):
+    """
+    One misconception generation run for a platform test. Work is split into
+    MisconceptionBatch rows (per subject, bounded size) that are processed
+    concurrently and can be retried individually (see services/misconception_service.py).
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('partial', 'Partially failed'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    platform_test = models.ForeignKey(
+        PlatformTest,
+        on_delete=models.CASCADE,
+        related_name='misconception_jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    batch_size = models.IntegerField(default=20)
+    total_questions = models.IntegerField(default=0)
+    # Questions already analysed or copied from a matching fingerprint when the job was planned
+    reused_questions = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'misconception_jobs'
+        verbose_name = 'Misconception Job'
+        verbose_name_plural = 'Misconception Jobs'
+        indexes = [
+            models.Index(fields=['platform_test', '-created_at'], name='misconception_job_test_idx'),
+        ]
+
+    def __str__(self):
+        return f"MisconceptionJob {self.id} (test {self.platform_test_id}, {self.status})"
+
+
+class MisconceptionBatch(models.Model):
+    """One LLM request's worth of distinct questions within a MisconceptionJob."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    job = models.ForeignKey(MisconceptionJob, on_delete=models.CASCADE, related_name='batches')
+    subject = models.CharField(max_length=50)
+    # Position across the whole job; also selects the Gemini API key
+    sequence = models.IntegerField()
+    # Distinct questions sent to the LLM, and {question_id: [ids sharing its content]}
+    question_ids = models.JSONField(default=list)
+    sibling_ids = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    processed_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'misconception_batches'
+        verbose_name = 'Misconception Batch'
+        verbose_name_plural = 'Misconception Batches'
+        unique_together = [['job', 'sequence']]
+        indexes = [
+            models.Index(fields=['job', 'status'], name='misconception_batch_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"MisconceptionBatch {self.sequence} of job {self.job_id} ({self.subject}, {self.status})"
+
+    @property
+    def question_count(self):
+        """Questions covered by the batch, including in-test duplicates."""
+        return sum(len(self.sibling_ids.get(str(qid), [qid])) for qid in self.question_ids)
+
+
+class TestCohortSummary(models.Model):
+    """
+    Running cohort aggregates for one platform test, updated incrementally as
+    sessions are scored (see services/cohort_analytics_service.py). Scores use
+    NEET marking: +4 correct, -1 incorrect.
+    """
+    platform_test = models.OneToOneField(
+        PlatformTest,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='cohort_summary'
+    )
+    sessions = models.IntegerField(default=0)
+    max_score = models.IntegerField(default=0)  # Highest possible marks seen (questions * 4)
+    score_sum = models.FloatField(default=0)
+    score_sq_sum = models.FloatField(default=0)
+    score_min = models.FloatField(null=True, blank=True)
+    score_max = models.FloatField(null=True, blank=True)
+    correct_sum = models.BigIntegerField(default=0)
+    incorrect_sum = models.BigIntegerField(default=0)
+    unanswered_sum = models.BigIntegerField(default=0)
+    time_sum = models.BigIntegerField(default=0)
+    # {"0": n, ..., "9": n}: sessions per 10% band of score / max_score (negative scores in band 0)
+    score_histogram = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'test_cohort_summaries'
+        verbose_name = 'Test Cohort Summary'
+        verbose_name_plural = 'Test Cohort Summaries'
+
+    def __str__(self):
+        return f"Cohort summary for test {self.platform_test_id} ({self.sessions} sessions)"
+
+
+class TestQuestionCohortStat(models.Model):
+    """Per-question cohort counters for a platform test (difficulty and discrimination indices)."""
+    id = models.BigAutoField(primary_key=True)
+    platform_test = models.ForeignKey(PlatformTest, on_delete=models.CASCADE, related_name='question_cohort_stats')
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_column='question_id',
+        related_name='+'
+    )
+    attempts = models.IntegerField(default=0)  # Sessions that were served the question
+    correct = models.IntegerField(default=0)
+    incorrect = models.IntegerField(default=0)
+    unanswered = models.IntegerField(default=0)
+    time_sum = models.BigIntegerField(default=0)
+    # Sums of the session scores of everyone served the question / of those who got it right
+    score_sum = models.FloatField(default=0)
+    correct_score_sum = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'test_question_cohort_stats'
+        verbose_name = 'Test Question Cohort Stat'
+        verbose_name_plural = 'Test Question Cohort Stats'
+        unique_together = [['platform_test', 'question']]
+
+
+class TestTopicCohortStat(models.Model):
+    """Per-topic cohort counters for a platform test (topic heatmap)."""
+    id = models.BigAutoField(primary_key=True)
+    platform_test = models.ForeignKey(PlatformTest, on_delete=models.CASCADE, related_name='topic_cohort_stats')
+    topic_id = models.IntegerField()
+    attempts = models.IntegerField(default=0)  # Question attempts in the topic
+    correct = models.IntegerField(default=0)
+    incorrect = models.IntegerField(default=0)
+    unanswered = models.IntegerField(default=0)
+    time_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'test_topic_cohort_stats'
+        verbose_name = 'Test Topic Cohort Stat'
+        verbose_name_plural = 'Test Topic Cohort Stats'
+        unique_together = [['platform_test', 'topic_id']]
@@ -1,15 +1,93 @@
-from typing import Dict, Optional
-import threading
+"""
+Student email notifications backed by the Notification outbox.
+
+Dispatchers render the message and insert a pending Notification row; delivery
+is enqueued once the surrounding transaction commits. Mail is only ever sent
+by deliver_notifications() inside a Celery worker, which claims a batch of due
+rows and pushes them through a single SMTP/ZeptoMail connection. Failed rows
+are retried with exponential backoff (NOTIFICATION_RETRY_BASE_SECONDS doubling
+per attempt) until NOTIFICATION_MAX_ATTEMPTS, then marked failed. Rows left
+pending because the broker was unreachable are picked up by the periodic
+deliver_notifications_task beat entry.
+"""
+from datetime import timedelta
+from typing import Dict, List, Optional
 import logging
 
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F
 from django.template.loader import render_to_string
 from django.utils import timezone
-from django.conf import settings
 
+from .models import Notification
 from .utils import emailer
 
 logger = logging.getLogger(__name__)
 
+# A claimed row whose worker died is re-claimed once this lease expires
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_RETRY_DELAY_SECONDS = 6 * 60 * 60
+
+
+def _frontend_base() -> str:
+    """Absolute scheme://host of the frontend, so links never render as relative paths."""
+    frontend_base = getattr(settings, 'FRONTEND_URL', None) or getattr(settings, 'FRONTEND_RESET_URL', None)
+    if frontend_base:
+        # FRONTEND_RESET_URL contains a path (eg /reset-password); keep scheme+host only
+        try:
+            from urllib.parse import urlparse
+            parsed = urlparse(frontend_base)
+            if parsed.scheme and parsed.netloc:
+                frontend_base = f"{parsed.scheme}://{parsed.netloc}"
+        except Exception:
+            pass
+
+    return frontend_base or 'https://neet.inzighted.com'
+
+
+def outbox_row(notification_type: str, user, rendered: Dict, dedupe_key: Optional[str] = None,
+               payload: Optional[Dict] = None, **fields) -> Notification:
+    """Unsaved pending Notification for a rendered message (used directly by bulk campaigns)."""
+    return Notification(
+        user=user,
+        notification_type=notification_type,
+        to_email=user.email,
+        subject=rendered['subject'][:255],
+        body_text=rendered['text'],
+        body_html=rendered.get('html'),
+        dedupe_key=dedupe_key,
+        payload=payload or {},
+        **fields,
+    )
+
+
+def _queue(notification_type: str, user, rendered: Dict, dedupe_key: Optional[str] = None,
+           payload: Optional[Dict] = None) -> Optional[Notification]:
+    """Insert a pending outbox row; returns None when dedupe_key was already queued."""
+    notification = outbox_row(notification_type, user, rendered, dedupe_key=dedupe_key, payload=payload)
+    if not dedupe_key:
+        notification.save()
+        return notification
+
+    fields = {
+        f.attname: getattr(notification, f.attname)
+        for f in Notification._meta.concrete_fields
+        if not f.primary_key and f.attname != 'dedupe_key'
+    }
+    notification, created = Notification.objects.get_or_create(dedupe_key=dedupe_key, defaults=fields)
+    return notification if created else None
+
+
+def _dispatch(notification: Optional[Notification]) -> bool:
+    if notification is None:
+        return False
+    from .tasks import schedule_notification_delivery
+    schedule_notification_delivery(notification.id)
+    return True
+
 
 def _render_welcome_templates(user, context: Dict) -> Dict[str, str]:
     """Render subject, html and text for welcome email. Falls back to simple text if templates missing."""
@@ -37,86 +115,24 @@ def _render_welcome_templates(user, context: Dict) -> Dict[str, str]:
     return {'subject': subject, 'html': html, 'text': text}
 
 
-def _send_email_sync(to_email: str, subject: str, html: Optional[str], text: str) -> bool:
-    """Use existing emailer functions to send an HTML-aware welcome email. If only text available, send via existing reset-email helper style."""
-    # emailer currently only exposes send_password_reset_email; re-use Django EmailMessage path by calling send_password_reset_email when subject matches.
-    # For simplicity and to avoid changing emailer, send plain text using SMTP/Django path via send_password_reset_email signature.
-    try:
-        # Use EmailMultiAlternatives which supports HTML alternatives
-        from django.core.mail import EmailMultiAlternatives
-        from django.conf import settings
-
-        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
-        # text body first
-        msg = EmailMultiAlternatives(subject=subject, body=text, from_email=from_email, to=[to_email])
-        if html:
-            msg.attach_alternative(html, 'text/html')
-        msg.send(fail_silently=False)
-        return True
-    except Exception as e:
-        logger.exception('Failed to send welcome email: %s', e)
-        return False
-
-
-def dispatch_welcome_email(user):
-    """Render and dispatch welcome email to a StudentProfile instance.
-
-    This function performs the send asynchronously on a background thread so it doesn't block
-    the request / model save path. For production, replace with a Celery task or other worker.
-    """
+def queue_welcome_email(user) -> Optional[Notification]:
+    """Render the welcome email for a StudentProfile into the outbox (once per student)."""
     if not getattr(user, 'email', None):
-        return False
-
-    # Use absolute frontend URL to avoid relative links like '/' which can render as invalid
-    frontend_base = getattr(settings, 'FRONTEND_URL', None) or getattr(settings, 'FRONTEND_RESET_URL', None)
-    if frontend_base:
-        # If FRONTEND_RESET_URL contains a path (eg /reset-password) prefer base host only
-        # attempt to use scheme+host only
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(frontend_base)
-            if parsed.scheme and parsed.netloc:
-                frontend_base = f"{parsed.scheme}://{parsed.netloc}"
-        except Exception:
-            pass
-
-    if not frontend_base:
-        frontend_base = 'https://neet.inzighted.com'
+        return None
 
     context = {
         'user': user,
         'full_name': user.full_name,
-        'login_url': frontend_base + '/',
+        'login_url': _frontend_base() + '/',
         'support_email': 'support@inzighted.com',
     }
-
     rendered = _render_welcome_templates(user, context)
+    return _queue('welcome', user, rendered, dedupe_key=f'welcome:{user.student_id}')
 
-    def _worker():
-        try:
-            success = _send_email_sync(user.email, rendered['subject'], rendered.get('html'), rendered['text'])
-            if not success:
-                logger.warning('Welcome email send returned False for %s', user.email)
-        except Exception:
-            logger.exception('Unhandled exception sending welcome email')
 
-    try:
-        # Enqueue Celery task to send welcome email
-        from .tasks import send_welcome_email_task
-        send_welcome_email_task.delay(user.student_id)
-        logger.info(f'Welcome email task enqueued for user {user.student_id}')
-        return True
-    except ImportError:
-        # Celery tasks not available, fallback to threading
-        logger.warning('Celery tasks not available, falling back to threading for welcome email')
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return True
-    except Exception as e:
-        # Log the specific error but still try to send via Celery
-        logger.error(f'Error enqueueing welcome email task for user {user.student_id}: {e}')
-        # Re-raise to let Celery handle retries
-        raise
+def dispatch_welcome_email(user) -> bool:
+    """Queue the welcome email and enqueue its delivery once the transaction commits."""
+    return _dispatch(queue_welcome_email(user))
 
 
 def _render_test_result_templates(user, context: Dict) -> Dict[str, str]:
@@ -149,74 +165,37 @@ def _render_test_result_templates(user, context: Dict) -> Dict[str, str]:
     return {'subject': subject, 'html': html, 'text': text}
 
 
-def dispatch_test_result_email(user, results: Dict) -> bool:
-    """Dispatch a test result email for a StudentProfile instance.
-
-    This mirrors `dispatch_welcome_email` but uses test result templates.
-    The send is performed on a background thread.
-    """
+def queue_test_result_email(user, results: Dict) -> Optional[Notification]:
+    """Render a test result email into the outbox (once per session)."""
     if not getattr(user, 'email', None):
-        return False
-
-    frontend_base = getattr(settings, 'FRONTEND_URL', None) or getattr(settings, 'FRONTEND_RESET_URL', None)
-    if frontend_base:
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(frontend_base)
-            if parsed.scheme and parsed.netloc:
-                frontend_base = f"{parsed.scheme}://{parsed.netloc}"
-        except Exception:
-            pass
-
-    if not frontend_base:
-        frontend_base = 'https://neet.inzighted.com'
+        return None
 
+    session_id = results.get('session_id')
     context = {
         'user': user,
         'full_name': user.full_name,
         # include result fields expected by templates
-        'session_id': results.get('session_id'),
+        'session_id': session_id,
         'total_questions': results.get('total_questions'),
         'correct_answers': results.get('correct_answers'),
         'incorrect_answers': results.get('incorrect_answers'),
         'unanswered_questions': results.get('unanswered_questions'),
         'time_taken': results.get('time_taken'),
         'score_percentage': results.get('score_percentage'),
-        'results_url': f"{frontend_base}/results/{results.get('session_id')}",
+        'results_url': f"{_frontend_base()}/results/{session_id}",
         'support_email': 'support@inzighted.com',
     }
-
     rendered = _render_test_result_templates(user, context)
+    return _queue(
+        'test_result', user, rendered,
+        dedupe_key=f'test_result:{session_id}' if session_id else None,
+        payload={'session_id': session_id},
+    )
 
-    def _worker():
-        try:
-            success = _send_email_sync(user.email, rendered['subject'], rendered.get('html'), rendered['text'])
-            if not success:
-                logger.warning('Test result email send returned False for %s', user.email)
-        except Exception:
-            logger.exception('Unhandled exception sending test result email')
-
-    # Attempt to enqueue Celery email task; fall back to background thread on failure.
 
-    # If workers are available, try Celery first
-    try:
-        from .tasks import send_test_result_email_task
-        send_test_result_email_task.delay(user.student_id, results)
-        logger.info(f'Test result email task enqueued for user {user.student_id}')
-        return True
-    except ImportError:
-        # Celery tasks not available, fallback to threading
-        logger.warning('Celery tasks not available, falling back to threading for test result email')
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return True
-    except Exception as e:
-        # Log the specific error and fallback to threading instead of failing
-        logger.error(f'Error enqueueing test result email task for user {user.student_id}: {e}')
-        logger.warning('Falling back to background thread for test result email')
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return True
+def dispatch_test_result_email(user, results: Dict) -> bool:
+    """Queue a test result email and enqueue its delivery once the transaction commits."""
+    return _dispatch(queue_test_result_email(user, results))
 
 
 def _render_inactivity_templates(user, context: Dict) -> Dict[str, str]:
@@ -243,58 +222,190 @@ def _render_inactivity_templates(user, context: Dict) -> Dict[str, str]:
     return {'subject': subject, 'html': html, 'text': text}
 
 
-def dispatch_inactivity_reminder(user, last_test_date=None) -> bool:
-    """Send an inactivity reminder email to a StudentProfile.
+def inactivity_dedupe_key(student_id: str, run_date=None) -> str:
+    """One inactivity reminder per student per day, shared by single and campaign sends."""
+    return f'{inactivity_dedupe_prefix(run_date)}{student_id}'
 
-    last_test_date: optional datetime of last test to include in email.
-    """
-    if not getattr(user, 'email', None):
-        return False
 
-    frontend_base = getattr(settings, 'FRONTEND_URL', None) or getattr(settings, 'FRONTEND_RESET_URL', None)
-    if frontend_base:
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(frontend_base)
-            if parsed.scheme and parsed.netloc:
-                frontend_base = f"{parsed.scheme}://{parsed.netloc}"
-        except Exception:
-            pass
+def inactivity_dedupe_prefix(run_date=None) -> str:
+    return f'inactivity:{(run_date or timezone.localdate()).isoformat()}:'
+
 
-    if not frontend_base:
-        frontend_base = 'https://neet.inzighted.com'
+def render_inactivity_reminder(user, last_test_date=None) -> Dict[str, str]:
+    """Render subject/text/html of an inactivity reminder.
 
+    last_test_date: optional datetime of last test to include in email.
+    """
     context = {
         'user': user,
         'full_name': user.full_name,
         'last_test_date': last_test_date,
-        'dashboard_url': frontend_base + '/',
+        'dashboard_url': _frontend_base() + '/',
         'support_email': 'support@inzighted.com',
     }
+    return _render_inactivity_templates(user, context)
 
-    rendered = _render_inactivity_templates(user, context)
 
-    def _worker():
-        try:
-            success = _send_email_sync(user.email, rendered['subject'], rendered.get('html'), rendered['text'])
-            if not success:
-                logger.warning('Inactivity reminder send returned False for %s', user.email)
-        except Exception:
-            logger.exception('Unhandled exception sending inactivity reminder')
+def inactivity_payload(last_test_date=None) -> Dict:
+    return {'last_test_date': last_test_date.isoformat() if last_test_date else None}
+
+
+def queue_inactivity_reminder(user, last_test_date=None) -> Optional[Notification]:
+    """Render an inactivity reminder into the outbox (at most one per student per day)."""
+    if not getattr(user, 'email', None):
+        return None
+
+    return _queue(
+        'inactivity', user, render_inactivity_reminder(user, last_test_date),
+        dedupe_key=inactivity_dedupe_key(user.student_id),
+        payload=inactivity_payload(last_test_date),
+    )
+
+
+def dispatch_inactivity_reminder(user, last_test_date=None) -> bool:
+    """Queue an inactivity reminder and enqueue its delivery once the transaction commits."""
+    return _dispatch(queue_inactivity_reminder(user, last_test_date=last_test_date))
+
+
+# --- Outbox delivery (Celery workers only) ---
+
+def _batch_size() -> int:
+    return int(getattr(settings, 'NOTIFICATION_BATCH_SIZE', 50))
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = int(getattr(settings, 'NOTIFICATION_RETRY_BASE_SECONDS', 60))
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), MAX_RETRY_DELAY_SECONDS))
+
 
+def claim_due_notifications(notification_ids=None, limit: Optional[int] = None) -> List[Notification]:
+    """
+    Lock and claim up to `limit` due rows (pending, or sending with an expired lease).
+    Claimed rows move to 'sending' with attempts incremented, so concurrent
+    workers skip them until the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            Notification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+        )
+        if notification_ids is not None:
+            due = due.filter(id__in=notification_ids)
+        claimed = list(due[:limit or _batch_size()])
+        if claimed:
+            Notification.objects.filter(id__in=[n.id for n in claimed]).update(
+                status='sending', attempts=F('attempts') + 1, next_attempt_at=now + CLAIM_LEASE,
+            )
+    for notification in claimed:
+        notification.status = 'sending'
+        notification.attempts += 1
+    return claimed
+
+
+def _build_message(notification: Notification, connection) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(
+        subject=notification.subject,
+        body=notification.body_text,
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+        to=[notification.to_email],
+        connection=connection,
+    )
+    if notification.body_html:
+        msg.attach_alternative(notification.body_html, 'text/html')
+    return msg
+
+
+def _record_failure(notification: Notification, error: str) -> str:
+    """Schedule a retry with backoff, or mark the row failed once attempts run out."""
+    max_attempts = int(getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5))
+    if notification.attempts >= max_attempts:
+        status, next_attempt_at = 'failed', timezone.now()
+    else:
+        status, next_attempt_at = 'pending', timezone.now() + _retry_delay(notification.attempts)
+    Notification.objects.filter(id=notification.id).update(
+        status=status, error=error[:2000], next_attempt_at=next_attempt_at,
+    )
+    return status
+
+
+def _release_claims(notifications: List[Notification]) -> None:
+    """Hand unsent claimed rows back as due now, without counting the attempt."""
+    Notification.objects.filter(id__in=[n.id for n in notifications], status='sending').update(
+        status='pending', attempts=F('attempts') - 1, next_attempt_at=timezone.now(),
+    )
+
+
+def deliver_notifications(notification_ids=None, limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Claim a batch of due notifications and send them over one mail connection.
+    Each row is marked sent as soon as its message is accepted, so a worker
+    killed mid-batch never re-sends what it already delivered. On the task's
+    soft time limit the rows not yet sent are released and the exception propagates.
+
+    Returns:
+        Dict with the number of notifications claimed, sent, retried and failed
+    """
+    stats = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+    claimed = claim_due_notifications(notification_ids, limit)
+    stats['claimed'] = len(claimed)
+    if not claimed:
+        return stats
+
+    def _fail(notification, error):
+        status = _record_failure(notification, error)
+        stats['failed' if status == 'failed' else 'retried'] += 1
+
+    deliverable = []
+    for notification in claimed:
+        if notification.to_email:
+            deliverable.append(notification)
+        else:
+            _fail(notification, 'No recipient email address')
+
+    if not deliverable:
+        return stats
+
+    connection = emailer.get_mail_connection()
     try:
-        from .tasks import send_inactivity_reminder_task
-        send_inactivity_reminder_task.delay(user.student_id, last_test_date)
-        logger.info(f'Inactivity reminder task enqueued for user {user.student_id}')
-        return True
-    except ImportError:
-        # Celery tasks not available, fallback to threading
-        logger.warning('Celery tasks not available, falling back to threading for inactivity reminder')
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return True
-    except Exception as e:
-        # Log the specific error but still try to send via Celery
-        logger.error(f'Error enqueueing inactivity reminder task for user {user.student_id}: {e}')
-        # Re-raise to let Celery handle retries
+        connection.open()
+    except SoftTimeLimitExceeded:
+        _release_claims(deliverable)
         raise
+    except Exception as e:
+        logger.warning(f'Could not open mail connection for {len(deliverable)} notifications: {e}')
+        for notification in deliverable:
+            _fail(notification, f'Connection failed: {e}')
+        return stats
+
+    try:
+        for index, notification in enumerate(deliverable):
+            try:
+                if connection.send_messages([_build_message(notification, connection)]):
+                    Notification.objects.filter(id=notification.id).update(
+                        status='sent', sent_at=timezone.now(), error=None,
+                    )
+                    stats['sent'] += 1
+                else:
+                    _fail(notification, 'Mail backend accepted no messages')
+            except SoftTimeLimitExceeded:
+                # Delivery of the in-flight message is unknown; it goes back with the rest
+                _release_claims(deliverable[index:])
+                raise
+            except Exception as e:
+                logger.warning(f'Notification {notification.id} delivery failed: {e}')
+                _fail(notification, str(e))
+                # A broken SMTP session is reopened by the next send_messages() call
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    return stats
@@ -116,6 +116,95 @@ class QuestionForTestSerializer(serializers.ModelSerializer):
         ]
 
 
+# --- Test-taking payload profiles ---
+# Base64 image columns are by far the heaviest part of a question row. Each
+# profile lists the Question columns it renders so views can shape the query
+# with .only() and leave unrendered image/explanation columns in the database.
+QUESTION_IMAGE_FIELDS = [
+    'question_image', 'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image',
+]
+REVIEW_IMAGE_FIELDS = QUESTION_IMAGE_FIELDS + ['explanation_image']
+
+QUESTION_PAYLOAD_PROFILES = {
+    # ids + text only; images are referenced and fetched per question
+    'skeleton': [
+        'id', 'topic', 'question', 'question_type', 'option_a', 'option_b', 'option_c', 'option_d',
+    ],
+    # legacy test-taking payload with inline images
+    'full': [
+        'id', 'topic', 'question', 'question_type', 'option_a', 'option_b', 'option_c', 'option_d',
+        'question_image', 'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image',
+    ],
+    # post-submission review: skeleton + answer key and explanation text
+    'review': [
+        'id', 'topic', 'question', 'question_type', 'option_a', 'option_b', 'option_c', 'option_d',
+        'correct_answer', 'explanation',
+    ],
+}
+DEFAULT_QUESTION_PAYLOAD_PROFILE = 'full'
+
+
+def question_image_flag_annotations(image_fields=QUESTION_IMAGE_FIELDS):
+    """
+    Build `has_<field>` boolean annotations for the given image columns so a
+    profile can reference images without selecting the base64 payload.
+    """
+    from django.db.models import BooleanField, Case, Q, Value, When
+
+    return {
+        f'has_{field}': Case(
+            When(Q(**{f'{field}__isnull': True}) | Q(**{field: ''}), then=Value(False)),
+            default=Value(True),
+            output_field=BooleanField(),
+        )
+        for field in image_fields
+    }
+
+
+class QuestionSkeletonSerializer(serializers.ModelSerializer):
+    """
+    Lightweight test-taking payload: question text and options plus a list of
+    image fields that exist for the question. The client fetches the images
+    for a single question when it is displayed.
+
+    Expects the queryset to carry `has_<field>` annotations
+    (see question_image_flag_annotations).
+    """
+    image_refs = serializers.SerializerMethodField()
+
+    image_fields = QUESTION_IMAGE_FIELDS
+
+    class Meta:
+        model = Question
+        fields = QUESTION_PAYLOAD_PROFILES['skeleton'] + ['image_refs']
+
+    def get_image_refs(self, obj):
+        return [field for field in self.image_fields if getattr(obj, f'has_{field}', False)]
+
+
+class QuestionReviewSerializer(QuestionSkeletonSerializer):
+    """Review payload for completed sessions: skeleton + correct answer and explanation."""
+    image_fields = REVIEW_IMAGE_FIELDS
+
+    class Meta:
+        model = Question
+        fields = QUESTION_PAYLOAD_PROFILES['review'] + ['image_refs']
+
+
+class QuestionImagesSerializer(serializers.ModelSerializer):
+    """Per-question image payload used to lazily hydrate skeleton/review profiles."""
+    class Meta:
+        model = Question
+        fields = ['id'] + REVIEW_IMAGE_FIELDS
+
+
+QUESTION_PROFILE_SERIALIZERS = {
+    'skeleton': QuestionSkeletonSerializer,
+    'full': QuestionForTestSerializer,
+    'review': QuestionReviewSerializer,
+}
+
+
 # This serializer is for returning full question details (e.g., in results/analytics)
 class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -131,6 +220,16 @@ class QuestionSerializer(serializers.ModelSerializer):
         return data
 
 
+def memoized_student_name(serializer, obj):
+    """Student name for a session-like obj, looked up once per student per serialization."""
+    # Listings are one student's sessions, so this is usually a single profile query
+    names = serializer.context.setdefault('_student_names', {})
+    if obj.student_id not in names:
+        student_profile = obj.get_student_profile()
+        names[obj.student_id] = student_profile.full_name if student_profile else "Unknown Student"
+    return names[obj.student_id]
+
+
 class TestSessionSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     overall_score = serializers.SerializerMethodField()
@@ -154,8 +253,7 @@ class TestSessionSerializer(serializers.ModelSerializer):
         ]
     
     def get_student_name(self, obj):
-        student_profile = obj.get_student_profile()
-        return student_profile.full_name if student_profile else "Unknown Student"
+        return memoized_student_name(self, obj)
     
     def get_overall_score(self, obj):
         return obj.calculate_score_percentage()
@@ -281,17 +379,16 @@ class TestSessionCreateSerializer(serializers.Serializer):
         time_limit = validated_data.get('time_limit')
         question_count = validated_data.get('question_count')
         
-        # For random tests, we'll let the view handle question selection directly
-        # No need to generate topics here since we're selecting questions from entire database
-        
-        # Create test session (without generating questions here - the view will handle it)
+        # Create test session (questions are selected by the view before saving;
+        # for random tests it passes the topics of the questions it drew)
         test_session = TestSession.objects.create(
             student_id=student_id,  # Use authenticated user's student_id
-            selected_topics=selected_topics,  # Empty for random tests
+            selected_topics=selected_topics,
             time_limit=time_limit,
             question_count=question_count,
             start_time=timezone.now(),
-            total_questions=question_count or 0  # Will be updated by view after question generation
+            # The view passes the number of questions actually selected
+            total_questions=validated_data.get('total_questions', question_count or 0)
         )
         
         # The signals will automatically handle topic classification
@@ -386,6 +483,36 @@ class TestAnswerCreateSerializer(serializers.Serializer):
         return data
 
 
+class AnswerAutosaveDeltaSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    seq = serializers.IntegerField(min_value=0, required=False) # Falls back to the batch-level seq
+    selected_answer = serializers.ChoiceField(choices=['A', 'B', 'C', 'D'], allow_null=True, required=False)
+    text_answer = serializers.CharField(max_length=2000, allow_null=True, allow_blank=True, required=False)
+    marked_for_review = serializers.BooleanField(default=False, required=False)
+    is_bookmarked = serializers.BooleanField(default=False, required=False)
+
+
+class AnswerAutosaveSerializer(serializers.Serializer):
+    """
+    Batch of answer deltas with client sequence numbers.
+    Every delta needs a seq, either its own or the batch-level one.
+    """
+    session_id = serializers.IntegerField()
+    seq = serializers.IntegerField(min_value=0, required=False)
+    answers = AnswerAutosaveDeltaSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate(self, data):
+        batch_seq = data.get('seq')
+        for delta in data['answers']:
+            if delta.get('seq') is None:
+                if batch_seq is None:
+                    raise serializers.ValidationError({"seq": "Each answer needs a seq, or provide a batch seq."})
+                delta['seq'] = batch_seq
+            if delta.get('text_answer'):
+                delta['text_answer'] = delta['text_answer'].strip()
+        return data
+
+
 # Enhanced StudentProfile serializer with authentication and statistics
 class StudentProfileSerializer(serializers.ModelSerializer):
     total_tests = serializers.SerializerMethodField()
@@ -634,33 +761,19 @@ class ReviewCommentSerializer(serializers.ModelSerializer):
 class ChatSessionSerializer(serializers.ModelSerializer):
     """Serializer for ChatSession model"""
     student_name = serializers.SerializerMethodField()
-    message_count = serializers.SerializerMethodField()
-    last_message = serializers.SerializerMethodField()
+    # Denormalized on ChatSession (see ChatMessage.save()), so no per-row message queries
+    last_message = serializers.CharField(source='last_message_preview', read_only=True, allow_null=True)
     
     class Meta:
         model = ChatSession
         fields = [
             'id', 'student_id', 'student_name', 'chat_session_id', 'session_title',
-            'is_active', 'created_at', 'updated_at', 'message_count', 'last_message'
+            'is_active', 'created_at', 'updated_at', 'message_count', 'last_message', 'last_message_at'
         ]
-        read_only_fields = ['id', 'chat_session_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'chat_session_id', 'created_at', 'updated_at', 'message_count', 'last_message_at']
     
     def get_student_name(self, obj):
-        """Get student name from StudentProfile"""
-        student_profile = obj.get_student_profile()
-        return student_profile.full_name if student_profile else "Unknown Student"
-    
-    def get_message_count(self, obj):
-        """Get total number of messages in this session"""
-        return obj.messages.count()
-    
-    def get_last_message(self, obj):
-        """Get the last message content (truncated)"""
-        last_message = obj.messages.last()
-        if last_message:
-            content = last_message.message_content
-            return content[:100] + "..." if len(content) > 100 else content
-        return None
+        return memoized_student_name(self, obj)
 
 
 class ChatMessageSerializer(serializers.ModelSerializer):
@@ -2,6 +2,7 @@
 Gemini Client with API Key Rotation
 Handles Google Gemini AI interactions with automatic key rotation to avoid rate limits
 """
+import logging
 import os
 import time
 import threading
@@ -9,6 +10,11 @@ from typing import Optional, List
 import google.generativeai as genai
 from django.conf import settings
 
+from ...utils.tracing import traced
+from ...utils.profiler import external_timer
+
+logger = logging.getLogger(__name__)
+
 
 class GeminiClient:
     """
@@ -38,7 +44,7 @@ class GeminiClient:
         self.client = None
         self._initialize_client()
         
-        print(f"GeminiClient initialized with {len(self.api_keys)} API keys")
+        logger.debug("GeminiClient initialized with %s API keys", len(self.api_keys))
     
     def _load_api_keys(self) -> List[str]:
         """Load API keys from settings or environment variables"""
@@ -60,9 +66,9 @@ class GeminiClient:
                 api_keys.append(single_key.strip())
         
         if not api_keys:
-            print("Warning: No Gemini API keys found!")
-            print("Add your API keys to settings.py as GEMINI_API_KEYS list or")
-            print("set environment variables GEMINI_API_KEY_1, GEMINI_API_KEY_2, etc.")
+            logger.warning("Warning: No Gemini API keys found!")
+            logger.debug("Add your API keys to settings.py as GEMINI_API_KEYS list or")
+            logger.debug("set environment variables GEMINI_API_KEY_1, GEMINI_API_KEY_2, etc.")
         
         return api_keys
     
@@ -92,9 +98,9 @@ class GeminiClient:
                 },
                 safety_settings=safety_settings
             )
-            print(f"Initialized Gemini client with API key {self.current_key_index + 1} (***{current_key[-4:]})")
+            logger.debug("Initialized Gemini client with API key %s (***%s)", self.current_key_index + 1, current_key[-4:])
         except Exception as e:
-            print(f"Error initializing Gemini client: {e}")
+            logger.warning("Error initializing Gemini client: %s", e)
             self.client = None
     
     def _rotate_api_key(self):
@@ -104,9 +110,17 @@ class GeminiClient:
             self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
             old_key = self.api_keys[old_index] if self.api_keys else ''
             new_key = self.api_keys[self.current_key_index] if self.api_keys else ''
-            print(f"🔄 Rotating from API key {old_index + 1} (***{old_key[-4:]}) to API key {self.current_key_index + 1} (***{new_key[-4:]})")
+            logger.debug("🔄 Rotating from API key %s (***%s) to API key %s (***%s)", old_index + 1, old_key[-4:], self.current_key_index + 1, new_key[-4:])
             self._initialize_client()
     
+    def use_api_key(self, index: int):
+        """Start from a specific key of the pool (index wraps), e.g. to spread parallel jobs"""
+        if not self.api_keys:
+            return
+        with self.lock:
+            self.current_key_index = index % len(self.api_keys)
+            self._initialize_client()
+
     def _wait_for_rate_limit(self):
         """Ensure we don't exceed rate limits"""
         current_time = time.time()
@@ -118,6 +132,7 @@ class GeminiClient:
         
         self.last_request_time = time.time()
     
+    @traced('ai.llm', 'gemini.generate_response')
     def generate_response(self, prompt: str, max_retries: int = 10) -> str:
         """
         Generate response with automatic key rotation on rate limit errors.
@@ -132,13 +147,14 @@ class GeminiClient:
                 current_key_masked = f"***{self.api_keys[self.current_key_index][-4:]}" if self.api_keys else 'None'
             except Exception:
                 current_key_masked = 'None'
-            print(f"🔑 Attempt {attempt+1}/{max_retries} using API key {self.current_key_index + 1} ({current_key_masked})")
+            logger.debug("🔑 Attempt %s/%s using API key %s (%s)", attempt + 1, max_retries, self.current_key_index + 1, current_key_masked)
             try:
                 # Rate limiting
                 self._wait_for_rate_limit()
                 
                 # Generate response
-                response = self.client.generate_content(prompt)
+                with external_timer('llm'):
+                    response = self.client.generate_content(prompt)
                 
                 if response and response.candidates:
                     # Try simple text accessor first
@@ -151,45 +167,45 @@ class GeminiClient:
                     
                     # Extract text from response parts
                     text_parts = []
-                    print(f"🔍 Processing {len(response.candidates)} candidates")
+                    logger.debug("🔍 Processing %s candidates", len(response.candidates))
                     
                     for i, candidate in enumerate(response.candidates):
-                        print(f"Candidate {i}: finish_reason={candidate.finish_reason}")
+                        logger.debug("Candidate %s: finish_reason=%s", i, candidate.finish_reason)
                         
                         # Check for safety blocks
                         if candidate.finish_reason == 2:  # SAFETY
-                            print(f"🚫 Response blocked by safety filters")
+                            logger.warning("🚫 Response blocked by safety filters")
                             if candidate.safety_ratings:
                                 for rating in candidate.safety_ratings:
-                                    print(f"   Safety: {rating.category} - {rating.probability}")
+                                    logger.debug("   Safety: %s - %s", rating.category, rating.probability)
                             return "I cannot analyze this conversation due to content safety restrictions. Please try with a shorter or different conversation."
                         elif candidate.finish_reason == 3:  # RECITATION
-                            print(f"🚫 Response blocked due to recitation concerns")
+                            logger.warning("🚫 Response blocked due to recitation concerns")
                             return "I cannot provide this response due to recitation concerns. Please rephrase your request."
                         
                         if candidate.content and candidate.content.parts:
-                            print(f"  Has {len(candidate.content.parts)} content parts")
+                            logger.debug("  Has %s content parts", len(candidate.content.parts))
                             for j, part in enumerate(candidate.content.parts):
-                                print(f"    Part {j}: type={type(part)}, has_text={hasattr(part, 'text')}")
+                                logger.debug("    Part %s: type=%s, has_text=%s", j, type(part), hasattr(part, 'text'))
                                 if hasattr(part, 'text') and part.text:
                                     text_parts.append(part.text)
-                                    print(f"    ✅ Added text: {part.text[:50]}...")
+                                    logger.debug("    ✅ Added text: %s...", part.text[:50])
                                 elif hasattr(part, 'text'):
-                                    print(f"    ❌ Text attribute empty")
+                                    logger.debug("    ❌ Text attribute empty")
                                 else:
-                                    print(f"    ❌ No text attribute, available: {[attr for attr in dir(part) if not attr.startswith('_')]}")
+                                    logger.debug("    ❌ No text attribute on %s", type(part).__name__)
                         else:
-                            print(f"  ❌ No content or parts")
+                            logger.debug("  ❌ No content or parts")
                     
                     if text_parts:
                         combined = ''.join(text_parts).strip()
-                        print(f"✅ Successfully combined {len(text_parts)} text parts: {combined[:100]}...")
+                        logger.debug("✅ Successfully combined %s text parts: %s...", len(text_parts), combined[:100])
                         return combined
                     else:
-                        print("❌ No text content found in any response parts")
+                        logger.warning("❌ No text content found in any response parts")
                         return self._get_fallback_response()
                 else:
-                    print("Warning: Empty response or no candidates from Gemini")
+                    logger.warning("Warning: Empty response or no candidates from Gemini")
                     return self._get_fallback_response()
                     
             except Exception as e:
@@ -206,16 +222,16 @@ class GeminiClient:
                 ]
                 
                 if any(term in error_msg for term in rate_limit_terms):
-                    print(f"🚫 Rate limit/quota hit on API key {self.current_key_index + 1}")
-                    print(f"   Error: {str(e)[:200]}...")
+                    logger.warning("🚫 Rate limit/quota hit on API key %s", self.current_key_index + 1)
+                    logger.warning("   Error: %s...", str(e)[:200])
                     
                     # Don't retry with same key if all keys tried
                     if attempt >= len(self.api_keys):
-                        print("❌ All API keys exhausted, returning fallback response")
+                        logger.warning("❌ All API keys exhausted, returning fallback response")
                         return self._get_fallback_response()
                     
                     self._rotate_api_key()
-                    print(f"🔄 Rotated to API key {self.current_key_index + 1}, retrying...")
+                    logger.debug("🔄 Rotated to API key %s, retrying...", self.current_key_index + 1)
                     
                     # Wait a bit before retrying with new key
                     time.sleep(2)
@@ -225,8 +241,8 @@ class GeminiClient:
                 # Detect authentication / invalid key / expired key errors robustly
                 auth_terms = ['authentication', 'invalid api key', 'invalid_api_key', 'api_key_invalid', 'api key', 'expired', '401', '403']
                 if any(term in error_msg for term in auth_terms):
-                    print(f"🔑 Authentication/Key error with API key {self.current_key_index + 1} ({current_key_masked})")
-                    print(f"   Error: {orig_err[:200]}...")
+                    logger.warning("🔑 Authentication/Key error with API key %s (%s)", self.current_key_index + 1, current_key_masked)
+                    logger.warning("   Error: %s...", orig_err[:200])
                     # Rotate to next key and retry unless we've exhausted attempts
                     if len(self.api_keys) > 1:
                         self._rotate_api_key()
@@ -235,7 +251,7 @@ class GeminiClient:
                         continue
                     else:
                         # No other keys to try
-                        print("❌ No alternate API keys available to rotate to.")
+                        logger.warning("❌ No alternate API keys available to rotate to.")
                         if attempt == max_retries - 1:
                             return self._get_fallback_response()
                         time.sleep(1)
@@ -243,7 +259,7 @@ class GeminiClient:
                 
                 # Other errors
                 else:
-                    print(f"⚠️ Gemini API error (attempt {attempt + 1}): {e}")
+                    logger.warning("⚠️ Gemini API error (attempt %s): %s", attempt + 1, e)
                     if attempt == max_retries - 1:
                         return self._get_fallback_response()
                     time.sleep(1)
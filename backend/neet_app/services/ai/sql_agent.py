@@ -2,6 +2,7 @@
 SQL Agent using LangChain
 Handles natural language to SQL conversion and execution with advanced rate limit handling
 """
+import logging
 import re
 import time
 import json
@@ -13,6 +14,10 @@ from django.core.cache import cache
 # Import LangChain components
 from langchain_community.utilities import SQLDatabase
 
+from ...utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
 
 class SQLAgent:
     """Enhanced LangChain SQL Agent with caching, exponential backoff, and optimized rotation"""
@@ -71,13 +76,13 @@ class SQLAgent:
                         ],
                         sample_rows_in_table_info=1  # Minimal sample data
                     )
-                    print("🔗 Database connection established")
+                    logger.debug("🔗 Database connection established")
                 except Exception as e:
                     # Don't allow URI parsing or SQLDatabase errors to bubble up
-                    print(f"⚠️ Could not initialize SQLDatabase from URI: {e}")
+                    logger.warning("⚠️ Could not initialize SQLDatabase from URI: %s", e)
                     self.db = None
             except Exception as e:
-                print(f"⚠️ Error building DB URL: {e}")
+                logger.warning("⚠️ Error building DB URL: %s", e)
                 self.db = None
     
     def _create_llm_with_timeouts(self):
@@ -89,7 +94,7 @@ class SQLAgent:
             # Use Grok API with Llama 3.3 70B Versatile model
             grok_api_key = os.getenv('GROQ_API_KEY')
             if not grok_api_key:
-                print("⚠️ GROQ_API_KEY not found in environment variables")
+                logger.warning("⚠️ GROQ_API_KEY not found in environment variables")
                 return False
 
             # Create LLM with Grok API
@@ -102,11 +107,11 @@ class SQLAgent:
                 max_retries=2
             )
             
-            print(f"🔧 LLM configured with Grok API using Llama-3.3-70b-versatile model")
+            logger.debug("🔧 LLM configured with Grok API using Llama-3.3-70b-versatile model")
             return True
             
         except Exception as e:
-            print(f"⚠️ LLM creation failed: {e}")
+            logger.warning("⚠️ LLM creation failed: %s", e)
             self.llm = None
             return False
     
@@ -116,7 +121,7 @@ class SQLAgent:
         """Create SQL agent using existing LLM and database connection"""
         try:
             if not self.llm or not self.db:
-                print("⚠️ LLM or Database not available for SQL agent")
+                logger.warning("⚠️ LLM or Database not available for SQL agent")
                 return False
             
             # Set environment variable to suppress pydantic warnings
@@ -130,9 +135,9 @@ class SQLAgent:
             warnings.filterwarnings("ignore", message=".*__modify_schema__.*")
             
             # First try: Direct simple agent approach (most compatible)
-            print("🔄 Attempting simple SQL agent creation...")
+            logger.debug("🔄 Attempting simple SQL agent creation...")
             if self._create_simple_sql_agent():
-                print(f"✅ SQL Agent created with Grok API using Llama-3.3-70b-versatile model")
+                logger.debug("✅ SQL Agent created with Grok API using Llama-3.3-70b-versatile model")
                 return True
             
             # Try different approaches for SQL agent creation only if simple fails
@@ -178,7 +183,7 @@ class SQLAgent:
                 )
                 
             except Exception as e1:
-                print(f"⚠️ Modern agent creation failed: {e1}, trying legacy method...")
+                logger.warning("⚠️ Modern agent creation failed: %s, trying legacy method...", e1)
                 
                 # Method 2: Legacy approach with compatibility fixes
                 try:
@@ -202,25 +207,25 @@ class SQLAgent:
                         )
                         
                 except Exception as e2:
-                    print(f"⚠️ Legacy agent creation also failed: {e2}")
+                    logger.warning("⚠️ Legacy agent creation also failed: %s", e2)
                     # Method 3: Fall back to simple agent (already tried above)
                     if not self.sql_agent:
-                        print("🔄 All complex methods failed, using simple agent...")
+                        logger.warning("🔄 All complex methods failed, using simple agent...")
                         return self._create_simple_sql_agent()
             
-            print(f"✅ SQL Agent created with Grok API using Llama-3.3-70b-versatile model")
+            logger.debug("✅ SQL Agent created with Grok API using Llama-3.3-70b-versatile model")
             return True
             
         except Exception as e:
-            print(f"⚠️ SQL Agent creation failed: {e}")
-            print("🔄 Falling back to simple SQL agent...")
+            logger.warning("⚠️ SQL Agent creation failed: %s", e)
+            logger.debug("🔄 Falling back to simple SQL agent...")
             # Always fall back to simple agent if complex creation fails
             return self._create_simple_sql_agent()
     
     def _create_simple_sql_agent(self):
         """Create a simple SQL agent as fallback when complex creation fails"""
         try:
-            print("🔄 Creating simple SQL agent as fallback...")
+            logger.debug("🔄 Creating simple SQL agent as fallback...")
             
             # Create a simple wrapper that acts like an agent
             class SimpleSQLAgent:
@@ -252,7 +257,7 @@ class SQLAgent:
                         return self.db.get_table_info()
                     except Exception as e:
                         # Fallback schema if database info retrieval fails
-                        print(f"⚠️ Could not get table info: {e}")
+                        logger.warning("⚠️ Could not get table info: %s", e)
                         return """
                         POSTGRESQL DATABASE SCHEMA FOR NEET STUDENT PERFORMANCE:
                         
@@ -268,11 +273,11 @@ class SQLAgent:
                         """
             
             self.sql_agent = SimpleSQLAgent(self.llm, self.db)
-            print("✅ Simple SQL Agent created successfully")
+            logger.debug("✅ Simple SQL Agent created successfully")
             return True
             
         except Exception as e:
-            print(f"❌ Simple SQL Agent creation failed: {e}")
+            logger.warning("❌ Simple SQL Agent creation failed: %s", e)
             self.sql_agent = None
             return False
     
@@ -286,7 +291,7 @@ class SQLAgent:
             # Update the agent's LLM
             if hasattr(self.sql_agent, 'llm_chain'):
                 self.sql_agent.llm_chain.llm = self.llm
-            print(f"🔄 Updated SQL Agent with Grok API")
+            logger.debug("🔄 Updated SQL Agent with Grok API")
             return True
         return False
     
@@ -301,10 +306,10 @@ class SQLAgent:
             cache_key = self._get_cache_key(student_id, user_message)
             cached_sql = cache.get(cache_key)
             if cached_sql:
-                print(f"💾 Cache hit for query: {user_message[:50]}...")
+                logger.debug("💾 Cache hit for query: %s...", user_message[:50])
                 return cached_sql
         except Exception as e:
-            print(f"⚠️ Cache retrieval failed: {e}")
+            logger.warning("⚠️ Cache retrieval failed: %s", e)
         return None
     
     def _cache_query(self, student_id: str, user_message: str, sql_query: str):
@@ -312,9 +317,9 @@ class SQLAgent:
         try:
             cache_key = self._get_cache_key(student_id, user_message)
             cache.set(cache_key, sql_query, timeout=self.cache_timeout)
-            print(f"💾 Cached SQL query for: {user_message[:50]}...")
+            logger.debug("💾 Cached SQL query for: %s...", user_message[:50])
         except Exception as e:
-            print(f"⚠️ Cache storage failed: {e}")
+            logger.warning("⚠️ Cache storage failed: %s", e)
     
     def _get_optimized_sql_prefix(self):
         """Optimized, concise prefix for faster processing"""
@@ -406,6 +411,7 @@ class SQLAgent:
         """Check if SQL agent is available"""
         return self.sql_agent is not None
     
+    @traced('ai.sql_agent', 'sql_agent.generate_sql_query')
     def generate_sql_query(self, student_id: str, user_message: str) -> Tuple[Dict[str, Any], str]:
         """Generate SQL query using Grok API with simplified retry logic"""
         if not self.is_available():
@@ -420,7 +426,7 @@ class SQLAgent:
         
         for attempt in range(max_retries):
             try:
-                print(f"🔄 SQL Agent attempt {attempt + 1}/{max_retries} using Grok API")
+                logger.debug("🔄 SQL Agent attempt %s/%s using Grok API", attempt + 1, max_retries)
                 
                 # Optimized, concise prompt
                 sql_prompt = f"""Generate PostgreSQL query for student {student_id}: "{user_message}"
@@ -478,35 +484,35 @@ class SQLAgent:
                         is_quota_exceeded = any(indicator in error_msg for indicator in quota_indicators)
                         
                         if is_quota_exceeded:
-                            print(f"🚫 Quota exceeded on API key {self.gemini_client.current_key_index + 1}")
+                            logger.warning("🚫 Quota exceeded on API key %s", self.gemini_client.current_key_index + 1)
                             
                             # Try next API key if available
                             if attempt < max_retries - 1 and self.gemini_client.rotate_api_key():
-                                print(f"� Rotating to API key {self.gemini_client.current_key_index + 1}")
+                                logger.debug("🔄 Rotating to API key %s", self.gemini_client.current_key_index + 1)
                                 
                                 # Update LLM with new key
                                 if not self._update_api_key():
-                                    print("⚠️ Key update failed, recreating agent...")
+                                    logger.warning("⚠️ Key update failed, recreating agent...")
                                     self._create_sql_agent()
                                 
                                 # Short delay before retry
                                 time.sleep(1)
                                 continue
                             else:
-                                print("❌ All API keys exhausted due to quota limits")
+                                logger.warning("❌ All API keys exhausted due to quota limits")
                                 return self._generate_fallback_response(student_id, user_message)
                         
                         # Handle timeout or other errors
                         if 'timeout' in error_msg or isinstance(e, TimeoutError):
-                            print(f"⏱️ Timeout on API key {self.gemini_client.current_key_index + 1}")
+                            logger.debug("⏱️ Timeout on API key %s", self.gemini_client.current_key_index + 1)
                             
                             # For timeouts, also try rotating API key since it might be due to quota issues
                             if attempt < max_retries - 1 and self.gemini_client.rotate_api_key():
-                                print(f"🔄 Timeout - rotating to API key {self.gemini_client.current_key_index + 1}")
+                                logger.debug("🔄 Timeout - rotating to API key %s", self.gemini_client.current_key_index + 1)
                                 
                                 # Update LLM with new key
                                 if not self._update_api_key():
-                                    print("⚠️ Key update failed, recreating agent...")
+                                    logger.warning("⚠️ Key update failed, recreating agent...")
                                     self._create_sql_agent()
                                 
                                 time.sleep(1)
@@ -517,7 +523,7 @@ class SQLAgent:
                         
                         # Re-raise for final attempt
                         if attempt == max_retries - 1:
-                            print(f"❌ Final attempt failed: {str(e)[:100]}...")
+                            logger.warning("❌ Final attempt failed: %s...", str(e)[:100])
                             return self._generate_fallback_response(student_id, user_message)
                         
                         raise e
@@ -531,29 +537,29 @@ class SQLAgent:
                     
                     # If fix returns empty string, trigger fallback
                     if not fixed_sql or not fixed_sql.strip():
-                        print("🔄 Nested aggregates detected - using fallback response")
+                        logger.debug("🔄 Nested aggregates detected - using fallback response")
                         return self._generate_fallback_response(student_id, user_message)
                     
-                    print(f"🤖 Generated SQL: {fixed_sql[:100]}...")
+                    logger.debug("🤖 Generated SQL: %s...", fixed_sql[:100])
                     # Cache successful query
                     self._cache_query(student_id, user_message, fixed_sql)
                     return {'success': True, 'cached': False}, fixed_sql
                 else:
-                    print("⚠️ No valid SQL extracted from response, trying fallback...")
+                    logger.warning("⚠️ No valid SQL extracted from response, trying fallback...")
                     raise Exception("No valid SQL extracted")
                     
             except Exception as e:
-                print(f"❌ Attempt {attempt + 1} failed: {str(e)[:100]}...")
+                logger.warning("❌ Attempt %s failed: %s...", attempt + 1, str(e)[:100])
                 
                 if attempt == max_retries - 1:
-                    print("❌ All retries exhausted, using fallback")
+                    logger.warning("❌ All retries exhausted, using fallback")
                     return self._generate_fallback_response(student_id, user_message)
         
         return self._generate_fallback_response(student_id, user_message)
     
     def _generate_fallback_response(self, student_id: str, user_message: str) -> Tuple[Dict[str, Any], str]:
         """Generate a simple fallback SQL query when AI fails"""
-        print("🔄 Generating fallback SQL query...")
+        logger.debug("🔄 Generating fallback SQL query...")
         
         # Analyze user message to provide specific fallback
         message_lower = user_message.lower()
@@ -626,7 +632,7 @@ class SQLAgent:
             LIMIT 4;
             """.strip()
         
-        print(f"📝 Fallback SQL: {fallback_sql[:100]}...")
+        logger.debug("📝 Fallback SQL: %s...", fallback_sql[:100])
         return {'success': True, 'fallback': True}, fallback_sql
     
     def _extract_sql_with_markers(self, agent_response) -> str:
@@ -641,7 +647,7 @@ class SQLAgent:
             else:
                 response_text = str(agent_response)
             
-            print(f"🔍 Extracting SQL from response (length: {len(response_text)})...")
+            logger.debug("🔍 Extracting SQL from response (length: %s)...", len(response_text))
             
             # Primary: Look for marker-wrapped queries
             marker_pattern = r'<sql_query>\s*(.*?)\s*</sql_query>'
@@ -654,7 +660,7 @@ class SQLAgent:
                     # Always check for nested aggregates
                     sql_query = self._fix_nested_aggregates(sql_query)
                     if sql_query:  # Only return if not empty after fixing
-                        print(f"✅ Found marked SQL query: {sql_query[:150]}...")
+                        logger.debug("✅ Found marked SQL query: %s...", sql_query[:150])
                         return sql_query
             
             # Fallback: Use existing regex patterns
@@ -663,14 +669,14 @@ class SQLAgent:
                 # CRITICAL: Also check fallback SQL for nested aggregates
                 fallback_sql = self._fix_nested_aggregates(fallback_sql)
                 if fallback_sql:  # Only return if not empty after fixing
-                    print(f"✅ Found fallback SQL query: {fallback_sql[:150]}...")
+                    logger.debug("✅ Found fallback SQL query: %s...", fallback_sql[:150])
                     return fallback_sql
             
-            print(f"⚠️ No valid SQL found in response. Content: {response_text[:300]}...")
+            logger.warning("⚠️ No valid SQL found in response. Content: %s...", response_text[:300])
             return ""
             
         except Exception as e:
-            print(f"❌ SQL extraction failed: {e}")
+            logger.warning("❌ SQL extraction failed: %s", e)
             return ""
     
     def _extract_sql_fallback(self, response_text: str) -> str:
@@ -698,7 +704,7 @@ class SQLAgent:
         
         # Check for placeholder SQL and reject it
         if '...' in sql_query or sql_query == 'SELECT ... ;':
-            print("⚠️ Detected placeholder SQL, rejecting...")
+            logger.warning("⚠️ Detected placeholder SQL, rejecting...")
             return ""
         
         # Ensure semicolon
@@ -736,7 +742,7 @@ class SQLAgent:
                 
                 if 'ts.start_time' in sql_query.lower():
                     # Replace ORDER BY ts.start_time with subquery approach
-                    print("🔧 Fixing ORDER BY issue with aggregate function...")
+                    logger.debug("🔧 Fixing ORDER BY issue with aggregate function...")
                     
                     # Remove ORDER BY ts.start_time DESC LIMIT
                     pattern = r'ORDER BY\s+ts\.start_time\s+(DESC|ASC)?\s*(LIMIT\s+\d+)?;?'
@@ -746,12 +752,12 @@ class SQLAgent:
                     if not sql_query.rstrip().endswith(';'):
                         sql_query = sql_query.rstrip() + ';'
                     
-                    print(f"✅ Fixed ORDER BY issue in aggregate query")
+                    logger.debug("✅ Fixed ORDER BY issue in aggregate query")
             
             return sql_query
             
         except Exception as e:
-            print(f"⚠️ Error fixing GROUP BY issues: {e}")
+            logger.warning("⚠️ Error fixing GROUP BY issues: %s", e)
             return sql_query
     
     def _fix_nested_aggregates(self, sql_query: str) -> str:
@@ -775,7 +781,7 @@ class SQLAgent:
             has_nested = any(re.search(pattern, sql_query, re.IGNORECASE) for pattern in nested_patterns)
             
             if has_nested:
-                print("🔧 Detected nested aggregates, applying automatic fix...")
+                logger.debug("🔧 Detected nested aggregates, applying automatic fix...")
                 
                 # Extract student_id from the query
                 student_match = re.search(r"student_id\s*=\s*'([^']+)'", sql_query)
@@ -794,7 +800,7 @@ JOIN test_sessions ts ON ta.session_id = ts.id
 WHERE ts.student_id = '{student_id}' 
 AND ts.is_completed = TRUE"""
                         
-                        print("✅ Applied nested aggregates fix: Simple average accuracy calculation")
+                        logger.debug("✅ Applied nested aggregates fix: Simple average accuracy calculation")
                         return fixed_sql.strip() + ';'
                     
                     elif 'subject' in sql_query.lower():
@@ -815,18 +821,18 @@ AND ts.is_completed = TRUE
 GROUP BY t.subject
 ORDER BY percentage DESC"""
                         
-                        print("✅ Applied nested aggregates fix: Subject performance query")
+                        logger.debug("✅ Applied nested aggregates fix: Subject performance query")
                         return fixed_sql.strip() + ';'
                 
                 # If we can't extract student_id or determine query type, return empty to trigger fallback
-                print("⚠️ Complex nested aggregates detected, triggering fallback generation...")
+                logger.warning("⚠️ Complex nested aggregates detected, triggering fallback generation...")
                 return ""
             
             # No nested aggregates found, return original query
             return sql_query
             
         except Exception as e:
-            print(f"⚠️ Error fixing nested aggregates: {e}")
+            logger.warning("⚠️ Error fixing nested aggregates: %s", e)
             return sql_query
     
     def _extract_sql_from_response(self, agent_response) -> str:
@@ -846,7 +852,7 @@ ORDER BY percentage DESC"""
             else:
                 response_text = str(agent_response)
             
-            print(f"🔍 Extracting SQL from: {response_text[:200]}...")
+            logger.debug("🔍 Extracting SQL from: %s...", response_text[:200])
             
             # Look for SQL patterns in the response
             sql_patterns = [
@@ -875,7 +881,7 @@ ORDER BY percentage DESC"""
                             
                             # Ensure proper FROM clause exists
                             if 'SELECT' in sql_query.upper() and 'FROM' not in sql_query.upper():
-                                print(f"⚠️ Skipping SQL without FROM clause: {sql_query[:100]}...")
+                                logger.warning("⚠️ Skipping SQL without FROM clause: %s...", sql_query[:100])
                                 continue
                             
                             # Take only the first query if multiple are found
@@ -884,7 +890,7 @@ ORDER BY percentage DESC"""
                                 if not sql_query.endswith(';'):
                                     sql_query += ';'
                             
-                            print(f"✅ Found SQL query: {sql_query}")
+                            logger.debug("✅ Found SQL query: %s", sql_query)
                             return sql_query
             
             # If no specific SQL found but response contains SELECT, extract it
@@ -911,19 +917,20 @@ ORDER BY percentage DESC"""
                                 if not sql_query.endswith(';'):
                                     sql_query += ';'
                             
-                            print(f"✅ Extracted SQL from text: {sql_query}")
+                            logger.debug("✅ Extracted SQL from text: %s", sql_query)
                             return sql_query
             
-            print(f"⚠️ No valid SQL pattern found in response")
+            logger.warning("⚠️ No valid SQL pattern found in response")
             return ""
             
         except Exception as e:
-            print(f"❌ Failed to extract SQL from agent response: {e}")
+            logger.warning("❌ Failed to extract SQL from agent response: %s", e)
             return ""
 
+    @traced('db.sql_agent', 'sql_agent.execute_sql_query')
     def execute_sql_query(self, sql_query: str) -> List[Dict[str, Any]]:
         """Execute SQL query with enhanced error handling and result formatting"""
-        print(f"📊 Executing SQL query: {sql_query[:100]}...")
+        logger.debug("📊 Executing SQL query: %s...", sql_query[:100])
         
         try:
             # Import Django here to avoid circular import issues
@@ -939,7 +946,7 @@ ORDER BY percentage DESC"""
                 rows = cursor.fetchall()
                 
                 if not rows:
-                    print("⚠️ Query returned no results")
+                    logger.debug("Query returned no results")
                     return []
                 
                 # Convert to list of dictionaries
@@ -962,11 +969,11 @@ ORDER BY percentage DESC"""
                     
                     results.append(row_dict)
                 
-                print(f"✅ Query returned {len(results)} rows")
+                logger.debug("✅ Query returned %s rows", len(results))
                 return results
                 
         except Exception as e:
-            print(f"❌ SQL execution error: {e}")
+            logger.warning("❌ SQL execution error: %s", e)
             # Return error information in a structured format
             return [{
                 'error': True,
@@ -978,9 +985,9 @@ ORDER BY percentage DESC"""
         """Clean up resources"""
         try:
             self.sql_agent = None
-            print("🧹 SQL Agent cleanup completed")
+            logger.debug("🧹 SQL Agent cleanup completed")
         except Exception as e:
-            print(f"⚠️ Error during cleanup: {e}")
+            logger.warning("⚠️ Error during cleanup: %s", e)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get SQL Agent statistics"""
@@ -1041,7 +1048,7 @@ ORDER BY percentage DESC"""
             }
             
         except Exception as e:
-            print(f"❌ SQL generation and execution failed: {e}")
+            logger.warning("❌ SQL generation and execution failed: %s", e)
             return {
                 'success': False,
                 'error': str(e),
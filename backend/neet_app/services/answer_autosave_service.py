@@ -0,0 +1,176 @@
+"""
+Answer evaluation and sequence-ordered autosave for test answers.
+
+Autosave batches carry a client sequence number per answer delta. A batch is
+written with a single INSERT ... ON CONFLICT DO UPDATE whose WHERE clause only
+lets a delta through when its sequence is newer than TestAnswer.client_seq,
+so retried or reordered requests from flaky connections cannot overwrite a
+later answer (last writer by sequence wins).
+"""
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from neet_app.models import Question, TestAnswer
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_nvt_answer(student_answer, correct_answer) -> bool:
+    """
+    Evaluate NVT answer against correct answer.
+    Handles numeric (with tolerance) and string (case-insensitive) comparisons.
+    """
+    # Strip whitespace from both answers
+    student_answer = str(student_answer).strip()
+    correct_answer = str(correct_answer).strip()
+
+    # Try numeric comparison first
+    try:
+        student_numeric = float(student_answer)
+        correct_numeric = float(correct_answer)
+        tolerance = settings.NEET_SETTINGS.get('NVT_NUMERIC_TOLERANCE', 0.01)
+        return abs(student_numeric - correct_numeric) <= tolerance
+    except (ValueError, TypeError):
+        # Not numeric, fall back to string comparison
+        case_sensitive = settings.NEET_SETTINGS.get('NVT_CASE_SENSITIVE', False)
+        if case_sensitive:
+            return student_answer == correct_answer
+        return student_answer.lower() == correct_answer.lower()
+
+
+def evaluate_answer(question, selected_answer=None, text_answer=None) -> Dict:
+    """
+    Normalize a student's response for a question and grade it.
+
+    Returns:
+        {'selected_answer', 'text_answer', 'is_correct', 'answer_provided'}
+    """
+    question_type = getattr(question, 'question_type', None) or 'Blank'  # Default to MCQ
+
+    if question_type == 'NVT':
+        # NVT question - store text answer, clear MCQ answer
+        is_correct = None
+        if text_answer:
+            auto_evaluate = settings.NEET_SETTINGS.get('NVT_AUTO_EVALUATE', True)
+            if auto_evaluate and question.correct_answer:
+                is_correct = evaluate_nvt_answer(text_answer, question.correct_answer)
+        return {
+            'selected_answer': None,
+            'text_answer': text_answer,
+            'is_correct': is_correct,
+            'answer_provided': bool(text_answer),
+        }
+
+    # MCQ question - store selected answer, clear text answer
+    is_correct = None
+    if selected_answer:
+        try:
+            # Normalize both sides and compare. For MCQ we expect letters A/B/C/D,
+            # but question.correct_answer may be a text/number for NVT questions
+            # if the data was authored inconsistently. Handle gracefully.
+            sel = str(selected_answer).strip()
+            corr = question.correct_answer
+            if corr is not None:
+                corr_str = str(corr).strip()
+                # If both look like single letters, compare case-insensitively
+                if len(sel) == 1 and corr_str and len(corr_str) == 1:
+                    is_correct = sel.upper() == corr_str.upper()
+                else:
+                    # Fallback to direct string equality (trimmed)
+                    is_correct = sel == corr_str
+        except Exception:
+            is_correct = False
+    return {
+        'selected_answer': selected_answer,
+        'text_answer': None,
+        'is_correct': is_correct,
+        'answer_provided': bool(selected_answer),
+    }
+
+
+def latest_deltas(deltas: Iterable[Dict]) -> Dict[int, Dict]:
+    """Keep only the highest-sequence delta per question (ties: later in the batch wins)."""
+    latest: Dict[int, Dict] = {}
+    for delta in deltas:
+        current = latest.get(delta['question_id'])
+        if current is None or delta['seq'] >= current['seq']:
+            latest[delta['question_id']] = delta
+    return latest
+
+
+_UPSERT_COLUMNS = (
+    'session_id', 'question_id', 'selected_answer', 'text_answer', 'is_correct',
+    'marked_for_review', 'is_bookmarked', 'time_taken', 'visit_count', 'answered_at', 'client_seq',
+)
+
+
+def _upsert_sql(row_count: int) -> str:
+    table = TestAnswer._meta.db_table
+    row = '(' + ', '.join(['%s'] * len(_UPSERT_COLUMNS)) + ')'
+    return f"""
+INSERT INTO {table} ({', '.join(_UPSERT_COLUMNS)})
+VALUES {', '.join([row] * row_count)}
+ON CONFLICT (session_id, question_id) DO UPDATE SET
+    selected_answer = EXCLUDED.selected_answer,
+    text_answer = EXCLUDED.text_answer,
+    is_correct = EXCLUDED.is_correct,
+    marked_for_review = EXCLUDED.marked_for_review,
+    is_bookmarked = EXCLUDED.is_bookmarked,
+    answered_at = COALESCE({table}.answered_at, EXCLUDED.answered_at),
+    client_seq = EXCLUDED.client_seq
+WHERE {table}.client_seq IS NULL OR {table}.client_seq < EXCLUDED.client_seq
+RETURNING question_id
+"""
+
+
+def autosave_answers(session_id: int, deltas: Iterable[Dict]) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Apply a batch of answer deltas for one session in a single upsert.
+
+    Each delta: {'question_id', 'seq', 'selected_answer', 'text_answer',
+    'marked_for_review', 'is_bookmarked'}. Deltas are full answer states for
+    their question, matching the single-answer create endpoint.
+
+    Returns:
+        (applied question ids, stale question ids, unknown question ids)
+    """
+    latest = latest_deltas(deltas)
+    if not latest:
+        return [], [], []
+
+    questions = {
+        q.id: q for q in Question.objects.filter(id__in=list(latest))
+        .only('id', 'question_type', 'correct_answer')
+    }
+    unknown = sorted(qid for qid in latest if qid not in questions)
+
+    answered_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = []
+    rows = 0
+    for question_id, delta in latest.items():
+        question = questions.get(question_id)
+        if question is None:
+            continue
+        graded = evaluate_answer(question, delta.get('selected_answer'), delta.get('text_answer'))
+        params.extend([
+            session_id, question_id, graded['selected_answer'], graded['text_answer'], graded['is_correct'],
+            delta.get('marked_for_review', False), delta.get('is_bookmarked', False),
+            None, 1, answered_at if graded['answer_provided'] else None, delta['seq'],
+        ])
+        rows += 1
+
+    applied = []
+    if rows:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(_upsert_sql(rows), params)
+            applied = sorted(row[0] for row in cursor.fetchall())
+
+    applied_set = set(applied)
+    stale = sorted(qid for qid in questions if qid in latest and qid not in applied_set)
+    if stale:
+        logger.debug(f"Dropped {len(stale)} stale autosave deltas for session {session_id}")
+    return applied, stale, unknown
@@ -2,6 +2,7 @@
 NEET Chatbot Service - Simplified Version
 Main orchestrator focusing on core functionality only
 """
+import logging
 import time
 import json
 from datetime import datetime
@@ -12,6 +13,9 @@ from ..models import StudentProfile, ChatSession, ChatMessage
 # Import only essential components
 from .ai.gemini_client import GeminiClient
 from .ai.sql_agent import SQLAgent
+from ..utils.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 def datetime_serializer(obj):
@@ -51,36 +55,36 @@ class NeetChatbotService:
         if self._initialization_time is None:
             import time
             start_time = time.time()
-            print("🔧 Initializing NeetChatbotService (first time)...")
+            logger.debug("🔧 Initializing NeetChatbotService (first time)...")
             
             # Initialize Gemini client
             try:
-                print("🔄 Initializing Gemini client...")
+                logger.debug("🔄 Initializing Gemini client...")
                 self._gemini_client = GeminiClient()
-                print("✅ Gemini client initialized successfully")
+                logger.debug("✅ Gemini client initialized successfully")
             except Exception as e:
-                print(f"❌ Error initializing Gemini client: {e}")
+                logger.warning("❌ Error initializing Gemini client: %s", e)
                 self._gemini_client = None
             
             # Initialize Grok client for backup
             try:
-                print("🔄 Initializing Grok client...")
+                logger.debug("🔄 Initializing Grok client...")
                 self._grok_client = self._initialize_grok_client()
                 if self._grok_client:
-                    print("✅ Grok client initialized successfully")
+                    logger.debug("✅ Grok client initialized successfully")
                 else:
-                    print("⚠️ Grok client not available")
+                    logger.warning("⚠️ Grok client not available")
             except Exception as e:
-                print(f"❌ Error initializing Grok client: {e}")
+                logger.warning("❌ Error initializing Grok client: %s", e)
                 self._grok_client = None
             
             # Initialize SQL agent
             try:
-                print("🔄 Initializing SQL agent...")
+                logger.debug("🔄 Initializing SQL agent...")
                 self._sql_agent = SQLAgent()
-                print("✅ SQL Agent initialized successfully")
+                logger.debug("✅ SQL Agent initialized successfully")
             except Exception as e:
-                print(f"❌ Error initializing SQL agent: {e}")
+                logger.warning("❌ Error initializing SQL agent: %s", e)
                 self._sql_agent = None
             
             # Set AI availability based on successful initializations
@@ -107,9 +111,9 @@ When providing personalized responses:
 9. Please respond in plain text only, without any Markdown formatting (no bold, italics, headings, or symbols like *, `, #, etc.)."""
             
             self._initialization_time = time.time() - start_time
-            print(f"⏱️ Service initialization completed in {self._initialization_time:.2f}s")
-            print(f"🤖 AI Available: {self._ai_available}")
-            print("NEET Chatbot Service initialized - AI Available: True" if self._ai_available else "NEET Chatbot Service initialized - AI Available: False")
+            logger.debug("⏱️ Service initialization completed in %.2fs", self._initialization_time)
+            logger.debug("🤖 AI Available: %s", self._ai_available)
+            logger.info("NEET Chatbot Service initialized - AI Available: %s", self._ai_available)
     
     @property
     def sql_agent(self):
@@ -146,7 +150,7 @@ When providing personalized responses:
         cls._ai_available = False
         cls._initialization_time = None
         cls._neet_prompt = None
-        print("🔄 NeetChatbotService instance reset")
+        logger.debug("🔄 NeetChatbotService instance reset")
         
     def get_initialization_time(self):
         """Get the time it took to initialize the service"""
@@ -160,7 +164,7 @@ When providing personalized responses:
             
             grok_api_key = os.getenv('GROQ_API_KEY')
             if not grok_api_key:
-                print("⚠️ GROQ_API_KEY not found in environment variables")
+                logger.warning("⚠️ GROQ_API_KEY not found in environment variables")
                 return None
             
             client = ChatGroq(
@@ -174,16 +178,16 @@ When providing personalized responses:
             
             
             
-            print("🔧 Grok API client initialized for backup responses")
+            logger.debug("🔧 Grok API client initialized for backup responses")
             return client
             
         except Exception as e:
-            print(f"⚠️ Failed to initialize Grok client: {e}")
+            logger.warning("⚠️ Failed to initialize Grok client: %s", e)
             return None
 
     def _classify_intent(self, query: str) -> str:
         """Classify query as 'general' or 'student_specific' using Gemini LLM"""
-        print(f"🔍 Classifying query using Gemini LLM: '{query}'")
+        logger.debug("🔍 Classifying query using Gemini LLM: '%s'", query)
         
         # First try LLM-based classification
         if self.gemini_client and self.gemini_client.is_available():
@@ -210,27 +214,27 @@ Student Query: "{query}"
 
 Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
 
-                print(f"🤖 Sending classification request to Gemini...")
+                logger.debug("🤖 Sending classification request to Gemini...")
                 llm_response = self.gemini_client.generate_response(classification_prompt)
                 
                 # Clean and validate LLM response
                 llm_result = llm_response.strip().upper()
-                print(f"🤖 Gemini classification result: '{llm_result}'")
+                logger.debug("🤖 Gemini classification result: '%s'", llm_result)
                 
                 if "STUDENT_SPECIFIC" in llm_result:
-                    print(f"✅ LLM classified as: student_specific")
+                    logger.debug("✅ LLM classified as: student_specific")
                     return 'student_specific'
                 elif "GENERAL" in llm_result:
-                    print(f"✅ LLM classified as: general")
+                    logger.debug("✅ LLM classified as: general")
                     return 'general'
                 else:
-                    print(f"⚠️ Unexpected LLM response: '{llm_result}' - falling back to keyword matching")
+                    logger.warning("⚠️ Unexpected LLM response: '%s' - falling back to keyword matching", llm_result)
                     
             except Exception as e:
-                print(f"⚠️ LLM classification failed: {e} - falling back to keyword matching")
+                logger.warning("⚠️ LLM classification failed: %s - falling back to keyword matching", e)
         
         # Fallback to keyword-based classification if LLM fails
-        print(f"🔄 Using fallback keyword-based classification")
+        logger.debug("🔄 Using fallback keyword-based classification")
         query_lower = query.lower()
         
         # Keywords that indicate student-specific queries (performance analysis)
@@ -285,10 +289,10 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
         matched_keywords = [keyword for keyword in student_specific_keywords if keyword in query_lower]
         
         if matched_keywords:
-            print(f"✅ Fallback: Matched student-specific keywords: {matched_keywords}")
+            logger.debug("✅ Fallback: Matched student-specific keywords: %s", matched_keywords)
             return 'student_specific'
         else:
-            print(f"❌ Fallback: No student-specific keywords found - treating as general")
+            logger.debug("Fallback: No student-specific keywords found - treating as general")
             return 'general'
     
     def _get_session_history(self, chat_session_id: str, limit: int = 10) -> list:
@@ -312,11 +316,11 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
                 content = msg.message_content[:200] + "..." if len(msg.message_content) > 200 else msg.message_content
                 session_history.append(f"{role}: {content}")
             
-            print(f"   📋 Session history: {len(session_history)} messages")
+            logger.debug("   📋 Session history: %s messages", len(session_history))
             return session_history
             
         except Exception as e:
-            print(f"   ⚠️ Failed to fetch session history: {e}")
+            logger.warning("   ⚠️ Failed to fetch session history: %s", e)
             return []
     
     def _get_long_term_memories(self, student_id: str, limit: int = 5) -> list:
@@ -344,11 +348,11 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
                 
                 memory_facts.append(f"- {fact}")
             
-            print(f"   🧠 Long-term memories: {len(memory_facts)} facts")
+            logger.debug("   🧠 Long-term memories: %s facts", len(memory_facts))
             return memory_facts
             
         except Exception as e:
-            print(f"   ⚠️ Failed to fetch long-term memories: {e}")
+            logger.warning("   ⚠️ Failed to fetch long-term memories: %s", e)
             return []
     
     def _build_memory_context(self, session_history: list, long_term_memories: list) -> str:
@@ -370,6 +374,7 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
         
         return "\n".join(context_parts)
     
+    @traced('ai.chatbot', 'chatbot.generate_response')
     def generate_response(self, query: str, student_id: str, chat_session_id: str) -> Dict[str, Any]:
         """
         Generate response using simplified logic with memory integration:
@@ -378,60 +383,60 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
         """
         try:
             start_time = time.time()
-            print(f"\n🚀 Starting response generation:")
-            print(f"   Query: '{query}'")
-            print(f"   Student ID: {student_id}")
-            print(f"   Chat Session ID: {chat_session_id}")
-            print(f"   AI Available: {self.ai_available}")
+            logger.debug("🚀 Starting response generation:")
+            logger.debug("   Query: '%s'", query)
+            logger.debug("   Student ID: %s", student_id)
+            logger.debug("   Chat Session ID: %s", chat_session_id)
+            logger.debug("   AI Available: %s", self.ai_available)
             
             # Step 1: Fetch memory context (both short-term and long-term)
             memory_start = time.time()
             session_history = self._get_session_history(chat_session_id)
             long_term_memories = self._get_long_term_memories(student_id)
             memory_time = time.time() - memory_start
-            print(f"💾 Memory fetched: {len(session_history)} session messages, {len(long_term_memories)} long-term memories (time: {memory_time:.2f}s)")
+            logger.debug("💾 Memory fetched: %s session messages, %s long-term memories (time: %.2fs)", len(session_history), len(long_term_memories), memory_time)
             
             # Step 2: Classify intent (general or student_specific)
             intent_start = time.time()
             intent = self._classify_intent(query)
             intent_time = time.time() - intent_start
-            print(f"📝 Intent classified as: {intent} (time: {intent_time:.2f}s)")
+            logger.debug("📝 Intent classified as: %s (time: %.2fs)", intent, intent_time)
             
             # Step 2: Handle student-specific queries - fetch SQL data
             sql_data = None
             sql_query = None
             
             if intent == 'student_specific' and self.ai_available:
-                print(f"🔍 Student-specific query detected - fetching SQL data...")
+                logger.debug("🔍 Student-specific query detected - fetching SQL data...")
                 sql_start = time.time()
                 try:
-                    print(f"   Calling SQL agent with query: '{query}' for student: {student_id}")
+                    logger.debug("   Calling SQL agent with query: '%s' for student: %s", query, student_id)
                     sql_result = self.sql_agent.generate_sql_and_execute(
                         query, student_id, context=f"Student is asking about their performance data"
                     )
-                    print(f"   SQL Agent Result: {sql_result}")
+                    logger.debug("   SQL Agent Result: %s", sql_result)
                     
                     if sql_result and sql_result.get('success'):
                         sql_data = sql_result.get('data', [])
                         sql_query = sql_result.get('sql_query', '')
-                        print(f"   ✅ SQL executed successfully!")
-                        print(f"   SQL Query: {sql_query}")
-                        print(f"   Data rows: {len(sql_data) if sql_data else 0}")
+                        logger.debug("   ✅ SQL executed successfully!")
+                        logger.debug("   SQL Query: %s", sql_query)
+                        logger.debug("   Data rows: %s", len(sql_data) if sql_data else 0)
                         if sql_data:
-                            print(f"   Sample data: {sql_data[:2]}")  # Show first 2 rows
+                            logger.debug("   Sample data: %s", sql_data[:2])  # Show first 2 rows
                     else:
-                        print(f"   ❌ SQL execution failed or returned no success flag")
+                        logger.warning("   ❌ SQL execution failed or returned no success flag")
                         sql_data = None
                         
                 except Exception as e:
-                    print(f"   ❌ SQL execution failed with exception: {e}")
+                    logger.warning("   ❌ SQL execution failed with exception: %s", e)
                     import traceback
                     traceback.print_exc()
                     sql_data = None
             elif intent == 'student_specific' and not self.ai_available:
-                print(f"⚠️ Student-specific query but AI not available")
+                logger.warning("⚠️ Student-specific query but AI not available")
             else:
-                print(f"📖 General query - skipping SQL data fetch")
+                logger.debug("📖 General query - skipping SQL data fetch")
             
             # Step 3: Build memory context for prompt injection
             memory_context = self._build_memory_context(session_history, long_term_memories)
@@ -439,7 +444,7 @@ Respond with ONLY one word: either "STUDENT_SPECIFIC" or "GENERAL"."""
             # Step 4: Generate AI response based on intent type
             if self.ai_available and self.gemini_client:
                 ai_start = time.time()
-                print(f"🤖 Generating AI response for intent: {intent}")
+                logger.debug("🤖 Generating AI response for intent: %s", intent)
                 
                 if intent == 'general':
                     # For general queries: prompt + query + memory context
@@ -468,17 +473,17 @@ When answering:
                     prompt_parts.append(f"Student Query: {query}\n\nProvide a helpful response:")
                     
                     full_prompt = "\n".join(prompt_parts)
-                    print(f"   Using general prompt with memory (length: {len(full_prompt)} chars)")
+                    logger.debug("   Using general prompt with memory (length: %s chars)", len(full_prompt))
                     
                 elif intent == 'student_specific':
                     # For student-specific queries: detailed prompt + query + memory + SQL data
                     context_info = ""
                     if sql_data:
                         context_info = f"\n\nStudent's Performance Data: {json.dumps(sql_data, indent=2, default=datetime_serializer)}"
-                        print(f"   ✅ Including performance data ({len(sql_data)} records)")
+                        logger.debug("   ✅ Including performance data (%s records)", len(sql_data))
                     else:
                         context_info = "\n\nNote: No performance data available for this student."
-                        print(f"   ⚠️ No performance data available")
+                        logger.debug("   No performance data available")
                     
                     # Build full prompt with memory context and performance data
                     prompt_parts = [self.neet_prompt]
@@ -487,24 +492,24 @@ When answering:
                     prompt_parts.append(f"Student Query: {query}{context_info}\n\nProvide a personalized analysis and response:")
                     
                     full_prompt = "\n".join(prompt_parts)
-                    print(f"   Using personalized prompt with memory (length: {len(full_prompt)} chars)")
+                    logger.debug("   Using personalized prompt with memory (length: %s chars)", len(full_prompt))
                 
-                print(f"   Sending to Gemini API...")
+                logger.debug("   Sending to Gemini API...")
                 gemini_start = time.time()
                 try:
                     # First try Gemini for general responses
                     ai_response = self.gemini_client.generate_response(full_prompt)
                     gemini_time = time.time() - gemini_start
-                    print(f"   ✅ Gemini response received (length: {len(ai_response)} chars, time: {gemini_time:.2f}s)")
-                    print(f"   Response preview: {ai_response[:200]}...")
+                    logger.debug("   ✅ Gemini response received (length: %s chars, time: %.2fs)", len(ai_response), gemini_time)
+                    logger.debug("   Response preview: %s...", ai_response[:200])
                     
                 except Exception as e:
                     gemini_time = time.time() - gemini_start
-                    print(f"⚠️ Gemini API error after {gemini_time:.2f}s: {e}")
+                    logger.warning("⚠️ Gemini API error after %.2fs: %s", gemini_time, e)
                     
                     # Fallback to Grok API if Gemini fails
                     if self.grok_client:
-                        print(f"   🔄 Falling back to Grok API...")
+                        logger.debug("   🔄 Falling back to Grok API...")
                         try:
                             response = self.grok_client.invoke(full_prompt)
                             
@@ -514,25 +519,25 @@ When answering:
                             else:
                                 ai_response = str(response)
                                 
-                            print(f"   ✅ Grok fallback response received (length: {len(ai_response)} chars)")
-                            print(f"   Response preview: {ai_response[:200]}...")
+                            logger.debug("   ✅ Grok fallback response received (length: %s chars)", len(ai_response))
+                            logger.debug("   Response preview: %s...", ai_response[:200])
                             
                         except Exception as grok_error:
-                            print(f"⚠️ Grok fallback also failed: {grok_error}")
+                            logger.warning("⚠️ Grok fallback also failed: %s", grok_error)
                             ai_response = "I'm experiencing technical difficulties with both AI services. Please try again in a moment."
                     else:
                         ai_response = "I'm experiencing technical difficulties. Please try again in a moment."
                 
                 ai_time = time.time() - ai_start
-                print(f"   🎯 Total AI response time: {ai_time:.2f}s")
+                logger.debug("   🎯 Total AI response time: %.2fs", ai_time)
                 
             else:
                 ai_response = "I'm currently unavailable. Please try again in a moment."
-                print(f"⚠️ AI unavailable - using fallback response")
+                logger.warning("⚠️ AI unavailable - using fallback response")
             
             # Step 4: Save to database
             processing_time = time.time() - start_time
-            print(f"💾 Saving to database (total processing time: {processing_time:.2f}s)")
+            logger.debug("💾 Saving to database (total processing time: %.2fs)", processing_time)
             
             db_start_time = time.time()
             try:
@@ -541,17 +546,17 @@ When answering:
                     metadata={'intent': intent, 'has_sql_data': sql_data is not None, 'processing_time': processing_time}
                 )
                 db_save_time = time.time() - db_start_time
-                print(f"   ✅ Chat message saved with ID: {message_id} (DB save time: {db_save_time:.2f}s)")
+                logger.debug("   ✅ Chat message saved with ID: %s (DB save time: %.2fs)", message_id, db_save_time)
                 
                 # Save SQL query if available
                 if sql_query and message_id:
                     sql_start_time = time.time()
                     self._save_sql_query(message_id, sql_query)
                     sql_save_time = time.time() - sql_start_time
-                    print(f"   ✅ SQL query saved to message {message_id} (SQL save time: {sql_save_time:.2f}s)")
+                    logger.debug("   ✅ SQL query saved to message %s (SQL save time: %.2fs)", message_id, sql_save_time)
                     
             except Exception as e:
-                print(f"   ❌ Failed to save chat message: {e}")
+                logger.warning("   ❌ Failed to save chat message: %s", e)
                 message_id = None
             
             result = {
@@ -565,17 +570,17 @@ When answering:
                 'success': True
             }
             
-            print(f"🎉 Response generation completed successfully!")
-            print(f"   Intent: {intent}")
-            print(f"   Has personalized data: {sql_data is not None}")
-            print(f"   Has session memory: {len(session_history) > 0}")
-            print(f"   Has long-term memory: {len(long_term_memories) > 0}")
-            print(f"   Processing time: {processing_time:.2f}s")
+            logger.debug("🎉 Response generation completed successfully!")
+            logger.debug("   Intent: %s", intent)
+            logger.debug("   Has personalized data: %s", sql_data is not None)
+            logger.debug("   Has session memory: %s", len(session_history) > 0)
+            logger.debug("   Has long-term memory: %s", len(long_term_memories) > 0)
+            logger.debug("   Processing time: %.2fs", processing_time)
             
             return result
             
         except Exception as e:
-            print(f"💥 Error in generate_response: {e}")
+            logger.error("💥 Error in generate_response: %s", e)
             import traceback
             traceback.print_exc()
             
@@ -618,10 +623,10 @@ When answering:
             return str(bot_message.id)  # Return bot message ID for SQL query saving
             
         except ChatSession.DoesNotExist:
-            print(f"Chat session {chat_session_id} not found")
+            logger.warning("Chat session %s not found", chat_session_id)
             return None
         except Exception as e:
-            print(f"Error saving chat message: {e}")
+            logger.warning("Error saving chat message: %s", e)
             return None
 
     def _save_sql_query(self, chat_message_id: Optional[str], sql_query: str):
@@ -634,7 +639,7 @@ When answering:
             chat_message.sql_query = sql_query
             chat_message.save(update_fields=['sql_query'])
         except Exception as e:
-            print(f"Error saving SQL query: {e}")
+            logger.warning("Error saving SQL query: %s", e)
 
     def test_sql_execution(self, student_id: str) -> Dict[str, Any]:
         """Test SQL execution capability"""
@@ -0,0 +1,351 @@
+"""
+Per-test cohort analytics for institution dashboards.
+
+Every scored platform-test session is folded once (TestSession.cohort_aggregated_at)
+into summary tables:
+
+    TestCohortSummary        score moments, min/max, 10% score histogram, totals
+    TestQuestionCohortStat   per-question attempts/correct/time and score sums
+    TestTopicCohortStat      per-topic attempts/correct/time (heatmap)
+
+Updates for one test are serialized by locking its summary row, so counters
+can be read-modified-written in memory and written back with bulk statements.
+Dashboards read only these tables, so response time does not grow with the
+number of students. Derived indices:
+
+- difficulty index p = correct / attempts
+- discrimination = point-biserial correlation between answering the question
+  correctly and the session score: (M1 - M0) / s * sqrt(p * (1 - p))
+"""
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from neet_app.models import (
+    TestAnswer, TestCohortSummary, TestQuestionCohortStat, TestSession, TestTopicCohortStat
+)
+
+logger = logging.getLogger(__name__)
+
+MARKS_CORRECT = 4
+MARKS_INCORRECT = -1
+HISTOGRAM_BANDS = 10
+
+QUESTION_COUNTERS = ('attempts', 'correct', 'incorrect', 'unanswered', 'time_sum', 'score_sum', 'correct_score_sum')
+TOPIC_COUNTERS = ('attempts', 'correct', 'incorrect', 'unanswered', 'time_sum')
+
+
+def _answer_outcome(selected_answer, text_answer, is_correct) -> str:
+    if is_correct:
+        return 'correct'
+    if selected_answer or text_answer:
+        return 'incorrect'
+    return 'unanswered'
+
+
+class CohortDelta:
+    """Counters accumulated from one or more sessions, applied to a test's aggregates in one pass."""
+
+    def __init__(self):
+        self.session_scores = []
+        self.max_score = 0
+        self.totals = defaultdict(int)
+        self.questions = defaultdict(lambda: defaultdict(int))
+        self.topics = defaultdict(lambda: defaultdict(int))
+
+    def add_session(self, answers: Iterable, time_taken: Optional[int]) -> None:
+        """answers: (question_id, topic_id, selected_answer, text_answer, is_correct, time_taken) rows."""
+        rows = [(qid, tid, _answer_outcome(sel, text, ok), t or 0) for qid, tid, sel, text, ok, t in answers]
+        counts = defaultdict(int)
+        for _, _, outcome, _ in rows:
+            counts[outcome] += 1
+        score = counts['correct'] * MARKS_CORRECT + counts['incorrect'] * MARKS_INCORRECT
+
+        self.session_scores.append(score)
+        self.max_score = max(self.max_score, len(rows) * MARKS_CORRECT)
+        self.totals['correct_sum'] += counts['correct']
+        self.totals['incorrect_sum'] += counts['incorrect']
+        self.totals['unanswered_sum'] += counts['unanswered']
+        self.totals['time_sum'] += time_taken or 0
+
+        for question_id, topic_id, outcome, spent in rows:
+            question = self.questions[question_id]
+            question['attempts'] += 1
+            question[outcome] += 1
+            question['time_sum'] += spent
+            question['score_sum'] += score
+            if outcome == 'correct':
+                question['correct_score_sum'] += score
+
+            topic = self.topics[topic_id]
+            topic['attempts'] += 1
+            topic[outcome] += 1
+            topic['time_sum'] += spent
+
+
+def _histogram_band(score: float, max_score: int) -> int:
+    if max_score <= 0:
+        return 0
+    return min(HISTOGRAM_BANDS - 1, max(0, int(score / max_score * HISTOGRAM_BANDS)))
+
+
+def _apply_delta(summary: TestCohortSummary, delta: CohortDelta) -> None:
+    """Write a delta into a locked summary row and its question/topic stat rows."""
+    test_id = summary.platform_test_id
+    summary.max_score = max(summary.max_score, delta.max_score)
+    histogram = dict(summary.score_histogram or {})
+    for score in delta.session_scores:
+        summary.sessions += 1
+        summary.score_sum += score
+        summary.score_sq_sum += score * score
+        summary.score_min = score if summary.score_min is None else min(summary.score_min, score)
+        summary.score_max = score if summary.score_max is None else max(summary.score_max, score)
+        band = str(_histogram_band(score, summary.max_score))
+        histogram[band] = histogram.get(band, 0) + 1
+    summary.score_histogram = histogram
+    for field, value in delta.totals.items():
+        setattr(summary, field, getattr(summary, field) + value)
+    summary.save()
+
+    _merge_rows(
+        TestQuestionCohortStat, test_id, 'question_id', delta.questions, QUESTION_COUNTERS,
+    )
+    _merge_rows(
+        TestTopicCohortStat, test_id, 'topic_id', delta.topics, TOPIC_COUNTERS,
+    )
+
+
+def _merge_rows(model, test_id: int, key_field: str, increments: Dict, counters) -> None:
+    if not increments:
+        return
+    existing = {
+        getattr(row, key_field): row
+        for row in model.objects.filter(platform_test_id=test_id, **{f'{key_field}__in': list(increments)})
+    }
+    to_create = []
+    for key, values in increments.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(model(platform_test_id=test_id, **{key_field: key}, **{
+                field: values.get(field, 0) for field in counters
+            }))
+            continue
+        for field in counters:
+            setattr(row, field, getattr(row, field) + values.get(field, 0))
+    if existing:
+        model.objects.bulk_update(list(existing.values()), list(counters), batch_size=500)
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=500)
+
+
+def _locked_summary(test_id: int) -> TestCohortSummary:
+    TestCohortSummary.objects.get_or_create(platform_test_id=test_id)
+    return TestCohortSummary.objects.select_for_update().get(platform_test_id=test_id)
+
+
+def _answer_rows(session_ids):
+    return (
+        TestAnswer.objects.filter(session_id__in=session_ids)
+        .order_by('session_id', 'id')
+        .values_list('session_id', 'question_id', 'question__topic_id', 'selected_answer',
+                     'text_answer', 'is_correct', 'time_taken')
+    )
+
+
+def record_session_in_cohort(session_id: int) -> bool:
+    """
+    Fold one scored platform-test session into its test's aggregates (once).
+
+    Returns:
+        True if the session was added, False if skipped (not a completed
+        platform session, or already aggregated)
+    """
+    session = (
+        TestSession.objects.filter(id=session_id)
+        .values('platform_test_id', 'is_completed', 'total_time_taken', 'cohort_aggregated_at')
+        .first()
+    )
+    if not session or not session['platform_test_id'] or not session['is_completed']:
+        return False
+    if session['cohort_aggregated_at'] is not None:
+        return False
+
+    test_id = session['platform_test_id']
+    with transaction.atomic():
+        summary = _locked_summary(test_id)
+        # The marker is claimed under the summary lock, so a session is counted at most once
+        if not TestSession.objects.filter(id=session_id, cohort_aggregated_at__isnull=True).update(
+            cohort_aggregated_at=timezone.now()
+        ):
+            return False
+        delta = CohortDelta()
+        delta.add_session(
+            (row[1:] for row in _answer_rows([session_id])),
+            session['total_time_taken'],
+        )
+        _apply_delta(summary, delta)
+    return True
+
+
+def rebuild_test_cohort(test_id: int, chunk_size: int = 500) -> int:
+    """
+    Recompute a test's aggregates from all its completed sessions (backfill or repair).
+    Answers are streamed session-chunk by chunk; returns the number of sessions counted.
+    """
+    with transaction.atomic():
+        summary = _locked_summary(test_id)
+        TestQuestionCohortStat.objects.filter(platform_test_id=test_id).delete()
+        TestTopicCohortStat.objects.filter(platform_test_id=test_id).delete()
+        for field in ('sessions', 'max_score', 'score_sum', 'score_sq_sum', 'correct_sum',
+                      'incorrect_sum', 'unanswered_sum', 'time_sum'):
+            setattr(summary, field, 0)
+        summary.score_min = summary.score_max = None
+        summary.score_histogram = {}
+
+        TestSession.objects.filter(platform_test_id=test_id).update(cohort_aggregated_at=None)
+        times = dict(
+            TestSession.objects.filter(platform_test_id=test_id, is_completed=True)
+            .order_by('id').values_list('id', 'total_time_taken')
+        )
+        session_ids = list(times)
+        # Histogram bands depend on max_score, so take it from the whole cohort first
+        delta = CohortDelta()
+        for start in range(0, len(session_ids), chunk_size):
+            chunk = session_ids[start:start + chunk_size]
+            by_session = defaultdict(list)
+            for row in _answer_rows(chunk).iterator(chunk_size=2000):
+                by_session[row[0]].append(row[1:])
+            for session_id in chunk:
+                delta.add_session(by_session.get(session_id, []), times[session_id])
+        summary.max_score = delta.max_score
+        _apply_delta(summary, delta)
+        TestSession.objects.filter(id__in=session_ids).update(cohort_aggregated_at=timezone.now())
+    return len(session_ids)
+
+
+# --- Read side ---
+
+# One rebuild per test in flight; the marker outlives rebuild_test_cohort_task's time_limit
+REBUILD_MARKER_TIMEOUT = 15 * 60
+
+
+def rebuild_marker_key(test_id: int) -> str:
+    return f'cohort:rebuild:{test_id}'
+
+
+def enqueue_cohort_rebuild(test_id: int) -> bool:
+    """
+    Queue a background rebuild of a test's aggregates unless one is already
+    queued or running. Never rebuilds inline: when the broker is down the
+    marker is dropped so a later request can try again.
+
+    Returns:
+        True if a rebuild task was queued by this call
+    """
+    from django.core.cache import cache
+    from neet_app.tasks import rebuild_test_cohort_task
+
+    key = rebuild_marker_key(test_id)
+    if not cache.add(key, timezone.now().isoformat(), timeout=REBUILD_MARKER_TIMEOUT):
+        return False
+    try:
+        rebuild_test_cohort_task.delay(test_id)
+    except Exception as e:
+        cache.delete(key)
+        logger.warning(f"Could not enqueue cohort rebuild for test {test_id}: {e}")
+        return False
+    return True
+
+
+def _std(summary: TestCohortSummary) -> float:
+    if summary.sessions < 2:
+        return 0.0
+    mean = summary.score_sum / summary.sessions
+    return math.sqrt(max(0.0, summary.score_sq_sum / summary.sessions - mean * mean))
+
+
+def question_indices(stat: TestQuestionCohortStat, std: float) -> Dict:
+    """Difficulty index (share correct) and point-biserial discrimination for one question."""
+    attempts = stat.attempts
+    if not attempts:
+        return {'difficulty_index': None, 'discrimination_index': None}
+    p = stat.correct / attempts
+    discrimination = None
+    if std > 0 and 0 < stat.correct < attempts:
+        mean_correct = stat.correct_score_sum / stat.correct
+        mean_other = (stat.score_sum - stat.correct_score_sum) / (attempts - stat.correct)
+        discrimination = round((mean_correct - mean_other) / std * math.sqrt(p * (1 - p)), 3)
+    return {'difficulty_index': round(p, 3), 'discrimination_index': discrimination}
+
+
+def cohort_report(test_id: int) -> Optional[Dict]:
+    """
+    Dashboard payload for a test from the summary tables (three queries).
+    Returns None when no session has been aggregated yet.
+    """
+    from ..utils.topic_taxonomy import get_topic_taxonomy
+
+    summary = TestCohortSummary.objects.filter(platform_test_id=test_id).first()
+    if summary is None or not summary.sessions:
+        return None
+
+    n = summary.sessions
+    std = _std(summary)
+    band_width = 100 // HISTOGRAM_BANDS
+    distribution = [
+        {
+            'band': f'{band * band_width}-{(band + 1) * band_width}%',
+            'count': (summary.score_histogram or {}).get(str(band), 0),
+        }
+        for band in range(HISTOGRAM_BANDS)
+    ]
+
+    questions = []
+    for stat in TestQuestionCohortStat.objects.filter(platform_test_id=test_id).order_by('question_id'):
+        questions.append({
+            'question_id': stat.question_id,
+            'attempts': stat.attempts,
+            'correct': stat.correct,
+            'incorrect': stat.incorrect,
+            'unanswered': stat.unanswered,
+            'avg_time': round(stat.time_sum / stat.attempts, 1) if stat.attempts else 0,
+            **question_indices(stat, std),
+        })
+
+    topic_stats = list(TestTopicCohortStat.objects.filter(platform_test_id=test_id).order_by('topic_id'))
+    taxonomy = get_topic_taxonomy(topic_ids=[stat.topic_id for stat in topic_stats])
+    topics = []
+    for stat in topic_stats:
+        info = taxonomy.get(stat.topic_id)
+        topics.append({
+            'topic_id': stat.topic_id,
+            'topic_name': info.name if info else f'Topic #{stat.topic_id}',
+            'subject': info.subject if info else None,
+            'attempts': stat.attempts,
+            'accuracy': round(stat.correct / stat.attempts * 100, 1) if stat.attempts else 0,
+            'unanswered_rate': round(stat.unanswered / stat.attempts * 100, 1) if stat.attempts else 0,
+            'avg_time': round(stat.time_sum / stat.attempts, 1) if stat.attempts else 0,
+        })
+
+    return {
+        'summary': {
+            'sessions': n,
+            'max_score': summary.max_score,
+            'mean_score': round(summary.score_sum / n, 2),
+            'std_score': round(std, 2),
+            'min_score': summary.score_min,
+            'max_achieved_score': summary.score_max,
+            'avg_correct': round(summary.correct_sum / n, 2),
+            'avg_incorrect': round(summary.incorrect_sum / n, 2),
+            'avg_unanswered': round(summary.unanswered_sum / n, 2),
+            'avg_time': round(summary.time_sum / n, 1),
+            'updated_at': summary.updated_at.isoformat(),
+        },
+        'score_distribution': distribution,
+        'questions': questions,
+        'topics': topics,
+    }
@@ -0,0 +1,133 @@
+"""
+Set-based inactivity reminder campaign.
+
+The inactive cohort is selected in one query: active students with an email,
+annotated with MAX(end_time) of their completed sessions, anti-joined against
+completed sessions newer than the cutoff and against reminders already queued
+for today's run. Rows are streamed from a server-side cursor, rendered, and
+bulk-inserted into the Notification outbox in chunks (the unique dedupe_key
+makes re-runs no-ops).
+
+Sending is rate limited through the outbox itself: each chunk gets a later
+next_attempt_at slot (INACTIVITY_REMINDER_RATE_PER_MINUTE), and one
+deliver_notifications_task is scheduled per slot to drain it in connection-sized
+batches. Slots missed by the broker are drained by the periodic beat delivery.
+"""
+import logging
+import math
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from neet_app.models import Notification, StudentProfile, TestSession
+from neet_app.notifications import (
+    inactivity_dedupe_key, inactivity_dedupe_prefix, inactivity_payload, outbox_row, render_inactivity_reminder
+)
+
+logger = logging.getLogger(__name__)
+
+
+def campaign_chunk_size() -> int:
+    return int(getattr(settings, 'INACTIVITY_REMINDER_CHUNK_SIZE', 500))
+
+
+def campaign_rate_per_minute() -> int:
+    return int(getattr(settings, 'INACTIVITY_REMINDER_RATE_PER_MINUTE', 3000))
+
+
+def inactive_students(days: int = 5, now=None):
+    """
+    Active students with an email and no completed session ending within `days`,
+    not yet reminded today, annotated with last_test_date (None if they never
+    completed a test).
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=days)
+
+    completed = TestSession.objects.filter(student_id=OuterRef('student_id'), is_completed=True)
+    last_test_date = completed.order_by().values('student_id').annotate(last=Max('end_time')).values('last')
+    reminded = Notification.objects.filter(
+        dedupe_key=Concat(Value(inactivity_dedupe_prefix(timezone.localdate(now))), OuterRef('student_id')),
+    )
+
+    return (
+        StudentProfile.objects
+        .filter(is_active=True, email__isnull=False)
+        .exclude(email='')
+        .annotate(last_test_date=Subquery(last_test_date))
+        .filter(~Exists(completed.filter(end_time__gte=cutoff)), ~Exists(reminded))
+        .only('student_id', 'full_name', 'email')
+        .order_by('student_id')
+    )
+
+
+def _schedule_slot_delivery(slot, rows: int):
+    from neet_app.tasks import CELERY_AVAILABLE, deliver_notifications_task
+
+    batch_size = int(getattr(settings, 'NOTIFICATION_BATCH_SIZE', 50))
+
+    def _enqueue():
+        try:
+            if CELERY_AVAILABLE:
+                deliver_notifications_task.apply_async(
+                    kwargs={'max_batches': math.ceil(rows / batch_size)}, eta=slot,
+                )
+        except Exception as e:
+            logger.warning(f'Could not schedule inactivity reminder delivery at {slot}: {e}')
+
+    transaction.on_commit(_enqueue)
+
+
+def queue_inactivity_campaign(days: int = 5, limit: int = 0, now=None,
+                              chunk_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Queue today's inactivity reminders for the whole inactive cohort.
+
+    Returns:
+        Dict with the number of reminders queued, chunks written and the
+        minutes until the last chunk becomes due
+    """
+    now = now or timezone.now()
+    chunk_size = chunk_size or campaign_chunk_size()
+    run_date = timezone.localdate(now)
+    seconds_per_chunk = chunk_size * 60 / max(campaign_rate_per_minute(), 1)
+
+    cohort = inactive_students(days, now)
+    if limit:
+        cohort = cohort[:limit]
+
+    queued = 0
+    chunks = 0
+    rows = []
+
+    def _flush():
+        nonlocal chunks, queued
+        slot = now + timedelta(seconds=chunks * seconds_per_chunk)
+        for row in rows:
+            row.next_attempt_at = slot
+        with transaction.atomic():
+            Notification.objects.bulk_create(rows, ignore_conflicts=True)
+            _schedule_slot_delivery(slot, len(rows))
+        queued += len(rows)
+        chunks += 1
+        rows.clear()
+
+    for student in cohort.iterator(chunk_size=chunk_size):
+        rows.append(outbox_row(
+            'inactivity', student, render_inactivity_reminder(student, student.last_test_date),
+            dedupe_key=inactivity_dedupe_key(student.student_id, run_date),
+            payload=inactivity_payload(student.last_test_date),
+        ))
+        if len(rows) >= chunk_size:
+            _flush()
+    if rows:
+        _flush()
+
+    spread_minutes = round(max(chunks - 1, 0) * seconds_per_chunk / 60, 1)
+    logger.info(f'Queued {queued} inactivity reminders in {chunks} chunks over {spread_minutes} minutes')
+    return {'queued': queued, 'chunks': chunks, 'spread_minutes': spread_minutes}
@@ -0,0 +1,232 @@
+"""
+Token-budgeted payloads for the zone insight LLM prompts.
+
+FOCUS_ZONE_PROMPT, REPEATED_MISTAKES_PROMPT and CHECKPOINT_PROMPT embed
+question data as JSON. fit_topics()/fit_subject_payload() keep that payload
+inside a per-subject token budget:
+
+- questions are ranked misconception-bearing wrong answers first, then other
+  wrong answers, then skipped, then correct (round-robin across topics within
+  each rank), and added until the subject's budget is spent,
+- question text and options are truncated,
+- a stem or option set repeated within the payload is replaced by a reference
+  to the first question that carried it,
+- JSON is encoded without indentation.
+
+Each call logs and counts its estimated prompt tokens (see get_prompt_token_stats).
+"""
+import json
+import logging
+import math
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English/LaTeX question text
+CHARS_PER_TOKEN = 4
+DEFAULT_SUBJECT_TOKEN_BUDGET = 2500
+MAX_QUESTION_CHARS = 400
+MAX_OPTION_CHARS = 120
+TRUNCATION_MARK = '…'
+
+PROMPT_STATS_KEY = 'insight_prompt_tokens:{name}'
+PROMPT_STATS_TTL = 7 * 24 * 60 * 60
+
+RANK_MISCONCEPTION = 0
+RANK_WRONG = 1
+RANK_SKIPPED = 2
+RANK_CORRECT = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return math.ceil(len(text or '') / CHARS_PER_TOKEN)
+
+
+def compact_json(payload) -> str:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+
+
+def subject_token_budget() -> int:
+    return int(getattr(settings, 'INSIGHT_PROMPT_SUBJECT_TOKEN_BUDGET', DEFAULT_SUBJECT_TOKEN_BUDGET))
+
+
+def truncate_text(text: Optional[str], limit: int) -> str:
+    text = ' '.join((text or '').split())
+    if len(text) <= limit:
+        return text
+    return text[:limit - len(TRUNCATION_MARK)].rstrip() + TRUNCATION_MARK
+
+
+def question_rank(question: Dict) -> int:
+    if question.get('is_correct'):
+        return RANK_CORRECT
+    if not question.get('selected_answer'):
+        return RANK_SKIPPED
+    if question.get('misconception'):
+        return RANK_MISCONCEPTION
+    return RANK_WRONG
+
+
+class _SharedText:
+    """Tracks stems/option sets already emitted so repeats become references."""
+
+    def __init__(self):
+        self.stems = {}
+        self.option_sets = {}
+
+    def compact_question(self, question: Dict):
+        """Compacted copy of a question plus the texts to remember() if it is kept."""
+        compacted = dict(question)
+        stem = truncate_text(question.get('question'), MAX_QUESTION_CHARS)
+        compacted['question'] = f"same as Q{self.stems[stem]}" if stem in self.stems else stem
+
+        signature = None
+        options = question.get('options')
+        if isinstance(options, dict):
+            options = {key: truncate_text(value, MAX_OPTION_CHARS) for key, value in options.items()}
+            signature = compact_json(options)
+            compacted['options'] = (
+                f"same as Q{self.option_sets[signature]}" if signature in self.option_sets else options
+            )
+        return compacted, (stem, signature)
+
+    def remember(self, question_id, texts) -> None:
+        stem, signature = texts
+        if stem:
+            self.stems.setdefault(stem, question_id)
+        if signature:
+            self.option_sets.setdefault(signature, question_id)
+
+
+def _question_slots(topic: Dict) -> Iterable:
+    """(container path, question) pairs; repeated-mistake topics nest questions under tests."""
+    if 'tests' in topic:
+        for test_index, test in enumerate(topic.get('tests') or []):
+            for question in test.get('questions') or []:
+                yield test_index, question
+    else:
+        for question in topic.get('questions') or []:
+            yield None, question
+
+
+def fit_topics(topics: List[Dict], budget: int, shared: Optional[_SharedText] = None) -> List[Dict]:
+    """
+    Select and compact questions from a subject's topics within a token budget.
+    Topic/test order and metadata are preserved; containers left without questions are dropped.
+    """
+    shared = shared or _SharedText()
+
+    candidates = []
+    for topic_index, topic in enumerate(topics):
+        for position, (test_index, question) in enumerate(_question_slots(topic)):
+            candidates.append((question_rank(question), position, topic_index, test_index, question))
+    # Stable ordering: rank, then round-robin across topics, then original order
+    candidates.sort(key=lambda c: (c[0], c[1], c[2]))
+
+    spent = 0
+    chosen = {}
+    headers_spent = set()
+    for rank, position, topic_index, test_index, question in candidates:
+        compacted, texts = shared.compact_question(question)
+        cost = estimate_tokens(compact_json(compacted))
+        header = (topic_index, test_index)
+        if header not in headers_spent:
+            cost += _header_cost(topics[topic_index], test_index)
+        if spent + cost > budget and chosen:
+            continue
+        spent += cost
+        shared.remember(question.get('question_id'), texts)
+        headers_spent.add(header)
+        chosen.setdefault(header, []).append((position, compacted))
+
+    fitted = []
+    for topic_index, topic in enumerate(topics):
+        if 'tests' in topic:
+            tests = []
+            for test_index, test in enumerate(topic.get('tests') or []):
+                questions = chosen.get((topic_index, test_index))
+                if questions:
+                    tests.append({**test, 'questions': [q for _, q in sorted(questions, key=lambda x: x[0])]})
+            if tests:
+                fitted.append({**topic, 'tests': tests})
+        else:
+            questions = chosen.get((topic_index, None))
+            if questions:
+                fitted.append({**topic, 'questions': [q for _, q in sorted(questions, key=lambda x: x[0])]})
+    return fitted
+
+
+def _header_cost(topic: Dict, test_index: Optional[int]) -> int:
+    header = {key: value for key, value in topic.items() if key not in ('questions', 'tests')}
+    if test_index is not None:
+        test = topic['tests'][test_index]
+        header['test'] = {key: value for key, value in test.items() if key != 'questions'}
+    return estimate_tokens(compact_json(header))
+
+
+def fit_subject_payload(subject_data: Dict[str, Dict], budget: Optional[int] = None) -> Dict[str, Dict]:
+    """Budget a {subject: {'topics': [...]}} payload, each subject getting its own budget."""
+    budget = budget or subject_token_budget()
+    shared = _SharedText()
+    fitted = {}
+    for subject, data in subject_data.items():
+        topics = fit_topics((data or {}).get('topics') or [], budget, shared)
+        if topics:
+            fitted[subject] = {**data, 'topics': topics}
+    return fitted
+
+
+PROMPT_STAT_FIELDS = ('calls', 'tokens', 'max_tokens')
+
+
+def _prompt_stat_key(name: str, field: str) -> str:
+    return f"{PROMPT_STATS_KEY.format(name=name)}:{field}"
+
+
+def record_prompt_tokens(name: str, tokens: int) -> None:
+    """
+    Aggregate per-prompt token counts (calls/total/max) in the cache; best effort.
+    calls and tokens are separate counters bumped with atomic incr (INCRBY on
+    Redis) so concurrent workers do not lose updates; the running max is a plain
+    compare-and-set and may miss a concurrent larger value.
+    """
+    try:
+        for field, delta in (('calls', 1), ('tokens', tokens)):
+            key = _prompt_stat_key(name, field)
+            cache.add(key, 0, PROMPT_STATS_TTL)
+            cache.incr(key, delta)
+        max_key = _prompt_stat_key(name, 'max_tokens')
+        if tokens > (cache.get(max_key) or 0):
+            cache.set(max_key, tokens, PROMPT_STATS_TTL)
+    except Exception as e:
+        logger.debug(f"Could not record prompt token stats for {name}: {e}")
+
+
+def get_prompt_token_stats(name: str) -> Dict:
+    found = cache.get_many([_prompt_stat_key(name, field) for field in PROMPT_STAT_FIELDS])
+    return {field: found.get(_prompt_stat_key(name, field)) or 0 for field in PROMPT_STAT_FIELDS}
+
+
+def build_insight_prompt(name: str, template: str, payload_key: str, payload, **format_kwargs) -> str:
+    """
+    Format an insight prompt with a compact JSON payload and record its token estimate.
+
+    Args:
+        name: Prompt name used for logs/metrics (e.g. 'focus_zone')
+        template: Prompt template
+        payload_key: Template placeholder receiving the JSON
+        payload: Already budgeted payload
+    """
+    payload_json = compact_json(payload)
+    prompt = template.format(**{payload_key: payload_json}, **format_kwargs)
+    prompt_tokens = estimate_tokens(prompt)
+    record_prompt_tokens(name, prompt_tokens)
+    logger.info(
+        f"Insight prompt {name}: ~{prompt_tokens} tokens (payload ~{estimate_tokens(payload_json)})",
+        extra={'prompt_name': name, 'prompt_tokens': prompt_tokens},
+    )
+    return prompt
@@ -0,0 +1,205 @@
+"""
+Live test-session presence backed by Redis sorted sets.
+
+Heartbeats are recorded as scores (unix seconds) in sorted sets instead of
+writing TestSession rows on every ping:
+
+    presence:sessions          session_id -> last heartbeat
+    presence:students          student_id -> last heartbeat
+    presence:test:<test_key>   session_id -> last heartbeat, per platform test ('custom' for custom tests)
+    presence:tests             test_key   -> last heartbeat (index of tests with live sessions)
+
+Admin live metrics are ZCOUNTs over these sets (O(log n)). The latest
+heartbeat per session is bulk-persisted to TestSession.last_heartbeat by
+persist_heartbeats_task; entries past PRESENCE_RETENTION_SECONDS are pruned
+on each run. When Redis is unavailable, callers fall back to the database.
+"""
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from neet_app.models import TestSession
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_KEY = 'presence:sessions'
+STUDENTS_KEY = 'presence:students'
+TESTS_INDEX_KEY = 'presence:tests'
+TEST_KEY = 'presence:test:{test_key}'
+PERSISTED_WATERMARK_KEY = 'presence:persisted_at'
+
+CUSTOM_TEST_KEY = 'custom'
+PRESENCE_RETENTION_SECONDS = 60 * 60
+PERSIST_BATCH_SIZE = 500
+
+
+def presence_enabled() -> bool:
+    return getattr(settings, 'LIVE_PRESENCE_REDIS_ENABLED', False)
+
+
+def heartbeat_window_seconds() -> int:
+    return getattr(settings, 'PLATFORM_ADMIN_HEARTBEAT_SECONDS', 90)
+
+
+def session_test_key(session) -> str:
+    """Presence dimension for a session: platform test id, or 'custom'/'pyq' etc. by test type."""
+    if getattr(session, 'platform_test_id', None):
+        return str(session.platform_test_id)
+    return getattr(session, 'test_type', None) or CUSTOM_TEST_KEY
+
+
+def _client():
+    from neet_app.utils.redis_client import get_redis
+    return get_redis()
+
+
+def record_heartbeat(session, now: Optional[float] = None) -> bool:
+    """
+    Record a heartbeat for a session in Redis.
+    Returns False when Redis is unavailable so the caller can write the row instead.
+    A late ping for a submitted or quit session is dropped so its cleared presence stays cleared.
+    """
+    if getattr(session, 'is_completed', False):
+        return True
+    now = now if now is not None else time.time()
+    test_key = session_test_key(session)
+    try:
+        pipe = _client().pipeline(transaction=False)
+        # GT: a delayed ping never moves a score backwards
+        pipe.zadd(SESSIONS_KEY, {session.id: now}, gt=True)
+        if session.student_id:
+            pipe.zadd(STUDENTS_KEY, {session.student_id: now}, gt=True)
+        pipe.zadd(TEST_KEY.format(test_key=test_key), {session.id: now}, gt=True)
+        pipe.zadd(TESTS_INDEX_KEY, {test_key: now}, gt=True)
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Presence heartbeat for session {session.id} not recorded in Redis: {e}")
+        return False
+
+
+def clear_session_presence(session) -> None:
+    """
+    Drop a finished (submitted or quit) session from the live sets (best effort).
+    The student stays in presence:students only while another of their open
+    sessions has a heartbeat, carrying that session's latest score.
+    """
+    try:
+        client = _client()
+        other_ids = list(
+            TestSession.objects.filter(student_id=session.student_id, is_completed=False)
+            .exclude(id=session.id).values_list('id', flat=True)
+        ) if session.student_id else []
+        latest = None
+        if other_ids:
+            pipe = client.pipeline(transaction=False)
+            for other_id in other_ids:
+                pipe.zscore(SESSIONS_KEY, other_id)
+            latest = max((score for score in pipe.execute() if score is not None), default=None)
+
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(SESSIONS_KEY, session.id)
+        pipe.zrem(TEST_KEY.format(test_key=session_test_key(session)), session.id)
+        if session.student_id:
+            pipe.zrem(STUDENTS_KEY, session.student_id)
+            if latest is not None:
+                pipe.zadd(STUDENTS_KEY, {session.student_id: latest})
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not clear presence for session {session.id}: {e}")
+
+
+def get_live_counts(now: Optional[float] = None) -> Dict:
+    """
+    Live metrics from Redis:
+        {'taking_count', 'concurrent_count', 'active_custom_sessions', 'live_tests': {test_key: count}}
+    Raises on Redis errors; callers fall back to database queries.
+    """
+    now = now if now is not None else time.time()
+    threshold = now - heartbeat_window_seconds()
+    client = _client()
+
+    pipe = client.pipeline(transaction=False)
+    pipe.zcount(SESSIONS_KEY, threshold, '+inf')
+    pipe.zcount(STUDENTS_KEY, threshold, '+inf')
+    pipe.zrangebyscore(TESTS_INDEX_KEY, threshold, '+inf')
+    taking_count, concurrent_count, live_test_keys = pipe.execute()
+
+    live_tests = {}
+    if live_test_keys:
+        pipe = client.pipeline(transaction=False)
+        for test_key in live_test_keys:
+            pipe.zcount(TEST_KEY.format(test_key=test_key), threshold, '+inf')
+        live_tests = {
+            test_key: count
+            for test_key, count in zip(live_test_keys, pipe.execute())
+            if count
+        }
+
+    return {
+        'taking_count': taking_count,
+        'concurrent_count': concurrent_count,
+        'active_custom_sessions': live_tests.get(CUSTOM_TEST_KEY, 0),
+        'live_tests': live_tests,
+    }
+
+
+def get_live_counts_from_db(now=None) -> Dict:
+    """Database fallback for get_live_counts (used when Redis is unavailable)."""
+    now = now or timezone.now()
+    threshold = now - timedelta(seconds=heartbeat_window_seconds())
+    live = TestSession.objects.filter(is_active=True, last_heartbeat__gte=threshold, student_id__isnull=False)
+    return {
+        'taking_count': live.count(),
+        'concurrent_count': live.values('student_id').distinct().count(),
+        'active_custom_sessions': TestSession.objects.filter(
+            test_type='custom', is_active=True, last_heartbeat__gte=threshold
+        ).count(),
+        'live_tests': {},
+    }
+
+
+def persist_heartbeats(now: Optional[float] = None) -> int:
+    """
+    Bulk-write heartbeats received since the last run to TestSession.last_heartbeat
+    (one UPDATE per PERSIST_BATCH_SIZE sessions) and prune expired presence entries.
+
+    Returns:
+        Number of sessions persisted
+    """
+    now = now if now is not None else time.time()
+    client = _client()
+    since = float(client.get(PERSISTED_WATERMARK_KEY) or 0)
+    entries = client.zrangebyscore(SESSIONS_KEY, f'({since}', now, withscores=True)
+
+    persisted = 0
+    for start in range(0, len(entries), PERSIST_BATCH_SIZE):
+        chunk = entries[start:start + PERSIST_BATCH_SIZE]
+        beats = {
+            int(session_id): datetime.fromtimestamp(score, tz=dt_timezone.utc)
+            for session_id, score in chunk
+        }
+        # A session completed since its last heartbeat must not be revived
+        persisted += TestSession.objects.filter(id__in=list(beats), is_completed=False).update(
+            last_heartbeat=Case(
+                *[When(id=session_id, then=Value(beat)) for session_id, beat in beats.items()],
+                output_field=DateTimeField(),
+            ),
+            is_active=True,
+        )
+
+    cutoff = now - PRESENCE_RETENTION_SECONDS
+    pipe = client.pipeline(transaction=False)
+    pipe.set(PERSISTED_WATERMARK_KEY, now)
+    pipe.zremrangebyscore(SESSIONS_KEY, '-inf', cutoff)
+    pipe.zremrangebyscore(STUDENTS_KEY, '-inf', cutoff)
+    for test_key in client.zrangebyscore(TESTS_INDEX_KEY, '-inf', '+inf'):
+        pipe.zremrangebyscore(TEST_KEY.format(test_key=test_key), '-inf', cutoff)
+    pipe.zremrangebyscore(TESTS_INDEX_KEY, '-inf', cutoff)
+    pipe.execute()
+    return persisted
@@ -1,14 +1,27 @@
 """
 Misconception generation service using Gemini AI.
 Analyzes MCQ questions to identify common misconceptions for each wrong option.
+Questions sharing content (see utils/question_fingerprint.py) reuse stored
+misconceptions instead of being sent to the LLM again.
+
+Generation runs as a MisconceptionJob split into per-subject MisconceptionBatch
+rows. Batches are dispatched as Celery tasks with bounded parallelism (spread
+across the Gemini key pool), persist their results as they finish, and failed
+batches can be resumed without repeating completed ones.
 """
 
 import logging
 import json
 import re
-from typing import List, Dict, Any
+from collections import defaultdict
+from datetime import timedelta
+from typing import List, Dict, Any, Optional
+from django.conf import settings
 from django.db import transaction
-from neet_app.models import Question, PlatformTest
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from neet_app.models import MisconceptionBatch, MisconceptionJob, Question, PlatformTest
+from neet_app.utils.question_fingerprint import FINGERPRINT_FIELDS
 from neet_app.services.ai.gemini_client import GeminiClient
 
 logger = logging.getLogger(__name__)
@@ -126,11 +139,438 @@ def parse_llm_response(llm_response: str) -> List[Dict[str, Any]]:
         return []
 
 
+def _normalized_answer(answer) -> str:
+    return str(answer or '').strip().upper()
+
+
+def _usable_misconceptions(value) -> bool:
+    return isinstance(value, dict) and any(value.values())
+
+
+def ensure_fingerprints(questions: List[Question]) -> List[Question]:
+    """
+    Fill content_fingerprint on questions saved before it existed.
+    Image columns are only loaded for those questions. Returns the questions updated.
+    """
+    missing = [q for q in questions if not q.content_fingerprint]
+    if not missing:
+        return []
+    fingerprints = {
+        row.id: row.compute_content_fingerprint()
+        for row in Question.objects.filter(id__in=[q.id for q in missing]).only('id', *FINGERPRINT_FIELDS)
+    }
+    for q in missing:
+        q.content_fingerprint = fingerprints.get(q.id)
+    return missing
+
+
+def find_known_misconceptions(questions: List[Question]) -> Dict[int, Dict]:
+    """
+    Misconceptions already stored for the same content elsewhere (any test or institution).
+    A donor must share the fingerprint and the correct answer.
+
+    Returns:
+        {question_id: misconceptions} for questions that can be filled by copying
+    """
+    by_fingerprint = defaultdict(list)
+    for q in questions:
+        if q.content_fingerprint:
+            by_fingerprint[q.content_fingerprint].append(q)
+    if not by_fingerprint:
+        return {}
+
+    donors = defaultdict(dict)
+    rows = (
+        Question.objects.filter(content_fingerprint__in=list(by_fingerprint), misconceptions__isnull=False)
+        .exclude(id__in=[q.id for q in questions])
+        .order_by('id')
+        .values_list('content_fingerprint', 'correct_answer', 'misconceptions')
+    )
+    for fingerprint, correct_answer, misconceptions in rows:
+        if _usable_misconceptions(misconceptions):
+            donors[fingerprint].setdefault(_normalized_answer(correct_answer), misconceptions)
+
+    known = {}
+    for fingerprint, group in by_fingerprint.items():
+        for q in group:
+            misconceptions = donors.get(fingerprint, {}).get(_normalized_answer(q.correct_answer))
+            if misconceptions:
+                known[q.id] = misconceptions
+    return known
+
+
+def _empty_stats(**extra) -> Dict[str, Any]:
+    stats = {
+        'success': True,
+        'total_questions': 0,
+        'processed': 0,
+        'failed': 0,
+        'reused': 0,
+        'generated': 0,
+        'subjects_processed': []
+    }
+    stats.update(extra)
+    return stats
+
+
+def _test_questions(test: PlatformTest) -> List[Question]:
+    """MCQ questions of an institution test (NVT excluded); image/explanation columns are not needed."""
+    return list(
+        Question.objects.filter(
+            institution=test.institution,
+            institution_test_name=test.test_name,
+            exam_type=test.exam_type
+        ).exclude(
+            question_type__iexact='NVT'
+        ).select_related('topic').defer(
+            'explanation', 'explanation_image', 'question_image',
+            'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image',
+        ).order_by('id')
+    )
+
+
+def max_parallel_batches() -> int:
+    """Concurrent batches per job: bounded by the setting and the size of the Gemini key pool."""
+    limit = int(getattr(settings, 'MISCONCEPTION_MAX_PARALLEL_BATCHES', 4))
+    key_count = len(getattr(settings, 'GEMINI_API_KEYS', None) or []) or 1
+    return max(1, min(limit, key_count))
+
+
 @transaction.atomic
+def plan_misconception_job(test: PlatformTest, batch_size: int = 20) -> MisconceptionJob:
+    """
+    Create a job for a test: keep already-analysed questions, copy misconceptions
+    known for the same fingerprint and correct answer, then split the remaining
+    distinct questions into per-subject batches of at most batch_size.
+    """
+    batch_size = max(1, batch_size or 20)
+    questions = _test_questions(test)
+
+    fingerprinted = ensure_fingerprints(questions)
+    if fingerprinted:
+        Question.objects.bulk_update(fingerprinted, ['content_fingerprint'], batch_size=500)
+
+    pending = [q for q in questions if not _usable_misconceptions(q.misconceptions)]
+    already_done = len(questions) - len(pending)
+
+    # Copy misconceptions known from other tests/institutions
+    known = find_known_misconceptions(pending)
+    copied = [q for q in pending if q.id in known]
+    for q in copied:
+        q.misconceptions = known[q.id]
+    if copied:
+        Question.objects.bulk_update(copied, ['misconceptions'], batch_size=500)
+    pending = [q for q in pending if q.id not in known]
+
+    # Group by subject; duplicates within the test share one generation
+    questions_by_subject = {}
+    siblings = {}
+    for q in pending:
+        key = (q.content_fingerprint or f'id:{q.id}', _normalized_answer(q.correct_answer))
+        if key in siblings:
+            siblings[key].append(q.id)
+            continue
+        siblings[key] = [q.id]
+        questions_by_subject.setdefault(q.topic.subject, []).append(q)
+    siblings_by_id = {ids[0]: ids for ids in siblings.values()}
+
+    job = MisconceptionJob.objects.create(
+        platform_test=test,
+        batch_size=batch_size,
+        total_questions=len(questions),
+        reused_questions=already_done + len(copied),
+    )
+    batches = []
+    for subject, subject_questions in questions_by_subject.items():
+        for start in range(0, len(subject_questions), batch_size):
+            chunk = subject_questions[start:start + batch_size]
+            batches.append(MisconceptionBatch(
+                job=job,
+                subject=subject,
+                sequence=len(batches),
+                question_ids=[q.id for q in chunk],
+                sibling_ids={str(q.id): siblings_by_id[q.id] for q in chunk},
+            ))
+    MisconceptionBatch.objects.bulk_create(batches)
+
+    logger.info(
+        f"Misconception job {job.id} for test {test.id}: {already_done} questions already analysed, "
+        f"{len(copied)} copied, {len(pending)} pending in {len(batches)} batches"
+    )
+    if not batches:
+        _finalize_job(job.id)
+    return job
+
+
+def run_misconception_batch(batch_id: int, gemini_client: Optional[GeminiClient] = None) -> bool:
+    """
+    Process one batch: claim it, send its questions to Gemini and bulk_update the
+    results (including in-test duplicates). The batch ends 'completed' when every
+    question got misconceptions, otherwise 'failed' so it can be resumed.
+
+    Returns:
+        False if the batch was not claimable (already processed or taken)
+    """
+    now = timezone.now()
+    claimed = MisconceptionBatch.objects.filter(id=batch_id, status__in=['pending', 'queued']).update(
+        status='running', attempts=F('attempts') + 1, started_at=now, error=None, updated_at=now
+    )
+    if not claimed:
+        return False
+    batch = MisconceptionBatch.objects.get(id=batch_id)
+
+    processed = 0
+    failed = batch.question_count
+    error = None
+    try:
+        questions = list(
+            Question.objects.filter(id__in=batch.question_ids).select_related('topic')
+            .only('id', 'question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer',
+                  'topic__name', 'topic__subject')
+            .order_by('id')
+        )
+        if gemini_client is None:
+            gemini_client = GeminiClient()
+            # Spread concurrent batches across the key pool
+            gemini_client.use_api_key(batch.sequence)
+        if not gemini_client.is_available():
+            raise RuntimeError('Gemini client not available')
+        # Override model to gemini-2.5-flash
+        gemini_client.model_name = 'gemini-2.5-flash'
+
+        logger.info(f"Sending {len(questions)} questions to Gemini for subject: {batch.subject} (batch {batch.id})")
+        llm_response = gemini_client.generate_response(
+            MISCONCEPTION_PROMPT.format(questions_data=build_questions_payload(questions))
+        )
+        if not llm_response:
+            raise RuntimeError('Empty response from Gemini')
+
+        results = parse_llm_response(llm_response)
+        if not results:
+            raise RuntimeError('Could not parse Gemini response')
+
+        # Map results back to questions using question_id
+        results_map = {}
+        for r in results:
+            if 'question_id' in r and 'misconceptions' in r:
+                try:
+                    results_map[int(r['question_id'])] = r['misconceptions']
+                except (TypeError, ValueError):
+                    continue
+
+        updated = []
+        missing = []
+        for question_id in batch.question_ids:
+            misconceptions = results_map.get(question_id)
+            if not misconceptions:
+                missing.append(question_id)
+                continue
+            for sibling_id in batch.sibling_ids.get(str(question_id), [question_id]):
+                updated.append(Question(id=sibling_id, misconceptions=misconceptions))
+
+        if updated:
+            Question.objects.bulk_update(updated, ['misconceptions'])
+        processed = len(updated)
+        failed = sum(len(batch.sibling_ids.get(str(qid), [qid])) for qid in missing)
+        if missing:
+            error = f"No misconceptions returned for questions {missing}"
+            logger.warning(f"Batch {batch.id}: {error}")
+    except Exception as e:
+        logger.exception(f"Error processing misconception batch {batch.id} ({batch.subject}): {e}")
+        error = str(e)
+
+    now = timezone.now()
+    MisconceptionBatch.objects.filter(id=batch.id).update(
+        status='failed' if error else 'completed',
+        processed_count=processed,
+        failed_count=failed,
+        error=error,
+        finished_at=now,
+        updated_at=now,
+    )
+    return True
+
+
+def _finalize_job(job_id: int) -> Optional[str]:
+    """
+    Close the job once no batch is outstanding and mirror the outcome on the
+    test's misconception_generation_status. Returns the final status, if closed.
+    """
+    statuses = set(MisconceptionBatch.objects.filter(job_id=job_id).values_list('status', flat=True))
+    if statuses & {'pending', 'queued', 'running'}:
+        return None
+
+    final_status = 'partial' if 'failed' in statuses else 'completed'
+    now = timezone.now()
+    closed = MisconceptionJob.objects.filter(id=job_id, status='running').update(
+        status=final_status, finished_at=now, updated_at=now
+    )
+    if closed:
+        job = MisconceptionJob.objects.select_related('platform_test').get(id=job_id)
+        test = job.platform_test
+        if final_status == 'completed':
+            test.misconception_generation_status = 'completed'
+            test.misconception_generated_at = now
+            test.save(update_fields=['misconception_generation_status', 'misconception_generated_at', 'updated_at'])
+        else:
+            test.misconception_generation_status = 'failed'
+            test.save(update_fields=['misconception_generation_status', 'updated_at'])
+    return final_status
+
+
+def dispatch_misconception_batches(job_id: int) -> int:
+    """
+    Queue pending batches up to the parallelism limit (counting batches already
+    queued or running). Each finished batch calls this again, so at most
+    max_parallel_batches() requests are in flight per job; the job row is locked
+    while counting and marking, so concurrent dispatchers cannot both fill the
+    free slots. Falls back to processing inline when the Celery broker is unavailable.
+
+    Returns:
+        Number of batches queued by this call
+    """
+    from ..tasks import process_misconception_batch_task
+
+    queued = 0
+    while True:
+        with transaction.atomic():
+            MisconceptionJob.objects.select_for_update().filter(id=job_id).first()
+            in_flight = MisconceptionBatch.objects.filter(job_id=job_id, status__in=['queued', 'running']).count()
+            slots = max_parallel_batches() - in_flight
+            batch_ids = list(
+                MisconceptionBatch.objects.filter(job_id=job_id, status='pending')
+                .order_by('sequence').values_list('id', flat=True)[:max(slots, 0)]
+            )
+            MisconceptionBatch.objects.filter(id__in=batch_ids).update(status='queued', updated_at=timezone.now())
+        if not batch_ids:
+            break
+
+        ran_inline = False
+        for batch_id in batch_ids:
+            queued += 1
+            try:
+                process_misconception_batch_task.delay(batch_id)
+            except Exception as e:
+                logger.warning(f"Celery unavailable ({e}), processing misconception batch {batch_id} inline")
+                run_misconception_batch(batch_id)
+                ran_inline = True
+        # Inline runs free their slots again; queued tasks re-dispatch when they finish
+        if not ran_inline:
+            break
+
+    _finalize_job(job_id)
+    return queued
+
+
+def start_misconception_job(test_id: int, batch_size: int = 20) -> MisconceptionJob:
+    """Plan a job for a test and start dispatching its batches."""
+    test = PlatformTest.objects.get(id=test_id)
+    test.misconception_generation_status = 'processing'
+    test.save(update_fields=['misconception_generation_status', 'updated_at'])
+    job = plan_misconception_job(test, batch_size)
+    dispatch_misconception_batches(job.id)
+    return job
+
+
+def latest_misconception_job(test_id: int) -> Optional[MisconceptionJob]:
+    return MisconceptionJob.objects.filter(platform_test_id=test_id).order_by('-created_at', '-id').first()
+
+
+def resume_misconception_job(test_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Retry only the failed batches of the test's latest job (batches stuck in
+    queued/running for longer than MISCONCEPTION_STALE_BATCH_SECONDS count as failed).
+
+    Returns:
+        {'job_id', 'retried'} or None when the test has no job
+    """
+    job = latest_misconception_job(test_id)
+    if job is None:
+        return None
+
+    stale_before = timezone.now() - timedelta(
+        seconds=int(getattr(settings, 'MISCONCEPTION_STALE_BATCH_SECONDS', 15 * 60))
+    )
+    with transaction.atomic():
+        retried = MisconceptionBatch.objects.filter(job=job).filter(
+            Q(status='failed') | Q(status__in=['queued', 'running'], updated_at__lt=stale_before)
+        ).update(status='pending', error=None, updated_at=timezone.now())
+        if retried:
+            MisconceptionJob.objects.filter(id=job.id).update(status='running', finished_at=None)
+            PlatformTest.objects.filter(id=test_id).update(misconception_generation_status='processing')
+
+    if retried:
+        dispatch_misconception_batches(job.id)
+    return {'job_id': job.id, 'retried': retried}
+
+
+def misconception_job_progress(test_id: int) -> Optional[Dict[str, Any]]:
+    """Per-subject batch/question progress of the test's latest job (one aggregate query)."""
+    job = latest_misconception_job(test_id)
+    if job is None:
+        return None
+
+    subjects = {}
+    rows = MisconceptionBatch.objects.filter(job=job).values(
+        'subject', 'status', 'question_ids', 'sibling_ids', 'processed_count', 'failed_count'
+    )
+    for row in rows:
+        entry = subjects.setdefault(row['subject'], {
+            'batches': 0, 'completed_batches': 0, 'failed_batches': 0, 'in_progress_batches': 0,
+            'questions': 0, 'processed': 0, 'failed': 0,
+        })
+        entry['batches'] += 1
+        if row['status'] == 'completed':
+            entry['completed_batches'] += 1
+        elif row['status'] == 'failed':
+            entry['failed_batches'] += 1
+        else:
+            entry['in_progress_batches'] += 1
+        entry['questions'] += sum(
+            len(row['sibling_ids'].get(str(qid), [qid])) for qid in row['question_ids']
+        )
+        entry['processed'] += row['processed_count']
+        entry['failed'] += row['failed_count']
+
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'total_questions': job.total_questions,
+        'reused_questions': job.reused_questions,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'subjects': subjects,
+    }
+
+
+def job_stats(job: MisconceptionJob) -> Dict[str, Any]:
+    """generate_misconceptions_for_test-style statistics for a job (so far, if still running)."""
+    totals = MisconceptionBatch.objects.filter(job=job).aggregate(
+        processed=Sum('processed_count'), failed=Sum('failed_count')
+    )
+    subjects = list(
+        MisconceptionBatch.objects.filter(job=job).order_by('sequence')
+        .values_list('subject', flat=True)
+    )
+    generated = totals['processed'] or 0
+    return _empty_stats(
+        job_id=job.id,
+        total_questions=job.total_questions,
+        processed=job.reused_questions + generated,
+        failed=totals['failed'] or 0,
+        reused=job.reused_questions,
+        generated=generated,
+        subjects_processed=list(dict.fromkeys(subjects)),
+    )
+
+
 def generate_misconceptions_for_test(test_id: int, batch_size: int = 20) -> Dict[str, Any]:
     """
-    Generate misconceptions for all MCQ questions in a test.
-    Questions are grouped by subject and processed in batches.
+    Generate misconceptions for all MCQ questions in a test, synchronously.
+
+    Plans a MisconceptionJob (reuse by fingerprint, per-subject batches of at most
+    batch_size distinct questions) and processes its batches one after another in
+    this process. start_misconception_job() is the concurrent, resumable variant.
     
     Args:
         test_id: PlatformTest ID
@@ -142,6 +582,8 @@ def generate_misconceptions_for_test(test_id: int, batch_size: int = 20) -> Dict
             'total_questions': int,
             'processed': int,
             'failed': int,
+            'reused': int,
+            'generated': int,
             'subjects_processed': list
         }
     """
@@ -150,124 +592,30 @@ def generate_misconceptions_for_test(test_id: int, batch_size: int = 20) -> Dict
         test = PlatformTest.objects.get(id=test_id)
         
         logger.info(f"Starting misconception generation for test {test_id}: {test.test_name}")
-        
-        # Get all MCQ questions for this test (exclude NVT)
-        questions = Question.objects.filter(
-            institution=test.institution,
-            institution_test_name=test.test_name,
-            exam_type=test.exam_type
-        ).exclude(
-            question_type__iexact='NVT'
-        ).select_related('topic')
-        
-        if not questions.exists():
-            logger.info(f"No MCQ questions found for test {test_id}")
-            return {
-                'success': True,
-                'total_questions': 0,
-                'processed': 0,
-                'failed': 0,
-                'subjects_processed': []
-            }
-        
-        # Group questions by subject
-        questions_by_subject = {}
-        for q in questions:
-            subject = q.topic.subject
-            if subject not in questions_by_subject:
-                questions_by_subject[subject] = []
-            questions_by_subject[subject].append(q)
-        
-        # Initialize Gemini client with specific model
-        gemini_client = GeminiClient()
-        if not gemini_client.is_available():
-            logger.error("Gemini client not available for misconception generation")
-            return {
-                'success': False,
-                'total_questions': questions.count(),
-                'processed': 0,
-                'failed': questions.count(),
-                'error': 'Gemini client not available',
-                'subjects_processed': []
-            }
-        
-        # Override model to gemini-2.5-flash
-        gemini_client.model_name = 'gemini-2.5-flash'
-        
-        total_processed = 0
-        total_failed = 0
-        subjects_processed = []
-        
-        # Process each subject — send one request per subject (no inner batching)
-        for subject, subject_questions in questions_by_subject.items():
-            logger.info(f"Processing {len(subject_questions)} questions for subject: {subject}")
-            subjects_processed.append(subject)
-
-            try:
-                # Build payload for the entire subject
-                questions_data = build_questions_payload(subject_questions)
-                prompt = MISCONCEPTION_PROMPT.format(questions_data=questions_data)
-
-                # Call LLM once per subject
-                logger.info(f"Sending {len(subject_questions)} questions to Gemini for subject: {subject}")
-                llm_response = gemini_client.generate_response(prompt)
 
-                if not llm_response:
-                    logger.error(f"Empty response from Gemini for subject {subject}")
-                    total_failed += len(subject_questions)
-                    continue
-
-                # Parse response
-                results = parse_llm_response(llm_response)
-
-                if not results:
-                    logger.error(f"Failed to parse LLM response for subject {subject}")
-                    total_failed += len(subject_questions)
-                    continue
+        job = plan_misconception_job(test, batch_size)
+        batch_ids = list(job.batches.order_by('sequence').values_list('id', flat=True))
+        if batch_ids:
+            gemini_client = GeminiClient()
+            if not gemini_client.is_available():
+                logger.error("Gemini client not available for misconception generation")
+                job.batches.update(status='failed', error='Gemini client not available')
+                _finalize_job(job.id)
+                return job_stats(job) | {
+                    'success': False,
+                    'failed': job.total_questions - job.reused_questions,
+                    'error': 'Gemini client not available',
+                    'subjects_processed': [],
+                }
+            for batch_id in batch_ids:
+                run_misconception_batch(batch_id, gemini_client)
+            _finalize_job(job.id)
 
-                # Map results back to questions using question_id
-                results_map = {r['question_id']: r['misconceptions'] for r in results if 'question_id' in r and 'misconceptions' in r}
-
-                # Update questions for this subject
-                for question in subject_questions:
-                    if question.id in results_map:
-                        question.misconceptions = results_map[question.id]
-                        question.save(update_fields=['misconceptions'])
-                        total_processed += 1
-                        logger.debug(f"Updated misconceptions for question {question.id}")
-                    else:
-                        logger.warning(f"No misconceptions returned for question {question.id}")
-                        total_failed += 1
-
-            except Exception as e:
-                logger.exception(f"Error processing subject {subject}: {e}")
-                total_failed += len(subject_questions)
-        
-        return {
-            'success': True,
-            'total_questions': questions.count(),
-            'processed': total_processed,
-            'failed': total_failed,
-            'subjects_processed': subjects_processed
-        }
+        return job_stats(job)
         
     except PlatformTest.DoesNotExist:
         logger.error(f"Test {test_id} not found")
-        return {
-            'success': False,
-            'error': f'Test {test_id} not found',
-            'total_questions': 0,
-            'processed': 0,
-            'failed': 0,
-            'subjects_processed': []
-        }
+        return _empty_stats(success=False, error=f'Test {test_id} not found')
     except Exception as e:
         logger.exception(f"Unexpected error in generate_misconceptions_for_test: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'total_questions': 0,
-            'processed': 0,
-            'failed': 0,
-            'subjects_processed': []
-        }
+        return _empty_stats(success=False, error=str(e))
@@ -0,0 +1,240 @@
+"""
+Per-student mistake ledger feeding repeated-mistake generation.
+
+Each completed platform test appends its wrong answers (question, topic,
+subject, misconception, test, time) once. The ledger is compacted after every
+append, deterministically (newest first, ties by id):
+
+- entries older than LEDGER_MAX_AGE_DAYS are dropped,
+- at most LEDGER_MAX_PER_TOPIC entries are kept per topic, so one noisy
+  topic cannot crowd out the rest,
+- at most LEDGER_MAX_ENTRIES entries are kept per student.
+
+build_repeated_mistakes_corpus() reads the student's slice with one indexed
+query and caps the prompt: LEDGER_TOPICS_PER_SUBJECT topics per subject
+(most tests with mistakes first), LEDGER_TESTS_PER_TOPIC tests per topic and
+LEDGER_QUESTIONS_PER_TEST questions per test.
+"""
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from typing import Dict
+
+from django.db import transaction
+from django.utils import timezone
+
+from neet_app.models import Question, StudentMistakeLedger, TestSession
+
+logger = logging.getLogger(__name__)
+
+LEDGER_MAX_ENTRIES = 300
+LEDGER_MAX_PER_TOPIC = 30
+LEDGER_MAX_AGE_DAYS = 180
+# Completed platform tests replayed into an empty ledger (first run for a student)
+LEDGER_BACKFILL_TESTS = 10
+
+LEDGER_TOPICS_PER_SUBJECT = 5
+LEDGER_TESTS_PER_TOPIC = 3
+LEDGER_QUESTIONS_PER_TEST = 3
+
+
+def _misconception_for(question, selected_answer):
+    misconceptions = question.misconceptions or {}
+    return misconceptions.get(f"option_{selected_answer.lower()}", None)
+
+
+def record_session_mistakes(test_session_id: int, compact: bool = True) -> int:
+    """
+    Append a completed platform test's wrong answers to its student's ledger.
+    Idempotent per (session, question).
+
+    Returns:
+        Number of entries appended
+    """
+    from .zone_insights_service import SessionAnswerView
+
+    view = SessionAnswerView.load(test_session_id)
+    session = view.session
+    if session.test_type != 'platform' or not session.is_completed:
+        return 0
+
+    occurred_at = session.end_time or timezone.now()
+    entries = []
+    seen = set()
+    for subject in view.subjects:
+        for answer in view.answers_for(subject):
+            if not answer.selected_answer or answer.is_correct is not False:
+                continue
+            if answer.question_id in seen:
+                continue
+            seen.add(answer.question_id)
+            entries.append(StudentMistakeLedger(
+                student_id=session.student_id,
+                test_session_id=session.id,
+                question_id=answer.question_id,
+                topic_id=answer.question.topic_id,
+                subject=subject,
+                selected_answer=answer.selected_answer.upper(),
+                misconception=_misconception_for(answer.question, answer.selected_answer),
+                occurred_at=occurred_at,
+            ))
+
+    if entries:
+        with transaction.atomic():
+            StudentMistakeLedger.objects.bulk_create(entries, ignore_conflicts=True)
+            if compact:
+                compact_ledger(session.student_id)
+    return len(entries)
+
+
+def compact_ledger(student_id: str) -> int:
+    """
+    Apply the recency/frequency bounds to a student's ledger.
+
+    Returns:
+        Number of entries deleted
+    """
+    cutoff = timezone.now() - timedelta(days=LEDGER_MAX_AGE_DAYS)
+    rows = (
+        StudentMistakeLedger.objects.filter(student_id=student_id)
+        .order_by('-occurred_at', '-id')
+        .values_list('id', 'topic_id', 'occurred_at')
+    )
+
+    kept = 0
+    per_topic = defaultdict(int)
+    drop = []
+    for entry_id, topic_id, occurred_at in rows:
+        if occurred_at < cutoff or kept >= LEDGER_MAX_ENTRIES or per_topic[topic_id] >= LEDGER_MAX_PER_TOPIC:
+            drop.append(entry_id)
+            continue
+        kept += 1
+        per_topic[topic_id] += 1
+
+    if drop:
+        StudentMistakeLedger.objects.filter(id__in=drop).delete()
+    return len(drop)
+
+
+def backfill_student_ledger(student_id: str) -> int:
+    """Replay the student's most recent completed platform tests into an empty ledger."""
+    session_ids = list(
+        TestSession.objects.filter(student_id=student_id, test_type='platform', is_completed=True)
+        .order_by('-end_time')
+        .values_list('id', flat=True)[:LEDGER_BACKFILL_TESTS]
+    )
+    appended = sum(record_session_mistakes(session_id, compact=False) for session_id in session_ids)
+    if appended:
+        compact_ledger(student_id)
+    return appended
+
+
+def build_repeated_mistakes_corpus(student_id: str) -> Dict:
+    """
+    Capped subject -> topic -> test -> questions corpus for REPEATED_MISTAKES_PROMPT,
+    built from the student's ledger (same shape as the former full-history scan).
+    """
+    from ..utils.topic_taxonomy import get_topic_taxonomy
+    from .zone_insights_service import SUBJECT_TOPIC_FIELDS
+
+    entries = list(
+        StudentMistakeLedger.objects.filter(student_id=student_id)
+        .order_by('-occurred_at', '-id')
+        .values('question_id', 'topic_id', 'subject', 'test_session_id', 'selected_answer',
+                'misconception', 'occurred_at')[:LEDGER_MAX_ENTRIES]
+    )
+    if not entries:
+        return {}
+
+    # subject -> topic_id -> test_session_id -> [entries] (newest tests first)
+    grouped = defaultdict(lambda: defaultdict(lambda: OrderedDict()))
+    for entry in entries:
+        tests = grouped[entry['subject']][entry['topic_id']]
+        tests.setdefault(entry['test_session_id'], []).append(entry)
+
+    # Select the capped slice first so only its questions are loaded
+    selected = OrderedDict()
+    for subject in SUBJECT_TOPIC_FIELDS:
+        topics = grouped.get(subject)
+        if not topics:
+            continue
+        ranked = sorted(
+            topics.items(),
+            key=lambda item: (
+                -len(item[1]),
+                -sum(len(qs) for qs in item[1].values()),
+                -max(e['occurred_at'] for qs in item[1].values() for e in qs).timestamp(),
+                item[0],
+            ),
+        )
+        selected[subject] = [
+            (topic_id, [
+                (test_id, sorted(qs, key=lambda e: e['question_id'])[:LEDGER_QUESTIONS_PER_TEST])
+                for test_id, qs in list(tests.items())[:LEDGER_TESTS_PER_TOPIC]
+            ])
+            for topic_id, tests in ranked[:LEDGER_TOPICS_PER_SUBJECT]
+        ]
+
+    question_ids = set()
+    test_ids = set()
+    for topics in selected.values():
+        for _, tests in topics:
+            for test_id, qs in tests:
+                test_ids.add(test_id)
+                question_ids.update(e['question_id'] for e in qs)
+
+    questions = {
+        q.id: q for q in Question.objects.filter(id__in=question_ids).only(
+            'id', 'question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer'
+        )
+    }
+    test_names = {
+        row['id']: row['platform_test__test_name'] or f"Test #{row['id']}"
+        for row in TestSession.objects.filter(id__in=test_ids).values('id', 'platform_test__test_name')
+    }
+
+    taxonomy = get_topic_taxonomy(topic_ids=[topic_id for topics in selected.values() for topic_id, _ in topics])
+    result = {}
+    for subject, topics in selected.items():
+        topics_list = []
+        for topic_id, tests in topics:
+            info = taxonomy.get(topic_id)
+            tests_list = []
+            for test_id, qs in tests:
+                question_entries = []
+                for entry in qs:
+                    q = questions.get(entry['question_id'])
+                    if q is None:
+                        continue
+                    question_entries.append({
+                        'question_id': q.id,
+                        'question': q.question if q.question else '',
+                        'options': {
+                            'A': q.option_a,
+                            'B': q.option_b,
+                            'C': q.option_c,
+                            'D': q.option_d,
+                        },
+                        'correct_answer': q.correct_answer if q.correct_answer else None,
+                        'selected_answer': entry['selected_answer'],
+                        'misconception': entry['misconception'],
+                    })
+                if question_entries:
+                    tests_list.append({
+                        'test_name': test_names.get(test_id, f"Test #{test_id}"),
+                        'test_id': test_id,
+                        'questions': question_entries,
+                    })
+            if tests_list:
+                topics_list.append({
+                    'topic_name': info.name if info else f"Topic #{topic_id}",
+                    'tests': tests_list,
+                })
+        if topics_list:
+            result[subject] = {'topics': topics_list}
+    return result
+
+
+def ledger_is_empty(student_id: str) -> bool:
+    return not StudentMistakeLedger.objects.filter(student_id=student_id).exists()
+
@@ -45,10 +45,28 @@ from django.utils import timezone
 
 from ..models import Question, TestAnswer, Topic, TestSession, StudentProfile
 from ..views.utils import clean_mathematical_text
+from ..utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+class _LazyTopicNames:
+    """Log argument that resolves topic names when formatted, so disabled DEBUG logging costs no query."""
+
+    def __init__(self, topic_ids: List[int], limit: int = 5):
+        self.topic_ids = topic_ids
+        self.limit = limit
+
+    def __str__(self) -> str:
+        try:
+            names = list(Topic.objects.filter(id__in=self.topic_ids[:self.limit]).values_list('name', flat=True))
+        except Exception:
+            return f"{len(self.topic_ids)} topics"
+        if len(self.topic_ids) > self.limit:
+            names.append(f"... +{len(self.topic_ids) - self.limit} more")
+        return str(names)
+
+
 @dataclass
 class StudentStats:
     """Cached student statistics for deterministic selection"""
@@ -222,8 +240,7 @@ class DeterministicSelectionEngine:
         Returns:
             QuerySet of selected Question objects
         """
-        self.logger.info(f"Starting deterministic selection: {question_count} questions, "
-                        f"test_type={test_type}, topics={len(selected_topics)}")
+        self.logger.debug("Starting deterministic selection: %s questions, test_type=%s, topics=%s", question_count, test_type, len(selected_topics))
         
         # Store original question count for quota calculations
         self.original_question_count = question_count
@@ -285,7 +302,7 @@ class DeterministicSelectionEngine:
                 if actual_count != question_count:
                     self.logger.error(f"CRITICAL: Expected {question_count} questions, got {actual_count}")
                 
-                self.logger.info(f"Selection completed: {actual_count} questions selected")
+                self.logger.debug("Selection completed: %s questions selected", actual_count)
                 return questions
             else:
                 self.logger.warning("No questions selected")
@@ -409,7 +426,7 @@ class DeterministicSelectionEngine:
             
             excluded_questions.update(recent_question_ids)
             
-        self.logger.info(f"R8 exclusion: {len(excluded_questions)} questions excluded")
+        self.logger.debug("R8 exclusion: %s questions excluded", len(excluded_questions))
         return excluded_questions
     
     def _determine_topic_universe(self, selected_topics: List[int], test_type: str) -> List[int]:
@@ -426,11 +443,11 @@ class DeterministicSelectionEngine:
         if test_type == "random" or not selected_topics:
             # Use all available topics for random tests
             all_topics = list(Topic.objects.values_list('id', flat=True))
-            self.logger.info(f"Topic universe: {len(all_topics)} topics (random test)")
+            self.logger.debug("Topic universe: %s topics (random test)", len(all_topics))
             return all_topics
         else:
             # Use selected topics for custom tests
-            self.logger.info(f"Topic universe: {len(selected_topics)} topics (custom test)")
+            self.logger.debug("Topic universe: %s topics (custom test)", len(selected_topics))
             return selected_topics
     
     def _compute_topic_quotas(self, question_count: int, topic_universe: List[int]) -> QuotaAllocation:
@@ -498,8 +515,8 @@ class DeterministicSelectionEngine:
         used_topics = set(weak_topics + strong_topics)
         random_topics = [t for t in topic_universe if t not in used_topics]
         
-        self.logger.info(f"R14 quotas - Weak: {weak_count}, Strong: {strong_count}, Random: {random_count}")
-        self.logger.info(f"Topic categories - Weak: {len(weak_topics)}, Strong: {len(strong_topics)}, Random: {len(random_topics)}")
+        self.logger.debug("R14 quotas - Weak: %s, Strong: %s, Random: %s", weak_count, strong_count, random_count)
+        self.logger.debug("Topic categories - Weak: %s, Strong: %s, Random: %s", len(weak_topics), len(strong_topics), len(random_topics))
         
         return QuotaAllocation(
             weak_topics=weak_topics,
@@ -574,7 +591,7 @@ class DeterministicSelectionEngine:
                 allocated_so_far += count
             global_difficulty_quotas[difficulty] = count
         
-        self.logger.info(f"R6 global difficulty quotas: {global_difficulty_quotas}")
+        self.logger.debug("R6 global difficulty quotas: %s", global_difficulty_quotas)
         
         # Track how many questions we've allocated per difficulty across all categories
         difficulty_tracker = {difficulty: 0 for difficulty in global_difficulty_quotas}
@@ -639,7 +656,7 @@ class DeterministicSelectionEngine:
                             difficulty_tracker[difficulty_name] += remaining
                             break
         
-        self.logger.info(f"Final difficulty distribution: {difficulty_tracker}")
+        self.logger.debug("Final difficulty distribution: %s", difficulty_tracker)
         return quota_allocation
     
     def _build_candidate_pools(self, topic_universe: List[int], 
@@ -734,28 +751,30 @@ class DeterministicSelectionEngine:
                     candidate.highest_rule_priority = RULE_PRIORITIES["random_pool"]
             candidate_pools["random_pool"].extend(topic_candidates)
         
-        # Log candidate pool sizes with topic information
-        for rule, candidates in candidate_pools.items():
-            if candidates:
-                # Show first few candidates with their topic info
-                sample_info = []
-                for candidate in candidates[:3]:  # Show first 3 as sample
-                    try:
-                        topic = Topic.objects.get(id=candidate.topic_id)
-                        sample_info.append(f"Q{candidate.question_id}(Topic:{topic.name})")
-                    except Topic.DoesNotExist:
-                        sample_info.append(f"Q{candidate.question_id}(Topic:Unknown)")
-                
-                sample_text = ", ".join(sample_info)
-                if len(candidates) > 3:
-                    sample_text += f"... +{len(candidates)-3} more"
-                
-                self.logger.info(f"Candidate pool {rule}: {len(candidates)} questions - {sample_text}")
-            else:
-                self.logger.info(f"Candidate pool {rule}: 0 questions")
+        # Log candidate pool sizes with topic information (the sample topic lookups only run at DEBUG)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            for rule, candidates in candidate_pools.items():
+                if candidates:
+                    # Show first few candidates with their topic info
+                    sample = candidates[:3]
+                    topic_names = dict(Topic.objects.filter(id__in={c.topic_id for c in sample}).values_list('id', 'name'))
+                    sample_text = ", ".join(
+                        f"Q{c.question_id}(Topic:{topic_names.get(c.topic_id, 'Unknown')})" for c in sample
+                    )
+                    if len(candidates) > 3:
+                        sample_text += f"... +{len(candidates)-3} more"
+
+                    self.logger.debug("Candidate pool %s: %s questions - %s", rule, len(candidates), sample_text)
+                else:
+                    self.logger.debug("Candidate pool %s: 0 questions", rule)
         
         return candidate_pools
     
+    @staticmethod
+    def _topic_names_for_log(topic_ids: List[int]) -> "_LazyTopicNames":
+        """Up to five topic names for a log message, fetched only if the record is emitted."""
+        return _LazyTopicNames(topic_ids)
+
     def _get_topic_candidates(self, topic_id: int) -> List[CandidateQuestion]:
         """Get all candidate questions for a specific topic"""
         questions = Question.objects.filter(topic_id=topic_id).values(
@@ -817,7 +836,7 @@ class DeterministicSelectionEngine:
             
             excluded_count = len(candidates) - len(filtered_candidates)
             if excluded_count > 0:
-                self.logger.info(f"R8 exclusion in {rule}: {excluded_count} questions removed")
+                self.logger.debug("R8 exclusion in %s: %s questions removed", rule, excluded_count)
         
         return filtered_pools
     
@@ -854,7 +873,7 @@ class DeterministicSelectionEngine:
         global_difficulty_counts = {'Easy': 0, 'Moderate': 0, 'Hard': 0}
         global_subject_counts = {'physics': 0, 'chemistry': 0, 'botany': 0, 'zoology': 0}
         
-        self.logger.info(f"Starting new selection logic for {target_question_count} questions")
+        self.logger.debug("Starting new selection logic for %s questions", target_question_count)
         
         # STEP 1: Remove R1-R13 questions from random_pool to avoid duplication
         rule_pools = ['R1', 'R2', 'R3', 'R4', 'R5', 'R12', 'R13']
@@ -870,7 +889,7 @@ class DeterministicSelectionEngine:
                 c for c in candidate_pools['random_pool'] 
                 if c.question_id not in rule_question_ids
             ]
-            self.logger.info(f"Cleaned random pool: {original_random_count} -> {len(candidate_pools['random_pool'])} questions")
+            self.logger.debug("Cleaned random pool: %s -> %s questions", original_random_count, len(candidate_pools['random_pool']))
         
         # STEP 2: Select 1 question from topics that satisfy each rule condition
         rule_selection_config = {
@@ -933,13 +952,13 @@ class DeterministicSelectionEngine:
                         # Track difficulty and subject for this question
                         self._update_global_counts(question_id, global_difficulty_counts, global_subject_counts)
                     
-                    self.logger.info(f"Selected {selected_count} from {rule} from topics {satisfying_topics[:3]}{'...' if len(satisfying_topics)>3 else ''} (preferred: {config['preferred_difficulty']})")
+                    self.logger.debug("Selected %s from %s from topics %s%s (preferred: %s)", selected_count, rule, satisfying_topics[:3], '...' if len(satisfying_topics) > 3 else '', config['preferred_difficulty'])
             else:
-                self.logger.info(f"No topics satisfy rule {rule}")
+                self.logger.debug("No topics satisfy rule %s", rule)
         
         # STEP 3: Apply R9 rule (2% of total questions)
         r9_count = max(1, round(target_question_count * 0.02))  # At least 1, typically 2% of total
-        self.logger.info(f"Applying R9 rule: selecting {r9_count} questions")
+        self.logger.debug("Applying R9 rule: selecting %s questions", r9_count)
 
         # R9: Prefer HIGH_WEIGHT_TOPICS (from settings) first — small pedagogical injection
         r9_candidates = []
@@ -951,7 +970,7 @@ class DeterministicSelectionEngine:
             hw_topic_ids = []
 
         if hw_topic_ids:
-            self.logger.info(f"R9: Using high-weight topics for R9 selection: {hw_topic_ids}")
+            self.logger.debug("R9: Using high-weight topics for R9 selection: %s", hw_topic_ids)
             for topic_id in hw_topic_ids:
                 topic_questions = Question.objects.filter(topic_id=topic_id).exclude(id__in=used_question_ids).values('id', 'topic_id', 'difficulty')
                 for q in topic_questions:
@@ -969,13 +988,8 @@ class DeterministicSelectionEngine:
         if not r9_candidates and self.student_stats:
             r9_satisfying_topics = [t for t in topic_universe if 40 <= self.student_stats.accuracy_per_topic.get(t, 50) <= 80]
             if r9_satisfying_topics:
-                try:
-                    r9_topic_names = list(Topic.objects.filter(id__in=r9_satisfying_topics[:5]).values_list('name', flat=True))
-                    if len(r9_satisfying_topics) > 5:
-                        r9_topic_names.append(f"... +{len(r9_satisfying_topics)-5} more")
-                    self.logger.info(f"R9 fallback: Found {len(r9_satisfying_topics)} moderate-performance topics: {r9_topic_names}")
-                except Exception:
-                    self.logger.info(f"R9 fallback: Found {len(r9_satisfying_topics)} moderate-performance topics")
+                self.logger.debug("R9 fallback: Found %s moderate-performance topics: %s",
+                                  len(r9_satisfying_topics), self._topic_names_for_log(r9_satisfying_topics))
 
                 for topic_id in r9_satisfying_topics:
                     topic_questions = Question.objects.filter(topic_id=topic_id).exclude(id__in=used_question_ids).values('id', 'topic_id', 'difficulty')
@@ -1003,14 +1017,14 @@ class DeterministicSelectionEngine:
                 # Track difficulty and subject for this question
                 self._update_global_counts(question_id, global_difficulty_counts, global_subject_counts)
 
-            self.logger.info(f"Selected {r9_selected} questions using R9 rule (high-weight preference applied)")
+            self.logger.debug("Selected %s questions using R9 rule (high-weight preference applied)", r9_selected)
         else:
             self.logger.info("R9: No candidates found for high-weight or moderate topics")
         
         # STEP 4: Fill remaining from topics with low accuracy (R1) with subject/difficulty distribution
         remaining_needed = target_question_count - len(selected_question_ids)
         if remaining_needed > 0:
-            self.logger.info(f"Filling remaining {remaining_needed} questions from R1 topics (accuracy < {ACCURACY_THRESHOLD}%)")
+            self.logger.debug("Filling remaining %s questions from R1 topics (accuracy < %s%%)", remaining_needed, ACCURACY_THRESHOLD)
             
             # Identify topics that satisfy R1 condition (accuracy < 60%)
             r1_satisfying_topics = []
@@ -1024,14 +1038,8 @@ class DeterministicSelectionEngine:
                 r1_satisfying_topics = topic_universe.copy()
             
             if r1_satisfying_topics:
-                # Get topic names for logging
-                try:
-                    r1_topic_names = list(Topic.objects.filter(id__in=r1_satisfying_topics[:5]).values_list('name', flat=True))
-                    if len(r1_satisfying_topics) > 5:
-                        r1_topic_names.append(f"... +{len(r1_satisfying_topics)-5} more")
-                    self.logger.info(f"R1: Found {len(r1_satisfying_topics)} topics with low accuracy: {r1_topic_names}")
-                except Exception:
-                    self.logger.info(f"R1: Found {len(r1_satisfying_topics)} topics with low accuracy")
+                self.logger.debug("R1: Found %s topics with low accuracy: %s",
+                                  len(r1_satisfying_topics), self._topic_names_for_log(r1_satisfying_topics))
                 
                 # Get all available questions from R1 satisfying topics
                 r1_candidates = []
@@ -1068,17 +1076,17 @@ class DeterministicSelectionEngine:
                     for question_id in selected_r1:
                         self._update_global_counts(question_id, global_difficulty_counts, global_subject_counts)
                         
-                    self.logger.info(f"Selected {len(selected_r1)} questions from R1 topics with distribution constraints")
+                    self.logger.debug("Selected %s questions from R1 topics with distribution constraints", len(selected_r1))
                 else:
                     self.logger.warning("R1: No questions available from topics with low accuracy")
             else:
                 self.logger.warning("R1: No topics found with low accuracy")
         
-        self.logger.info(f"Sequential selection completed: {len(selected_question_ids)} questions")
+        self.logger.debug("Sequential selection completed: %s questions", len(selected_question_ids))
         
         # Log final global distribution
-        self.logger.info(f"Global difficulty distribution: {global_difficulty_counts}")
-        self.logger.info(f"Global subject distribution: {global_subject_counts}")
+        self.logger.debug("Global difficulty distribution: %s", global_difficulty_counts)
+        self.logger.debug("Global subject distribution: %s", global_subject_counts)
         
         return selected_question_ids
     
@@ -1173,7 +1181,7 @@ class DeterministicSelectionEngine:
             deficit = needed_count - total_remaining_target
             remaining_moderate_target += deficit
         
-        self.logger.info(f"Adjusted R1 targets: Easy={remaining_easy_target}, Moderate={remaining_moderate_target}, Hard={remaining_hard_target}")
+        self.logger.debug("Adjusted R1 targets: Easy=%s, Moderate=%s, Hard=%s", remaining_easy_target, remaining_moderate_target, remaining_hard_target)
         
         # Track counts (start with current global counts)
         difficulty_counts = {'Easy': 0, 'Moderate': 0, 'Hard': 0}
@@ -1259,11 +1267,11 @@ class DeterministicSelectionEngine:
                     difficulty_counts[difficulty] += 1
                     selected_for_diff += 1
             
-            self.logger.info(f"Selected {selected_for_diff}/{target} {difficulty} questions from R1")
+            self.logger.debug("Selected %s/%s %s questions from R1", selected_for_diff, target, difficulty)
             # If we couldn't meet the difficulty target due to subject caps, relax caps and fill remaining
             if selected_for_diff < target and len(selected_ids) < needed_count:
                 still_needed = min(target - selected_for_diff, needed_count - len(selected_ids))
-                self.logger.info(f"Difficulty {difficulty}: subject-aware pass selected {selected_for_diff}, relaxing subject caps to fill {still_needed} more")
+                self.logger.debug("Difficulty %s: subject-aware pass selected %s, relaxing subject caps to fill %s more", difficulty, selected_for_diff, still_needed)
                 for score, question_id in scored:
                     if still_needed <= 0 or len(selected_ids) >= needed_count:
                         break
@@ -1285,7 +1293,7 @@ class DeterministicSelectionEngine:
                     except Topic.DoesNotExist:
                         pass
                     still_needed -= 1
-                self.logger.info(f"After relaxing caps, added {min(target, selected_for_diff + (target - selected_for_diff)) - selected_for_diff} questions for {difficulty}")
+                self.logger.debug("After relaxing caps, added %s questions for %s", min(target, selected_for_diff + (target - selected_for_diff)) - selected_for_diff, difficulty)
         
         # Check if we met difficulty targets, if not try random pool for missing difficulties
         unmet_difficulties = []
@@ -1304,7 +1312,7 @@ class DeterministicSelectionEngine:
             # If R1 pool doesn't have enough questions or missing difficulty targets, look into random pool
             if len(unused_candidates) < remaining or unmet_difficulties:
                 missing_count = max(remaining - len(unused_candidates), 0)
-                self.logger.info(f"R1 pool insufficient or missing difficulty targets. Need {missing_count} more candidates. Looking into random pool...")
+                self.logger.debug("R1 pool insufficient or missing difficulty targets. Need %s more candidates. Looking into random pool...", missing_count)
                 
                 # Get additional candidates from random pool that are not already selected
                 try:
@@ -1366,7 +1374,7 @@ class DeterministicSelectionEngine:
                                 except Exception:
                                     continue
                     
-                    self.logger.info(f"Enhanced candidate pool with {len(unused_candidates)} total candidates from R1 + random pool")
+                    self.logger.debug("Enhanced candidate pool with %s total candidates from R1 + random pool", len(unused_candidates))
                     
                 except Exception as e:
                     self.logger.warning(f"Failed to get additional candidates from random pool: {e}")
@@ -1423,12 +1431,11 @@ class DeterministicSelectionEngine:
                     if subject_index > len(subjects) * remaining:
                         break
                 
-                self.logger.info(f"Phase 2: Selected {selected_remaining} additional questions for subject balance")
+                self.logger.debug("Phase 2: Selected %s additional questions for subject balance", selected_remaining)
         
         # Final logging
-        self.logger.info(f"Final R1 selection: Easy={difficulty_counts['Easy']}, "
-                        f"Moderate={difficulty_counts['Moderate']}, Hard={difficulty_counts['Hard']}")
-        self.logger.info(f"Final subject distribution: {subject_counts}")
+        self.logger.debug("Final R1 selection: Easy=%s, Moderate=%s, Hard=%s", difficulty_counts['Easy'], difficulty_counts['Moderate'], difficulty_counts['Hard'])
+        self.logger.debug("Final subject distribution: %s", subject_counts)
         
         return selected_ids
     
@@ -1484,7 +1491,7 @@ class DeterministicSelectionEngine:
             if satisfies_rule:
                 satisfying_topics.append(topic_id)
         
-        self.logger.info(f"Rule {rule}: Found {len(satisfying_topics)} satisfying topics: {satisfying_topics}")
+        self.logger.debug("Rule %s: Found %s satisfying topics: %s", rule, len(satisfying_topics), satisfying_topics)
         return satisfying_topics
 
     def _get_topics_satisfying_rule(self, rule_name: str, topic_universe: List[int]) -> List[int]:
@@ -1539,17 +1546,9 @@ class DeterministicSelectionEngine:
         satisfying_topics.sort()
         
         if satisfying_topics:
-            # Log topic names for clarity
-            try:
-                topic_names = Topic.objects.filter(id__in=satisfying_topics[:5]).values_list('name', flat=True)
-                sample_names = list(topic_names)
-                if len(satisfying_topics) > 5:
-                    sample_names.append(f"... +{len(satisfying_topics)-5} more")
-                self.logger.info(f"{rule_name} satisfying topics: {sample_names}")
-            except Exception:
-                self.logger.info(f"{rule_name} satisfying topics: {len(satisfying_topics)} topics")
+            self.logger.debug("%s satisfying topics: %s", rule_name, self._topic_names_for_log(satisfying_topics))
         else:
-            self.logger.info(f"{rule_name} satisfying topics: none found")
+            self.logger.debug("%s satisfying topics: none found", rule_name)
             
         return satisfying_topics
 
@@ -1626,7 +1625,7 @@ class DeterministicSelectionEngine:
         if remaining_needed <= 0:
             return selected_ids[:target_count]  # Truncate if over target
         
-        self.logger.info(f"Applying conservative fallback strategy: need {remaining_needed} more questions")
+        self.logger.debug("Applying conservative fallback strategy: need %s more questions", remaining_needed)
         
         # Legacy-style fallback: prioritize random pool with subject distribution
         if remaining_needed > 0:
@@ -1662,7 +1661,7 @@ class DeterministicSelectionEngine:
                         selected_ids.append(question_id)
                         used_question_ids.add(question_id)
                         selected_count += 1
-                        self.logger.info(f"Fallback selected Q{question_id} from {current_subject}")
+                        self.logger.debug("Fallback selected Q%s from %s", question_id, current_subject)
                     
                     subject_index += 1
                     
@@ -1670,7 +1669,7 @@ class DeterministicSelectionEngine:
                     if subject_index > len(subjects) * 10:
                         break
                 
-                self.logger.info(f"Fallback completed: added {selected_count} questions with subject distribution")
+                self.logger.debug("Fallback completed: added %s questions with subject distribution", selected_count)
         
         return selected_ids[:target_count]  # Ensure exact count
     
@@ -1751,7 +1750,7 @@ class DeterministicSelectionEngine:
                 take_count = min(len(available_list), subject_question_count)
                 subject_selected = available_list[:take_count]
                 additional_ids.extend(subject_selected)
-                self.logger.info(f"Fallback: Selected {len(subject_selected)} questions from {subject}")
+                self.logger.debug("Fallback: Selected %s questions from %s", len(subject_selected), subject)
             else:
                 self.logger.warning(f"Fallback: No questions available for {subject}")
         
@@ -1770,7 +1769,7 @@ class DeterministicSelectionEngine:
                 random.shuffle(available_list)
                 additional_selected = available_list[:remaining_needed]
                 additional_ids.extend(additional_selected)
-                self.logger.info(f"Fallback: Added {len(additional_selected)} additional questions from any subject")
+                self.logger.debug("Fallback: Added %s additional questions from any subject", len(additional_selected))
         
         return additional_ids
     
@@ -1864,6 +1863,7 @@ class DeterministicSelectionEngine:
 
 # Backward Compatibility and Public Interface
 
+@traced('selection')
 def generate_questions_with_rules(selected_topics: List[int],
                                 question_count: int,
                                 student_id: Optional[str] = None,
@@ -2092,7 +2092,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
             )
             
             if streak_question_ids:
-                self.logger.info(f"Streak rules applied: {len(streak_question_ids)} questions recommended")
+                self.logger.debug("Streak rules applied: %s questions recommended", len(streak_question_ids))
                 # Ensure questions exist and are available
                 existing_ids = list(
                     Question.objects.filter(id__in=streak_question_ids)
@@ -2161,7 +2161,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                     break
 
             if available_streak_ids:
-                self.logger.info(f"Dynamic streak rules applied: {len(available_streak_ids)} questions selected")
+                self.logger.debug("Dynamic streak rules applied: %s questions selected", len(available_streak_ids))
 
             return available_streak_ids
             
@@ -2244,7 +2244,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                     selected_r4 = list(r4_questions[:r4_count])
                     timing_questions.extend(selected_r4)
                     questions_needed -= len(selected_r4)
-                    self.logger.info(f"R4 applied: {len(selected_r4)} easier questions for slow topics")
+                    self.logger.debug("R4 applied: %s easier questions for slow topics", len(selected_r4))
             
             # R5: Harder questions for fast but inaccurate topics (<60s + <60% accuracy)
             if questions_needed > 0:
@@ -2264,7 +2264,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                     if r5_count > 0:
                         selected_r5 = list(r5_questions[:r5_count])
                         timing_questions.extend(selected_r5)
-                        self.logger.info(f"R5 applied: {len(selected_r5)} harder questions for fast-inaccurate topics")
+                        self.logger.debug("R5 applied: %s harder questions for fast-inaccurate topics", len(selected_r5))
             
             return timing_questions
             
@@ -2316,7 +2316,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                     bridge_count = min(len(bridge_questions), min(question_count, 2))
                     if bridge_count > 0:
                         selected_bridge = list(bridge_questions[:bridge_count])
-                        self.logger.info(f"R11 applied: {len(selected_bridge)} bridge questions for low accuracy")
+                        self.logger.debug("R11 applied: %s bridge questions for low accuracy", len(selected_bridge))
                         return selected_bridge
             
             return []
@@ -2343,7 +2343,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
             List of question IDs from legacy selection
         """
         try:
-            self.logger.info(f"Applying legacy fallback for {question_count} questions")
+            self.logger.debug("Applying legacy fallback for %s questions", question_count)
             
             # Get base question pool
             if test_type == "random" or not selected_topics:
@@ -2448,8 +2448,8 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
             available_questions = base_questions
             excluded_count = 0
         
-        self.logger.info(f"Exclusion applied: {excluded_count} questions excluded, "
-                        f"{available_questions.count()} available")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Exclusion applied: %s questions excluded, %s available", excluded_count, available_questions.count())
         
         return available_questions
     
@@ -2510,7 +2510,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                     allocation["Physics"] = max(1, allocation["Physics"] + diff // 3)
                     allocation["Chemistry"] = max(1, allocation["Chemistry"] + diff // 3)
         
-        self.logger.info(f"Subject allocation: {allocation}")
+        self.logger.debug("Subject allocation: %s", allocation)
         return allocation
     
     def _apply_weak_strong_allocation(self,
@@ -2556,7 +2556,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
             if total_categorized < count:
                 allocation[subject]["random"] = count - total_categorized
         
-        self.logger.info(f"Weak/strong allocation: {allocation}")
+        self.logger.debug("Weak/strong allocation: %s", allocation)
         return allocation
     
     def _get_topic_performance(self) -> Dict[int, float]:
@@ -2634,7 +2634,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
             # Add/subtract from Moderate (largest proportion)
             allocation["Moderate"] = max(1, allocation.get("Moderate", 0) + diff)
         
-        self.logger.info(f"Difficulty allocation: {allocation}")
+        self.logger.debug("Difficulty allocation: %s", allocation)
         return allocation
     
     def _select_questions_by_allocation(self,
@@ -2698,7 +2698,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
         if len(selected_ids) > question_count:
             selected_ids = selected_ids[:question_count]
         
-        self.logger.info(f"Final selection: {len(selected_ids)} questions")
+        self.logger.debug("Final selection: %s questions", len(selected_ids))
         return selected_ids
     
     def _ensure_high_weight_topics(self, 
@@ -2732,7 +2732,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
                 high_weight_q = high_weight_questions.order_by('?').first()
                 selected_ids.append(high_weight_q.id)
                 
-                self.logger.info(f"Added high-weight topic question: {high_weight_q.topic.name}")
+                self.logger.debug("Added high-weight topic question: %s", high_weight_q.topic.name)
         
         return selected_ids
     
@@ -2856,7 +2856,7 @@ def test_deterministic_selection(student_id: str, session_id: int, selected_topi
         
         # Log the selection process
         if selection_log:
-            self.logger.info(f"Difficulty selection log: {'; '.join(selection_log)}")
+            self.logger.debug("Difficulty selection log: %s", '; '.join(selection_log))
         
         return selected[:count]
     
@@ -2943,7 +2943,7 @@ def apply_streak_rules(student_id: str, session: TestSession, recent_answers: Li
         # R2: If last answer incorrect, recommend simpler questions from same sub-topic (highest priority)
         last_answer = recent_answers[0]
         if not last_answer.is_correct:
-            logger.info(f"Applying R2: Last answer incorrect for student {student_id}")
+            logger.debug("Applying R2: Last answer incorrect for student %s", student_id)
             simpler_ids = _get_simpler_questions_same_topic(
                 last_answer.question.topic_id, 
                 exclude_ids=[last_answer.question_id]
@@ -2957,14 +2957,14 @@ def apply_streak_rules(student_id: str, session: TestSession, recent_answers: Li
             
             # R12: 3 consecutive correct answers (harder challenge)
             if all(recent_correct):
-                logger.info(f"Applying R12: 3 consecutive correct for student {student_id}")
+                logger.debug("Applying R12: 3 consecutive correct for student %s", student_id)
                 harder_ids = _get_harder_challenge_questions(recent_answers[0].question.topic_id)
                 if harder_ids:
                     return harder_ids
             
             # R13: 3 consecutive incorrect answers (confidence boost)
             if not any(recent_correct):
-                logger.info(f"Applying R13: 3 consecutive incorrect for student {student_id}")
+                logger.debug("Applying R13: 3 consecutive incorrect for student %s", student_id)
                 boost_ids = _get_confidence_boost_questions()
                 if boost_ids:
                     return boost_ids
@@ -2974,7 +2974,7 @@ def apply_streak_rules(student_id: str, session: TestSession, recent_answers: Li
             last_two = recent_answers[:2]
             if (all(ans.is_correct for ans in last_two) and 
                 last_two[0].question.topic_id == last_two[1].question.topic_id):
-                logger.info(f"Applying R3: Consecutive correct in same topic for student {student_id}")
+                logger.debug("Applying R3: Consecutive correct in same topic for student %s", student_id)
                 harder_same_topic_ids = _get_harder_questions_same_topic(last_two[0].question.topic_id)
                 if harder_same_topic_ids:
                     return harder_same_topic_ids
@@ -0,0 +1,286 @@
+"""
+Question-level export of a student's test sessions for institution admins.
+
+Answers are read with a server-side cursor (`.iterator(chunk_size=...)`) as flat
+`values()` rows, and every output format is produced from one generator, so
+memory stays constant regardless of how many sessions/questions are exported:
+
+    json    the original grouped document (built in memory, kept for compatibility)
+    ndjson  streamed: one "student" line, then each "session" line followed by its "question" lines
+    csv     streamed: one row per question, session columns repeated
+    xlsx    generated by a Celery task into default_storage, then fetched by export id
+
+Artifacts live at exports/<institution_id>/<export_id>.xlsx; a sibling
+.pending/.failed marker tracks generation state.
+"""
+import csv
+import json
+import logging
+import re
+import tempfile
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+
+from neet_app.models import TestAnswer, TestSession, TestSubjectZoneInsight
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('json', 'ndjson', 'csv', 'xlsx')
+STREAMING_FORMATS = ('ndjson', 'csv')
+DEFAULT_QUESTION_TYPES = ['correct', 'wrong', 'skipped']
+
+QUESTION_FIELDS = [
+    'question_number', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+    'correct_answer', 'student_answer', 'misconception', 'time_taken_seconds',
+    'topic', 'subject', 'difficulty',
+]
+EXPORT_COLUMNS = ['session_id', 'test_name', 'mark', 'total_mark'] + QUESTION_FIELDS
+
+_EXPORT_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def export_chunk_size() -> int:
+    return int(getattr(settings, 'STUDENT_EXPORT_CHUNK_SIZE', 500))
+
+
+def answer_type_filter(question_types) -> Q:
+    """
+    "correct"  -> is_correct=True
+    "wrong"    -> answered but is_correct=False
+    "skipped"  -> no answer recorded
+    """
+    type_filter = Q()
+    if 'correct' in question_types:
+        type_filter |= Q(is_correct=True)
+    if 'wrong' in question_types:
+        answered_q = (
+            ~Q(selected_answer='') & Q(selected_answer__isnull=False)
+        ) | (
+            ~Q(text_answer='') & Q(text_answer__isnull=False)
+        )
+        type_filter |= Q(is_correct=False) & answered_q
+    if 'skipped' in question_types:
+        skipped_q = (
+            Q(selected_answer__isnull=True) | Q(selected_answer='')
+        ) & (
+            Q(text_answer__isnull=True) | Q(text_answer='')
+        )
+        type_filter |= skipped_q
+    return type_filter
+
+
+def load_sessions(student_id: str, session_ids) -> List[Dict]:
+    """
+    Headers for the student's completed sessions among session_ids, ordered by id,
+    with the zone-insight mark of each session (two queries in total).
+    """
+    sessions = list(
+        TestSession.objects
+        .filter(id__in=session_ids, student_id=student_id, is_completed=True)
+        .order_by('id')
+        .values('id', 'test_type', 'start_time', 'platform_test__test_name')
+    )
+    marks = {}
+    insights = (
+        TestSubjectZoneInsight.objects
+        .filter(test_session_id__in=[s['id'] for s in sessions], student_id=student_id)
+        .order_by('id')
+        .values_list('test_session_id', 'mark', 'total_mark')
+    )
+    for session_id, mark, total_mark in insights:
+        marks.setdefault(session_id, (mark, total_mark))
+
+    headers = []
+    for s in sessions:
+        if s['test_type'] == 'platform' and s['platform_test__test_name']:
+            test_name = s['platform_test__test_name']
+        else:
+            test_name = f"Custom Test ({s['start_time'].strftime('%d %b %Y')})"
+        mark, total_mark = marks.get(s['id'], (None, None))
+        headers.append({
+            'session_id': s['id'],
+            'test_name': test_name,
+            'mark': mark,
+            'total_mark': total_mark,
+        })
+    return headers
+
+
+def _answer_rows(session_ids, question_types, chunk_size: int):
+    return (
+        TestAnswer.objects
+        .filter(Q(session_id__in=session_ids) & answer_type_filter(question_types))
+        .order_by('session_id', 'id')
+        .values(
+            'session_id', 'selected_answer', 'text_answer', 'time_taken',
+            'question__question', 'question__option_a', 'question__option_b',
+            'question__option_c', 'question__option_d', 'question__correct_answer',
+            'question__misconceptions', 'question__difficulty',
+            'question__topic__name', 'question__topic__subject',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _question_payload(row: Dict, number: int) -> Dict:
+    # Misconception for the student's chosen wrong option
+    misconception = None
+    misconceptions = row['question__misconceptions']
+    if row['selected_answer'] and isinstance(misconceptions, dict):
+        misconception = misconceptions.get(f"option_{row['selected_answer'].lower()}")
+
+    return {
+        'question_number': number,
+        'question_text': row['question__question'],
+        'option_a': row['question__option_a'],
+        'option_b': row['question__option_b'],
+        'option_c': row['question__option_c'],
+        'option_d': row['question__option_d'],
+        'correct_answer': row['question__correct_answer'],
+        'student_answer': row['selected_answer'] or row['text_answer'] or None,
+        'misconception': misconception,
+        'time_taken_seconds': row['time_taken'],
+        'topic': row['question__topic__name'],
+        'subject': row['question__topic__subject'],
+        'difficulty': row['question__difficulty'],
+    }
+
+
+def iter_session_questions(
+    sessions: List[Dict], question_types, chunk_size: Optional[int] = None
+) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+    """
+    Yield (session_header, None) when a session starts, then (session_header, question)
+    for each of its matching answers. Questions are numbered per session (1-based).
+    """
+    rows = _answer_rows([s['session_id'] for s in sessions], question_types, chunk_size or export_chunk_size())
+    pending = next(rows, None)
+    for session in sessions:
+        yield session, None
+        number = 0
+        # Both sessions and answers are ordered by session id, so this is a merge walk
+        while pending is not None and pending['session_id'] <= session['session_id']:
+            if pending['session_id'] == session['session_id']:
+                number += 1
+                yield session, _question_payload(pending, number)
+            pending = next(rows, None)
+
+
+def build_grouped_export(student: Dict, sessions: List[Dict], question_types) -> Dict:
+    """The original JSON document: questions grouped under their session."""
+    groups = []
+    total = 0
+    for session, question in iter_session_questions(sessions, question_types):
+        if question is None:
+            groups.append({**session, 'questions': []})
+            continue
+        groups[-1]['questions'].append(question)
+        total += 1
+    return {'student': student, 'questions_by_test': groups, 'total': total}
+
+
+def iter_ndjson(student: Dict, sessions: List[Dict], question_types) -> Iterator[str]:
+    yield json.dumps({'type': 'student', **student}) + '\n'
+    for session, question in iter_session_questions(sessions, question_types):
+        if question is None:
+            yield json.dumps({'type': 'session', **session}, default=str) + '\n'
+        else:
+            yield json.dumps({'type': 'question', 'session_id': session['session_id'], **question}, default=str) + '\n'
+
+
+def _flat_rows(sessions: List[Dict], question_types) -> Iterator[List]:
+    for session, question in iter_session_questions(sessions, question_types):
+        if question is not None:
+            record = {**session, **question}
+            yield [record[column] for column in EXPORT_COLUMNS]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(sessions: List[Dict], question_types) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in _flat_rows(sessions, question_types):
+        yield writer.writerow(row)
+
+
+# --- Async XLSX artifacts ---
+
+def new_export_id() -> str:
+    return uuid.uuid4().hex
+
+
+def is_valid_export_id(export_id: str) -> bool:
+    return bool(_EXPORT_ID_RE.match(export_id or ''))
+
+
+def _export_path(institution_id: int, export_id: str, suffix: str) -> str:
+    return f'exports/{institution_id}/{export_id}{suffix}'
+
+
+def artifact_path(institution_id: int, export_id: str) -> str:
+    return _export_path(institution_id, export_id, '.xlsx')
+
+
+def mark_export_pending(institution_id: int, export_id: str) -> None:
+    default_storage.save(_export_path(institution_id, export_id, '.pending'), ContentFile(b''))
+
+
+def discard_export_pending(institution_id: int, export_id: str) -> None:
+    pending = _export_path(institution_id, export_id, '.pending')
+    if default_storage.exists(pending):
+        default_storage.delete(pending)
+
+
+def export_status(institution_id: int, export_id: str) -> Optional[str]:
+    """'ready', 'failed', 'pending', or None for an unknown export id."""
+    if default_storage.exists(artifact_path(institution_id, export_id)):
+        return 'ready'
+    if default_storage.exists(_export_path(institution_id, export_id, '.failed')):
+        return 'failed'
+    if default_storage.exists(_export_path(institution_id, export_id, '.pending')):
+        return 'pending'
+    return None
+
+
+def write_xlsx_export(
+    institution_id: int, export_id: str, student_id: str, session_ids, question_types
+) -> str:
+    """
+    Write the export to default_storage as an .xlsx workbook.
+    openpyxl's write-only mode streams rows to a temporary file, so memory stays flat.
+    """
+    from openpyxl import Workbook
+
+    pending = _export_path(institution_id, export_id, '.pending')
+    try:
+        sessions = load_sessions(student_id, session_ids)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Questions')
+        sheet.append(EXPORT_COLUMNS)
+        for row in _flat_rows(sessions, question_types):
+            sheet.append(row)
+
+        with tempfile.TemporaryFile(suffix='.xlsx') as tmp:
+            workbook.save(tmp)
+            tmp.seek(0)
+            path = default_storage.save(artifact_path(institution_id, export_id), File(tmp))
+    except Exception:
+        logger.exception(f'Student question export {export_id} failed')
+        default_storage.save(_export_path(institution_id, export_id, '.failed'), ContentFile(b''))
+        raise
+    finally:
+        if default_storage.exists(pending):
+            default_storage.delete(pending)
+    return path
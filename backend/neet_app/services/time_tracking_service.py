@@ -0,0 +1,231 @@
+"""
+Question-visit telemetry ingestion for live tests.
+
+Visit events are coalesced per question and applied with atomic F()
+increments: one INSERT ... ON CONFLICT DO NOTHING for missing TestAnswer rows,
+one multi-row UPDATE for all touched answers and one UPDATE for the session
+total. When the Redis buffer is enabled, batches are first accumulated in a
+per-session hash and flushed periodically (and on submit) so bursts from
+many students collapse into a few statements.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, DateTimeField, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from neet_app.models import Question, TestAnswer, TestSession
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'tt:buf:{session_id}'
+DIRTY_SESSIONS_KEY = 'tt:dirty'
+BUFFER_TTL_SECONDS = 24 * 60 * 60
+
+# Per-event sanity bound: a single visit longer than this is treated as a client bug
+MAX_VISIT_SECONDS = 3 * 60 * 60
+
+
+class VisitIncrement:
+    """Coalesced telemetry for one question: total seconds, visits and first visit end."""
+    __slots__ = ('time_spent', 'visits', 'first_seen')
+
+    def __init__(self, time_spent=0, visits=0, first_seen=None):
+        self.time_spent = time_spent
+        self.visits = visits
+        self.first_seen = first_seen
+
+    def merge(self, time_spent, visits, seen_at):
+        self.time_spent += time_spent
+        self.visits += visits
+        if seen_at and (self.first_seen is None or seen_at < self.first_seen):
+            self.first_seen = seen_at
+
+
+def coalesce_visit_events(events: Iterable[Dict]) -> Tuple[Dict[int, VisitIncrement], List[Dict]]:
+    """
+    Validate raw visit events and fold them into one increment per question.
+
+    Each event: {"question_id": int, "time_spent": int, "visit_end_time": iso str (optional)}
+
+    Returns:
+        (increments by question_id, rejected events with a reason)
+    """
+    increments: Dict[int, VisitIncrement] = {}
+    rejected = []
+    for event in events:
+        try:
+            question_id = int(event['question_id'])
+            time_spent = int(event['time_spent'])
+        except (KeyError, TypeError, ValueError):
+            rejected.append({'event': event, 'reason': 'question_id and time_spent are required integers'})
+            continue
+        if time_spent < 0 or time_spent > MAX_VISIT_SECONDS:
+            rejected.append({'event': event, 'reason': 'time_spent out of range'})
+            continue
+
+        seen_at = None
+        if event.get('visit_end_time'):
+            try:
+                seen_at = parse_datetime(event['visit_end_time'])
+            except (ValueError, TypeError):
+                seen_at = None
+
+        increments.setdefault(question_id, VisitIncrement()).merge(time_spent, 1, seen_at)
+    return increments, rejected
+
+
+def apply_visit_increments(session_id: int, increments: Dict[int, VisitIncrement]) -> Dict:
+    """
+    Apply coalesced increments for one session in a constant number of statements.
+    Unknown question ids (no TestAnswer row and no Question) are skipped.
+
+    Returns:
+        {'questions': n applied, 'time_added': seconds, 'skipped_question_ids': [...]}
+    """
+    if not increments:
+        return {'questions': 0, 'time_added': 0, 'skipped_question_ids': []}
+
+    question_ids = list(increments)
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = set(
+            TestAnswer.objects.filter(session_id=session_id, question_id__in=question_ids)
+            .values_list('question_id', flat=True)
+        )
+        missing = [qid for qid in question_ids if qid not in existing]
+        skipped = []
+        if missing:
+            valid = set(Question.objects.filter(id__in=missing).values_list('id', flat=True))
+            skipped = [qid for qid in missing if qid not in valid]
+            # visit_count starts at 0 here and receives the batch's visits below
+            TestAnswer.objects.bulk_create(
+                [
+                    TestAnswer(
+                        session_id=session_id, question_id=qid, selected_answer=None,
+                        is_correct=False, time_taken=0, answered_at=None,
+                        marked_for_review=False, visit_count=0,
+                    )
+                    for qid in missing if qid in valid
+                ],
+                ignore_conflicts=True,
+            )
+
+        applied = {qid: inc for qid, inc in increments.items() if qid not in skipped}
+        if not applied:
+            return {'questions': 0, 'time_added': 0, 'skipped_question_ids': skipped}
+
+        time_case = Case(
+            *[When(question_id=qid, then=Value(inc.time_spent)) for qid, inc in applied.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+        visit_case = Case(
+            *[When(question_id=qid, then=Value(inc.visits)) for qid, inc in applied.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+        seen_case = Case(
+            *[When(question_id=qid, then=Value(inc.first_seen or now)) for qid, inc in applied.items()],
+            default=Value(now), output_field=DateTimeField(),
+        )
+        TestAnswer.objects.filter(session_id=session_id, question_id__in=list(applied)).update(
+            time_taken=Coalesce(F('time_taken'), Value(0)) + time_case,
+            visit_count=F('visit_count') + visit_case,
+            answered_at=Coalesce(F('answered_at'), seen_case),
+        )
+
+        time_added = sum(inc.time_spent for inc in applied.values())
+        if time_added:
+            TestSession.objects.filter(id=session_id).update(
+                total_time_taken=Coalesce(F('total_time_taken'), Value(0)) + Value(time_added)
+            )
+
+    return {'questions': len(applied), 'time_added': time_added, 'skipped_question_ids': skipped}
+
+
+# --- Redis coalescing buffer ---
+
+def buffer_enabled() -> bool:
+    return getattr(settings, 'TIME_TRACKING_BUFFER_ENABLED', False)
+
+
+def buffer_visit_increments(session_id: int, increments: Dict[int, VisitIncrement]) -> bool:
+    """
+    Add increments to the session's Redis hash. Returns False if Redis is
+    unavailable so the caller can apply directly.
+    """
+    from neet_app.utils.redis_client import get_redis
+
+    try:
+        client = get_redis()
+        key = BUFFER_KEY.format(session_id=session_id)
+        pipe = client.pipeline(transaction=True)
+        for qid, inc in increments.items():
+            pipe.hincrby(key, f't:{qid}', inc.time_spent)
+            pipe.hincrby(key, f'v:{qid}', inc.visits)
+            if inc.first_seen:
+                pipe.hsetnx(key, f'a:{qid}', inc.first_seen.isoformat())
+        pipe.expire(key, BUFFER_TTL_SECONDS)
+        pipe.sadd(DIRTY_SESSIONS_KEY, session_id)
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Time tracking buffer unavailable, applying directly: {e}")
+        return False
+
+
+def _drain_session_buffer(client, session_id) -> Dict[int, VisitIncrement]:
+    key = BUFFER_KEY.format(session_id=session_id)
+    pipe = client.pipeline(transaction=True)
+    pipe.hgetall(key)
+    pipe.delete(key)
+    pipe.srem(DIRTY_SESSIONS_KEY, session_id)
+    raw = pipe.execute()[0] or {}
+
+    increments: Dict[int, VisitIncrement] = {}
+    for field, value in raw.items():
+        kind, _, qid = field.partition(':')
+        inc = increments.setdefault(int(qid), VisitIncrement())
+        if kind == 't':
+            inc.time_spent += int(value)
+        elif kind == 'v':
+            inc.visits += int(value)
+        elif kind == 'a':
+            inc.first_seen = parse_datetime(value)
+    return increments
+
+
+def flush_time_tracking_buffer(session_id: Optional[int] = None) -> Dict:
+    """
+    Drain buffered increments into the database, for one session or every
+    dirty session. Failed sessions are pushed back into the buffer.
+    """
+    from neet_app.utils.redis_client import get_redis
+
+    try:
+        client = get_redis()
+        session_ids = [session_id] if session_id is not None else list(client.smembers(DIRTY_SESSIONS_KEY))
+    except Exception as e:
+        logger.warning(f"Time tracking buffer flush skipped, Redis unavailable: {e}")
+        return {'sessions': 0, 'questions': 0}
+
+    flushed_sessions = 0
+    flushed_questions = 0
+    for sid in session_ids:
+        sid = int(sid)
+        increments = _drain_session_buffer(client, sid)
+        if not increments:
+            continue
+        try:
+            result = apply_visit_increments(sid, increments)
+            flushed_sessions += 1
+            flushed_questions += result['questions']
+        except Exception:
+            logger.exception(f"Failed to flush time tracking buffer for session {sid}; re-buffering")
+            buffer_visit_increments(sid, increments)
+
+    return {'sessions': flushed_sessions, 'questions': flushed_questions}
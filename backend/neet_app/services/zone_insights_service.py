@@ -187,51 +187,103 @@ Topics Data:
 """
 
 
-def extract_wrong_and_skipped_questions(test_session_id: int, subject: str) -> Dict:
+# Subject label -> TestSession field holding that subject's topic names
+SUBJECT_TOPIC_FIELDS = {
+    'Physics': 'physics_topics',
+    'Chemistry': 'chemistry_topics',
+    'Botany': 'botany_topics',
+    'Zoology': 'zoology_topics',
+    'Biology': 'biology_topics',
+    'Math': 'math_topics',
+}
+
+# Answer/question/topic columns the insight extractors read (no image columns)
+ANSWER_VIEW_FIELDS = (
+    'id', 'selected_answer', 'is_correct', 'time_taken', 'question',
+    'question__id', 'question__question', 'question__option_a', 'question__option_b',
+    'question__option_c', 'question__option_d', 'question__correct_answer',
+    'question__misconceptions', 'question__topic', 'question__topic__id', 'question__topic__name',
+    'question__topic__subject',
+)
+
+
+class SessionAnswerView:
+    """
+    In-memory, per-subject view of one session's answers for insight generation.
+
+    Loaded with one TestSession query and one TestAnswer query; subject topic
+    names are resolved to ids through the process-local topic taxonomy, so the
+    extractors below cost no further queries however many subjects they cover.
+    """
+
+    def __init__(self, session, answers):
+        from ..utils.topic_taxonomy import get_topic_taxonomy
+
+        self.session = session
+        self.answers = answers
+        taxonomy = get_topic_taxonomy(names=[
+            name for field in SUBJECT_TOPIC_FIELDS.values() for name in getattr(session, field) or []
+        ])
+        self._topic_names = {}
+        self._answers_by_subject = {}
+        for subject, field in SUBJECT_TOPIC_FIELDS.items():
+            topic_names = getattr(session, field) or []
+            if not topic_names:
+                continue
+            topic_ids = set(taxonomy.ids_for_names(topic_names))
+            self._topic_names[subject] = topic_names
+            self._answers_by_subject[subject] = [
+                a for a in answers if a.question.topic_id in topic_ids
+            ]
+
+    @classmethod
+    def load(cls, test_session_id: int) -> 'SessionAnswerView':
+        from ..models import TestSession, TestAnswer
+
+        session = TestSession.objects.get(id=test_session_id)
+        answers = list(
+            TestAnswer.objects.filter(session_id=test_session_id)
+            .select_related('question__topic')
+            .only(*ANSWER_VIEW_FIELDS)
+            .order_by('id')
+        )
+        return cls(session, answers)
+
+    @property
+    def subjects(self) -> List[str]:
+        """Subjects with topics in this session, in SUBJECT_TOPIC_FIELDS order"""
+        return list(self._topic_names)
+
+    def subject_topic_names(self, subject: str) -> List[str]:
+        return self._topic_names.get(subject, [])
+
+    def answers_for(self, subject: str) -> List:
+        """Answers (ordered by id) whose question belongs to one of the subject's topics"""
+        return self._answers_by_subject.get(subject, [])
+
+
+def extract_wrong_and_skipped_questions(test_session_id: int, subject: str, view: Optional[SessionAnswerView] = None) -> Dict:
     """
     Extract wrong and skipped questions for a subject, grouped by topic.
     
     Args:
         test_session_id: ID of the test session
         subject: Subject name (Physics, Chemistry, Botany, Zoology, Biology, Math)
+        view: Preloaded SessionAnswerView (loaded here when omitted)
         
     Returns:
         Dict with topic-grouped data including accuracy, question count, avg time, and questions array
     """
     try:
-        from ..models import TestSession, TestAnswer, Topic
-        
-        test_session = TestSession.objects.get(id=test_session_id)
-        
-        # Get subject-specific topic names
-        subject_map = {
-            'Physics': test_session.physics_topics,
-            'Chemistry': test_session.chemistry_topics,
-            'Botany': test_session.botany_topics,
-            'Zoology': test_session.zoology_topics,
-            'Biology': test_session.biology_topics,
-            'Math': test_session.math_topics
-        }
-        
-        topic_names = subject_map.get(subject, [])
+        view = view or SessionAnswerView.load(test_session_id)
+        topic_names = view.subject_topic_names(subject)
         
         if not topic_names:
             print(f"⚠️ No topics found for {subject} in test {test_session_id}")
             return {}
         
-        # Convert topic names to IDs
-        topic_objects = Topic.objects.filter(name__in=topic_names)
-        topic_ids = list(topic_objects.values_list('id', flat=True))
-        
-        if not topic_ids:
-            print(f"⚠️ Could not find topic IDs for {subject} topics: {topic_names}")
-            return {}
-        
-        # Get ALL answers for those topics
-        all_answers = TestAnswer.objects.filter(
-            session_id=test_session_id,
-            question__topic_id__in=topic_ids
-        ).select_related('question', 'question__topic').order_by('id')
+        # All answers for the subject's topics (already loaded, ordered by id)
+        all_answers = view.answers_for(subject)
         
         # Group by topic and separate wrong/skipped from all
         from collections import defaultdict
@@ -316,51 +368,26 @@ def extract_wrong_and_skipped_questions(test_session_id: int, subject: str) -> D
         return {}
 
 
-def extract_correct_questions(test_session_id: int, subject: str) -> Dict:
+def extract_correct_questions(test_session_id: int, subject: str, view: Optional[SessionAnswerView] = None) -> Dict:
     """
     Extract correct questions when no wrong/skipped questions exist.
     
     Args:
         test_session_id: ID of the test session
         subject: Subject name
+        view: Preloaded SessionAnswerView (loaded here when omitted)
         
     Returns:
         Dict with topic-grouped correct questions
     """
     try:
-        from ..models import TestSession, TestAnswer, Topic
-        
-        test_session = TestSession.objects.get(id=test_session_id)
+        view = view or SessionAnswerView.load(test_session_id)
         
-        # Get subject-specific topic names
-        subject_map = {
-            'Physics': test_session.physics_topics,
-            'Chemistry': test_session.chemistry_topics,
-            'Botany': test_session.botany_topics,
-            'Zoology': test_session.zoology_topics,
-            'Biology': test_session.biology_topics,
-            'Math': test_session.math_topics
-        }
-        
-        topic_names = subject_map.get(subject, [])
-        
-        if not topic_names:
-            return {}
-        
-        # Convert topic names to IDs
-        topic_objects = Topic.objects.filter(name__in=topic_names)
-        topic_ids = list(topic_objects.values_list('id', flat=True))
-        
-        if not topic_ids:
-            print(f"⚠️ Could not find topic IDs for {subject} topics: {topic_names}")
+        if not view.subject_topic_names(subject):
             return {}
         
         # Get only correct answers
-        correct_answers = TestAnswer.objects.filter(
-            session_id=test_session_id,
-            question__topic_id__in=topic_ids,
-            is_correct=True
-        ).select_related('question', 'question__topic').order_by('id')[:20]
+        correct_answers = [a for a in view.answers_for(subject) if a.is_correct][:20]
         
         from collections import defaultdict
         topic_data = defaultdict(lambda: {
@@ -459,10 +486,12 @@ def generate_checkpoints_for_subject(subject: str, topics_data: Dict) -> List[Di
             print(f"⚠️ No relevant topics to send to LLM for {subject}")
             return get_fallback_checkpoints(subject)
 
-        topics_json = json.dumps(prompt_topics, indent=2)
-        prompt = prompt_template.format(
+        from .insight_prompt_builder import build_insight_prompt, fit_topics, subject_token_budget
+        prompt_topics = fit_topics(prompt_topics, subject_token_budget())
+        prompt = build_insight_prompt(
+            'checkpoint' if has_wrong_or_skipped else 'correct_understanding',
+            prompt_template, 'topics_json', prompt_topics,
             subject=subject,
-            topics_json=topics_json
         )
 
         logger.info(f"🚀 Using {'CHECKPOINT' if has_wrong_or_skipped else 'CORRECT_UNDERSTANDING'} prompt for {subject} with {len(prompt_topics)} topics")
@@ -665,25 +694,14 @@ def generate_all_subject_checkpoints(test_session_id: int) -> Dict[str, List[Dic
         Dict mapping subject names to their checkpoint lists
     """
     try:
-        from ..models import TestSession, TestSubjectZoneInsight
+        from ..models import TestSubjectZoneInsight
         
-        test_session = TestSession.objects.get(id=test_session_id)
+        # One extraction pass shared by every subject below
+        view = SessionAnswerView.load(test_session_id)
+        test_session = view.session
         
         # Determine which subjects are present
-        subjects_to_process = []
-        
-        if test_session.physics_topics:
-            subjects_to_process.append('Physics')
-        if test_session.chemistry_topics:
-            subjects_to_process.append('Chemistry')
-        if test_session.botany_topics:
-            subjects_to_process.append('Botany')
-        if test_session.zoology_topics:
-            subjects_to_process.append('Zoology')
-        if test_session.biology_topics:
-            subjects_to_process.append('Biology')
-        if test_session.math_topics:
-            subjects_to_process.append('Math')
+        subjects_to_process = view.subjects
         
         if not subjects_to_process:
             print(f"⚠️ No subjects found in test {test_session_id}")
@@ -697,12 +715,12 @@ def generate_all_subject_checkpoints(test_session_id: int) -> Dict[str, List[Dic
         for subject in subjects_to_process:
             try:
                 # Extract wrong/skipped questions
-                topics_data = extract_wrong_and_skipped_questions(test_session_id, subject)
+                topics_data = extract_wrong_and_skipped_questions(test_session_id, subject, view=view)
                 
                 # If no wrong/skipped, try correct questions
                 if not topics_data or not topics_data.get('topics'):
                     print(f"ℹ️ No wrong/skipped questions for {subject}, checking correct answers")
-                    topics_data = extract_correct_questions(test_session_id, subject)
+                    topics_data = extract_correct_questions(test_session_id, subject, view=view)
                 
                 if not topics_data or not topics_data.get('topics'):
                     print(f"⚠️ No questions found for {subject}, skipping")
@@ -861,9 +879,10 @@ def compute_and_store_zone_insights(test_session_id: int) -> Dict[str, Dict]:
     """
     try:
         print(f"🔄 compute_and_store_zone_insights START for test {test_session_id}")
-        from ..models import TestSession, TestAnswer, TestSubjectZoneInsight
+        from ..models import TestSession, TestSubjectZoneInsight
         
-        test_session = TestSession.objects.get(id=test_session_id)
+        view = SessionAnswerView.load(test_session_id)
+        test_session = view.session
         
         # Helper to normalize subject name
         def _normalize_subject(s: str) -> str:
@@ -884,8 +903,8 @@ def compute_and_store_zone_insights(test_session_id: int) -> Dict[str, Dict]:
                 return 'Math'
             return s.strip()
         
-        # Fetch all answers for this test
-        answers = TestAnswer.objects.filter(session_id=test_session_id).select_related('question__topic')
+        # All answers for this test (loaded once by the view)
+        answers = view.answers
         
         # Group answers by subject
         from collections import defaultdict
@@ -957,7 +976,7 @@ def compute_and_store_zone_insights(test_session_id: int) -> Dict[str, Dict]:
         
         
         # Compute overall aggregates and persist a single per-test row
-        total_questions = answers.count()
+        total_questions = len(answers)
         total_correct = sum(1 for a in answers if a.is_correct)
         total_incorrect = sum(1 for a in answers if a.selected_answer and not a.is_correct)
         total_skipped = sum(1 for a in answers if not a.selected_answer)
@@ -1143,7 +1162,7 @@ def compute_and_store_zone_insights(test_session_id: int) -> Dict[str, Dict]:
         return {}
 
 
-def extract_focus_zone_data(test_session_id: int) -> Dict:
+def extract_focus_zone_data(test_session_id: int, view: Optional[SessionAnswerView] = None) -> Dict:
     """
     Extract wrong and skipped questions for focus zone generation.
     Groups by subject -> topic -> questions with full metadata.
@@ -1151,6 +1170,7 @@ def extract_focus_zone_data(test_session_id: int) -> Dict:
     
     Args:
         test_session_id: ID of the test session
+        view: Preloaded SessionAnswerView (loaded here when omitted)
         
     Returns:
         Dict with structure:
@@ -1179,42 +1199,15 @@ def extract_focus_zone_data(test_session_id: int) -> Dict:
         }
     """
     try:
-        from ..models import TestSession, TestAnswer, Topic
         from collections import defaultdict
         
-        test_session = TestSession.objects.get(id=test_session_id)
-        
-        # Define subjects to process
-        subjects = ['Physics', 'Chemistry', 'Botany', 'Zoology', 'Biology', 'Math']
-        subject_map = {
-            'Physics': test_session.physics_topics,
-            'Chemistry': test_session.chemistry_topics,
-            'Botany': test_session.botany_topics,
-            'Zoology': test_session.zoology_topics,
-            'Biology': test_session.biology_topics,
-            'Math': test_session.math_topics
-        }
+        view = view or SessionAnswerView.load(test_session_id)
         
         result = {}
         
-        for subject in subjects:
-            topic_names = subject_map.get(subject, [])
-            
-            if not topic_names:
-                continue
-            
-            # Convert topic names to IDs
-            topic_objects = Topic.objects.filter(name__in=topic_names)
-            topic_ids = list(topic_objects.values_list('id', flat=True))
-            
-            if not topic_ids:
-                continue
-            
-            # Get all answers for these topics
-            answers = TestAnswer.objects.filter(
-                session_id=test_session_id,
-                question__topic_id__in=topic_ids
-            ).select_related('question', 'question__topic').order_by('id')
+        for subject in view.subjects:
+            # All answers for the subject's topics (already loaded, ordered by id)
+            answers = view.answers_for(subject)
             
             # Group by topic
             topic_data = defaultdict(list)
@@ -1299,27 +1292,16 @@ def generate_focus_zone(test_session_id: int) -> Dict:
     """
     try:
         print(f"🎯 generate_focus_zone START for test {test_session_id}")
-        from ..models import TestSession, TestSubjectZoneInsight
+        from ..models import TestSubjectZoneInsight
         
-        test_session = TestSession.objects.get(id=test_session_id)
+        view = SessionAnswerView.load(test_session_id)
+        test_session = view.session
         
         # Get expected subjects from test session
-        expected_subjects = []
-        subject_map = {
-            'Physics': test_session.physics_topics,
-            'Chemistry': test_session.chemistry_topics,
-            'Botany': test_session.botany_topics,
-            'Zoology': test_session.zoology_topics,
-            'Biology': test_session.biology_topics,
-            'Math': test_session.math_topics
-        }
-        
-        for subject, topics in subject_map.items():
-            if topics:
-                expected_subjects.append(subject)
+        expected_subjects = view.subjects
         
         # Extract wrong and skipped questions
-        focus_data = extract_focus_zone_data(test_session_id)
+        focus_data = extract_focus_zone_data(test_session_id, view=view)
         
         # Check which subjects have actual question data
         subjects_with_data = []
@@ -1411,8 +1393,10 @@ def generate_focus_zone(test_session_id: int) -> Dict:
                 return result
             
             # Prepare prompt
-            data_json = json.dumps(filtered_focus_data, indent=2)
-            prompt = FOCUS_ZONE_PROMPT.format(data_json=data_json)
+            from .insight_prompt_builder import build_insight_prompt, fit_subject_payload
+            prompt = build_insight_prompt(
+                'focus_zone', FOCUS_ZONE_PROMPT, 'data_json', fit_subject_payload(filtered_focus_data)
+            )
             
             logger.info(f"🚀 Generating focus zone for test {test_session_id} using {client.model_name} for subjects: {subjects_with_data}")
         
@@ -1715,8 +1699,10 @@ def parse_repeated_mistakes_response(llm_response: str) -> Optional[Dict]:
 
 def extract_repeated_mistakes_data(student_id: str) -> Dict:
     """
-    Extract wrong answers from ALL platform tests for a student.
-    Groups by subject → topic → test → questions.
+    Extract repeated-mistake input for a student from their mistake ledger.
+    Groups by subject → topic → test → questions, capped in size
+    (see services/mistake_ledger_service.py). An empty ledger is backfilled
+    from the student's most recent completed platform tests.
     
     Args:
         student_id: Student's ID
@@ -1755,123 +1741,17 @@ def extract_repeated_mistakes_data(student_id: str) -> Dict:
         }
     """
     try:
-        from ..models import TestSession, TestAnswer, Topic, PlatformTest
-        from collections import defaultdict
-        
-        # Get all completed platform tests for this student
-        platform_tests = TestSession.objects.filter(
-            student_id=student_id,
-            test_type='platform',
-            is_completed=True
-        ).order_by('-end_time')
-        
-        if not platform_tests.exists():
-            logger.warning(f"No completed platform tests found for student {student_id}")
-            return {}
-        
-        logger.info(f"📊 Found {platform_tests.count()} platform tests for student {student_id}")
-        
-        # Define subjects to process
-        subjects = ['Physics', 'Chemistry', 'Botany', 'Zoology', 'Biology', 'Math']
-        result = {}
-        
-        for subject in subjects:
-            # Structure: topic_name -> test_id -> questions list
-            topic_test_data = defaultdict(lambda: defaultdict(list))
-            
-            for test_session in platform_tests:
-                # Get subject-specific topic names for this test
-                subject_map = {
-                    'Physics': test_session.physics_topics,
-                    'Chemistry': test_session.chemistry_topics,
-                    'Botany': test_session.botany_topics,
-                    'Zoology': test_session.zoology_topics,
-                    'Biology': test_session.biology_topics,
-                    'Math': test_session.math_topics
-                }
-                
-                topic_names = subject_map.get(subject, [])
-                
-                if not topic_names:
-                    continue
-                
-                # Convert topic names to IDs
-                topic_objects = Topic.objects.filter(name__in=topic_names)
-                topic_ids = list(topic_objects.values_list('id', flat=True))
-                
-                if not topic_ids:
-                    continue
-                
-                # Get ONLY wrong answers for these topics in this test
-                wrong_answers = TestAnswer.objects.filter(
-                    session_id=test_session.id,
-                    question__topic_id__in=topic_ids,
-                    selected_answer__isnull=False,  # Must have selected an answer
-                    is_correct=False  # Wrong answer
-                ).select_related('question', 'question__topic').order_by('id')
-                
-                # Get test name
-                if test_session.platform_test:
-                    test_name = test_session.platform_test.test_name
-                else:
-                    test_name = f"Test #{test_session.id}"
-                
-                # Group by topic
-                for answer in wrong_answers:
-                    q = answer.question
-                    topic_name = q.topic.name
-                    
-                    # Extract misconception
-                    misconception_text = None
-                    if answer.selected_answer:
-                        misconceptions = q.misconceptions or {}
-                        selected_option = answer.selected_answer.upper()
-                        misconception_text = misconceptions.get(f"option_{selected_option.lower()}", None)
-                    
-                    question_entry = {
-                        'question_id': q.id,
-                        'question': q.question if q.question else '',
-                        'options': {
-                            'A': q.option_a,
-                            'B': q.option_b,
-                            'C': q.option_c,
-                            'D': q.option_d,
-                        },
-                        'correct_answer': q.correct_answer if q.correct_answer else None,
-                        'selected_answer': answer.selected_answer if answer.selected_answer else None,
-                        'misconception': misconception_text
-                    }
-                    
-                    topic_test_data[topic_name][test_session.id].append(question_entry)
-            
-            # Structure the data for LLM
-            if topic_test_data:
-                topics_list = []
-                for topic_name, tests_dict in topic_test_data.items():
-                    tests_list = []
-                    for test_id, questions in tests_dict.items():
-                        # Get test name
-                        test_session = TestSession.objects.get(id=test_id)
-                        if test_session.platform_test:
-                            test_name = test_session.platform_test.test_name
-                        else:
-                            test_name = f"Test #{test_id}"
-                        
-                        tests_list.append({
-                            'test_name': test_name,
-                            'test_id': test_id,
-                            'questions': questions
-                        })
-                    
-                    topics_list.append({
-                        'topic_name': topic_name,
-                        'tests': tests_list
-                    })
-                
-                result[subject] = {
-                    'topics': topics_list
-                }
-        
+        from .mistake_ledger_service import (
+            backfill_student_ledger, build_repeated_mistakes_corpus, ledger_is_empty
+        )
+
+        if ledger_is_empty(student_id):
+            backfill_student_ledger(student_id)
+
+        result = build_repeated_mistakes_corpus(student_id)
+        if not result:
+            logger.warning(f"No ledger mistakes found for student {student_id}")
+
         logger.info(f"📊 Extracted repeated mistakes data for {len(result)} subjects")
         return result
         
@@ -1907,6 +1787,14 @@ def generate_repeated_mistakes(student_id: str, test_session_id: int) -> Dict:
         
         # Get test session to determine expected subjects
         test_session = TestSession.objects.get(id=test_session_id)
+
+        # Every path to the corpus (Celery, fallback thread, on-demand view) lands this
+        # test's wrong answers in the mistake ledger first; idempotent per session
+        try:
+            from .mistake_ledger_service import record_session_mistakes
+            record_session_mistakes(test_session_id)
+        except Exception as ledger_err:
+            logger.error(f'Mistake ledger append failed for session {test_session_id}: {ledger_err}')
         
         # Get expected subjects from test session
         expected_subjects = []
@@ -2043,8 +1931,10 @@ def generate_repeated_mistakes(student_id: str, test_session_id: int) -> Dict:
                 return result
             
             # Prepare prompt
-            data_json = json.dumps(filtered_repeated_data, indent=2)
-            prompt = REPEATED_MISTAKES_PROMPT.format(data_json=data_json)
+            from .insight_prompt_builder import build_insight_prompt, fit_subject_payload
+            prompt = build_insight_prompt(
+                'repeated_mistakes', REPEATED_MISTAKES_PROMPT, 'data_json', fit_subject_payload(filtered_repeated_data)
+            )
             
             logger.info(f"🚀 Generating repeated mistakes for student {student_id} using {client.model_name} for subjects: {subjects_with_data}")
         
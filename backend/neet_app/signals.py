@@ -1,61 +1,18 @@
 """
 Django signals for automatic data processing in NEET app models
 """
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import StudentProfile, TestSession
+from .models import (
+    StudentProfile, TestSession, PlatformTest, Institution, Topic, PreviousYearQuestionPaper
+)
+from .utils.cache import invalidate_cache_tags
+from .utils.topic_taxonomy import invalidate_topic_taxonomy
 
 # Global set to track processed sessions to prevent infinite loops
 _processed_sessions = set()
 
 
-@receiver(post_save, sender=TestSession)
-def update_subject_scores_on_completion(sender, instance, created, **kwargs):
-    """
-    Automatically update subject scores when a test session is marked as completed.
-    
-    **Important**: This signal now has minimal responsibility. The main test processing
-    pipeline (compute results → zone insights → student insights) is handled by the
-    process_test_submission_task orchestrator enqueued from the submit() endpoint.
-    
-    This signal only:
-    1. Updates subject-level scores for the session
-    2. Skips duplicate processing using in-process cache
-    
-    The orchestrator task in tasks.py handles all heavy processing on workers.
-    """
-    # Create unique key for this session and operation
-    session_key = f"scores_{instance.id}_{instance.is_completed}"
-    
-    # Only process if the session is completed and hasn't been processed yet
-    if instance.is_completed and session_key not in _processed_sessions:
-        _processed_sessions.add(session_key)
-        
-        try:
-            # Check if there are any test answers for this session
-            from .models import TestAnswer
-            answer_count = TestAnswer.objects.filter(session=instance).count()
-            
-            if answer_count > 0:
-                print(f"🔄 Auto-updating subject scores for completed session {instance.id}")
-                instance.calculate_and_update_subject_scores()
-                print(f"✅ Subject scores updated for session {instance.id}")
-                
-                # NOTE: Insights generation is now handled by process_test_submission_task
-                # orchestrator enqueued from submit() endpoint. We don't duplicate that here
-                # to avoid race conditions and duplicate work.
-                print(f"ℹ️ Insights pipeline will be handled by orchestrator task for session {instance.id}")
-            else:
-                print(f"⚠️ No answers found for session {instance.id}, skipping score calculation")
-                
-        except Exception as e:
-            print(f"❌ Failed to auto-update subject scores for session {instance.id}: {e}")
-        finally:
-            # Clean up old entries to prevent memory issues
-            if len(_processed_sessions) > 1000:
-                _processed_sessions.clear()
-
-
 @receiver(pre_save, sender=StudentProfile)
 def generate_student_credentials(sender, instance, **kwargs):
     """
@@ -120,3 +77,28 @@ def update_student_statistics(sender, instance, **kwargs):
             pass  # Student profile doesn't exist, skip statistics update
         except Exception as e:
             print(f"❌ Failed to update statistics for session {instance.id}: {e}")
+        finally:
+            # Clean up old entries to prevent memory issues
+            if len(_processed_sessions) > 1000:
+                _processed_sessions.clear()
+
+
+# --- Cache invalidation for cached catalog reads (see utils/cache.py) ---
+
+@receiver([post_save, post_delete], sender=PlatformTest)
+@receiver([post_save, post_delete], sender=Institution)
+def invalidate_platform_test_cache(sender, instance, **kwargs):
+    """Platform test listings embed institution data, so both models bump the tag"""
+    invalidate_cache_tags('platform_tests')
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def invalidate_topic_cache(sender, instance, **kwargs):
+    """Topic changes invalidate the shared topic list and every process's taxonomy"""
+    invalidate_cache_tags('topics')
+    invalidate_topic_taxonomy()
+
+
+@receiver([post_save, post_delete], sender=PreviousYearQuestionPaper)
+def invalidate_pyq_cache(sender, instance, **kwargs):
+    invalidate_cache_tags('pyqs')
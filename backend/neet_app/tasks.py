@@ -33,7 +33,9 @@ except ImportError:
 def generate_misconceptions_task(self, test_id: int):
     """
     Generate misconceptions for all MCQ questions in a test.
-    Runs asynchronously after test upload.
+    Runs asynchronously after test upload: plans a MisconceptionJob and
+    dispatches its batches (process_misconception_batch_task), which finish
+    the job and set the test's status when the last batch is done.
     
     Args:
         test_id: PlatformTest ID
@@ -41,51 +43,28 @@ def generate_misconceptions_task(self, test_id: int):
     Returns:
         Dict with processing statistics
     """
-    from django.utils import timezone
     from .models import PlatformTest
     
     try:
-        # Update test status to 'processing'
-        try:
-            test = PlatformTest.objects.get(id=test_id)
-            test.misconception_generation_status = 'processing'
-            test.save(update_fields=['misconception_generation_status', 'updated_at'])
-        except PlatformTest.DoesNotExist:
-            logger.error(f'Test {test_id} not found')
-            return {'status': 'error', 'error': 'Test not found'}
-        
-        from .services.misconception_service import generate_misconceptions_for_test
+        from .services.misconception_service import job_stats, start_misconception_job
         
         logger.info(f'🧠 Generating misconceptions for test {test_id}')
         print(f"🧠 Starting misconception generation for test {test_id}")
         
-        # Generate misconceptions
-        result = generate_misconceptions_for_test(test_id, batch_size=20)
-        
-        if result['success']:
-            # Update status to 'completed'
-            test.misconception_generation_status = 'completed'
-            test.misconception_generated_at = timezone.now()
-            test.save(update_fields=['misconception_generation_status', 'misconception_generated_at', 'updated_at'])
-            
-            logger.info(
-                f'✅ Misconceptions generated for test {test_id}: '
-                f'{result["processed"]}/{result["total_questions"]} questions processed, '
-                f'{result["failed"]} failed, '
-                f'subjects: {", ".join(result["subjects_processed"])}'
-            )
-            print(
-                f"✅ Misconceptions complete: {result['processed']}/{result['total_questions']} questions, "
-                f"{result['failed']} failed"
-            )
-        else:
-            # Update status to 'failed'
-            test.misconception_generation_status = 'failed'
-            test.save(update_fields=['misconception_generation_status', 'updated_at'])
-            
-            logger.error(f'❌ Misconception generation failed for test {test_id}: {result.get("error")}')
-            print(f"❌ Misconception generation failed: {result.get('error')}")
+        try:
+            job = start_misconception_job(test_id, batch_size=20)
+        except PlatformTest.DoesNotExist:
+            logger.error(f'Test {test_id} not found')
+            return {'status': 'error', 'error': 'Test not found'}
         
+        job.refresh_from_db()
+        result = job_stats(job)
+        result['status'] = job.status
+        logger.info(
+            f'🧠 Misconception job {job.id} for test {test_id} is {job.status}: '
+            f'{result["processed"]}/{result["total_questions"]} questions processed so far, '
+            f'{result["failed"]} failed, {result["reused"]} reused'
+        )
         return result
         
     except Exception as e:
@@ -109,6 +88,31 @@ def generate_misconceptions_task(self, test_id: int):
         }
 
 
+@shared_task(
+    bind=True,
+    soft_time_limit=300,  # 5 minutes
+    time_limit=600,  # 10 minutes
+    name='neet_app.tasks.process_misconception_batch_task'
+)
+def process_misconception_batch_task(self, batch_id: int):
+    """
+    Process one misconception batch, then queue the job's next pending batch
+    (keeping the job's parallelism bounded) or finish the job.
+    Failed batches are recorded on the row and retried via resume, not here.
+    """
+    from .models import MisconceptionBatch
+    from .services.misconception_service import dispatch_misconception_batches, run_misconception_batch
+
+    job_id = MisconceptionBatch.objects.filter(id=batch_id).values_list('job_id', flat=True).first()
+    if job_id is None:
+        return {'status': 'error', 'error': 'Batch not found'}
+    try:
+        run_misconception_batch(batch_id)
+    finally:
+        dispatch_misconception_batches(job_id)
+    return {'status': 'ok', 'batch_id': batch_id}
+
+
 @shared_task(
     bind=True,
     autoretry_for=(Exception,),
@@ -177,6 +181,8 @@ def compute_results_task(self, session_id: int):
         if session.correct_answers is not None and session.correct_answers >= 0:
             logger.info(f'⏭️ Results already computed for session {session_id}, skipping')
             print(f"⏭️ Results already computed for session {session_id}")
+            # Subject scores belong to the result-scoring stage; no-op once the marker is set
+            session.calculate_and_update_subject_scores(only_if_missing=True)
             return {
                 'status': 'skipped',
                 'session_id': session_id,
@@ -266,6 +272,9 @@ def compute_results_task(self, session_id: int):
         session.incorrect_answers = incorrect_answers_count
         session.unanswered = unanswered_questions_count
         session.save(update_fields=['correct_answers', 'incorrect_answers', 'unanswered'])
+
+        # Subject scores from the freshly persisted correctness (one grouped aggregate)
+        session.calculate_and_update_subject_scores(only_if_missing=True)
         
         logger.info(
             f'✅ Results computed for session {session_id}: '
@@ -296,6 +305,312 @@ def compute_results_task(self, session_id: int):
         }
 
 
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3},
+    retry_backoff=True,
+    soft_time_limit=60,
+    time_limit=120,
+    name='neet_app.tasks.compute_subject_scores_task'
+)
+def compute_subject_scores_task(self, session_id: int):
+    """
+    Persist subject-wise scores for a completed session.
+
+    Enqueued on commit by schedule_subject_scores() when a session is submitted
+    or quit, so the request never computes them inline. Idempotent via
+    TestSession.subject_scores_computed_at: the scores and marker are written by
+    one conditional UPDATE, so retries and duplicate enqueues are no-ops.
+
+    Args:
+        session_id: TestSession ID
+
+    Returns:
+        Dict with status ('success' | 'skipped' | 'error') and session_id
+    """
+    from .models import TestSession
+
+    try:
+        session = TestSession.objects.get(id=session_id)
+    except TestSession.DoesNotExist:
+        logger.error(f'TestSession {session_id} not found for subject scores')
+        return {'status': 'error', 'error': 'Session not found', 'session_id': session_id}
+
+    if not session.is_completed:
+        return {'status': 'skipped', 'session_id': session_id, 'message': 'Session not completed'}
+
+    if session.calculate_and_update_subject_scores(only_if_missing=True) is None:
+        return {'status': 'skipped', 'session_id': session_id, 'message': 'Subject scores already computed'}
+
+    logger.info(f'✅ Subject scores computed for session {session_id}')
+    return {'status': 'success', 'session_id': session_id}
+
+
+def schedule_subject_scores(session_id: int):
+    """
+    Enqueue compute_subject_scores_task once the current transaction commits.
+    Falls back to computing inline only when the broker cannot be reached.
+    """
+    from django.db import transaction
+
+    def _enqueue():
+        try:
+            if CELERY_AVAILABLE:
+                compute_subject_scores_task.delay(session_id)
+                return
+        except Exception as e:
+            logger.warning(f'Could not enqueue subject scores for session {session_id}: {e}')
+
+        from .models import TestSession
+        session = TestSession.objects.filter(id=session_id).first()
+        if session is not None:
+            session.calculate_and_update_subject_scores(only_if_missing=True)
+
+    transaction.on_commit(_enqueue)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3},
+    retry_backoff=True,
+    soft_time_limit=60,
+    time_limit=120,
+    name='neet_app.tasks.update_test_cohort_task'
+)
+def update_test_cohort_task(self, session_id: int):
+    """
+    Fold a scored platform-test session into its test's cohort aggregates.
+    Idempotent via TestSession.cohort_aggregated_at.
+    """
+    from .services.cohort_analytics_service import record_session_in_cohort
+
+    added = record_session_in_cohort(session_id)
+    return {'status': 'success' if added else 'skipped', 'session_id': session_id}
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=600,
+    time_limit=900,
+    name='neet_app.tasks.rebuild_test_cohort_task'
+)
+def rebuild_test_cohort_task(self, test_id: int):
+    """Recompute a platform test's cohort aggregates from all its completed sessions."""
+    from django.core.cache import cache
+    from .services.cohort_analytics_service import rebuild_marker_key, rebuild_test_cohort
+
+    try:
+        sessions = rebuild_test_cohort(test_id)
+    finally:
+        cache.delete(rebuild_marker_key(test_id))
+    logger.info(f'Rebuilt cohort aggregates for test {test_id} from {sessions} sessions')
+    return {'status': 'success', 'test_id': test_id, 'sessions': sessions}
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=600,
+    time_limit=900,
+    name='neet_app.tasks.export_student_questions_task'
+)
+def export_student_questions_task(self, institution_id: int, export_id: str, student_id: str,
+                                  session_ids: list, question_types: list):
+    """Generate a student's question-level XLSX export into default_storage."""
+    from .services.student_question_export import write_xlsx_export
+
+    path = write_xlsx_export(institution_id, export_id, student_id, session_ids, question_types)
+    return {'status': 'success', 'export_id': export_id, 'path': path}
+
+
+def schedule_cohort_update(session_id: int):
+    """
+    Enqueue update_test_cohort_task once the current transaction commits.
+    Falls back to aggregating inline only when the broker cannot be reached.
+    """
+    from django.db import transaction
+
+    def _enqueue():
+        try:
+            if CELERY_AVAILABLE:
+                update_test_cohort_task.delay(session_id)
+                return
+        except Exception as e:
+            logger.warning(f'Could not enqueue cohort update for session {session_id}: {e}')
+
+        from .services.cohort_analytics_service import record_session_in_cohort
+        try:
+            record_session_in_cohort(session_id)
+        except Exception:
+            logger.exception(f'Cohort update failed for session {session_id}')
+
+    transaction.on_commit(_enqueue)
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=120,
+    time_limit=180,
+    name='neet_app.tasks.deliver_notifications_task'
+)
+def deliver_notifications_task(self, notification_ids: list = None, max_batches: int = 10):
+    """
+    Send due Notification outbox rows, one mail connection per batch.
+
+    Enqueued on commit for freshly queued rows (notification_ids) and scheduled
+    by Celery beat without ids to drain retries and rows queued while the broker
+    was down. Failures are retried with backoff through Notification.next_attempt_at
+    rather than Celery retries, so the outbox row stays the source of truth.
+
+    Returns:
+        Dict with the number of notifications claimed, sent, retried and failed
+    """
+    from .notifications import deliver_notifications
+
+    totals = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+    for _ in range(1 if notification_ids else max_batches):
+        stats = deliver_notifications(notification_ids)
+        for key, value in stats.items():
+            totals[key] += value
+        if not stats['claimed']:
+            break
+    if totals['claimed']:
+        logger.info(
+            f"Delivered notifications: {totals['sent']} sent, {totals['retried']} to retry, "
+            f"{totals['failed']} failed"
+        )
+    return totals
+
+
+def schedule_notification_delivery(notification_id: int):
+    """
+    Enqueue deliver_notifications_task for a queued notification once the current
+    transaction commits. Mail is never sent inline: if the broker cannot be
+    reached the row stays pending for the periodic beat delivery.
+    """
+    from django.db import transaction
+
+    def _enqueue():
+        try:
+            if CELERY_AVAILABLE:
+                deliver_notifications_task.delay([notification_id])
+                return
+        except Exception as e:
+            logger.warning(f'Could not enqueue delivery of notification {notification_id}: {e}')
+        logger.info(f'Notification {notification_id} left pending for periodic delivery')
+
+    transaction.on_commit(_enqueue)
+
+
+def _queue_and_deliver(notification):
+    from .notifications import deliver_notifications
+
+    if notification is None:
+        return {'status': 'skipped', 'message': 'No email address or already queued'}
+    stats = deliver_notifications([notification.id])
+    return {'status': 'sent' if stats['sent'] else 'pending', 'notification_id': notification.id}
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=60,
+    time_limit=120,
+    name='neet_app.tasks.send_welcome_email_task'
+)
+def send_welcome_email_task(self, student_id: str):
+    """Queue and deliver the welcome email for a student through the outbox."""
+    from .models import StudentProfile
+    from .notifications import queue_welcome_email
+
+    student = StudentProfile.objects.filter(student_id=student_id).first()
+    if student is None:
+        return {'status': 'error', 'error': 'Student not found', 'student_id': student_id}
+    return _queue_and_deliver(queue_welcome_email(student))
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=60,
+    time_limit=120,
+    name='neet_app.tasks.send_test_result_email_task'
+)
+def send_test_result_email_task(self, student_id: str, results: dict):
+    """Queue and deliver a test result email for a student through the outbox."""
+    from .models import StudentProfile
+    from .notifications import queue_test_result_email
+
+    student = StudentProfile.objects.filter(student_id=student_id).first()
+    if student is None:
+        return {'status': 'error', 'error': 'Student not found', 'student_id': student_id}
+    return _queue_and_deliver(queue_test_result_email(student, results))
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=60,
+    time_limit=120,
+    name='neet_app.tasks.send_inactivity_reminder_task'
+)
+def send_inactivity_reminder_task(self, student_id: str, last_test_date=None):
+    """Queue and deliver an inactivity reminder through the outbox (last_test_date may be ISO text)."""
+    from django.utils.dateparse import parse_datetime
+    from .models import StudentProfile
+    from .notifications import queue_inactivity_reminder
+
+    student = StudentProfile.objects.filter(student_id=student_id).first()
+    if student is None:
+        return {'status': 'error', 'error': 'Student not found', 'student_id': student_id}
+    if isinstance(last_test_date, str):
+        last_test_date = parse_datetime(last_test_date)
+    return _queue_and_deliver(queue_inactivity_reminder(student, last_test_date=last_test_date))
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=30,
+    time_limit=60,
+    name='neet_app.tasks.flush_time_tracking_buffer_task'
+)
+def flush_time_tracking_buffer_task(self):
+    """
+    Drain the Redis time-tracking buffer for all dirty sessions into the database.
+    Scheduled every few seconds by Celery beat; see services/time_tracking_service.py.
+
+    Returns:
+        Dict with the number of sessions and questions flushed
+    """
+    from .services.time_tracking_service import flush_time_tracking_buffer
+
+    result = flush_time_tracking_buffer()
+    if result['sessions']:
+        logger.info(f"Flushed time tracking buffer: {result['sessions']} sessions, {result['questions']} questions")
+    return result
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=30,
+    time_limit=60,
+    name='neet_app.tasks.persist_heartbeats_task'
+)
+def persist_heartbeats_task(self):
+    """
+    Bulk-persist the latest Redis presence heartbeat per session to
+    TestSession.last_heartbeat and prune expired presence entries.
+    Scheduled by Celery beat; see services/live_presence_service.py.
+
+    Returns:
+        Dict with the number of sessions persisted
+    """
+    from .services.live_presence_service import persist_heartbeats
+
+    persisted = persist_heartbeats()
+    if persisted:
+        logger.info(f"Persisted heartbeats for {persisted} sessions")
+    return {'persisted': persisted}
+
+
 @shared_task(
     bind=True,
     autoretry_for=(Exception,),
@@ -402,6 +717,7 @@ def generate_zone_insights_task(self, session_id: int):
             f'✅ Zone insights computed for session {session_id}: '
             f'{len(zone_results)} subjects processed'
         )
+
         print(f"✅ Zone insights complete: {len(zone_results)} subjects processed")
         # NOTE: Do not run LLM-derived generation (focus_zone, repeated_mistake)
         # inline inside this task. LLM work is heavy and may be retried or
@@ -31,7 +31,7 @@ from .views.platform_test_views import (
     list_available_platform_tests, start_platform_test, get_platform_test_details
 )
 from .views.platform_admin_views import (
-    dashboard_home, metrics_api, session_heartbeat
+    dashboard_home, metrics_api, session_heartbeat, profiles_list, profile_detail, profiles_api
 )
 from .views.platform_admin_views import (
     platform_login, platform_logout, tests_list, tests_create, tests_edit, tests_delete
@@ -40,12 +40,13 @@ from .views.institution_admin_views import (
     institution_admin_login, get_exam_types, upload_test, 
     list_institution_tests as admin_list_institution_tests,
     toggle_test_status, get_test_details, upload_offline_results,
-    generate_misconceptions
+    generate_misconceptions, resume_misconceptions
 )
 from .views.institution_answer_key_views import upload_answer_key
 from .views.institution_json_update_views import upload_json_updates
 from .views.institution_analytics_views import (
-    list_institution_students, get_student_performance, download_student_questions
+    list_institution_students, get_student_performance, download_student_questions, get_student_question_export,
+    get_test_cohort_analytics
 )
 from .views.institution_student_views import (
     verify_institution_code, list_institution_tests, link_student_to_institution
@@ -162,6 +163,9 @@ urlpatterns = [
     path('platform-admin/', dashboard_home, name='platform-admin-home'),
     path('platform-admin/api/metrics/', metrics_api, name='platform-admin-metrics-api'),
     path('platform-admin/api/sessions/<int:pk>/heartbeat/', session_heartbeat, name='platform-admin-session-heartbeat'),
+    path('platform-admin/profiles/', profiles_list, name='platform-admin-profiles'),
+    path('platform-admin/profiles/<str:report_id>/', profile_detail, name='platform-admin-profile-detail'),
+    path('platform-admin/api/profiles/', profiles_api, name='platform-admin-profiles-api'),
     # new platform-admin auth and UI
     path('platform-admin/login/', platform_login, name='platform-admin-login'),
     path('platform-admin/logout/', platform_logout, name='platform-admin-logout'),
@@ -182,11 +186,14 @@ urlpatterns = [
     path('institution-admin/tests/<int:test_id>/', get_test_details, name='institution-admin-test-details'),
     path('institution-admin/tests/<int:test_id>/toggle/', toggle_test_status, name='institution-admin-toggle-test'),
     path('institution-admin/tests/<int:test_id>/generate-misconceptions/', generate_misconceptions, name='institution-admin-generate-misconceptions'),
+    path('institution-admin/tests/<int:test_id>/resume-misconceptions/', resume_misconceptions, name='institution-admin-resume-misconceptions'),
 
     # Institution Analytics endpoints (student performance dashboard)
     path('institution-admin/analytics/students/', list_institution_students, name='institution-admin-students-list'),
     path('institution-admin/analytics/students/<str:student_id>/performance/', get_student_performance, name='institution-admin-student-performance'),
     path('institution-admin/analytics/students/<str:student_id>/download/', download_student_questions, name='institution-admin-student-download'),
+    path('institution-admin/analytics/exports/<str:export_id>/', get_student_question_export, name='institution-admin-question-export'),
+    path('institution-admin/analytics/tests/<int:test_id>/cohort/', get_test_cohort_analytics, name='institution-admin-test-cohort'),
 
     # Institution Student endpoints
     path('institutions/verify-code/', verify_institution_code, name='verify-institution-code'),
@@ -0,0 +1,133 @@
+"""
+Shared Redis cache backend and cache-aside helpers.
+
+`SharedPoolRedisCache` is Django's built-in RedisCache wired to the
+connection pool from utils.redis_client, so the cache, OTP storage and
+Celery all talk to the same REDIS_URL and gunicorn/Celery workers share
+cached entries.
+
+`cache_aside` caches the return value of a plain function. Keys are
+versioned (namespace version + one version stamp per tag); calling
+`invalidate_cache_tags('platform_tests')` bumps the tag stamp so every
+entry carrying that tag is missed on the next read and left to expire.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient
+
+from .profiler import ProfiledCacheMixin
+from .redis_client import get_connection_pool
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+TAG_KEY_PREFIX = 'cachetag'
+ENTRY_KEY_PREFIX = 'cacheaside'
+
+
+class SharedPoolRedisCacheClient(RedisCacheClient):
+    """RedisCacheClient that reuses the process-wide pool instead of building its own."""
+
+    def _get_connection_pool(self, write):
+        # Cache values are pickled bytes, so use the non-decoding pool
+        return get_connection_pool(decode_responses=False)
+
+
+class SharedPoolRedisCache(ProfiledCacheMixin, RedisCache):
+    """
+    Django cache backend over settings.REDIS_URL using the shared pool.
+    LOCATION is kept for Django's sake but the pool always follows REDIS_URL.
+    Hits and misses are reported to the request profiler when one is active.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = SharedPoolRedisCacheClient
+
+
+def _tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    Return {tag: version_stamp}. Missing stamps (never set or evicted) are
+    initialised to the current time so stale entries can never match again.
+    """
+    if not tags:
+        return {}
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, tag in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            # add() keeps a concurrently initialised stamp if there is one
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[tag] = version
+    return versions
+
+
+def invalidate_cache_tags(*tags):
+    """Bump the version stamp of each tag, orphaning every entry that carries it."""
+    if not tags:
+        return
+    try:
+        stamp = time.time_ns()
+        cache.set_many({_tag_key(tag): stamp for tag in tags}, timeout=None)
+    except Exception as e:
+        logger.warning(f"Cache tag invalidation failed for {tags}: {e}")
+
+
+def _build_key(namespace, version, args, kwargs, tag_versions):
+    raw_args = repr((args, sorted(kwargs.items())))
+    raw_tags = ','.join(f'{tag}={tag_versions[tag]}' for tag in sorted(tag_versions))
+    digest = hashlib.md5(f'{raw_args}|{raw_tags}'.encode('utf-8')).hexdigest()
+    return f'{ENTRY_KEY_PREFIX}:{namespace}:v{version}:{digest}'
+
+
+def cache_aside(namespace, tags=(), timeout=300, version=1):
+    """
+    Cache-aside decorator for functions with hashable/reprable arguments.
+
+    Args:
+        namespace: Key namespace, unique per cached function
+        tags: Iterable of tag names, or a callable receiving the function's
+              arguments and returning them (for per-student tags)
+        timeout: Entry TTL in seconds
+        version: Bump when the cached payload shape changes
+
+    The wrapped function exposes `.uncached` for callers that need fresh data.
+    Cache failures are logged and fall through to the wrapped function.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            try:
+                key = _build_key(namespace, version, args, kwargs, get_tag_versions(list(entry_tags)))
+                value = cache.get(key, _MISSING)
+            except Exception as e:
+                logger.warning(f"Cache read failed for {namespace}: {e}")
+                return func(*args, **kwargs)
+
+            if value is not _MISSING:
+                return value
+
+            value = func(*args, **kwargs)
+            try:
+                cache.set(key, value, timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Cache write failed for {namespace}: {e}")
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
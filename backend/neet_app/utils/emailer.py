@@ -83,3 +83,30 @@ def send_password_reset_email(to_email: str, to_name: str, reset_link: str) -> b
     except Exception as e:
         print('Failed to send password reset email (Django backend):', str(e))
         return False
+
+
+def get_mail_connection(timeout: int = 30):
+    """Return an unopened Django mail connection for batch delivery.
+
+    With EMAIL_PROVIDER 'zeptomail' or 'smtp' this is an SMTP backend built from the
+    EMAIL_HOST/EMAIL_PORT/EMAIL_HOST_USER/EMAIL_HOST_PASSWORD settings (SSL on 465,
+    STARTTLS otherwise); any other provider uses the configured EMAIL_BACKEND.
+    Callers open it once and pass every message of the batch through send_messages().
+    """
+    from django.core.mail import get_connection
+
+    provider = getattr(settings, 'EMAIL_PROVIDER', '').lower()
+    if provider in ('zeptomail', 'smtp'):
+        port = int(getattr(settings, 'EMAIL_PORT', 587))
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=getattr(settings, 'EMAIL_HOST', 'smtp.zeptomail.in'),
+            port=port,
+            username=getattr(settings, 'EMAIL_HOST_USER', None),
+            password=getattr(settings, 'EMAIL_HOST_PASSWORD', None),
+            use_ssl=port == 465,
+            use_tls=port != 465,
+            timeout=timeout,
+            fail_silently=False,
+        )
+    return get_connection(fail_silently=False, timeout=timeout)
@@ -0,0 +1,383 @@
+"""
+Opt-in per-request performance profiler.
+
+RequestProfilerMiddleware profiles a request when it carries a valid signed
+X-Profile-Token header (minted by a platform admin, see issue_profile_token)
+or when it falls in the REQUEST_PROFILER_SAMPLE_RATE fraction. Everything else
+pays one header lookup and one random() call.
+
+A profiled request records:
+
+    db        query count and time, slowest statements (connection.execute_wrapper)
+    cache     hits and misses (ProfiledCacheMixin on the cache backend)
+    external  outbound HTTP (requests) and LLM time/calls (external_timer)
+    calls     a cProfile call tree pruned to frames above 1% of the request
+
+Reports are JSON dicts kept in a ring buffer: a capped Redis list shared by all
+workers (REQUEST_PROFILER_REDIS_BUFFER), falling back to a per-process deque
+when Redis is disabled or unreachable. Platform admins read them from the
+platform-admin profiles page.
+"""
+import cProfile
+import contextvars
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_TOKEN'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+TOKEN_SALT = 'neet_app.request_profiler'
+BUFFER_KEY = 'profiler:reports'
+
+SLOWEST_QUERIES = 5
+CALL_TREE_MIN_FRACTION = 0.01
+CALL_TREE_MAX_DEPTH = 15
+CALL_TREE_MAX_CHILDREN = 8
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_local_buffer = deque(maxlen=200)
+_local_lock = threading.Lock()
+_requests_patched = False
+
+
+def sample_rate() -> float:
+    return float(getattr(settings, 'REQUEST_PROFILER_SAMPLE_RATE', 0.0))
+
+
+def buffer_size() -> int:
+    return int(getattr(settings, 'REQUEST_PROFILER_BUFFER_SIZE', 200))
+
+
+def token_max_age() -> int:
+    return int(getattr(settings, 'REQUEST_PROFILER_TOKEN_MAX_AGE', 3600))
+
+
+# ---------------------------------------------------------------------------
+# Activation
+# ---------------------------------------------------------------------------
+
+def issue_profile_token(issued_by: str) -> str:
+    """Signed, time-limited value for the X-Profile-Token header."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(issued_by)
+
+
+def verify_profile_token(token: str) -> Optional[str]:
+    """Return who issued the token, or None if it is forged or expired."""
+    try:
+        return signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=token_max_age())
+    except signing.BadSignature:
+        return None
+
+
+def profile_trigger(request) -> Optional[str]:
+    """'header', 'sampled' or None (do not profile)."""
+    token = request.META.get(PROFILE_HEADER)
+    if token:
+        issued_by = verify_profile_token(token)
+        if issued_by:
+            return 'header'
+        logger.warning('Ignoring invalid or expired profile token for %s', request.path)
+    rate = sample_rate()
+    if rate > 0 and random.random() < rate:
+        return 'sampled'
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+
+class RequestProfile:
+    """Counters for one profiled request; active via a context variable."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.queries: List[tuple] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.in_cache_call = False
+        self.external: Dict[str, Dict[str, float]] = {}
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.db_queries += 1
+            self.db_seconds += elapsed
+            self.queries.append((elapsed, sql))
+            if len(self.queries) > SLOWEST_QUERIES * 4:
+                self.queries.sort(key=lambda q: q[0], reverse=True)
+                del self.queries[SLOWEST_QUERIES:]
+
+    def add_external(self, kind: str, seconds: float):
+        bucket = self.external.setdefault(kind, {'calls': 0, 'seconds': 0.0})
+        bucket['calls'] += 1
+        bucket['seconds'] += seconds
+
+    def summary(self) -> Dict:
+        slowest = sorted(self.queries, key=lambda q: q[0], reverse=True)[:SLOWEST_QUERIES]
+        return {
+            'db': {
+                'queries': self.db_queries,
+                'time_ms': _ms(self.db_seconds),
+                'slowest': [{'time_ms': _ms(t), 'sql': sql[:500]} for t, sql in slowest],
+            },
+            'cache': {'hits': self.cache_hits, 'misses': self.cache_misses},
+            'external': {
+                kind: {'calls': int(b['calls']), 'time_ms': _ms(b['seconds'])}
+                for kind, b in sorted(self.external.items())
+            },
+        }
+
+
+def record_cache_lookup(hits: int = 0, misses: int = 0):
+    profile = _current.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+@contextmanager
+def external_timer(kind: str):
+    """Attribute the wrapped block to an external dependency ('http', 'llm', ...)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_external(kind, time.perf_counter() - start)
+
+
+class ProfiledCacheMixin:
+    """Cache backend mixin that reports get/get_many hits and misses to the active profile."""
+
+    _probe = object()
+
+    def get(self, key, default=None, version=None):
+        profile = _current.get()
+        if profile is None or profile.in_cache_call:
+            return super().get(key, default, version)
+        value = super().get(key, self._probe, version)
+        hit = value is not self._probe
+        record_cache_lookup(hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        profile = _current.get()
+        if profile is None or profile.in_cache_call:
+            return super().get_many(keys, version)
+        keys = list(keys)
+        # Backends whose get_many loops over get() must not be counted twice
+        profile.in_cache_call = True
+        try:
+            values = super().get_many(keys, version)
+        finally:
+            profile.in_cache_call = False
+        record_cache_lookup(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+
+def install_http_timer():
+    """Time outbound `requests` calls for profiled requests (patched once per process)."""
+    global _requests_patched
+    if _requests_patched:
+        return
+    try:
+        import requests
+    except ImportError:
+        return
+
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        with external_timer('http'):
+            return original_send(self, request, **kwargs)
+
+    requests.Session.send = send
+    _requests_patched = True
+
+
+# ---------------------------------------------------------------------------
+# Call tree
+# ---------------------------------------------------------------------------
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({_short_path(filename)}:{line})'
+
+
+def _short_path(filename: str) -> str:
+    parts = filename.replace('\\', '/').split('/')
+    for marker in ('neet_app', 'site-packages', 'django'):
+        if marker in parts:
+            return '/'.join(parts[parts.index(marker):])
+    return os.path.basename(filename)
+
+
+def call_tree(profiler: cProfile.Profile, total_seconds: float) -> List[Dict]:
+    """
+    Build a call tree from cProfile caller edges, keeping frames that account
+    for at least CALL_TREE_MIN_FRACTION of the request.
+    """
+    stats = pstats.Stats(profiler).stats
+    children: Dict[tuple, List[tuple]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((edge[3], edge[1], func))
+
+    threshold = max(total_seconds, 1e-9) * CALL_TREE_MIN_FRACTION
+
+    def node(func, cumtime, calls, path, depth):
+        entry = {
+            'function': _label(func),
+            'calls': calls,
+            'cumtime_ms': _ms(cumtime),
+            'tottime_ms': _ms(stats[func][2]),
+            'children': [],
+        }
+        if depth < CALL_TREE_MAX_DEPTH:
+            kids = sorted(children.get(func, ()), key=lambda c: c[0], reverse=True)
+            for ct, nc, child in kids[:CALL_TREE_MAX_CHILDREN]:
+                if ct < threshold or child in path:
+                    continue
+                entry['children'].append(node(child, ct, nc, path | {child}, depth + 1))
+        return entry
+
+    roots = [(ct, nc, func) for func, (_cc, nc, _tt, ct, callers) in stats.items() if not callers]
+    roots.sort(key=lambda r: r[0], reverse=True)
+    return [node(func, ct, nc, {func}, 0) for ct, nc, func in roots if ct >= threshold]
+
+
+# ---------------------------------------------------------------------------
+# Profiling a request
+# ---------------------------------------------------------------------------
+
+def profile_call(func, *args, **kwargs):
+    """
+    Run func under the profiler. Returns (result, report) where report holds
+    everything except the request-specific fields added by the middleware.
+    """
+    profile = RequestProfile()
+    token = _current.set(profile)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        with _db_wrappers(profile):
+            try:
+                profiler.enable()
+                profiling = True
+            except ValueError:
+                # Another profiler (e.g. a debugger) already owns this thread
+                profiling = False
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                if profiling:
+                    profiler.disable()
+    finally:
+        elapsed = time.perf_counter() - started
+        _current.reset(token)
+
+    report = {
+        'id': uuid.uuid4().hex[:12],
+        'recorded_at': timezone.now().isoformat(),
+        'duration_ms': _ms(elapsed),
+        **profile.summary(),
+        'calls': call_tree(profiler, elapsed) if profiling else [],
+    }
+    return result, report
+
+
+@contextmanager
+def _db_wrappers(profile: RequestProfile):
+    wrappers = [conn.execute_wrapper(profile.db_wrapper) for conn in connections.all()]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer
+# ---------------------------------------------------------------------------
+
+def _redis_buffer_enabled() -> bool:
+    return getattr(settings, 'REQUEST_PROFILER_REDIS_BUFFER', True)
+
+
+def _redis():
+    from neet_app.utils.redis_client import get_redis
+    return get_redis()
+
+
+def store_report(report: Dict):
+    size = buffer_size()
+    if _redis_buffer_enabled():
+        try:
+            pipe = _redis().pipeline()
+            pipe.lpush(BUFFER_KEY, json.dumps(report, default=str))
+            pipe.ltrim(BUFFER_KEY, 0, size - 1)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning('Profile buffer unavailable, keeping report in process: %s', e)
+    global _local_buffer
+    with _local_lock:
+        if _local_buffer.maxlen != size:
+            _local_buffer = deque(_local_buffer, maxlen=size)
+        _local_buffer.appendleft(report)
+
+
+def recent_reports(limit: int = 50) -> List[Dict]:
+    """Newest first."""
+    if _redis_buffer_enabled():
+        try:
+            return [json.loads(raw) for raw in _redis().lrange(BUFFER_KEY, 0, limit - 1)]
+        except Exception as e:
+            logger.warning('Profile buffer unavailable, reading process reports: %s', e)
+    with _local_lock:
+        return list(_local_buffer)[:limit]
+
+
+def get_report(report_id: str) -> Optional[Dict]:
+    return next((r for r in recent_reports(buffer_size()) if r.get('id') == report_id), None)
+
+
+def clear_reports():
+    if _redis_buffer_enabled():
+        try:
+            _redis().delete(BUFFER_KEY)
+        except Exception as e:
+            logger.warning('Could not clear profile buffer: %s', e)
+    with _local_lock:
+        _local_buffer.clear()
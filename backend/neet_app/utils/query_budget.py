@@ -0,0 +1,70 @@
+"""
+Declarative per-endpoint query budgets.
+
+An endpoint declares the most SQL queries one request may issue, keyed by its
+URL name:
+
+    @query_budget('zone-insights-tests', 6)
+    @api_view(['GET'])
+    def get_student_tests(request): ...
+
+    @query_budget('test-session-list', 6)       # viewsets: decorate the class
+    class TestSessionViewSet(viewsets.ModelViewSet): ...
+
+The decorator only records the budget; nothing is wrapped. Budgets are checked
+in two places:
+
+  * tests/query_budget_plugin.py exercises every registered endpoint against
+    growing fixture sizes and fails if the count exceeds the budget or grows
+    with the data (an N+1);
+  * QueryCountMiddleware (DEBUG only) reports X-Query-Count / X-Query-Time-Ms
+    on every response and logs a warning when a budgeted endpoint overruns.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    url_name: str
+    max_queries: int
+    view: str
+
+
+_budgets: Dict[str, QueryBudget] = {}
+
+
+def register_query_budget(url_name: str, max_queries: int, view: str = '') -> QueryBudget:
+    existing = _budgets.get(url_name)
+    if existing and existing.max_queries != max_queries:
+        raise ValueError(f'Conflicting query budgets for {url_name}: {existing.max_queries} and {max_queries}')
+    budget = QueryBudget(url_name, max_queries, view)
+    _budgets[url_name] = budget
+    return budget
+
+
+def query_budget(url_name: str, max_queries: int):
+    """Declare that the endpoint routed as `url_name` issues at most `max_queries` queries."""
+    def decorator(view):
+        # @api_view returns an as_view() function; name the wrapped view instead
+        target = getattr(view, 'cls', view)
+        register_query_budget(url_name, max_queries, f'{target.__module__}.{target.__name__}')
+        return view
+    return decorator
+
+
+def get_query_budget(url_name: Optional[str]) -> Optional[QueryBudget]:
+    if not url_name:
+        return None
+    return _budgets.get(url_name)
+
+
+def registered_query_budgets() -> Dict[str, QueryBudget]:
+    """All budgets, after importing the URLconf so every decorated view has registered."""
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    return dict(sorted(_budgets.items()))
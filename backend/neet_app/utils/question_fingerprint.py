@@ -0,0 +1,28 @@
+"""
+Content fingerprint for questions shared across tests and institutions.
+
+The fingerprint is a SHA-256 over the stem and the four options (NFKC,
+lower-cased, whitespace-collapsed) plus any question/option images verbatim,
+so re-uploads of the same question with different spacing or casing match.
+The correct answer is deliberately excluded; callers compare it separately.
+"""
+import hashlib
+import unicodedata
+
+FINGERPRINT_FIELDS = (
+    'question', 'option_a', 'option_b', 'option_c', 'option_d',
+    'question_image', 'option_a_image', 'option_b_image', 'option_c_image', 'option_d_image',
+)
+
+
+def normalize_text(value) -> str:
+    return ' '.join(unicodedata.normalize('NFKC', value or '').split()).lower()
+
+
+def question_fingerprint(obj) -> str:
+    """Fingerprint of any object (model instance, historical model) exposing FINGERPRINT_FIELDS."""
+    parts = []
+    for field in FINGERPRINT_FIELDS:
+        value = getattr(obj, field, None) or ''
+        parts.append(value if field.endswith('_image') else normalize_text(value))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
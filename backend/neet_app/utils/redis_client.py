@@ -7,19 +7,34 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
-def get_redis_client():
+# Process-wide connection pools keyed by decode_responses. The OTP/presence
+# client decodes to str while the Django cache backend needs raw bytes, so
+# they get separate pools on the same REDIS_URL.
+_connection_pools = {}
+
+def get_connection_pool(decode_responses=True):
     """
-    Get Redis client instance with connection pooling
+    Get (or lazily create) the shared connection pool for REDIS_URL
     """
-    try:
+    pool = _connection_pools.get(decode_responses)
+    if pool is None:
         redis_url = getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
-        client = redis.from_url(
+        pool = redis.ConnectionPool.from_url(
             redis_url,
-            decode_responses=True,
+            decode_responses=decode_responses,
             socket_connect_timeout=5,
             socket_timeout=5,
             retry_on_timeout=True
         )
+        _connection_pools[decode_responses] = pool
+    return pool
+
+def get_redis_client():
+    """
+    Get Redis client instance with connection pooling
+    """
+    try:
+        client = redis.Redis(connection_pool=get_connection_pool(decode_responses=True))
         # Test connection
         client.ping()
         return client
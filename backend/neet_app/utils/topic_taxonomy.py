@@ -0,0 +1,239 @@
+"""
+Process-local topic taxonomy (topic id <-> name <-> subject <-> chapter).
+
+Topics change rarely but are looked up on every test session, dashboard and
+insight run. The taxonomy is loaded once per process and reused until the
+`topic_taxonomy` CacheVersion counter moves; Topic saves/deletes bump the
+counter (see signals.py). The stored version is re-checked at most every
+VERSION_CHECK_INTERVAL seconds so steady-state lookups issue no queries.
+
+Callers that resolve specific ids or names pass them to get_topic_taxonomy():
+if any is unknown to the snapshot (e.g. a topic just created by another
+worker), the snapshot is reloaded before the lookup instead of silently
+dropping it. Keys still unknown after a reload are remembered on the snapshot,
+so bad ids do not trigger a reload on every call.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_VERSION_KEY = 'topic_taxonomy'
+VERSION_CHECK_INTERVAL = 30  # seconds
+
+# Normalized subject buckets used by TestSession.<bucket>_topics
+SUBJECT_BUCKETS = ['physics', 'chemistry', 'botany', 'zoology', 'biology', 'math']
+
+TopicInfo = namedtuple('TopicInfo', ['id', 'name', 'subject', 'chapter', 'bucket'])
+
+
+def normalize_subject_bucket(subject, include_math=False):
+    """
+    Map a raw Topic.subject value to a TestSession subject bucket
+    ('physics', 'chemistry', 'botany', 'zoology', 'biology') or None.
+    Subject scoring also recognises 'math' (include_math=True).
+    """
+    subject_lower = (subject or '').lower()
+    if subject_lower in ['physics']:
+        return 'physics'
+    if subject_lower in ['chemistry']:
+        return 'chemistry'
+    if subject_lower in ['botany', 'plant biology']:
+        return 'botany'
+    if subject_lower in ['zoology', 'animal biology']:
+        return 'zoology'
+    if subject_lower in ['biology']:
+        return 'biology'
+    if include_math and subject_lower in ['math', 'mathematics', 'maths']:
+        return 'math'
+    # Handle edge cases - try to map based on common patterns
+    if 'physics' in subject_lower:
+        return 'physics'
+    if 'chemistry' in subject_lower or 'chemical' in subject_lower:
+        return 'chemistry'
+    if 'plant' in subject_lower or 'botany' in subject_lower:
+        return 'botany'
+    if 'animal' in subject_lower or 'zoology' in subject_lower:
+        return 'zoology'
+    if 'biology' in subject_lower or 'bio' in subject_lower:
+        return 'biology'
+    if include_math and ('math' in subject_lower or 'algebra' in subject_lower or 'geometry' in subject_lower):
+        return 'math'
+    return None
+
+
+class TopicTaxonomy:
+    """Immutable snapshot of the topics table with lookup indexes."""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.by_id = OrderedDict()
+        self._ids_by_name = {}
+        self._ids_by_subject = OrderedDict()
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        # Ids/names confirmed absent when this snapshot was loaded
+        self.known_missing = set()
+
+        for row in rows:
+            info = TopicInfo(
+                id=row['id'],
+                name=row['name'],
+                subject=row['subject'],
+                chapter=row['chapter'],
+                bucket=normalize_subject_bucket(row['subject']),
+            )
+            self.by_id[info.id] = info
+            self._ids_by_name.setdefault(info.name, []).append(info.id)
+            self._ids_by_subject.setdefault(info.subject, []).append(info.id)
+
+    def get(self, topic_id):
+        """TopicInfo for an id (int or numeric string), or None"""
+        try:
+            return self.by_id.get(int(topic_id))
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def subjects(self):
+        """Distinct raw subject values in first-seen (id) order"""
+        return list(self._ids_by_subject)
+
+    def unknown(self, topic_ids=None, names=None):
+        """The requested ids/names this snapshot cannot resolve (invalid ids are ignored)"""
+        missing = set()
+        for topic_id in topic_ids or []:
+            try:
+                topic_id = int(topic_id)
+            except (TypeError, ValueError):
+                continue
+            if topic_id not in self.by_id:
+                missing.add(('id', topic_id))
+        for name in names or []:
+            if name not in self._ids_by_name:
+                missing.add(('name', name))
+        return missing
+
+    def ids_for_subject(self, subject):
+        return list(self._ids_by_subject.get(subject, []))
+
+    def ids_for_names(self, names):
+        ids = []
+        for name in names or []:
+            ids.extend(self._ids_by_name.get(name, []))
+        return ids
+
+    def classify_by_bucket(self, topic_ids):
+        """
+        Group topic names by subject bucket for the given ids, in id order.
+        Returns {bucket: [topic names]} for every bucket in SUBJECT_BUCKETS.
+        """
+        wanted = set()
+        for topic_id in topic_ids or []:
+            try:
+                wanted.add(int(topic_id))
+            except (TypeError, ValueError):
+                continue
+
+        buckets = {bucket: [] for bucket in SUBJECT_BUCKETS}
+        for topic_id in sorted(wanted):
+            info = self.by_id.get(topic_id)
+            if info and info.bucket:
+                buckets[info.bucket].append(info.name)
+        return buckets
+
+    def memoize(self, key, compute):
+        """Cache a derived structure for the lifetime of this snapshot"""
+        if key not in self._memo:
+            with self._memo_lock:
+                if key not in self._memo:
+                    self._memo[key] = compute(self)
+        return self._memo[key]
+
+
+_state = {'taxonomy': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+
+def _load(version):
+    from ..models import Topic
+
+    rows = Topic.objects.order_by('id').values('id', 'name', 'subject', 'chapter')
+    taxonomy = TopicTaxonomy(version, rows)
+    logger.debug(f"Loaded topic taxonomy v{version} ({len(taxonomy.by_id)} topics)")
+    return taxonomy
+
+
+def get_topic_taxonomy(topic_ids=None, names=None):
+    """
+    Return the current TopicTaxonomy, reloading when the DB version has moved.
+
+    `topic_ids`/`names` are the keys the caller is about to resolve; when the
+    cached snapshot does not know one of them it is reloaded first.
+    """
+    now = time.monotonic()
+    taxonomy = _state['taxonomy']
+    if taxonomy is None or now - _state['checked_at'] >= VERSION_CHECK_INTERVAL:
+        taxonomy = _check_version(now)
+    if (topic_ids or names) and taxonomy.unknown(topic_ids, names) - taxonomy.known_missing:
+        taxonomy = _reload_for(topic_ids, names)
+    return taxonomy
+
+
+def _check_version(now):
+    from ..models import CacheVersion
+
+    with _lock:
+        taxonomy = _state['taxonomy']
+        if taxonomy is not None and now - _state['checked_at'] < VERSION_CHECK_INTERVAL:
+            return taxonomy
+
+        version = CacheVersion.get_version(TAXONOMY_VERSION_KEY)
+        if taxonomy is None or taxonomy.version != version:
+            taxonomy = _load(version)
+            _state['taxonomy'] = taxonomy
+        _state['checked_at'] = now
+        return taxonomy
+
+
+def _reload_for(topic_ids, names):
+    """Reload the snapshot for keys it cannot resolve; keys still unknown are remembered."""
+    from ..models import CacheVersion
+
+    with _lock:
+        stale = _state['taxonomy']
+        if stale is not None and not stale.unknown(topic_ids, names) - stale.known_missing:
+            return stale  # another thread reloaded meanwhile
+
+        taxonomy = _load(CacheVersion.get_version(TAXONOMY_VERSION_KEY))
+        missing = taxonomy.unknown(topic_ids, names)
+        if missing:
+            logger.warning(f"Unknown topics after taxonomy reload: {sorted(str(value) for _, value in missing)}")
+        if stale is not None and stale.known_missing:
+            missing |= taxonomy.unknown(*_split_keys(stale.known_missing))
+        taxonomy.known_missing = missing
+        _state['taxonomy'] = taxonomy
+        _state['checked_at'] = time.monotonic()
+        return taxonomy
+
+
+def _split_keys(keys):
+    """('id', n)/('name', s) keys back to (topic_ids, names)"""
+    return [value for kind, value in keys if kind == 'id'], [value for kind, value in keys if kind == 'name']
+
+
+def invalidate_topic_taxonomy():
+    """Bump the DB version (all processes reload) and drop this process's copy."""
+    from ..models import CacheVersion
+
+    CacheVersion.bump(TAXONOMY_VERSION_KEY)
+    reset_local_taxonomy()
+
+
+def reset_local_taxonomy():
+    """Forget this process's snapshot so the next call reloads."""
+    with _lock:
+        _state['taxonomy'] = None
+        _state['checked_at'] = 0.0
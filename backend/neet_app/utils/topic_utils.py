@@ -18,8 +18,16 @@ def classify_topics_by_subject():
             'Zoology': ['Animal Kingdom', 'Human Physiology', ...]
         }
     """
-    from ..models import Topic
-    
+    from .topic_taxonomy import get_topic_taxonomy
+
+    # Keyword matching only depends on topic names, so it is computed once per
+    # taxonomy version and copied out to callers
+    classification = get_topic_taxonomy().memoize('keyword_classification', _classify_topic_names)
+    return {subject: list(names) for subject, names in classification.items()}
+
+
+def _classify_topic_names(taxonomy):
+    """Keyword-based subject classification over all topic names in the taxonomy"""
     # NEET subject classification patterns
     physics_keywords = [
         'mechanics', 'motion', 'force', 'energy', 'power', 'work', 'momentum', 'gravity',
@@ -54,7 +62,7 @@ def classify_topics_by_subject():
     ]
     
     # Get all topics
-    topics = Topic.objects.all()
+    topics = taxonomy.by_id.values()
     
     classification = {
         'Physics': [],
@@ -0,0 +1,157 @@
+"""
+Low-overhead request tracing for Sentry.
+
+traces_sampler() replaces a flat traces_sample_rate=1.0. Each transaction is
+classified by route (or Celery task name):
+
+    ignored  health checks, static/admin assets                      -> never traced
+    hot      per-keystroke/per-tick endpoints (autosave, time
+             tracking, heartbeats, token refresh)                    -> SENTRY_HOT_TRACES_SAMPLE_RATE
+    slow     LLM, SQL-agent, insights, exports, submission           -> always traced
+    default  everything else                                         -> SENTRY_TRACES_SAMPLE_RATE
+
+Sampled hot/default transactions also draw from a per-process token bucket
+(SENTRY_MAX_TRACES_PER_SECOND), so the traced volume stays flat at peak while
+low-traffic periods are traced at the configured rates. Error events are not
+affected by trace sampling and are always sent. A decision already made by an
+upstream service (parent_sampled) is kept so distributed traces stay whole.
+
+span()/traced() wrap hot-path sections in named spans. When the current
+request is not being traced they return immediately without creating anything.
+
+Settings import this module before Django is configured, so configuration
+comes from the environment rather than django.conf.settings.
+"""
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+import sentry_sdk
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+TRACES_SAMPLE_RATE = _env_float('SENTRY_TRACES_SAMPLE_RATE', 0.05)
+HOT_TRACES_SAMPLE_RATE = _env_float('SENTRY_HOT_TRACES_SAMPLE_RATE', 0.005)
+MAX_TRACES_PER_SECOND = _env_float('SENTRY_MAX_TRACES_PER_SECOND', 2.0)
+
+IGNORED_ROUTES = re.compile(r'^/(static|media|favicon\.ico|health|healthz|admin/jsi18n)(/|$)')
+HOT_ROUTES = re.compile(
+    r'^/api/(test-answers/autosave|time-tracking|auth/refresh|platform-admin/api/sessions/\d+/heartbeat'
+    r'|test-sessions/\d+/questions/\d+)/?'
+)
+SLOW_ROUTES = re.compile(
+    r'^/api/(chat-sessions/[^/]+/send-message|chatbot|insights|zone-insights|test-sessions/\d+/submit'
+    r'|institution-admin/(upload|analytics/students/[^/]+/download))'
+)
+HOT_TASKS = {
+    'neet_app.tasks.flush_time_tracking_buffer_task',
+    'neet_app.tasks.persist_heartbeats_task',
+    'neet_app.tasks.deliver_notifications_task',
+}
+SLOW_TASK_MARKERS = ('insight', 'misconception', 'chat', 'zone', 'focus', 'submission', 'export')
+
+
+class _TokenBucket:
+    """Thread-safe per-process cap on how many transactions may be traced per second."""
+
+    def __init__(self, per_second: float):
+        self.per_second = per_second
+        self.capacity = max(per_second, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+_budget = _TokenBucket(MAX_TRACES_PER_SECOND)
+
+
+def classify(sampling_context) -> str:
+    """'ignored', 'hot', 'slow' or 'default' for a Sentry sampling context."""
+    job = sampling_context.get('celery_job')
+    if job:
+        task = job.get('task', '')
+        if task in HOT_TASKS:
+            return 'hot'
+        return 'slow' if any(marker in task for marker in SLOW_TASK_MARKERS) else 'default'
+
+    environ = sampling_context.get('wsgi_environ') or {}
+    path = environ.get('PATH_INFO') or (sampling_context.get('transaction_context') or {}).get('name') or ''
+    if IGNORED_ROUTES.match(path) or environ.get('REQUEST_METHOD') == 'OPTIONS':
+        return 'ignored'
+    if HOT_ROUTES.match(path):
+        return 'hot'
+    if SLOW_ROUTES.match(path):
+        return 'slow'
+    return 'default'
+
+
+def traces_sampler(sampling_context) -> float:
+    """Sentry traces_sampler: route-based rates capped by a per-process budget."""
+    parent_sampled = sampling_context.get('parent_sampled')
+    if parent_sampled is not None:
+        return 1.0 if parent_sampled else 0.0
+
+    kind = classify(sampling_context)
+    if kind == 'ignored':
+        return 0.0
+    if kind == 'slow':
+        return 1.0
+
+    rate = HOT_TRACES_SAMPLE_RATE if kind == 'hot' else TRACES_SAMPLE_RATE
+    if rate <= 0 or random.random() >= rate:
+        return 0.0
+    return 1.0 if _budget.take() else 0.0
+
+
+@contextmanager
+def _recording_span(op: str, name: str, data: dict):
+    with sentry_sdk.start_span(op=op, name=name) as current:
+        for key, value in data.items():
+            current.set_data(key, value)
+        yield current
+
+
+def span(op: str, name: str = None, **data):
+    """
+    Context manager for a named child span of the current transaction, e.g.
+    `with span('selection', 'adaptive', count=20):`. Yields the span, or None when
+    the request is not traced (no span object is created in that case).
+    """
+    if sentry_sdk.get_current_span() is None:
+        return nullcontext()
+    return _recording_span(op, name or op, data)
+
+
+def traced(op: str, name: str = None):
+    """Decorator form of span(); the span is named after the function by default."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if sentry_sdk.get_current_span() is None:
+                return func(*args, **kwargs)
+            with _recording_span(op, span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -2,6 +2,7 @@
 Chatbot Views for NEET AI Tutor
 Handles chat session creation, message processing, and history retrieval
 """
+import logging
 import uuid
 import sentry_sdk
 from rest_framework.decorators import api_view, permission_classes
@@ -9,9 +10,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status, viewsets, mixins
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Count, Q
 
 from ..models import ChatSession, ChatMessage, ChatMemory, StudentProfile
 from ..serializers import (
@@ -23,8 +26,20 @@ from ..services.chatbot_service_refactored import NeetChatbotService
 from ..jwt_authentication import StudentJWTAuthentication
 from ..errors import AppError, NotFoundError, ValidationError as AppValidationError
 from ..error_codes import ErrorCodes
+from ..utils.query_budget import query_budget
 
+logger = logging.getLogger(__name__)
 
+
+class ChatSessionCursorPagination(CursorPagination):
+    """Keyset pagination over a student's sessions, most recently used first"""
+    ordering = ('-updated_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+@query_budget('chat-session-list', 3)
 class ChatSessionViewSet(mixins.ListModelMixin,
                         mixins.CreateModelMixin,
                         mixins.RetrieveModelMixin,
@@ -38,6 +53,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
     serializer_class = ChatSessionSerializer
     authentication_classes = [StudentJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatSessionCursorPagination
     lookup_field = 'chat_session_id'  # Use chat_session_id instead of pk
     
     def _generate_session_title_from_message(self, message):
@@ -69,7 +85,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
                 return ChatSession.objects.filter(
                     student_id=self.request.user.student_id,
                     is_active=True
-                ).order_by('-updated_at')
+                ).order_by('-updated_at', '-id')
             return ChatSession.objects.none()
         except Exception as e:
             sentry_sdk.capture_exception(e, extra={
@@ -131,7 +147,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
     @action(detail=True, methods=['post'], url_path='send-message')
     def send_message(self, request, chat_session_id=None):
         """Send a message in the chat session"""
-        print(f"🔗 Chatbot API called - Session: {chat_session_id}, Student: {request.user.student_id}")
+        logger.debug("🔗 Chatbot API called - Session: %s, Student: %s", chat_session_id, request.user.student_id)
         
         try:
             sentry_sdk.add_breadcrumb(
@@ -174,7 +190,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
             
             # Process message with chatbot service  
             user_message = message_serializer.validated_data['message']
-            print(f"📝 Processing message: '{user_message}'")
+            logger.debug("📝 Processing message: '%s'", user_message)
             
             sentry_sdk.add_breadcrumb(
                 message="User message validated",
@@ -184,12 +200,12 @@ class ChatSessionViewSet(mixins.ListModelMixin,
             )
             
             # Update session title if this is the first message (no existing messages)
-            if chat_session.messages.count() == 0:
+            if chat_session.message_count == 0:
                 # Generate title from first message like ChatGPT
                 title = self._generate_session_title_from_message(user_message)
                 chat_session.session_title = title
                 chat_session.save()
-                print(f"📋 Updated session title to: '{title}'")
+                logger.debug("📋 Updated session title to: '%s'", title)
                 
                 sentry_sdk.add_breadcrumb(
                     message="Updated session title",
@@ -240,7 +256,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
                     
                     return Response({'status': 'queued', 'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
                 except Exception as e:
-                    print(f"Failed to enqueue chat task: {e}")
+                    logger.warning("Failed to enqueue chat task: %s", e)
                     sentry_sdk.capture_exception(e, extra={
                         "action": "enqueue_chat_task",
                         "chat_session_id": chat_session_id,
@@ -257,11 +273,11 @@ class ChatSessionViewSet(mixins.ListModelMixin,
                         chat_session_id=chat_session_id
                     )
 
-                    print(f"🤖 Chatbot response received:")
-                    print(f"   Success: {bot_response_data.get('success', False)}")
-                    print(f"   Intent: {bot_response_data.get('intent', 'unknown')}")
-                    print(f"   Has personalized data: {bot_response_data.get('has_personalized_data', False)}")
-                    print(f"   Processing time: {bot_response_data.get('processing_time', 0)}s")
+                    logger.debug("🤖 Chatbot response received:")
+                    logger.debug("   Success: %s", bot_response_data.get('success', False))
+                    logger.debug("   Intent: %s", bot_response_data.get('intent', 'unknown'))
+                    logger.debug("   Has personalized data: %s", bot_response_data.get('has_personalized_data', False))
+                    logger.debug("   Processing time: %ss", bot_response_data.get('processing_time', 0))
 
                     sentry_sdk.add_breadcrumb(
                         message="Chatbot response generated",
@@ -276,7 +292,7 @@ class ChatSessionViewSet(mixins.ListModelMixin,
 
                     # Extract the response text
                     bot_response = bot_response_data.get('response', 'Sorry, I encountered an error.')
-                    print(f"   Response length: {len(bot_response)} chars")
+                    logger.debug("   Response length: %s chars", len(bot_response))
                     
             except Exception as e:
                 sentry_sdk.capture_exception(e, extra={
@@ -297,7 +313,8 @@ class ChatSessionViewSet(mixins.ListModelMixin,
             
             # Check if we should trigger memory summarization
             # Trigger every 10 messages to extract long-term memories
-            total_messages = chat_session.messages.count()
+            chat_session.refresh_from_db(fields=['message_count'])
+            total_messages = chat_session.message_count
             if total_messages > 0 and total_messages % 10 == 0:
                 try:
                     from ..tasks import chat_memory_summarizer_task
@@ -307,9 +324,9 @@ class ChatSessionViewSet(mixins.ListModelMixin,
                         student_id=request.user.student_id,
                         message_threshold=10
                     )
-                    print(f"🧠 Triggered memory summarization for session {chat_session_id} after {total_messages} messages")
+                    logger.debug("🧠 Triggered memory summarization for session %s after %s messages", chat_session_id, total_messages)
                 except Exception as e:
-                    print(f"⚠️ Failed to trigger memory summarization: {e}")
+                    logger.warning("⚠️ Failed to trigger memory summarization: %s", e)
                     # Don't fail the main request if summarization fails
             
             return Response({
@@ -711,9 +728,13 @@ def chat_statistics(request):
         
         student_id = request.user.student_id
         
-        # Get statistics
-        total_sessions = ChatSession.objects.filter(student_id=student_id).count()
-        active_sessions = ChatSession.objects.filter(student_id=student_id, is_active=True).count()
+        # Get statistics (one aggregate over the student's sessions)
+        counts = ChatSession.objects.filter(student_id=student_id).aggregate(
+            total_sessions=Count('id'),
+            active_sessions=Count('id', filter=Q(is_active=True)),
+        )
+        total_sessions = counts['total_sessions']
+        active_sessions = counts['active_sessions']
         total_messages = ChatMessage.objects.filter(
             chat_session__student_id=student_id,
             message_type='user'
@@ -723,7 +744,7 @@ def chat_statistics(request):
         recent_session = ChatSession.objects.filter(
             student_id=student_id,
             is_active=True
-        ).order_by('-updated_at').first()
+        ).order_by('-updated_at', '-id').first()
         
         recent_session_data = None
         if recent_session:
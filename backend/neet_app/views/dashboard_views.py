@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from ..models import Question, TestAnswer, TestSession, Topic, PlatformTest, StudentProfile
+from ..utils.topic_taxonomy import get_topic_taxonomy
 from ..serializers import QuestionSerializer, TestAnswerSerializer, TestSessionSerializer
 
 logger = logging.getLogger(__name__)
@@ -344,9 +345,10 @@ def dashboard_comprehensive_analytics(request):
         }
 
         subject_performance_summary = []
-        all_subjects = Topic.objects.values_list('subject', flat=True).distinct()
+        taxonomy = get_topic_taxonomy()
+        all_subjects = taxonomy.subjects
         for subject_name in all_subjects:
-            topic_ids_for_subject = Topic.objects.filter(subject=subject_name).values_list('id', flat=True)
+            topic_ids_for_subject = taxonomy.ids_for_subject(subject_name)
             subject_answers = all_answers_for_completed_sessions.filter(question__topic_id__in=topic_ids_for_subject)
             total = subject_answers.count()
             correct = subject_answers.filter(is_correct=True).count()
@@ -470,7 +472,7 @@ def dashboard_comprehensive_analytics(request):
         if topics_attempted_count == 0 and total_questions_attempted > 0:
             topic_ids = all_answers_for_completed_sessions.values_list('question__topic_id', flat=True).distinct()
             for tid in topic_ids:
-                topic_obj = Topic.objects.filter(id=tid).first()
+                topic_obj = taxonomy.get(tid)
                 if not topic_obj:
                     continue
                 subj_answers = all_answers_for_completed_sessions.filter(question__topic_id=tid)
@@ -497,7 +499,7 @@ def dashboard_comprehensive_analytics(request):
         # Subject-wise accuracy distribution across past 7 tests
         subject_accuracy_past7 = []
         for subject_name in all_subjects:
-            topic_ids_for_subject = Topic.objects.filter(subject=subject_name).values_list('id', flat=True)
+            topic_ids_for_subject = taxonomy.ids_for_subject(subject_name)
             subj_answers = recent_answers.filter(question__topic_id__in=topic_ids_for_subject)
             subj_total = subj_answers.count()
             subj_correct = subj_answers.filter(is_correct=True).count()
@@ -532,7 +534,7 @@ def dashboard_comprehensive_analytics(request):
         # By-subject breakdown
         time_distribution_by_subject = {}
         for subject_name in all_subjects:
-            topic_ids_for_subject = Topic.objects.filter(subject=subject_name).values_list('id', flat=True)
+            topic_ids_for_subject = taxonomy.ids_for_subject(subject_name)
             subj_answers = recent_answers.filter(question__topic_id__in=topic_ids_for_subject)
             correct_t = subj_answers.filter(is_correct=True).aggregate(total_time=Sum('time_taken'))['total_time'] or 0
             incorrect_t = subj_answers.filter(is_correct=False).aggregate(total_time=Sum('time_taken'))['total_time'] or 0
@@ -7,6 +7,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
+from django.db.models import Count, Q
 from neet_app.models import InstitutionAdmin, Institution, PlatformTest, Question
 from neet_app.institution_auth import (
     generate_institution_admin_tokens,
@@ -14,6 +15,7 @@ from neet_app.institution_auth import (
 )
 from neet_app.services.institution_upload import process_upload, UploadValidationError
 from neet_app.services.offline_results_upload import process_offline_upload
+from neet_app.services.misconception_service import misconception_job_progress, resume_misconception_job
 import json
 import logging
 
@@ -270,10 +272,12 @@ def list_institution_tests(request):
         institution = request.institution
         exam_type = request.GET.get('exam_type', '').strip().lower()
         
-        # Build query
+        # Build query (attempt counts aggregated in the same query)
         query = PlatformTest.objects.filter(
             institution=institution,
             is_institution_test=True
+        ).annotate(
+            attempts_count=Count('testsession', filter=Q(testsession__test_type='platform'))
         ).order_by('-created_at')
         
         # Filter by exam type if provided
@@ -283,13 +287,6 @@ def list_institution_tests(request):
         # Get tests
         tests = []
         for test in query:
-            # Count test attempts (sessions)
-            from neet_app.models import TestSession
-            attempts_count = TestSession.objects.filter(
-                platform_test=test,
-                test_type='platform'
-            ).count()
-            
             tests.append({
                 'id': test.id,
                 'test_name': test.test_name,
@@ -300,7 +297,7 @@ def list_institution_tests(request):
                 'scheduled_date_time': test.scheduled_date_time.isoformat() if test.scheduled_date_time else None,
                 'is_active': test.is_active,
                 'created_at': test.created_at.isoformat(),
-                'attempts_count': attempts_count
+                'attempts_count': test.attempts_count
             })
         
         return JsonResponse({
@@ -373,7 +370,8 @@ def get_test_details(request, test_id):
     Returns: {
         "test": { ... },
         "questions": [ ... ],
-        "statistics": { ... }
+        "statistics": { ... },
+        "misconception_progress": { "job_id", "status", "subjects": { subject: {...} } } | null
     }
     """
     try:
@@ -409,27 +407,26 @@ def get_test_details(request, test_id):
                 'correct_answer': q.correct_answer
             })
         
-        # Get statistics
+        # Get statistics (one aggregate query)
+        from django.db.models import Avg
         from neet_app.models import TestSession
-        sessions = TestSession.objects.filter(
+        stats = TestSession.objects.filter(
             platform_test=test,
             test_type='platform'
+        ).aggregate(
+            total_attempts=Count('id'),
+            completed_attempts=Count('id', filter=Q(is_completed=True)),
+            avg_correct=Avg('correct_answers', filter=Q(is_completed=True)),
         )
         
-        completed_sessions = sessions.filter(is_completed=True)
-        
         statistics = {
-            'total_attempts': sessions.count(),
-            'completed_attempts': completed_sessions.count(),
-            'in_progress': sessions.filter(is_completed=False).count()
+            'total_attempts': stats['total_attempts'],
+            'completed_attempts': stats['completed_attempts'],
+            'in_progress': stats['total_attempts'] - stats['completed_attempts']
         }
         
-        if completed_sessions.exists():
-            from django.db.models import Avg
-            avg_score = completed_sessions.aggregate(
-                avg_correct=Avg('correct_answers')
-            )['avg_correct']
-            
+        if stats['completed_attempts']:
+            avg_score = stats['avg_correct']
             statistics['average_score'] = round(avg_score, 2) if avg_score else 0
         
         return JsonResponse({
@@ -449,7 +446,8 @@ def get_test_details(request, test_id):
                 'misconception_generated_at': test.misconception_generated_at.isoformat() if test.misconception_generated_at else None
             },
             'questions': questions_data,
-            'statistics': statistics
+            'statistics': statistics,
+            'misconception_progress': misconception_job_progress(test.id)
         }, status=200)
         
     except Exception as e:
@@ -677,3 +675,62 @@ def generate_misconceptions(request, test_id):
             'error': 'SERVER_ERROR',
             'message': 'An unexpected error occurred'
         }, status=500)
+
+
+@csrf_exempt
+@institution_admin_required
+@require_http_methods(["POST"])
+def resume_misconceptions(request, test_id):
+    """
+    Retry only the failed batches of the test's latest misconception job.
+    
+    POST /api/institution-admin/tests/<test_id>/resume-misconceptions/
+    
+    Returns: {
+        "success": true,
+        "test_id": 123,
+        "job_id": 45,
+        "retried_batches": 2,
+        "misconception_progress": { ... }
+    }
+    """
+    try:
+        institution = request.institution
+        
+        if not PlatformTest.objects.filter(
+            id=test_id,
+            institution=institution,
+            is_institution_test=True
+        ).exists():
+            return JsonResponse({
+                'error': 'NOT_FOUND',
+                'message': 'Test not found'
+            }, status=404)
+        
+        resumed = resume_misconception_job(test_id)
+        if resumed is None:
+            return JsonResponse({
+                'error': 'NO_MISCONCEPTION_JOB',
+                'message': 'Misconception generation has not been started for this test'
+            }, status=400)
+        if not resumed['retried']:
+            return JsonResponse({
+                'error': 'NOTHING_TO_RESUME',
+                'message': 'No failed misconception batches to retry',
+                'misconception_progress': misconception_job_progress(test_id)
+            }, status=409)
+        
+        return JsonResponse({
+            'success': True,
+            'test_id': test_id,
+            'job_id': resumed['job_id'],
+            'retried_batches': resumed['retried'],
+            'misconception_progress': misconception_job_progress(test_id)
+        }, status=200)
+        
+    except Exception as e:
+        logger.exception("Error in resume_misconceptions")
+        return JsonResponse({
+            'error': 'SERVER_ERROR',
+            'message': 'An unexpected error occurred'
+        }, status=500)
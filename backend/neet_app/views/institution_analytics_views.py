@@ -1,22 +1,26 @@
 """
 Institution analytics views.
 
-Provides student list, per-student performance trends, and question-level
-filtered download for institution admins.
+Provides student list, per-student performance trends, question-level
+filtered download and per-test cohort analytics for institution admins.
 
 Endpoints:
   GET  /api/institution-admin/analytics/students/
   GET  /api/institution-admin/analytics/students/<student_id>/performance/
   POST /api/institution-admin/analytics/students/<student_id>/download/
+  GET  /api/institution-admin/analytics/exports/<export_id>/
+  GET  /api/institution-admin/analytics/tests/<test_id>/cohort/
 """
 
-from django.http import JsonResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.db.models import Q
 
-from neet_app.models import StudentProfile, TestSession, TestAnswer, TestSubjectZoneInsight
+from neet_app.models import PlatformTest, StudentProfile, TestSession, TestSubjectZoneInsight
 from neet_app.institution_auth import institution_admin_required
+from neet_app.utils.query_budget import query_budget
 
 import json
 import logging
@@ -77,6 +81,7 @@ def list_institution_students(request):
 # 2.  Per-student performance (trend + test list)
 # ---------------------------------------------------------------------------
 
+@query_budget("institution-admin-student-performance", 4)
 @institution_admin_required
 @require_http_methods(["GET"])
 def get_student_performance(request, student_id):
@@ -126,6 +131,14 @@ def get_student_performance(request, student_id):
         elif test_type_filter == "platform":
             qs = qs.filter(test_type="platform")
 
+        # Zone-insight marks for all listed sessions in one query
+        insight_marks = {
+            session_id: (mark, total_mark)
+            for session_id, mark, total_mark in TestSubjectZoneInsight.objects.filter(
+                student=student, test_session__in=qs.values("id")
+            ).values_list("test_session_id", "mark", "total_mark")
+        }
+
         performance_trend = []
         test_list = []
 
@@ -146,10 +159,8 @@ def get_student_performance(request, student_id):
             time_spent = session.total_time_taken or 0
             date_str = session.start_time.isoformat()
 
-            # Try to include zone-insight marks if available
-            insight = TestSubjectZoneInsight.objects.filter(test_session=session, student=student).first()
-            mark = insight.mark if insight and insight.mark is not None else None
-            total_mark = insight.total_mark if insight and insight.total_mark is not None else None
+            # Include zone-insight marks if available
+            mark, total_mark = insight_marks.get(session.id, (None, None))
 
             performance_trend.append(
                 {
@@ -203,7 +214,7 @@ def get_student_performance(request, student_id):
 
 
 # ---------------------------------------------------------------------------
-# 3.  Download filtered question-level data as structured JSON
+# 3.  Download filtered question-level data (JSON, streamed NDJSON/CSV, async XLSX)
 # ---------------------------------------------------------------------------
 
 @csrf_exempt
@@ -211,44 +222,64 @@ def get_student_performance(request, student_id):
 @require_http_methods(["POST"])
 def download_student_questions(request, student_id):
     """
-    Download filtered question-level data for a student as structured JSON.
+    Download filtered question-level data for a student.
 
     POST /api/institution-admin/analytics/students/<student_id>/download/
     Body:
     {
         "session_ids":    [1, 2, 3],
-        "question_types": ["correct", "wrong", "skipped"]   // any combination
+        "question_types": ["correct", "wrong", "skipped"],  // any combination
+        "format":         "json" | "ndjson" | "csv" | "xlsx"  // default "json"
     }
 
-    Returns:
+    json (default):
     {
         "student": { "student_id", "full_name", "phone_number" },
-        "questions": [
+        "questions_by_test": [
             {
-                "session_id",   "test_name",     "question_number",
-                "question_text","option_a",      "option_b",
-                "option_c",     "option_d",      "correct_answer",
-                "student_answer","is_correct",   "skipped",
-                "misconception","time_taken_seconds",
-                "topic",        "subject",       "difficulty"
+                "session_id", "test_name", "mark", "total_mark",
+                "questions": [
+                    {
+                        "question_number", "question_text", "option_a",
+                        "option_b",        "option_c",      "option_d",
+                        "correct_answer",  "student_answer", "misconception",
+                        "time_taken_seconds", "topic", "subject", "difficulty"
+                    }
+                ]
             }
         ],
         "total": N
     }
+
+    ndjson / csv: streamed as the answers are read, in constant memory.
+      ndjson lines are typed "student", "session" (followed by its questions) and "question".
+      csv has one row per question with the session columns repeated.
+
+    xlsx: 202 { "export_id", "status": "pending" }; fetch the workbook from
+      GET /api/institution-admin/analytics/exports/<export_id>/
+      503 EXPORT_UNAVAILABLE when the export cannot be queued.
     """
+    from neet_app.services import student_question_export as export
+
     try:
         # Allow admins to download question data for any student (not restricted by institution)
-        try:
-            student = StudentProfile.objects.get(student_id=student_id)
-        except StudentProfile.DoesNotExist:
+        student = (
+            StudentProfile.objects.filter(student_id=student_id)
+            .values("student_id", "full_name", "phone_number")
+            .first()
+        )
+        if student is None:
             return JsonResponse(
                 {"error": "NOT_FOUND", "message": "Student not found"},
                 status=404,
             )
+        student["full_name"] = student["full_name"] or ""
+        student["phone_number"] = student["phone_number"] or ""
 
         data = json.loads(request.body)
         session_ids    = data.get("session_ids", [])
-        question_types = data.get("question_types", ["correct", "wrong", "skipped"])
+        question_types = data.get("question_types", export.DEFAULT_QUESTION_TYPES)
+        export_format  = data.get("format", "json")
 
         if not session_ids:
             return JsonResponse(
@@ -265,151 +296,168 @@ def download_student_questions(request, student_id):
                 status=400,
             )
 
-        # Fetch completed sessions for this student
-        sessions = (
-            TestSession.objects
-            .filter(
-                id__in=session_ids,
-                student_id=student_id,
-                is_completed=True,
+        if export_format not in export.EXPORT_FORMATS:
+            return JsonResponse(
+                {
+                    "error": "INVALID_INPUT",
+                    "message": f"format must be one of: {', '.join(export.EXPORT_FORMATS)}",
+                },
+                status=400,
             )
-            .select_related("platform_test")
-        )
-        session_map = {s.id: s for s in sessions}
 
-        if not session_map:
+        sessions = export.load_sessions(student_id, session_ids)
+        if not sessions:
             return JsonResponse(
                 {"error": "NOT_FOUND", "message": "No matching sessions found"},
                 status=404,
             )
 
-        # --- Build answer type filter ---
-        # "correct"  → is_correct=True
-        # "wrong"    → answered but is_correct=False
-        # "skipped"  → no answer recorded
-        type_filter = Q()
-
-        if "correct" in question_types:
-            type_filter |= Q(is_correct=True)
-
-        if "wrong" in question_types:
-            # Answered (selected_answer or text_answer is non-empty) but incorrect
-            answered_q = (
-                ~Q(selected_answer="") & Q(selected_answer__isnull=False)
-            ) | (
-                ~Q(text_answer="") & Q(text_answer__isnull=False)
-            )
-            type_filter |= Q(is_correct=False) & answered_q
-
-        if "skipped" in question_types:
-            # Both selected_answer and text_answer are NULL or empty string
-            skipped_q = (
-                Q(selected_answer__isnull=True) | Q(selected_answer="")
-            ) & (
-                Q(text_answer__isnull=True) | Q(text_answer="")
+        if export_format == "json":
+            return JsonResponse(export.build_grouped_export(student, sessions, question_types), status=200)
+
+        filename = f"{student_id}_questions"
+        if export_format == "ndjson":
+            response = StreamingHttpResponse(
+                export.iter_ndjson(student, sessions, question_types),
+                content_type="application/x-ndjson",
             )
-            type_filter |= skipped_q
+            response["Content-Disposition"] = f'attachment; filename="{filename}.ndjson"'
+            return response
 
-        answers = (
-            TestAnswer.objects
-            .filter(Q(session_id__in=list(session_map.keys())) & type_filter)
-            .select_related("question", "question__topic")
-            .order_by("session_id", "id")
-        )
+        if export_format == "csv":
+            response = StreamingHttpResponse(
+                export.iter_csv(sessions, question_types),
+                content_type="text/csv",
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+            return response
 
-        # Build response grouped by session/test. Number questions per session (1-based).
-        session_question_counter: dict = {}
-        session_questions_map: dict = {sid: [] for sid in session_map.keys()}
+        # xlsx: generated in the background, fetched by export id
+        from neet_app.tasks import export_student_questions_task
 
-        for ans in answers:
-            q = ans.question
-            session = session_map.get(ans.session_id)
-            if not session:
-                continue
+        export_id = export.new_export_id()
+        session_ids = [s["session_id"] for s in sessions]
+        export.mark_export_pending(request.institution.id, export_id)
+        args = (request.institution.id, export_id, student_id, session_ids, list(question_types))
+        try:
+            export_student_questions_task.delay(*args)
+        except Exception as e:
+            # Never build the workbook in the request thread; drop the marker so the id reads as unknown
+            logger.warning(f"Could not enqueue question export {export_id}: {e}")
+            export.discard_export_pending(request.institution.id, export_id)
+            return JsonResponse(
+                {"error": "EXPORT_UNAVAILABLE", "message": "Export could not be queued, please retry"},
+                status=503,
+            )
 
-            # Per-session question counter (1-based)
-            counter = session_question_counter.get(ans.session_id, 0) + 1
-            session_question_counter[ans.session_id] = counter
+        return JsonResponse({"export_id": export_id, "status": "pending"}, status=202)
 
-            # Test name
-            if session.test_type == "platform" and session.platform_test:
-                test_name = session.platform_test.test_name
-            else:
-                test_name = f"Custom Test ({session.start_time.strftime('%d %b %Y')})"
+    except json.JSONDecodeError:
+        return JsonResponse(
+            {"error": "INVALID_JSON", "message": "Invalid JSON in request body"},
+            status=400,
+        )
+    except Exception:
+        logger.exception("Error in download_student_questions")
+        return JsonResponse(
+            {"error": "SERVER_ERROR", "message": "An unexpected error occurred"},
+            status=500,
+        )
 
-            # Misconception for the student's chosen wrong option
-            misconception = None
-            if ans.selected_answer and q.misconceptions:
-                key = f"option_{ans.selected_answer.lower()}"
-                misconception = q.misconceptions.get(key)
-
-            student_answer = ans.selected_answer or ans.text_answer or None
-
-            qobj = {
-                "question_number":     counter,
-                "question_text":       q.question,
-                "option_a":            q.option_a,
-                "option_b":            q.option_b,
-                "option_c":            q.option_c,
-                "option_d":            q.option_d,
-                "correct_answer":      q.correct_answer,
-                "student_answer":      student_answer,
-                "misconception":       misconception,
-                "time_taken_seconds":  ans.time_taken,
-                "topic":               q.topic.name    if q.topic else None,
-                "subject":             q.topic.subject if q.topic else None,
-                "difficulty":          q.difficulty,
-            }
 
-            session_questions_map[ans.session_id].append(qobj)
+@institution_admin_required
+@require_http_methods(["GET"])
+def get_student_question_export(request, export_id):
+    """
+    Fetch an XLSX export started by download_student_questions.
 
-        # Build ordered list grouped by test/session
-        questions_by_test = []
-        total_questions = 0
-        # Keep order consistent with session_map (which preserves queryset order)
-        for sid, session in session_map.items():
-            items = session_questions_map.get(sid, [])
-            total_questions += len(items)
-            if session.test_type == "platform" and session.platform_test:
-                test_name = session.platform_test.test_name
-            else:
-                test_name = f"Custom Test ({session.start_time.strftime('%d %b %Y')})"
+    GET /api/institution-admin/analytics/exports/<export_id>/
 
-            # Try to fetch zone insight for this session to include marks
-            insight = TestSubjectZoneInsight.objects.filter(test_session=session, student=student).first()
-            mark = insight.mark if insight and insight.mark is not None else None
-            total_mark = insight.total_mark if insight and insight.total_mark is not None else None
+    Returns the workbook when ready, 202 { "status": "pending" } while it is
+    generated, 500 EXPORT_FAILED if generation failed, 404 for unknown ids.
+    """
+    from neet_app.services import student_question_export as export
 
-            questions_by_test.append(
-                {
-                    "session_id": sid,
-                    "test_name":  test_name,
-                    "mark":       mark,
-                    "total_mark": total_mark,
-                    "questions":  items,
-                }
+    try:
+        if not export.is_valid_export_id(export_id):
+            return JsonResponse({"error": "NOT_FOUND", "message": "Export not found"}, status=404)
+
+        status = export.export_status(request.institution.id, export_id)
+        if status is None:
+            return JsonResponse({"error": "NOT_FOUND", "message": "Export not found"}, status=404)
+        if status == "pending":
+            return JsonResponse({"export_id": export_id, "status": "pending"}, status=202)
+        if status == "failed":
+            return JsonResponse(
+                {"error": "EXPORT_FAILED", "message": "Export generation failed, please retry"},
+                status=500,
             )
 
-        return JsonResponse(
-            {
-                "student": {
-                    "student_id":   student.student_id,
-                    "full_name":    student.full_name    or "",
-                    "phone_number": student.phone_number or "",
-                },
-                "questions_by_test": questions_by_test,
-                "total": total_questions,
-            },
-            status=200,
+        return FileResponse(
+            default_storage.open(export.artifact_path(request.institution.id, export_id), "rb"),
+            as_attachment=True,
+            filename=f"questions_{export_id}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
-    except json.JSONDecodeError:
+    except Exception:
+        logger.exception("Error in get_student_question_export")
         return JsonResponse(
-            {"error": "INVALID_JSON", "message": "Invalid JSON in request body"},
-            status=400,
+            {"error": "SERVER_ERROR", "message": "An unexpected error occurred"},
+            status=500,
         )
+
+
+# ---------------------------------------------------------------------------
+# 4.  Per-test cohort analytics (served from precomputed summary tables)
+# ---------------------------------------------------------------------------
+
+@institution_admin_required
+@require_http_methods(["GET"])
+def get_test_cohort_analytics(request, test_id):
+    """
+    Cohort analytics for one of the institution's tests.
+
+    GET /api/institution-admin/analytics/tests/<test_id>/cohort/
+
+    Returns (200):
+    {
+        "test": { "id", "test_name" },
+        "summary": { "sessions", "max_score", "mean_score", "std_score", ... },
+        "score_distribution": [ { "band": "0-10%", "count" } ],
+        "questions": [ { "question_id", "attempts", "difficulty_index",
+                         "discrimination_index", "avg_time", ... } ],
+        "topics": [ { "topic_id", "topic_name", "subject", "accuracy", ... } ]
+    }
+
+    Returns 202 with { "status": "building" } while aggregates for a test
+    with existing sessions are being backfilled.
+    """
+    from neet_app.services.cohort_analytics_service import cohort_report
+
+    try:
+        test = (
+            PlatformTest.objects.filter(id=test_id, institution=request.institution, is_institution_test=True)
+            .values("id", "test_name")
+            .first()
+        )
+        if test is None:
+            return JsonResponse({"error": "NOT_FOUND", "message": "Test not found"}, status=404)
+
+        report = cohort_report(test_id)
+        if report is None:
+            if TestSession.objects.filter(platform_test_id=test_id, is_completed=True).exists():
+                # Queued at most once while building (polls just see 202); eager Celery finishes it here
+                from neet_app.services.cohort_analytics_service import enqueue_cohort_rebuild
+                if enqueue_cohort_rebuild(test_id):
+                    report = cohort_report(test_id)
+            if report is None:
+                return JsonResponse({"test": test, "status": "building"}, status=202)
+
+        return JsonResponse({"test": test, **report}, status=200)
+
     except Exception:
-        logger.exception("Error in download_student_questions")
+        logger.exception("Error in get_test_cohort_analytics")
         return JsonResponse(
             {"error": "SERVER_ERROR", "message": "An unexpected error occurred"},
             status=500,
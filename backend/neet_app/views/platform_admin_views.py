@@ -1,5 +1,6 @@
+import logging
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponseForbidden, Http404
 from django.utils import timezone
 from django.conf import settings
 from django.db.models import Sum
@@ -9,6 +10,13 @@ from ..models import PlatformTest, TestSession, UserActivity, PlatformAdmin, Top
 from django.views.decorators.csrf import csrf_exempt
 from django.urls import reverse
 
+from ..services.live_presence_service import (
+    get_live_counts, get_live_counts_from_db, presence_enabled, record_heartbeat
+)
+from ..utils import profiler
+
+logger = logging.getLogger(__name__)
+
 
 def _platform_admin_session_user(request):
     """Return PlatformAdmin instance if logged in via platform-admin session."""
@@ -25,6 +33,16 @@ def platform_admin_required(user):
     return getattr(user, 'is_superuser', False) or getattr(user, 'is_platform_admin', False)
 
 
+def _live_counts():
+    """Live session counts from Redis presence, falling back to TestSession heartbeats."""
+    if presence_enabled():
+        try:
+            return get_live_counts()
+        except Exception as e:
+            logger.warning(f"Presence metrics unavailable, using database: {e}")
+    return get_live_counts_from_db()
+
+
 @login_required
 @user_passes_test(platform_admin_required)
 def dashboard_home(request):
@@ -33,9 +51,7 @@ def dashboard_home(request):
     ctx = {}
     # Active tests: include active platform tests + active custom test sessions (recent heartbeat)
     active_platform = PlatformTest.objects.filter(is_active=True).count()
-    heartbeat_threshold = now - timedelta(seconds=90)
-    active_custom_sessions = TestSession.objects.filter(test_type='custom', is_active=True, last_heartbeat__gte=heartbeat_threshold).count()
-    ctx['active_tests'] = active_platform + active_custom_sessions
+    ctx['active_tests'] = active_platform + _live_counts()['active_custom_sessions']
     # Total tests: include platform tests + historical custom test sessions (count of custom test sessions)
     total_platform = PlatformTest.objects.count()
     total_custom = TestSession.objects.filter(test_type='custom').count()
@@ -161,16 +177,12 @@ def metrics_api(request):
         # fall back to UserActivity if StudentActivity table/migrations not present yet
         logged_in_count = UserActivity.objects.filter(last_seen__gte=online_threshold).count()
 
-    heartbeat_seconds = getattr(settings, 'PLATFORM_ADMIN_HEARTBEAT_SECONDS', 90)
-    heartbeat_threshold = now - timedelta(seconds=heartbeat_seconds)
-    # Only consider sessions that are tied to a student (student_id not null)
-    taking_count = TestSession.objects.filter(is_active=True, last_heartbeat__gte=heartbeat_threshold, student_id__isnull=False).count()
-    concurrent_count = TestSession.objects.filter(is_active=True, last_heartbeat__gte=heartbeat_threshold, student_id__isnull=False).values('student_id').distinct().count()
+    # Live sessions within the heartbeat window (Redis presence, DB fallback)
+    live = _live_counts()
 
     # Active tests: include active platform tests + active custom test sessions
     active_platform = PlatformTest.objects.filter(is_active=True).count()
-    active_custom_sessions = TestSession.objects.filter(test_type='custom', is_active=True, last_heartbeat__gte=heartbeat_threshold).count()
-    active_tests = active_platform + active_custom_sessions
+    active_tests = active_platform + live['active_custom_sessions']
     # Total tests: include platform tests + historical custom test sessions
     total_platform = PlatformTest.objects.count()
     total_custom = TestSession.objects.filter(test_type='custom').count()
@@ -189,8 +201,9 @@ def metrics_api(request):
 
     return JsonResponse({
         'logged_in_count': logged_in_count,
-        'taking_count': taking_count,
-        'concurrent_count': concurrent_count,
+        'taking_count': live['taking_count'],
+        'concurrent_count': live['concurrent_count'],
+        'live_tests': live['live_tests'],
         'active_tests': active_tests,
         'total_tests': total_tests,
         'attempts_last_24h': attempts_last_24h,
@@ -201,7 +214,9 @@ def metrics_api(request):
 @login_required
 def session_heartbeat(request, pk):
     try:
-        session = TestSession.objects.get(pk=pk)
+        session = TestSession.objects.only(
+            'id', 'student_id', 'test_type', 'platform_test_id', 'is_completed'
+        ).get(pk=pk)
     except TestSession.DoesNotExist:
         return JsonResponse({'error': 'not_found'}, status=404)
 
@@ -209,7 +224,65 @@ def session_heartbeat(request, pk):
     if not (request.user.is_superuser or getattr(request.user, 'is_platform_admin', False) or getattr(request.user, 'student_id', None) == session.student_id):
         return HttpResponseForbidden()
 
+    if session.is_completed:
+        # Late ping from a submitted or quit test: never make it live again
+        return JsonResponse({'status': 'completed'})
+
     session.last_heartbeat = timezone.now()
+    # Presence lives in Redis and is bulk-persisted by persist_heartbeats_task
+    if presence_enabled() and record_heartbeat(session, now=session.last_heartbeat.timestamp()):
+        return JsonResponse({'status': 'ok', 'last_heartbeat': session.last_heartbeat.isoformat()})
+
     session.is_active = True
     session.save(update_fields=['last_heartbeat', 'is_active'])
     return JsonResponse({'status': 'ok', 'last_heartbeat': session.last_heartbeat.isoformat()})
+
+
+def _profile_summary(report):
+    """Report without the call tree, for listings."""
+    return {key: value for key, value in report.items() if key != 'calls'}
+
+
+@login_required
+@user_passes_test(platform_admin_required)
+def profiles_list(request):
+    """Recent request profiles; POST issues an X-Profile-Token for profiling chosen requests."""
+    issued_token = None
+    if request.method == 'POST':
+        if request.POST.get('action') == 'clear':
+            profiler.clear_reports()
+            return redirect('platform-admin-profiles')
+        issued_token = profiler.issue_profile_token(request.user.get_username())
+    reports = [_profile_summary(r) for r in profiler.recent_reports(profiler.buffer_size())]
+    return render(request, 'platform_admin/profiles_list.html', {
+        'reports': reports,
+        'issued_token': issued_token,
+        'token_max_age_minutes': profiler.token_max_age() // 60,
+        'sample_rate': profiler.sample_rate(),
+    })
+
+
+@login_required
+@user_passes_test(platform_admin_required)
+def profile_detail(request, report_id):
+    report = profiler.get_report(report_id)
+    if report is None:
+        raise Http404('Profile not found (it may have rotated out of the buffer)')
+    return render(request, 'platform_admin/profile_detail.html', {'report': report})
+
+
+@login_required
+@user_passes_test(platform_admin_required)
+def profiles_api(request):
+    """JSON view of the profile buffer; ?id=<report id> returns one report with its call tree."""
+    report_id = request.GET.get('id')
+    if report_id:
+        report = profiler.get_report(report_id)
+        if report is None:
+            return JsonResponse({'error': 'not_found'}, status=404)
+        return JsonResponse(report)
+    try:
+        limit = min(int(request.GET.get('limit', 50)), profiler.buffer_size())
+    except ValueError:
+        limit = 50
+    return JsonResponse({'results': [_profile_summary(r) for r in profiler.recent_reports(limit)]})
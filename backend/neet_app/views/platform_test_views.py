@@ -1,4 +1,5 @@
 from django.utils import timezone
+from django.db.models import Count, Q
 import random
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -9,10 +10,61 @@ from ..error_codes import ErrorCodes
 
 from ..models import PlatformTest, TestSession, TestAnswer
 from ..serializers import TestSessionSerializer, QuestionForTestSerializer
+from ..utils.cache import cache_aside
+from ..utils.query_budget import query_budget
 
 # local imports for question generation utilities will be performed inline to avoid circular imports
 
 
+# --- cached catalog reads (invalidated by model signals, see signals.py) ---
+
+@cache_aside('platform_tests:active', tags=['platform_tests'], timeout=300)
+def get_active_platform_tests():
+    """Active platform tests (with institution) in display order."""
+    return list(
+        PlatformTest.objects.filter(is_active=True)
+        .select_related('institution')
+        .order_by('scheduled_date_time', 'test_name')
+    )
+
+
+@cache_aside('platform_tests:detail', tags=['platform_tests'], timeout=300)
+def get_active_platform_test(test_id):
+    """Single active platform test or None."""
+    return PlatformTest.objects.filter(id=test_id, is_active=True).first()
+
+
+@cache_aside('topics:list', tags=['topics'], timeout=3600)
+def get_topic_catalog():
+    """Topic id/name/subject/chapter rows ordered by subject and name."""
+    from ..models import Topic
+
+    return list(Topic.objects.order_by('subject', 'name').values('id', 'name', 'subject', 'chapter'))
+
+
+def get_student_platform_attempt_map(student_id):
+    """
+    Per-student attempt state for every platform test in one grouped query.
+    Returns {platform_test_id: {'has_completed': bool, 'has_active_session': bool}}.
+    """
+    rows = (
+        TestSession.objects.filter(student_id=student_id, platform_test__isnull=False)
+        .values('platform_test_id')
+        .annotate(
+            completed=Count('id', filter=Q(is_completed=True)),
+            active=Count('id', filter=Q(is_completed=False)),
+        )
+    )
+    return {
+        row['platform_test_id']: {
+            'has_completed': row['completed'] > 0,
+            'has_active_session': row['active'] > 0,
+        }
+        for row in rows
+    }
+
+
+@query_budget('list-available-platform-tests', 4)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_available_platform_tests(request):
@@ -20,28 +72,19 @@ def list_available_platform_tests(request):
     List all platform tests available to students.
     Shows both scheduled and open tests with their availability status.
     """
-    # Get all active platform tests
-    platform_tests = PlatformTest.objects.filter(is_active=True).order_by('scheduled_date_time', 'test_name')
+    # Get all active platform tests (cached; availability is still evaluated per request)
+    platform_tests = get_active_platform_tests()
     
     tests_data = []
     # Determine authenticated student's id if available
     student_id = getattr(request.user, 'student_id', None)
+    attempt_map = get_student_platform_attempt_map(student_id) if student_id else {}
 
     for test in platform_tests:
         # Per-student flags
-        has_completed = False
-        has_active_session = False
-        if student_id:
-            has_completed = TestSession.objects.filter(
-                student_id=student_id,
-                platform_test=test,
-                is_completed=True
-            ).exists()
-            has_active_session = TestSession.objects.filter(
-                student_id=student_id,
-                platform_test=test,
-                is_completed=False
-            ).exists()
+        attempt_state = attempt_map.get(test.id, {})
+        has_completed = attempt_state.get('has_completed', False)
+        has_active_session = attempt_state.get('has_active_session', False)
 
         # Determine if passcode is required (not required for NEET BRO institution)
         requires_passcode = bool(test.is_institution_test)
@@ -326,11 +369,7 @@ def list_available_topics(request):
     """
     Return list of available topics (id and name) so admin can choose topics by name instead of IDs.
     """
-    from ..models import Topic
-
-    topics = Topic.objects.all().order_by('subject', 'name')
-    topics_list = [{'id': t.id, 'name': t.name, 'subject': t.subject, 'chapter': t.chapter} for t in topics]
-    return Response({'topics': topics_list})
+    return Response({'topics': get_topic_catalog()})
 
 
 @api_view(['GET'])
@@ -339,9 +378,8 @@ def get_platform_test_details(request, test_id):
     """
     Get detailed information about a specific platform test.
     """
-    try:
-        platform_test = PlatformTest.objects.get(id=test_id, is_active=True)
-    except PlatformTest.DoesNotExist:
+    platform_test = get_active_platform_test(test_id)
+    if platform_test is None:
         return Response(
             {'error': 'Platform test not found or inactive.'}, 
             status=status.HTTP_404_NOT_FOUND
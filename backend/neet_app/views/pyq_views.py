@@ -5,6 +5,7 @@ Handles PYQ upload, listing for both institutions and students, and test initiat
 
 import logging
 import random
+from collections import Counter
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -27,6 +28,7 @@ from neet_app.errors import AppError, ValidationError as AppValidationError
 from neet_app.error_codes import ErrorCodes
 from neet_app.services.pyq_import import process_pyq_upload, UploadValidationError
 from neet_app.institution_auth import institution_admin_required
+from neet_app.utils.cache import cache_aside
 
 logger = logging.getLogger(__name__)
 
@@ -160,6 +162,30 @@ def list_institution_pyqs(request):
     })
 
 
+@cache_aside('pyqs:active', tags=['pyqs'], timeout=300)
+def get_active_pyqs():
+    """Active PYQ papers, newest first (cached; invalidated on PYQ save/delete)."""
+    return list(
+        PreviousYearQuestionPaper.objects.filter(is_active=True).order_by('-uploaded_at')
+    )
+
+
+def get_student_pyq_attempt_counts(student_id):
+    """
+    Map of pyq_id -> number of PYQ sessions for the student, from one query.
+    PYQ sessions store the pyq_id in selected_topics (see start_pyq_test).
+    """
+    counts = Counter()
+    session_topics = TestSession.objects.filter(
+        student_id=student_id,
+        test_type='pyq'
+    ).values_list('selected_topics', flat=True)
+    for selected_topics in session_topics:
+        # a session counts once per PYQ id it contains
+        counts.update({pyq_id for pyq_id in (selected_topics or []) if isinstance(pyq_id, int)})
+    return counts
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_student_pyqs(request):
@@ -172,20 +198,17 @@ def list_student_pyqs(request):
     """
     # Show all active PYQs to all students (global access like institution tests)
     # PYQs created by any institution should be visible to all users
-    pyqs = PreviousYearQuestionPaper.objects.filter(
-        is_active=True
-    ).order_by('-uploaded_at')
+    pyqs = get_active_pyqs()
     
+    # Attempt counts for all PYQs in a single query
+    attempt_counts = {}
+    if hasattr(request.user, 'student_id'):
+        attempt_counts = get_student_pyq_attempt_counts(request.user.student_id)
+
     pyqs_data = []
     for pyq in pyqs:
         # Count how many times this student has attempted this PYQ
-        attempt_count = 0
-        if hasattr(request.user, 'student_id'):
-            attempt_count = TestSession.objects.filter(
-                student_id=request.user.student_id,
-                test_type='pyq',
-                selected_topics__contains=[pyq.id]  # Store pyq_id in selected_topics for tracking
-            ).count()
+        attempt_count = attempt_counts.get(pyq.id, 0)
         
         pyqs_data.append({
             'id': pyq.id,
@@ -10,7 +10,6 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
 from django.utils import timezone
 from datetime import date, timedelta
 import random
@@ -86,30 +85,13 @@ def get_question_of_the_day(request):
     attempted_question_ids = set(test_answered_question_ids) | set(qod_question_ids)
     
     # Get questions not yet attempted
-    # Filter for non-image questions (all image fields must be null/blank)
-    available_questions = Question.objects.exclude(
-        id__in=attempted_question_ids
-    ).filter(
-        Q(institution__isnull=True) &  # Only global questions, not institution-specific
-        (Q(question_image__isnull=True) | Q(question_image='')) &
-        (Q(option_a_image__isnull=True) | Q(option_a_image='')) &
-        (Q(option_b_image__isnull=True) | Q(option_b_image='')) &
-        (Q(option_c_image__isnull=True) | Q(option_c_image='')) &
-        (Q(option_d_image__isnull=True) | Q(option_d_image='')) &
-        (Q(explanation_image__isnull=True) | Q(explanation_image=''))
-    )
+    # Only global (non-institution) text-only questions; served by the partial text-only index
+    text_only_global = Question.objects.filter(institution__isnull=True, has_images=False)
+    available_questions = text_only_global.exclude(id__in=attempted_question_ids)
     
     # Fallback: If all questions attempted, select from all non-image questions
     if not available_questions.exists():
-        available_questions = Question.objects.filter(
-            Q(institution__isnull=True) &
-            (Q(question_image__isnull=True) | Q(question_image='')) &
-            (Q(option_a_image__isnull=True) | Q(option_a_image='')) &
-            (Q(option_b_image__isnull=True) | Q(option_b_image='')) &
-            (Q(option_c_image__isnull=True) | Q(option_c_image='')) &
-            (Q(option_d_image__isnull=True) | Q(option_d_image='')) &
-            (Q(explanation_image__isnull=True) | Q(explanation_image=''))
-        )
+        available_questions = text_only_global
     
     # Select a random question and return it to the client without persisting
     # a QuestionOfTheDay row. The QOD record will be created only when the
@@ -7,7 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count, Q
 
 from ..models import TestAnswer, TestSession
-from ..serializers import TestAnswerCreateSerializer, TestAnswerSerializer
+from ..serializers import AnswerAutosaveSerializer, TestAnswerCreateSerializer, TestAnswerSerializer
+from ..services.answer_autosave_service import autosave_answers, evaluate_answer
 
 
 class TestAnswerViewSet(viewsets.ModelViewSet):
@@ -60,63 +61,20 @@ class TestAnswerViewSet(viewsets.ModelViewSet):
         session = validated_data.pop('session')
         question = validated_data.pop('question')
         
-        # Determine question type
-        question_type = getattr(question, 'question_type', None) or 'Blank'  # Default to MCQ
+        graded = evaluate_answer(
+            question,
+            selected_answer=validated_data.get('selected_answer'),
+            text_answer=validated_data.get('text_answer'),
+        )
 
         # Prepare defaults for update_or_create
         defaults = {
             'marked_for_review': validated_data.get('marked_for_review', False),
             'is_bookmarked': validated_data.get('is_bookmarked', False),
+            'selected_answer': graded['selected_answer'],
+            'text_answer': graded['text_answer'],
+            'is_correct': graded['is_correct'],
         }
-        
-        # Handle answer based on question type
-        if question_type == 'NVT':
-            # NVT question - store text answer and evaluate
-            text_answer = validated_data.get('text_answer')
-            defaults['text_answer'] = text_answer
-            defaults['selected_answer'] = None  # Clear MCQ answer for NVT
-            
-            # Auto-evaluate if enabled and answer provided
-            if text_answer:
-                from django.conf import settings
-                auto_evaluate = settings.NEET_SETTINGS.get('NVT_AUTO_EVALUATE', True)
-                if auto_evaluate and question.correct_answer:
-                    is_correct = self._evaluate_nvt_answer(text_answer, question.correct_answer)
-                    defaults['is_correct'] = is_correct
-                else:
-                    # Manual grading required or no correct answer set
-                    defaults['is_correct'] = None
-            else:
-                # Unanswered
-                defaults['is_correct'] = None
-        else:
-            # MCQ question - store selected answer
-            selected_answer = validated_data.get('selected_answer')
-            defaults['selected_answer'] = selected_answer
-            defaults['text_answer'] = None  # Clear text answer for MCQ
-            
-            # Evaluate MCQ correctness if answer provided
-            if selected_answer:
-                try:
-                    # Normalize both sides and compare. For MCQ we expect letters A/B/C/D,
-                    # but question.correct_answer may be a text/number for NVT questions
-                    # if the data was authored inconsistently. Handle gracefully.
-                    sel = str(selected_answer).strip()
-                    corr = question.correct_answer
-                    if corr is None:
-                        defaults['is_correct'] = None
-                    else:
-                        corr_str = str(corr).strip()
-                        # If both look like single letters, compare case-insensitively
-                        if len(sel) == 1 and corr_str and len(corr_str) == 1:
-                            defaults['is_correct'] = sel.upper() == corr_str.upper()
-                        else:
-                            # Fallback to direct string equality (trimmed)
-                            defaults['is_correct'] = sel == corr_str
-                except Exception:
-                    defaults['is_correct'] = False
-            else:
-                defaults['is_correct'] = None
 
         answer, created = TestAnswer.objects.update_or_create(
             session=session,
@@ -126,10 +84,7 @@ class TestAnswerViewSet(viewsets.ModelViewSet):
 
         # Set answered_at timestamp if answer was provided
         updated_fields = []
-        answer_provided = (question_type == 'NVT' and validated_data.get('text_answer')) or \
-                         (question_type != 'NVT' and validated_data.get('selected_answer'))
-        
-        if answer_provided and not answer.answered_at:
+        if graded['answer_provided'] and not answer.answered_at:
             from django.utils import timezone
             answer.answered_at = timezone.now()
             updated_fields.append('answered_at')
@@ -142,37 +97,36 @@ class TestAnswerViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
     
-    def _evaluate_nvt_answer(self, student_answer, correct_answer):
+    @action(detail=False, methods=['post'])
+    def autosave(self, request):
         """
-        Evaluate NVT answer against correct answer.
-        Handles numeric (with tolerance) and string (case-insensitive) comparisons.
-        
-        Args:
-            student_answer: Student's text answer (string)
-            correct_answer: Correct answer from Question model (string)
-            
-        Returns:
-            bool: True if answer is correct, False otherwise
+        Autosave a batch of answer deltas ordered by client sequence number.
+        POST /api/test-answers/autosave/
+        Body: {"session_id": int, "seq": int (optional default), "answers": [
+            {"question_id", "seq", "selected_answer", "text_answer", "marked_for_review", "is_bookmarked"}]}
+
+        The batch is applied as one upsert; deltas older than the stored
+        sequence for their question are dropped and reported as stale.
         """
-        from django.conf import settings
-        
-        # Strip whitespace from both answers
-        student_answer = str(student_answer).strip()
-        correct_answer = str(correct_answer).strip()
-        
-        # Try numeric comparison first
-        try:
-            student_numeric = float(student_answer)
-            correct_numeric = float(correct_answer)
-            tolerance = settings.NEET_SETTINGS.get('NVT_NUMERIC_TOLERANCE', 0.01)
-            return abs(student_numeric - correct_numeric) <= tolerance
-        except (ValueError, TypeError):
-            # Not numeric, fall back to string comparison
-            case_sensitive = settings.NEET_SETTINGS.get('NVT_CASE_SENSITIVE', False)
-            if case_sensitive:
-                return student_answer == correct_answer
-            else:
-                return student_answer.lower() == correct_answer.lower()
+        serializer = AnswerAutosaveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        session = TestSession.objects.filter(
+            id=data['session_id'], student_id=getattr(request.user, 'student_id', None)
+        ).only('id', 'is_completed').first()
+        if session is None:
+            raise AppError(code=ErrorCodes.TEST_SESSION_NOT_FOUND, message='Test session not found.')
+        if session.is_completed:
+            raise AppError(code=ErrorCodes.TEST_ALREADY_COMPLETED, message='Test session is already completed.')
+
+        applied, stale, unknown = autosave_answers(session.id, data['answers'])
+        return Response({
+            'session_id': session.id,
+            'applied': applied,
+            'stale': stale,
+            'unknown_question_ids': unknown,
+        }, status=status.HTTP_200_OK)
 
     def partial_update(self, request, *args, **kwargs):
         """
@@ -6,6 +6,7 @@ from django.http import Http404
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.conf import settings
+from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -17,13 +18,18 @@ from rest_framework.permissions import IsAuthenticated
 from ..models import Question, TestSession, TestAnswer
 from ..serializers import (
     QuestionForTestSerializer, TestSessionCreateSerializer, 
-    TestSessionSerializer
+    TestSessionSerializer, QuestionImagesSerializer,
+    QUESTION_PAYLOAD_PROFILES, QUESTION_PROFILE_SERIALIZERS, DEFAULT_QUESTION_PAYLOAD_PROFILE,
+    QUESTION_IMAGE_FIELDS, REVIEW_IMAGE_FIELDS, question_image_flag_annotations
 )
 from ..notifications import dispatch_test_result_email
+from ..utils.query_budget import query_budget
+from ..utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+@query_budget('test-session-list', 4)
 class TestSessionViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing test sessions.
@@ -33,6 +39,10 @@ class TestSessionViewSet(viewsets.ModelViewSet):
     serializer_class = TestSessionSerializer
     permission_classes = [IsAuthenticated]
 
+    # Page size for the /questions/ action (skeleton payloads are small)
+    QUESTION_PAGE_SIZE = 20
+    MAX_QUESTION_PAGE_SIZE = 100
+
     def get_queryset(self):
         """Filter test sessions by authenticated user"""
         logger.info(f"get_queryset - User: {self.request.user}")
@@ -46,9 +56,8 @@ class TestSessionViewSet(viewsets.ModelViewSet):
         logger.info(f"Filtering by student_id: {self.request.user.student_id}")
         queryset = TestSession.objects.filter(
             student_id=self.request.user.student_id
-        ).order_by('-start_time')
+        ).select_related('platform_test').order_by('-start_time')
         
-        logger.info(f"Queryset count: {queryset.count()}")
         return queryset
 
     def get_serializer_class(self):
@@ -79,147 +88,58 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data, context={'request': request})
             serializer.is_valid(raise_exception=True)
             
-            # Get student_id before creating session to check question availability
             student_id = request.user.student_id
             selected_topics = serializer.validated_data.get('selected_topics', [])
             requested_question_count = serializer.validated_data.get('question_count')
             adaptive_selection = serializer.validated_data.get('adaptive_selection', False)
-            
-            # Get recent question IDs to exclude
-            recent_question_ids = TestSession.get_recent_question_ids_for_student(student_id)
-            
-            # Check if this is a random test
             test_type = request.data.get('test_type', 'search')
-            
-            if test_type == 'random':
-                # For random tests, skip topic-based selection and directly select from entire database
-                from .utils import generate_random_questions_from_database
-                
-                # Note: random tests also exclude image questions (same as custom tests)
-                available_questions = generate_random_questions_from_database(
-                    requested_question_count,
-                    exclude_question_ids=recent_question_ids
+
+            # One selection pass: recent-question exclusion, availability and the final pick.
+            # Custom and random tests exclude image questions.
+            from .utils import select_session_questions
+            selection = select_session_questions(
+                test_type,
+                selected_topics,
+                requested_question_count,
+                student_id,
+                adaptive_selection=adaptive_selection,
+                exclude_image_questions=True
+            )
+
+            if not selection.sufficient:
+                details = {
+                    'available_questions': selection.available_count,
+                    'requested_questions': requested_question_count
+                }
+                if selection.available_count == 0:
+                    raise AppValidationError(message='No questions available for selected topics.', details=details)
+                raise AppValidationError(
+                    message=f'Only {selection.available_count} questions available for selected topics, but {requested_question_count} requested.',
+                    details=details
                 )
-                available_count = available_questions.count()
-                
-                # For random tests, we should always have enough questions since we're using the entire database
-                if available_count < requested_question_count:
-                    logger.warning(f"Random test: Only {available_count} questions available in entire database, but {requested_question_count} requested")
-                    # For random tests, adjust the count to what's available rather than failing
-                    serializer.validated_data['question_count'] = available_count
-                    requested_question_count = available_count
-            else:
-                # For topic-based tests (custom/search), use the existing logic
-                if adaptive_selection:
-                    # For adaptive selection, we're more lenient - just check if any questions exist
-                    from .utils import adaptive_generate_questions_for_topics
-                    # Custom tests exclude image questions
-                    available_questions = generate_questions_for_topics(
-                        selected_topics, 
-                        None,  # Don't limit to get total available count
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
-                    )
-                    available_count = available_questions.count()
-                    
-                    # For adaptive selection, we only fail if no questions are available at all
-                    if available_count == 0:
-                        raise AppValidationError(
-                            message='No questions available for selected topics.',
-                            details={'available_questions': 0, 'requested_questions': requested_question_count}
-                        )
-                    
-                    # If we have fewer questions than requested, log it but continue (adaptive selection will handle it)
-                    if available_count < requested_question_count:
-                        logger.info(f"Adaptive selection: Only {available_count} questions available for {requested_question_count} requested, but continuing with adaptive logic")
-                else:
-                    # For traditional selection, enforce strict availability
-                    from .utils import generate_questions_for_topics
-                    # Custom tests exclude image questions
-                    available_questions = generate_questions_for_topics(
-                        selected_topics, 
-                        None,  # Don't limit to get total available count
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
-                    )
-                    available_count = available_questions.count()
-                    
-                    # Validate if we have enough questions for topic-based tests
-                    if available_count < requested_question_count:
-                        raise AppValidationError(
-                            message=f'Only {available_count} questions available for selected topics, but {requested_question_count} requested.',
-                            details={'available_questions': available_count, 'requested_questions': requested_question_count}
-                        )
-            
-            # Create the session (serializer generates questions internally with exclusion)
-            session = serializer.save()
-            
-            # Get the final questions with proper exclusion and count limit
+
+            selected_questions = selection.questions
+            save_kwargs = {'total_questions': len(selected_questions)}
             if test_type == 'random':
-                # For random tests, choose between adaptive and traditional selection
-                # Random tests also exclude image questions (same as custom tests)
-                if adaptive_selection:
-                    from .utils import adaptive_generate_random_questions_from_database
-                    selected_questions = adaptive_generate_random_questions_from_database(
-                        session.question_count,
-                        student_id,
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
-                    )
-                else:
-                    from .utils import generate_random_questions_from_database
-                    selected_questions = generate_random_questions_from_database(
-                        session.question_count,
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
-                    )
-            else:
-                # For topic-based tests, choose between adaptive and traditional selection
-                if adaptive_selection:
-                    from .utils import adaptive_generate_questions_for_topics
-                    # Custom tests exclude image questions
-                    selected_questions = adaptive_generate_questions_for_topics(
-                        session.selected_topics, 
-                        session.question_count,
-                        student_id,
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
-                    )
-                else:
-                    # Custom tests exclude image questions
-                    selected_questions = generate_questions_for_topics(
-                        session.selected_topics, 
-                        session.question_count,
-                        exclude_question_ids=recent_question_ids,
-                        exclude_image_questions=True
+                # Random tests adapt to the pool and record the topics actually drawn,
+                # so topic classification (post_save signal) sees them on create
+                save_kwargs['question_count'] = min(requested_question_count, selection.available_count)
+                save_kwargs['selected_topics'] = selection.topic_ids
+
+            # Session, topic classification and the unanswered TestAnswer rows are written together
+            with transaction.atomic():
+                session = serializer.save(**save_kwargs)
+                TestAnswer.objects.bulk_create([
+                    TestAnswer(
+                        session=session,
+                        question=question,
+                        selected_answer=None,
+                        is_correct=False,
+                        marked_for_review=False,
+                        time_taken=0
                     )
-            
-            # Update session with actual question count
-            # If this was a random test, store the topics of the randomly-selected questions
-            if test_type == 'random':
-                try:
-                    # selected_questions may be a QuerySet or list of Question objects
-                    topic_ids = list({getattr(q, 'topic_id', getattr(q, 'topic').id) for q in selected_questions})
-                    session.selected_topics = topic_ids
-                    session.save(update_fields=['selected_topics'])
-                except Exception:
-                    logger.exception('Failed to populate session.selected_topics for random test')
-
-            session.total_questions = len(selected_questions)
-            session.save(update_fields=['total_questions'])
-
-            # Create TestAnswer records for all assigned questions (initially unanswered)
-            test_answers = []
-            for question in selected_questions:
-                test_answers.append(TestAnswer(
-                    session=session,
-                    question=question,
-                    selected_answer=None,
-                    is_correct=False,
-                    marked_for_review=False,
-                    time_taken=0
-                ))
-            TestAnswer.objects.bulk_create(test_answers)
+                    for question in selected_questions
+                ])
 
             session_data = TestSessionSerializer(session).data
             questions_data = QuestionForTestSerializer(selected_questions, many=True).data
@@ -276,12 +196,13 @@ class TestSessionViewSet(viewsets.ModelViewSet):
         except ValueError:
             raise AppError(code=ErrorCodes.SERVER_ERROR, message='Invalid topic IDs stored in session.')
 
-        # Get questions from TestAnswer table (the exact questions assigned to this session)
-        test_answers = TestAnswer.objects.filter(session=session).select_related('question')
-        selected_questions = [answer.question for answer in test_answers]
+        profile = self._resolve_question_profile(request, session)
+
+        # Question ids from TestAnswer table (the exact questions assigned to this session)
+        question_ids = self._session_question_ids(session)
 
         # If no TestAnswer rows exist (legacy or previously-miscreated session), create them now
-        if not selected_questions:
+        if not question_ids:
             try:
                 # Try to import question generation utility
                 from .utils import generate_questions_for_topics
@@ -319,11 +240,11 @@ class TestSessionViewSet(viewsets.ModelViewSet):
                     ))
                 TestAnswer.objects.bulk_create(test_answer_objs)
 
-                # Refresh selected_questions from generated set
-                selected_questions = list(generated_questions)
+                # Refresh question_ids from generated set
+                question_ids = [q.id for q in generated_questions]
                 # Update session.total_questions if mismatch
-                if session.total_questions != len(selected_questions):
-                    session.total_questions = len(selected_questions)
+                if session.total_questions != len(question_ids):
+                    session.total_questions = len(question_ids)
                     session.save(update_fields=['total_questions'])
 
             except Exception as e:
@@ -331,13 +252,104 @@ class TestSessionViewSet(viewsets.ModelViewSet):
                 raise AppError(code=ErrorCodes.SERVER_ERROR, message='Failed to generate questions for session', details={'exception': str(e)})
 
         session_data = TestSessionSerializer(session).data
-        questions_data = QuestionForTestSerializer(selected_questions, many=True).data
+        selected_questions = self._load_profile_questions(question_ids, profile)
+        questions_data = QUESTION_PROFILE_SERIALIZERS[profile](selected_questions, many=True).data
 
         return Response({
             'session': session_data,
             'questions': questions_data
         })
 
+    @action(detail=True, methods=['get'], url_path='questions')
+    def questions(self, request, pk=None):
+        """
+        Paged question payload for a session.
+        GET /api/test-sessions/:id/questions/?profile=skeleton&offset=0&limit=20
+        """
+        session = self._get_owned_session(pk)
+        profile = self._resolve_question_profile(request, session)
+
+        try:
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+            limit = int(request.query_params.get('limit', self.QUESTION_PAGE_SIZE))
+        except (TypeError, ValueError):
+            raise AppValidationError(message='offset and limit must be integers')
+        limit = min(max(limit, 1), self.MAX_QUESTION_PAGE_SIZE)
+
+        question_ids = self._session_question_ids(session)
+        page_ids = question_ids[offset:offset + limit]
+        selected_questions = self._load_profile_questions(page_ids, profile)
+
+        return Response({
+            'profile': profile,
+            'total': len(question_ids),
+            'offset': offset,
+            'limit': limit,
+            'question_ids': question_ids,
+            'questions': QUESTION_PROFILE_SERIALIZERS[profile](selected_questions, many=True).data
+        })
+
+    @action(detail=True, methods=['get'], url_path=r'questions/(?P<question_id>\d+)')
+    def question_images(self, request, pk=None, question_id=None):
+        """
+        Image payload for a single question of the session, used to hydrate
+        skeleton/review profiles as each question is displayed.
+        GET /api/test-sessions/:id/questions/:question_id/
+        """
+        session = self._get_owned_session(pk)
+        # Explanation images are only revealed once the session is completed
+        image_fields = REVIEW_IMAGE_FIELDS if session.is_completed else QUESTION_IMAGE_FIELDS
+
+        question = Question.objects.filter(
+            id=question_id, testanswer__session=session
+        ).only('id', *image_fields).first()
+        if question is None:
+            raise NotFoundError(message='Question not found in this test session')
+
+        data = QuestionImagesSerializer(question).data
+        return Response({key: value for key, value in data.items() if key == 'id' or key in image_fields})
+
+    # --- question payload helpers ---
+    def _get_owned_session(self, pk):
+        try:
+            return get_object_or_404(self.get_queryset(), pk=pk)
+        except Http404:
+            raise NotFoundError(message='Test session not found')
+
+    def _resolve_question_profile(self, request, session):
+        """Validate ?profile= (default: full). Review is only allowed after completion."""
+        profile = request.query_params.get('profile') or DEFAULT_QUESTION_PAYLOAD_PROFILE
+        if profile not in QUESTION_PAYLOAD_PROFILES:
+            raise AppValidationError(
+                message='Invalid question profile',
+                details={'profile': profile, 'allowed': list(QUESTION_PAYLOAD_PROFILES)}
+            )
+        if profile == 'review' and not session.is_completed:
+            raise AppValidationError(message='Review profile is only available for completed test sessions')
+        return profile
+
+    @staticmethod
+    def _session_question_ids(session):
+        return list(
+            TestAnswer.objects.filter(session=session).order_by('id').values_list('question_id', flat=True)
+        )
+
+    @staticmethod
+    def _load_profile_questions(question_ids, profile):
+        """
+        Load questions in session order selecting only the columns the profile
+        renders; skeleton/review get `has_<image>` flags instead of the images.
+        """
+        if not question_ids:
+            return []
+        queryset = Question.objects.filter(id__in=question_ids).only(*QUESTION_PAYLOAD_PROFILES[profile])
+        if profile == 'skeleton':
+            queryset = queryset.annotate(**question_image_flag_annotations(QUESTION_IMAGE_FIELDS))
+        elif profile == 'review':
+            queryset = queryset.annotate(**question_image_flag_annotations(REVIEW_IMAGE_FIELDS))
+        by_id = {q.id: q for q in queryset}
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
     @action(detail=True, methods=['post'])
     def submit(self, request, pk=None):
         """
@@ -355,6 +367,16 @@ class TestSessionViewSet(viewsets.ModelViewSet):
         session.end_time = timezone.now()
         session.save(update_fields=['is_completed', 'end_time'])
 
+        # Land any buffered time-tracking increments before answers are scored
+        from ..services.time_tracking_service import buffer_enabled, flush_time_tracking_buffer
+        if buffer_enabled():
+            flush_time_tracking_buffer(session.id)
+
+        # Submitted sessions no longer count as live
+        from ..services.live_presence_service import clear_session_presence, presence_enabled
+        if presence_enabled():
+            clear_session_presence(session)
+
         answers = TestAnswer.objects.filter(session=session).select_related('question').prefetch_related('question__topic')
 
         total_questions_in_session = session.total_questions
@@ -432,95 +454,96 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             question_map[q.id] = q
 
         # Process all TestAnswer objects (now includes all assigned questions)
-        for answer in answers:
-            question = answer.question
-            is_correct = False
+        with span('scoring', 'test_session.submit.evaluate_answers', session_id=session.id):
+            for answer in answers:
+                question = answer.question
+                is_correct = False
 
-            # Determine question type (NVT vs MCQ/Blank)
-            q_type = (getattr(question, 'question_type', '') or '').upper()
+                # Determine question type (NVT vs MCQ/Blank)
+                q_type = (getattr(question, 'question_type', '') or '').upper()
 
-            if q_type == 'NVT':
-                # Prefer text_answer for NVT questions
-                student_text = answer.text_answer if answer.text_answer is not None and str(answer.text_answer).strip() != '' else None
+                if q_type == 'NVT':
+                    # Prefer text_answer for NVT questions
+                    student_text = answer.text_answer if answer.text_answer is not None and str(answer.text_answer).strip() != '' else None
 
-                if student_text is None:
-                    # For NVT, missing text_answer is considered unanswered (do not fallback to selected_answer)
-                    unanswered_questions_count += 1
-                    is_correct = False
-                else:
-                    # Evaluate NVT answer: try numeric comparison first, then string
-                    try:
-                        student_numeric = float(str(student_text).strip())
-                        correct_numeric = float(str(question.correct_answer).strip())
-                        tolerance = settings.NEET_SETTINGS.get('NVT_NUMERIC_TOLERANCE', 0.01)
-                        if abs(student_numeric - correct_numeric) <= float(tolerance):
-                            correct_answers_count += 1
-                            is_correct = True
-                        else:
-                            incorrect_answers_count += 1
-                            is_correct = False
-                    except (ValueError, TypeError):
-                        # Fall back to string comparison
-                        case_sensitive = settings.NEET_SETTINGS.get('NVT_CASE_SENSITIVE', False)
-                        if case_sensitive:
-                            match = str(student_text).strip() == str(question.correct_answer).strip()
-                        else:
-                            match = str(student_text).strip().lower() == str(question.correct_answer).strip().lower()
+                    if student_text is None:
+                        # For NVT, missing text_answer is considered unanswered (do not fallback to selected_answer)
+                        unanswered_questions_count += 1
+                        is_correct = False
+                    else:
+                        # Evaluate NVT answer: try numeric comparison first, then string
+                        try:
+                            student_numeric = float(str(student_text).strip())
+                            correct_numeric = float(str(question.correct_answer).strip())
+                            tolerance = settings.NEET_SETTINGS.get('NVT_NUMERIC_TOLERANCE', 0.01)
+                            if abs(student_numeric - correct_numeric) <= float(tolerance):
+                                correct_answers_count += 1
+                                is_correct = True
+                            else:
+                                incorrect_answers_count += 1
+                                is_correct = False
+                        except (ValueError, TypeError):
+                            # Fall back to string comparison
+                            case_sensitive = settings.NEET_SETTINGS.get('NVT_CASE_SENSITIVE', False)
+                            if case_sensitive:
+                                match = str(student_text).strip() == str(question.correct_answer).strip()
+                            else:
+                                match = str(student_text).strip().lower() == str(question.correct_answer).strip().lower()
+
+                            if match:
+                                correct_answers_count += 1
+                                is_correct = True
+                            else:
+                                incorrect_answers_count += 1
+                                is_correct = False
 
-                        if match:
+                else:
+                    # Default/MCQ handling: compare selected_answer to correct_answer
+                    if answer.selected_answer is not None and str(answer.selected_answer).strip() != '':
+                        if str(answer.selected_answer).strip() == str(question.correct_answer):
                             correct_answers_count += 1
                             is_correct = True
                         else:
                             incorrect_answers_count += 1
                             is_correct = False
-
-            else:
-                # Default/MCQ handling: compare selected_answer to correct_answer
-                if answer.selected_answer is not None and str(answer.selected_answer).strip() != '':
-                    if str(answer.selected_answer).strip() == str(question.correct_answer):
-                        correct_answers_count += 1
-                        is_correct = True
                     else:
-                        incorrect_answers_count += 1
+                        unanswered_questions_count += 1
                         is_correct = False
-                else:
-                    unanswered_questions_count += 1
-                    is_correct = False
 
-            # Persist correctness (maintain existing field semantics)
-            answer.is_correct = is_correct
-            answer.save(update_fields=['is_correct'])
-
-            detailed_answers.append({
-                'questionId': question.id,
-                'question': question.question,
-                'selectedAnswer': answer.selected_answer,
-                'correctAnswer': question.correct_answer,
-                'isCorrect': is_correct,
-                'explanation': question.explanation,
-                # Include question image (nullable) for results display
-                'question_image': getattr(question, 'question_image', None),
-                # Include explanation image (nullable) for results display
-                'explanation_image': getattr(question, 'explanation_image', None),
-                'optionA': question.option_a,
-                'optionB': question.option_b,
-                'optionC': question.option_c,
-                'optionD': question.option_d,
-                # Include option images (nullable) so results page can show them
-                'option_a_image': getattr(question, 'option_a_image', None),
-                'option_b_image': getattr(question, 'option_b_image', None),
-                'option_c_image': getattr(question, 'option_c_image', None),
-                'option_d_image': getattr(question, 'option_d_image', None),
-                'markedForReview': answer.marked_for_review,
-                'timeTaken': answer.time_taken
-            })
-
-            subject_name = question.topic.subject
-            if subject_name not in subject_performance:
-                subject_performance[subject_name] = {'correct': 0, 'total': 0}
-            subject_performance[subject_name]['total'] += 1
-            if is_correct:
-                subject_performance[subject_name]['correct'] += 1
+                # Persist correctness (maintain existing field semantics)
+                answer.is_correct = is_correct
+                answer.save(update_fields=['is_correct'])
+
+                detailed_answers.append({
+                    'questionId': question.id,
+                    'question': question.question,
+                    'selectedAnswer': answer.selected_answer,
+                    'correctAnswer': question.correct_answer,
+                    'isCorrect': is_correct,
+                    'explanation': question.explanation,
+                    # Include question image (nullable) for results display
+                    'question_image': getattr(question, 'question_image', None),
+                    # Include explanation image (nullable) for results display
+                    'explanation_image': getattr(question, 'explanation_image', None),
+                    'optionA': question.option_a,
+                    'optionB': question.option_b,
+                    'optionC': question.option_c,
+                    'optionD': question.option_d,
+                    # Include option images (nullable) so results page can show them
+                    'option_a_image': getattr(question, 'option_a_image', None),
+                    'option_b_image': getattr(question, 'option_b_image', None),
+                    'option_c_image': getattr(question, 'option_c_image', None),
+                    'option_d_image': getattr(question, 'option_d_image', None),
+                    'markedForReview': answer.marked_for_review,
+                    'timeTaken': answer.time_taken
+                })
+
+                subject_name = question.topic.subject
+                if subject_name not in subject_performance:
+                    subject_performance[subject_name] = {'correct': 0, 'total': 0}
+                subject_performance[subject_name]['total'] += 1
+                if is_correct:
+                    subject_performance[subject_name]['correct'] += 1
 
         answered_questions_count = len(answers)
 
@@ -568,6 +591,10 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             # Do not fail result response if DB write has issues; log exception for visibility
             logger.exception('Failed to persist session summary for session %s', session.id)
 
+        # Subject scores are computed off the request path once correctness is persisted
+        from ..tasks import schedule_subject_scores
+        schedule_subject_scores(session.id)
+
         formatted_subject_performance = []
         for subject_name, data in subject_performance.items():
             formatted_subject_performance.append({
@@ -599,9 +626,9 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             """Run zone-insight generation directly (used when no Celery worker found)."""
             try:
                 from ..services.zone_insights_service import compute_and_store_zone_insights
-                print(f"🔄 [fallback-thread] Computing zone insights for session {sid}")
+                logger.debug("🔄 [fallback-thread] Computing zone insights for session %s", sid)
                 compute_and_store_zone_insights(sid)
-                print(f"✅ [fallback-thread] Zone insights done for session {sid}")
+                logger.debug("✅ [fallback-thread] Zone insights done for session %s", sid)
             except Exception as _e:
                 logger.exception(f"[fallback-thread] compute_and_store_zone_insights failed for session {sid}: {_e}")
                 return  # can't generate focus_zone without the base row
@@ -609,11 +636,11 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             if test_type == 'platform':
                 try:
                     from ..services.zone_insights_service import generate_focus_zone, generate_repeated_mistakes
-                    print(f"🎯 [fallback-thread] Generating focus_zone for session {sid}")
+                    logger.debug("🎯 [fallback-thread] Generating focus_zone for session %s", sid)
                     generate_focus_zone(sid)
-                    print(f"🔁 [fallback-thread] Generating repeated_mistake for session {sid}")
+                    logger.debug("🔁 [fallback-thread] Generating repeated_mistake for session %s", sid)
                     generate_repeated_mistakes(student_id, sid)
-                    print(f"✅ [fallback-thread] focus_zone + repeated_mistake done for session {sid}")
+                    logger.debug("✅ [fallback-thread] focus_zone + repeated_mistake done for session %s", sid)
                 except Exception as _e:
                     logger.exception(f"[fallback-thread] focus_zone/repeated_mistake failed for session {sid}: {_e}")
 
@@ -624,7 +651,7 @@ class TestSessionViewSet(viewsets.ModelViewSet):
             
             # In DEBUG mode, skip Celery and always use fallback thread for immediate execution
             if settings.DEBUG:
-                print(f"🔧 DEBUG mode active — forcing fallback thread for session {session.id}")
+                logger.debug("🔧 DEBUG mode active — forcing fallback thread for session %s", session.id)
             else:
                 try:
                     from celery import current_app as _celery_app
@@ -633,16 +660,16 @@ class TestSessionViewSet(viewsets.ModelViewSet):
                         if _workers:
                             from ..tasks import process_test_submission_task
                             _task = process_test_submission_task.apply_async(args=[session.id])
-                            print(f"✅ Pipeline enqueued via Celery (attempt {_attempt}) ID: {_task.id}")
+                            logger.debug("✅ Pipeline enqueued via Celery (attempt %s) ID: %s", _attempt, _task.id)
                             _pipeline_enqueued = True
                             break
-                        print(f"⚠️ No Celery workers (attempt {_attempt}/2) — {'retrying...' if _attempt == 1 else 'giving up.'}")
+                        logger.warning("⚠️ No Celery workers (attempt %s/2) — %s", _attempt, 'retrying...' if _attempt == 1 else 'giving up.')
                 except Exception as _ce:
                     logger.warning(f"Celery ping/enqueue error: {_ce} — will run pipeline in background thread")
 
             if not _pipeline_enqueued:
-                print(f"🚀 No Celery worker available — running pipeline in background thread for session {session.id}")
-                print(f"🔎 [fallback] session.test_type={session.test_type}, student_id={session.student_id}")
+                logger.debug("🚀 No Celery worker available — running pipeline in background thread for session %s", session.id)
+                logger.debug("🔎 [fallback] session.test_type=%s, student_id=%s", session.test_type, session.student_id)
                 _t = _threading.Thread(
                     target=_run_pipeline_sync,
                     args=(session.id, session.student_id, session.test_type),
@@ -651,7 +678,7 @@ class TestSessionViewSet(viewsets.ModelViewSet):
                 )
                 _t.start()
         else:
-            print(f"⏩ Skipping insights pipeline for test_type={session.test_type} (session {session.id})")
+            logger.debug("⏩ Skipping insights pipeline for test_type=%s (session %s)", session.test_type, session.id)
 
         # Send test result email asynchronously (best-effort)
         try:
@@ -692,6 +719,14 @@ class TestSessionViewSet(viewsets.ModelViewSet):
         session.end_time = timezone.now()
         session.save(update_fields=['is_completed', 'end_time'])
 
+        # Quit sessions no longer count as live
+        from ..services.live_presence_service import clear_session_presence, presence_enabled
+        if presence_enabled():
+            clear_session_presence(session)
+
+        from ..tasks import schedule_subject_scores
+        schedule_subject_scores(session.id)
+
         logger.info(f"Test session {session.id} marked as completed (quit by user)")
 
         return Response({
@@ -1,13 +1,16 @@
 import logging
-from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from django.utils.dateparse import parse_datetime
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from ..models import Question, TestSession, TestAnswer
+from ..models import TestSession, TestAnswer
+from ..services.time_tracking_service import (
+    apply_visit_increments, buffer_enabled, buffer_visit_increments, coalesce_visit_events
+)
+
+# Upper bound on visit events accepted per batch request
+MAX_BATCH_EVENTS = 500
 
 logger = logging.getLogger(__name__)
 
@@ -53,58 +56,28 @@ class TimeTrackingViewSet(viewsets.GenericViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Validate question exists
-            try:
-                question = Question.objects.get(id=question_id)
-            except Question.DoesNotExist:
+            # Single visit: same F()-increment path as the batch endpoint
+            increments, rejected = coalesce_visit_events([{
+                'question_id': question_id,
+                'time_spent': time_spent,
+                'visit_end_time': visit_end_time,
+            }])
+            if rejected:
+                return Response(
+                    {"error": rejected[0]['reason']}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            result = apply_visit_increments(session.id, increments)
+            if result['skipped_question_ids']:
                 return Response(
                     {"error": "Question not found"}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
-            
-            # Get or create TestAnswer record
-            test_answer, created = TestAnswer.objects.get_or_create(
-                session=session,
-                question=question,
-                defaults={
-                    'selected_answer': None,
-                    'is_correct': False,
-                    'time_taken': 0,
-                    'answered_at': None,
-                    'marked_for_review': False,
-                    'visit_count': 1  # Set to 1 for first visit
-                }
+
+            test_answer = TestAnswer.objects.only('time_taken', 'visit_count').get(
+                session_id=session.id, question_id=question_id
             )
-            
-            # Update visit count - increment on each visit (including first time)
-            if not created:
-                # If the record already existed, increment visit count
-                test_answer.visit_count = (test_answer.visit_count or 1) + 1
-            # If created=True, visit_count is already set to 1 in defaults
-            
-            # Update time tracking - accumulate all visit times
-            current_time = test_answer.time_taken or 0
-            test_answer.time_taken = current_time + time_spent
-            
-            # Update answered_at if this is the first time logging for this question
-            if not test_answer.answered_at and visit_end_time:
-                try:
-                    test_answer.answered_at = parse_datetime(visit_end_time)
-                except (ValueError, TypeError):
-                    test_answer.answered_at = timezone.now()
-            elif not test_answer.answered_at:
-                test_answer.answered_at = timezone.now()
-            
-            test_answer.save(update_fields=['time_taken', 'answered_at', 'visit_count'])
-            
             logger.info(f"✅ Successfully logged {time_spent} seconds for question {question_id} in session {session_id}. Total time: {test_answer.time_taken}")
-            # Also update session.total_time_taken by summing the increment
-            try:
-                previous_total = session.total_time_taken or 0
-                session.total_time_taken = previous_total + time_spent
-                session.save(update_fields=['total_time_taken'])
-            except Exception:
-                logger.exception('Failed to update session.total_time_taken')
             
             return Response({
                 "status": "success",
@@ -121,3 +94,56 @@ class TimeTrackingViewSet(viewsets.GenericViewSet):
                 {"error": f"Error: {str(e)}"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    @action(detail=False, methods=['post'])
+    def log_time_batch(self, request):
+        """
+        Log a batch of question visits for one test session.
+
+        Body: {"session_id": int, "events": [{"question_id", "time_spent", "visit_end_time"}, ...]}
+        Events are coalesced per question and applied with atomic increments, or
+        buffered in Redis when TIME_TRACKING_BUFFER_ENABLED is set.
+        """
+        data = request.data
+        session_id = data.get('session_id')
+        events = data.get('events')
+        if not session_id or not isinstance(events, list) or not events:
+            return Response(
+                {"error": "session_id and a non-empty events list are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events) > MAX_BATCH_EVENTS:
+            return Response(
+                {"error": f"At most {MAX_BATCH_EVENTS} events per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        session = TestSession.objects.filter(
+            id=session_id, student_id=request.user.student_id
+        ).only('id', 'is_completed').first()
+        if session is None:
+            return Response(
+                {"error": "Test session not found or access denied"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if session.is_completed:
+            return Response(
+                {"error": "Test session is already completed"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        increments, rejected = coalesce_visit_events(events)
+        buffered = bool(increments) and buffer_enabled() and buffer_visit_increments(session.id, increments)
+        skipped = []
+        if increments and not buffered:
+            skipped = apply_visit_increments(session.id, increments)['skipped_question_ids']
+
+        return Response({
+            "status": "success",
+            "sessionId": session.id,
+            "accepted": len(events) - len(rejected),
+            "questions": len(increments) - len(skipped),
+            "rejected": rejected,
+            "skippedQuestionIds": skipped,
+            "buffered": buffered,
+        }, status=status.HTTP_200_OK)
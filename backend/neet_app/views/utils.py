@@ -8,6 +8,9 @@ import logging
 from django.db import transaction, IntegrityError
 import random
 import re
+from dataclasses import dataclass
+
+from ..utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -325,6 +328,7 @@ def clean_mathematical_text(text):
         return original_text
 
 
+@traced('selection')
 def generate_questions_for_topics(selected_topics, question_count=None, exclude_question_ids=None, difficulty_distribution=None, exclude_image_questions=False):
     """
     Generate questions for the selected topics with cleaned mathematical expressions.
@@ -363,7 +367,8 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
             )
             
             if rule_engine_result is not None and rule_engine_result.exists():
-                logger.info(f"Rule engine selected {rule_engine_result.count()} questions")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Rule engine selected %s questions", rule_engine_result.count())
                 return rule_engine_result
             else:
                 logger.warning("Rule engine returned no questions, falling back to legacy method")
@@ -387,21 +392,14 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
         
         # For custom tests, exclude questions with images (all image fields must be null/blank)
         if exclude_image_questions:
-            from django.db.models import Q
-            questions = questions.filter(
-                Q(question_image__isnull=True) | Q(question_image=''),
-                Q(option_a_image__isnull=True) | Q(option_a_image=''),
-                Q(option_b_image__isnull=True) | Q(option_b_image=''),
-                Q(option_c_image__isnull=True) | Q(option_c_image=''),
-                Q(option_d_image__isnull=True) | Q(option_d_image=''),
-                Q(explanation_image__isnull=True) | Q(explanation_image='')
-            )
-            logger.info(f"Excluding questions with images for custom test")
+            questions = exclude_questions_with_images(questions)
+            logger.debug("Excluding questions with images for custom test")
         
         if exclude_question_ids:
             questions = questions.exclude(id__in=exclude_question_ids)
         
-        logger.info(f"Found {questions.count()} questions for topics {selected_topics} (excluded {len(exclude_question_ids)} recent questions, exclude_image_questions={exclude_image_questions})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %s questions for topics %s (excluded %s recent questions, exclude_image_questions=%s)", questions.count(), selected_topics, len(exclude_question_ids), exclude_image_questions)
         
         # If no questions found for selected topics after exclusion, try fallback strategies
         if questions.count() == 0:
@@ -411,7 +409,8 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
             all_questions_for_topics = Question.objects.filter(topic_id__in=selected_topics)
             if all_questions_for_topics.exists():
                 questions = all_questions_for_topics
-                logger.info(f"Fallback 1: Using all {questions.count()} questions from selected topics (ignoring exclusions)")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Fallback 1: Using all %s questions from selected topics (ignoring exclusions)", questions.count())
             else:
                 # Strategy 2: Get questions from any topics that have questions
                 available_topic_ids = Question.objects.values_list('topic_id', flat=True).distinct()
@@ -426,9 +425,11 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
                     # If still no questions after excluding recent ones, use all available
                     if questions.count() == 0:
                         questions = Question.objects.filter(topic_id__in=fallback_topics)
-                        logger.info(f"Fallback 2b: Using all {questions.count()} questions from available topics (ignoring exclusions)")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Fallback 2b: Using all %s questions from available topics (ignoring exclusions)", questions.count())
                     else:
-                        logger.info(f"Fallback 2a: Using {questions.count()} questions from available topics {fallback_topics[:10]} (excluded recent)")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Fallback 2a: Using %s questions from available topics %s (excluded recent)", questions.count(), fallback_topics[:10])
                 else:
                     logger.error("No questions found in the entire database!")
                     return Question.objects.none()
@@ -505,7 +506,7 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
                 else:
                     unknown_list.append(q)
 
-            logger.info(f"Question difficulty buckets: easy={len(easy_list)}, medium={len(medium_list)}, hard={len(hard_list)}, unknown={len(unknown_list)}")
+            logger.debug("Question difficulty buckets: easy=%s, medium=%s, hard=%s, unknown=%s", len(easy_list), len(medium_list), len(hard_list), len(unknown_list))
 
             selected = []
             used_ids = set()
@@ -557,7 +558,7 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
                     more = remaining_pool[:remaining_needed]
                     selected.extend(more); used_ids.update(q.id for q in more)
 
-            logger.info(f"Selected per-difficulty counts -> easy={len(sel_easy)}, medium={len(sel_medium)}, hard={len(sel_hard)}, total_selected={len(selected)} (requested {question_count})")
+            logger.debug("Selected per-difficulty counts -> easy=%s, medium=%s, hard=%s, total_selected=%s (requested %s)", len(sel_easy), len(sel_medium), len(sel_hard), len(selected), question_count)
 
             # Return queryset built from selected ids
             if selected:
@@ -579,13 +580,13 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
                 # Use only non-excluded questions
                 random.shuffle(non_excluded_questions)
                 selected_questions = non_excluded_questions[:question_count]
-                logger.info(f"Selected {len(selected_questions)} questions (all non-excluded)")
+                logger.debug("Selected %s questions (all non-excluded)", len(selected_questions))
             else:
                 # Use all non-excluded questions + some excluded ones to reach the target
                 random.shuffle(questions_list)
                 selected_questions = questions_list[:question_count]
                 excluded_count = sum(1 for q in selected_questions if q.id in exclude_question_ids)
-                logger.info(f"Selected {len(selected_questions)} questions ({excluded_count} from recent tests due to insufficient pool)")
+                logger.debug("Selected %s questions (%s from recent tests due to insufficient pool)", len(selected_questions), excluded_count)
             
             # Return a queryset-like structure
             question_ids = [q.id for q in selected_questions]
@@ -625,7 +626,8 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
                 question.save(update_fields=['question', 'option_a', 'option_b', 'option_c', 'option_d', 'explanation', 'difficulty', 'question_type'])
         
         excluded_in_final = sum(1 for q in questions if q.id in exclude_question_ids) if exclude_question_ids else 0
-        logger.info(f"Generated {questions.count()} questions for topics {selected_topics} ({excluded_in_final} from recent tests)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated %s questions for topics %s (%s from recent tests)", questions.count(), selected_topics, excluded_in_final)
         return questions
         
     except Exception as e:
@@ -634,6 +636,7 @@ def generate_questions_for_topics(selected_topics, question_count=None, exclude_
         return Question.objects.none()
 
 
+@traced('selection')
 def generate_random_questions_from_database(question_count, exclude_question_ids=None, exclude_image_questions=False):
     """
     Generate random questions directly from the entire database, bypassing topic selection.
@@ -668,7 +671,8 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
             )
             
             if rule_engine_result is not None and rule_engine_result.exists():
-                logger.info(f"Rule engine selected {rule_engine_result.count()} random questions")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Rule engine selected %s random questions", rule_engine_result.count())
                 return rule_engine_result
             else:
                 logger.warning("Rule engine returned no questions, falling back to legacy random method")
@@ -692,22 +696,14 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
         
         # For custom tests (including random tests), exclude questions with images
         if exclude_image_questions:
-            from django.db.models import Q
-            all_questions = all_questions.filter(
-                Q(question_image__isnull=True) | Q(question_image=''),
-                Q(option_a_image__isnull=True) | Q(option_a_image=''),
-                Q(option_b_image__isnull=True) | Q(option_b_image=''),
-                Q(option_c_image__isnull=True) | Q(option_c_image=''),
-                Q(option_d_image__isnull=True) | Q(option_d_image=''),
-                Q(explanation_image__isnull=True) | Q(explanation_image='')
-            )
-            logger.info(f"Excluding questions with images for random custom test")
+            all_questions = exclude_questions_with_images(all_questions)
+            logger.debug("Excluding questions with images for random custom test")
         
         if exclude_question_ids:
             all_questions = all_questions.exclude(id__in=exclude_question_ids)
         
         total_available = all_questions.count()
-        logger.info(f"Random test: Found {total_available} total questions available (excluded {len(exclude_question_ids)} recent questions)")
+        logger.debug("Random test: Found %s total questions available (excluded %s recent questions)", total_available, len(exclude_question_ids))
         
         # Check if we have enough questions
         if total_available < question_count:
@@ -738,7 +734,7 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
             if subject_questions.exists():
                 subject_selected = list(subject_questions.order_by('?')[:subject_question_count])
                 selected_questions.extend(subject_selected)
-                logger.info(f"Random test: Selected {len(subject_selected)} questions from {subject}")
+                logger.debug("Random test: Selected %s questions from %s", len(subject_selected), subject)
             else:
                 logger.warning(f"Random test: No questions available for {subject}")
         
@@ -750,7 +746,7 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
             
             additional_questions = all_questions.exclude(id__in=selected_ids).order_by('?')[:remaining_questions_needed]
             selected_questions.extend(list(additional_questions))
-            logger.info(f"Random test: Added {len(additional_questions)} additional questions from any subject")
+            logger.debug("Random test: Added %s additional questions from any subject", len(additional_questions))
         
         # Convert to queryset
         if selected_questions:
@@ -792,7 +788,8 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
                     question.question_type = clean_mathematical_text(question.question_type)
                 question.save(update_fields=['question', 'option_a', 'option_b', 'option_c', 'option_d', 'explanation', 'difficulty', 'question_type'])
         
-        logger.info(f"Random test: Successfully generated {questions.count()} random questions from entire database")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Random test: Successfully generated %s random questions from entire database", questions.count())
         return questions
         
     except Exception as e:
@@ -801,6 +798,113 @@ def generate_random_questions_from_database(question_count, exclude_question_ids
         return Question.objects.none()
 
 
+def exclude_questions_with_images(questions):
+    """
+    Keep only questions without any image (custom and random tests are text-only).
+    Uses the maintained has_images flag, served by the partial text-only indexes.
+    """
+    return questions.filter(has_images=False)
+
+
+@dataclass
+class SessionQuestionSelection:
+    """Outcome of select_session_questions: the chosen questions plus availability diagnostics."""
+    questions: list
+    requested_count: int
+    available_count: int
+    excluded_count: int
+    sufficient: bool
+
+    @property
+    def question_ids(self):
+        return [q.id for q in self.questions]
+
+    @property
+    def topic_ids(self):
+        return sorted({q.topic_id for q in self.questions})
+
+
+@traced('selection')
+def select_session_questions(test_type, selected_topics, question_count, student_id,
+                             adaptive_selection=False, exclude_image_questions=True):
+    """
+    Pick the questions for a new custom/search/random test session in one pass.
+
+    Recent questions are excluded once (TestSession.get_recent_question_ids_for_student)
+    and availability is a single COUNT over the same pool, so the full selection only
+    runs once, with the final count:
+
+    - random tests shrink to what is available
+    - adaptive topic tests only need one available question
+    - other topic tests need question_count available questions
+
+    When the pool is insufficient, no selection runs and `sufficient` is False.
+    """
+    exclude_question_ids = TestSession.get_recent_question_ids_for_student(student_id)
+
+    pool = Question.objects.all()
+    if test_type != 'random':
+        pool = pool.filter(topic_id__in=selected_topics)
+    if exclude_image_questions:
+        pool = exclude_questions_with_images(pool)
+    available_count = pool.exclude(id__in=exclude_question_ids).count() if exclude_question_ids else pool.count()
+    if available_count == 0 and exclude_question_ids and test_type != 'random':
+        # Topic selection falls back to recently seen questions rather than an empty test
+        available_count = pool.count()
+
+    target_count = question_count
+    if test_type == 'random':
+        if available_count < question_count:
+            logger.warning(f"Random test: Only {available_count} questions available in entire database, but {question_count} requested")
+            target_count = available_count
+        sufficient = True
+    elif adaptive_selection:
+        sufficient = available_count > 0
+        if sufficient and available_count < question_count:
+            logger.debug("Adaptive selection: Only %s questions available for %s requested, but continuing with adaptive logic", available_count, question_count)
+    else:
+        sufficient = available_count >= question_count
+
+    selection = SessionQuestionSelection(
+        questions=[],
+        requested_count=question_count,
+        available_count=available_count,
+        excluded_count=len(exclude_question_ids),
+        sufficient=sufficient,
+    )
+    if not sufficient or target_count <= 0:
+        return selection
+
+    if test_type == 'random':
+        if adaptive_selection:
+            questions = adaptive_generate_random_questions_from_database(
+                target_count, student_id,
+                exclude_question_ids=exclude_question_ids,
+                exclude_image_questions=exclude_image_questions
+            )
+        else:
+            questions = generate_random_questions_from_database(
+                target_count,
+                exclude_question_ids=exclude_question_ids,
+                exclude_image_questions=exclude_image_questions
+            )
+    elif adaptive_selection:
+        questions = adaptive_generate_questions_for_topics(
+            selected_topics, target_count, student_id,
+            exclude_question_ids=exclude_question_ids,
+            exclude_image_questions=exclude_image_questions
+        )
+    else:
+        questions = generate_questions_for_topics(
+            selected_topics, target_count,
+            exclude_question_ids=exclude_question_ids,
+            exclude_image_questions=exclude_image_questions
+        )
+
+    selection.questions = list(questions)
+    return selection
+
+
 @api_view(['GET'])
 def sync_topics_from_database_question(request=None):
     """
@@ -1287,6 +1391,37 @@ def clean_existing_questions(request=None):
         return error_response
 
 
+# Buckets up to this size are shuffled in SQL; larger ones are sampled at random offsets
+ADAPTIVE_SHUFFLE_LIMIT = 2000
+
+
+def sample_question_ids(queryset, count):
+    """
+    Random sample of up to `count` question ids, drawn database-side.
+
+    Small buckets are ordered randomly in SQL. Large buckets are counted once, then
+    `count` distinct offsets are drawn uniformly from [0, size) and each is resolved
+    as `ORDER BY id OFFSET k LIMIT 1` over the primary key index, all in one query of
+    scalar subqueries. Offsets are dense whatever gaps the id space has, so every
+    question in the bucket is equally likely and no runs of neighbouring ids appear.
+    """
+    from django.db.models import Subquery
+
+    if count <= 0:
+        return []
+    ids = queryset.values_list('id', flat=True).order_by()
+    if ids[:ADAPTIVE_SHUFFLE_LIMIT + 1].count() <= ADAPTIVE_SHUFFLE_LIMIT:
+        return list(ids.order_by('?')[:count])
+
+    size = ids.count()
+    offsets = random.sample(range(size), min(count, size))
+    ordered = ids.order_by('id')
+    picks = {f'p{n}': Subquery(ordered[offset:offset + 1]) for n, offset in enumerate(offsets)}
+    row = queryset.model.objects.order_by().values(**picks)[:1]
+    return [question_id for question_id in (row[0].values() if row else []) if question_id is not None]
+
+
+@traced('selection')
 def adaptive_generate_questions_for_topics(selected_topics, question_count, student_id, exclude_question_ids=None, exclude_image_questions=False):
     """
     Generate questions for topics using adaptive selection logic.
@@ -1306,7 +1441,7 @@ def adaptive_generate_questions_for_topics(selected_topics, question_count, stud
         QuerySet: Selected questions following adaptive logic
     """
     from django.conf import settings
-    from django.db.models import Q
+    from django.db.models import Exists, OuterRef
     
     if exclude_question_ids is None:
         exclude_question_ids = set()
@@ -1317,9 +1452,9 @@ def adaptive_generate_questions_for_topics(selected_topics, question_count, stud
     ratio_wrong = neet_settings.get('ADAPTIVE_RATIO_WRONG', 30) / 100
     ratio_correct = neet_settings.get('ADAPTIVE_RATIO_CORRECT', 10) / 100
     
-    logger.info(f"Adaptive selection for student {student_id}: {question_count} questions with ratios {ratio_new*100}%/{ratio_wrong*100}%/{ratio_correct*100}%")
+    logger.debug("Adaptive selection for student %s: %s questions with ratios %s%%/%s%%/%s%%", student_id, question_count, ratio_new * 100, ratio_wrong * 100, ratio_correct * 100)
     
-    # Get all available questions for selected topics
+    # Candidate pool (never materialized: every bucket below is a SQL filter over it)
     if selected_topics:
         all_questions = Question.objects.filter(topic_id__in=selected_topics)
     else:
@@ -1327,53 +1462,23 @@ def adaptive_generate_questions_for_topics(selected_topics, question_count, stud
     
     # For custom tests, exclude questions with images (all image fields must be null/blank)
     if exclude_image_questions:
-        from django.db.models import Q
-        all_questions = all_questions.filter(
-            Q(question_image__isnull=True) | Q(question_image=''),
-            Q(option_a_image__isnull=True) | Q(option_a_image=''),
-            Q(option_b_image__isnull=True) | Q(option_b_image=''),
-            Q(option_c_image__isnull=True) | Q(option_c_image=''),
-            Q(option_d_image__isnull=True) | Q(option_d_image=''),
-            Q(explanation_image__isnull=True) | Q(explanation_image='')
-        )
-        logger.info(f"Excluding questions with images for adaptive custom test")
+        all_questions = exclude_questions_with_images(all_questions)
+        logger.debug("Excluding questions with images for adaptive custom test")
     
     # Exclude questions that should not be selected
     if exclude_question_ids:
         all_questions = all_questions.exclude(id__in=exclude_question_ids)
     
-    logger.info(f"Total available questions after exclusions: {all_questions.count()}")
-    
-    # Get student's answer history for these questions
-    student_answers = TestAnswer.objects.filter(
+    # Buckets as anti-/semi-joins against the student's completed answers:
+    # A (new) has no answer, B has a wrong/unanswered one, C has a correct one
+    history = TestAnswer.objects.filter(
         session__student_id=student_id,
-        question__in=all_questions,
-        session__is_completed=True
-    ).select_related('question')
-    
-    # Categorize questions into buckets
-    answered_question_ids = set()
-    correct_question_ids = set()
-    wrong_unanswered_question_ids = set()
-    
-    for answer in student_answers:
-        answered_question_ids.add(answer.question.id)
-        if answer.is_correct:
-            correct_question_ids.add(answer.question.id)
-        else:
-            # Either wrong answer or unanswered (selected_answer is None)
-            wrong_unanswered_question_ids.add(answer.question.id)
-    
-    # Bucket A: Never attempted questions
-    new_questions = all_questions.exclude(id__in=answered_question_ids)
-    
-    # Bucket B: Wrong/Unanswered questions
-    wrong_questions = all_questions.filter(id__in=wrong_unanswered_question_ids)
-    
-    # Bucket C: Correctly answered questions
-    correct_questions = all_questions.filter(id__in=correct_question_ids)
-    
-    logger.info(f"Question buckets - New: {new_questions.count()}, Wrong/Unanswered: {wrong_questions.count()}, Correct: {correct_questions.count()}")
+        session__is_completed=True,
+        question_id=OuterRef('pk')
+    )
+    new_questions = all_questions.filter(~Exists(history))
+    wrong_questions = all_questions.filter(Exists(history.exclude(is_correct=True)))
+    correct_questions = all_questions.filter(Exists(history.filter(is_correct=True)))
     
     # Calculate target counts for each bucket
     target_new = int(question_count * ratio_new)
@@ -1386,136 +1491,45 @@ def adaptive_generate_questions_for_topics(selected_topics, question_count, stud
         # Add remaining to the new questions bucket (highest priority)
         target_new += question_count - total_target
     
-    logger.info(f"Target allocation - New: {target_new}, Wrong/Unanswered: {target_wrong}, Correct: {target_correct}")
-    
-    # Select questions from each bucket
-    selected_questions = []
+    logger.debug("Target allocation - New: %s, Wrong/Unanswered: %s, Correct: %s", target_new, target_wrong, target_correct)
     
-    # Step 1: Try to fill each bucket with its target count
-    actual_new = min(target_new, new_questions.count())
-    actual_wrong = min(target_wrong, wrong_questions.count())
-    actual_correct = min(target_correct, correct_questions.count())
+    selected_ids = []
     
-    # Add questions from each bucket
-    if actual_new > 0:
-        selected_new = list(new_questions.order_by('?')[:actual_new])
-        selected_questions.extend(selected_new)
-        logger.info(f"Selected {len(selected_new)} new questions")
+    def take(bucket, count):
+        if count <= 0:
+            return 0
+        ids = sample_question_ids(bucket.exclude(id__in=selected_ids) if selected_ids else bucket, count)
+        selected_ids.extend(ids)
+        return len(ids)
     
-    if actual_wrong > 0:
-        selected_wrong = list(wrong_questions.order_by('?')[:actual_wrong])
-        selected_questions.extend(selected_wrong)
-        logger.info(f"Selected {len(selected_wrong)} wrong/unanswered questions")
+    # Step 1: Fill each bucket up to its target
+    got_new = take(new_questions, target_new)
+    got_wrong = take(wrong_questions, target_wrong)
+    got_correct = take(correct_questions, target_correct)
+    logger.debug("Selected %s new, %s wrong/unanswered, %s correct questions", got_new, got_wrong, got_correct)
     
-    if actual_correct > 0:
-        selected_correct = list(correct_questions.order_by('?')[:actual_correct])
-        selected_questions.extend(selected_correct)
-        logger.info(f"Selected {len(selected_correct)} correct questions")
-    
-    # Step 2: Handle shortages with fallback logic
-    current_count = len(selected_questions)
-    remaining_needed = question_count - current_count
-    
-    if remaining_needed > 0:
-        logger.info(f"Need {remaining_needed} more questions, applying fallback logic")
-        
-        # Get IDs of already selected questions
-        selected_ids = {q.id for q in selected_questions}
-        
-        # Fallback priority order based on bucket shortages
-        fallback_buckets = []
-        
-        # If new questions bucket was short, prioritize wrong then correct
-        if actual_new < target_new:
-            shortage_new = target_new - actual_new
-            remaining_wrong = wrong_questions.exclude(id__in=selected_ids)
-            remaining_correct = correct_questions.exclude(id__in=selected_ids)
-            
-            # Fill from wrong questions first
-            if remaining_wrong.exists() and shortage_new > 0:
-                take_from_wrong = min(shortage_new, remaining_wrong.count())
-                fallback_wrong = list(remaining_wrong.order_by('?')[:take_from_wrong])
-                selected_questions.extend(fallback_wrong)
-                selected_ids.update(q.id for q in fallback_wrong)
-                remaining_needed -= len(fallback_wrong)
-                logger.info(f"Fallback: Added {len(fallback_wrong)} from wrong bucket for new shortage")
-            
-            # Fill remaining from correct questions
-            if remaining_correct.exists() and remaining_needed > 0:
-                remaining_correct = remaining_correct.exclude(id__in=selected_ids)
-                take_from_correct = min(remaining_needed, remaining_correct.count())
-                fallback_correct = list(remaining_correct.order_by('?')[:take_from_correct])
-                selected_questions.extend(fallback_correct)
-                selected_ids.update(q.id for q in fallback_correct)
-                remaining_needed -= len(fallback_correct)
-                logger.info(f"Fallback: Added {len(fallback_correct)} from correct bucket for new shortage")
-        
-        # If wrong questions bucket was short, prioritize new then correct
-        if actual_wrong < target_wrong and remaining_needed > 0:
-            shortage_wrong = target_wrong - actual_wrong
-            remaining_new = new_questions.exclude(id__in=selected_ids)
-            remaining_correct = correct_questions.exclude(id__in=selected_ids)
-            
-            # Fill from new questions first
-            if remaining_new.exists() and shortage_wrong > 0:
-                take_from_new = min(min(shortage_wrong, remaining_needed), remaining_new.count())
-                fallback_new = list(remaining_new.order_by('?')[:take_from_new])
-                selected_questions.extend(fallback_new)
-                selected_ids.update(q.id for q in fallback_new)
-                remaining_needed -= len(fallback_new)
-                logger.info(f"Fallback: Added {len(fallback_new)} from new bucket for wrong shortage")
-            
-            # Fill remaining from correct questions
-            if remaining_correct.exists() and remaining_needed > 0:
-                remaining_correct = remaining_correct.exclude(id__in=selected_ids)
-                take_from_correct = min(remaining_needed, remaining_correct.count())
-                fallback_correct = list(remaining_correct.order_by('?')[:take_from_correct])
-                selected_questions.extend(fallback_correct)
-                selected_ids.update(q.id for q in fallback_correct)
-                remaining_needed -= len(fallback_correct)
-                logger.info(f"Fallback: Added {len(fallback_correct)} from correct bucket for wrong shortage")
-        
-        # If correct questions bucket was short, prioritize wrong then new
-        if actual_correct < target_correct and remaining_needed > 0:
-            shortage_correct = target_correct - actual_correct
-            remaining_wrong = wrong_questions.exclude(id__in=selected_ids)
-            remaining_new = new_questions.exclude(id__in=selected_ids)
-            
-            # Fill from wrong questions first
-            if remaining_wrong.exists() and shortage_correct > 0:
-                take_from_wrong = min(min(shortage_correct, remaining_needed), remaining_wrong.count())
-                fallback_wrong = list(remaining_wrong.order_by('?')[:take_from_wrong])
-                selected_questions.extend(fallback_wrong)
-                selected_ids.update(q.id for q in fallback_wrong)
-                remaining_needed -= len(fallback_wrong)
-                logger.info(f"Fallback: Added {len(fallback_wrong)} from wrong bucket for correct shortage")
-            
-            # Fill remaining from new questions
-            if remaining_new.exists() and remaining_needed > 0:
-                remaining_new = remaining_new.exclude(id__in=selected_ids)
-                take_from_new = min(remaining_needed, remaining_new.count())
-                fallback_new = list(remaining_new.order_by('?')[:take_from_new])
-                selected_questions.extend(fallback_new)
-                selected_ids.update(q.id for q in fallback_new)
-                remaining_needed -= len(fallback_new)
-                logger.info(f"Fallback: Added {len(fallback_new)} from new bucket for correct shortage")
+    # Step 2: Cover each bucket's shortage from the other buckets, in priority order
+    fallbacks = [
+        (target_new - got_new, wrong_questions, correct_questions),
+        (target_wrong - got_wrong, new_questions, correct_questions),
+        (target_correct - got_correct, wrong_questions, new_questions),
+    ]
+    for shortage, first, second in fallbacks:
+        remaining_needed = question_count - len(selected_ids)
+        if shortage <= 0 or remaining_needed <= 0:
+            continue
+        take(first, min(shortage, remaining_needed))
+        take(second, question_count - len(selected_ids))
     
-    # Final check: if we still need more questions, take from any remaining
-    if remaining_needed > 0:
-        selected_ids = {q.id for q in selected_questions}
-        remaining_questions = all_questions.exclude(id__in=selected_ids)
-        if remaining_questions.exists():
-            final_questions = list(remaining_questions.order_by('?')[:remaining_needed])
-            selected_questions.extend(final_questions)
-            logger.info(f"Final fallback: Added {len(final_questions)} from any remaining questions")
+    # Final fallback: anything left in the pool
+    take(all_questions, question_count - len(selected_ids))
     
-    final_count = len(selected_questions)
-    logger.info(f"Adaptive selection completed: {final_count} questions selected")
+    selected_questions = selected_ids
+    logger.debug("Adaptive selection completed: %s questions selected", len(selected_ids))
     
     # Convert to queryset and apply mathematical text cleaning
     if selected_questions:
-        question_ids = [q.id for q in selected_questions]
-        questions = Question.objects.filter(id__in=question_ids)
+        questions = Question.objects.filter(id__in=selected_questions)
         
         # Apply the same mathematical text cleaning as the original function
         for question in questions:
@@ -1550,6 +1564,7 @@ def adaptive_generate_questions_for_topics(selected_topics, question_count, stud
         return Question.objects.none()
 
 
+@traced('selection')
 def adaptive_generate_random_questions_from_database(question_count, student_id, exclude_question_ids=None, exclude_image_questions=False):
     """
     Generate random questions from entire database using adaptive selection logic.
@@ -1564,7 +1579,7 @@ def adaptive_generate_random_questions_from_database(question_count, student_id,
     Returns:
         QuerySet: Selected questions following adaptive logic
     """
-    logger.info(f"Adaptive random test generation for student {student_id}: {question_count} questions")
+    logger.debug("Adaptive random test generation for student %s: %s questions", student_id, question_count)
     
     # Use adaptive selection with all topics (empty list means all topics)
     return adaptive_generate_questions_for_topics(
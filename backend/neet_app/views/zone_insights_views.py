@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from ..models import TestSession, TestSubjectZoneInsight, TestAnswer
+from ..utils.query_budget import query_budget
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,7 @@ def _resolve_student_id_from_request(request):
     return None
 
 
+@query_budget('zone-insights-tests', 2)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_student_tests(request):
@@ -99,17 +101,18 @@ def get_student_tests(request):
                 'message': 'User not properly authenticated'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        # Fetch completed tests that have TestAnswer records
+        # Fetch completed tests that have TestAnswer records, with their answer
+        # counts aggregated in the same query
         # This ensures we only show tests that actually have data
-        from django.db.models import Exists, OuterRef
+        from django.db.models import Count, Q
         tests = TestSession.objects.filter(
             student_id=student_id,
             is_completed=True
-        ).annotate(
-            has_answers=Exists(
-                TestAnswer.objects.filter(session_id=OuterRef('id'))
-            )
-        ).filter(has_answers=True).order_by('-end_time')
+        ).select_related('platform_test').annotate(
+            answer_count=Count('testanswer'),
+            attempted_count=Count('testanswer', filter=Q(testanswer__selected_answer__isnull=False)),
+            correct_count=Count('testanswer', filter=Q(testanswer__is_correct=True)),
+        ).filter(answer_count__gt=0).order_by('-end_time')
         
         # Format test data
         tests_data = []
@@ -117,21 +120,13 @@ def get_student_tests(request):
             # Calculate marks. Use robust answer-driven logic so total matches
             # per-subject calculations: treat any TestAnswer with selected_answer==None
             # as unanswered regardless of is_correct field.
-            try:
-                ta = TestAnswer.objects.filter(session_id=test.id)
-                attempted = ta.filter(selected_answer__isnull=False).count()
-                correct = ta.filter(is_correct=True).count()
-                incorrect = attempted - correct
-                total_q = test.total_questions or ta.count()
-                unanswered = total_q - attempted
-                if unanswered < 0:
-                    unanswered = ta.filter(selected_answer__isnull=True).count()
-            except Exception:
-                # fallback to stored counters
-                correct = getattr(test, 'correct_answers', 0) or 0
-                incorrect = getattr(test, 'incorrect_answers', 0) or 0
-                total_q = test.total_questions or 0
-                unanswered = getattr(test, 'unanswered', 0) or 0
+            attempted = test.attempted_count
+            correct = test.correct_count
+            incorrect = attempted - correct
+            total_q = test.total_questions or test.answer_count
+            unanswered = total_q - attempted
+            if unanswered < 0:
+                unanswered = test.answer_count - attempted
 
             total_marks = (correct * 4) - (incorrect * 1)
             max_marks = total_q * 4
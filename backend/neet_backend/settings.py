@@ -11,6 +11,8 @@ import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 
+from neet_app.utils.tracing import traces_sampler
+
 # Configure logging integration to capture logs at INFO level and above
 logging_integration = LoggingIntegration(
     level=logging.INFO,        # Capture info and above as breadcrumbs
@@ -25,7 +27,10 @@ sentry_sdk.init(
     ],
     # Disable auto-enabling integrations to avoid LangChain issues
     auto_enabling_integrations=False,
-    traces_sample_rate=1.0,
+    # Route-aware, rate-capped trace sampling (see neet_app/utils/tracing.py);
+    # error events are sent regardless of trace sampling
+    traces_sampler=traces_sampler,
+    sample_rate=1.0,
     send_default_pii=True
 )
 
@@ -60,6 +65,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'neet_app.middleware.RequestProfilerMiddleware',
+    'neet_app.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -146,6 +153,13 @@ HEARTBEAT_TIMEOUT_SECONDS = int(os.environ.get('HEARTBEAT_TIMEOUT_SECONDS', '90'
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Uploaded/generated files (default_storage), e.g. institution question exports
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Rows fetched per server-side cursor round trip when exporting student questions
+STUDENT_EXPORT_CHUNK_SIZE = int(os.environ.get('STUDENT_EXPORT_CHUNK_SIZE', 500))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -212,7 +226,9 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-profile-token',
 ]
+CORS_EXPOSE_HEADERS = ['x-profile-id', 'x-query-count', 'x-query-time-ms', 'x-query-budget']
 
 # JWT Configuration
 from datetime import timedelta
@@ -260,6 +276,14 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', 'your-smtp-password'
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@inzighted.com')
 EMAIL_PROVIDER = os.environ.get('EMAIL_PROVIDER', 'django')  # 'django' | 'smtp' | 'zeptomail'
+# Notification outbox delivery: messages per mail connection, attempts before a row is failed,
+# and the first retry delay (doubles per attempt)
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 50))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 5))
+NOTIFICATION_RETRY_BASE_SECONDS = int(os.environ.get('NOTIFICATION_RETRY_BASE_SECONDS', 60))
+# Inactivity campaign: outbox rows written per chunk and the send rate the chunks are spread over
+INACTIVITY_REMINDER_CHUNK_SIZE = int(os.environ.get('INACTIVITY_REMINDER_CHUNK_SIZE', 500))
+INACTIVITY_REMINDER_RATE_PER_MINUTE = int(os.environ.get('INACTIVITY_REMINDER_RATE_PER_MINUTE', 3000))
 
 # MSG91 SMS Configuration for OTP delivery
 # Get your credentials from MSG91 dashboard: https://control.msg91.com/
@@ -296,6 +320,9 @@ if not GEMINI_API_KEYS:
     # Warn at startup — prevents silent use of embedded or expired keys
     print("⚠️ No GEMINI_API_KEYS configured in environment; set GEMINI_API_KEY or GEMINI_API_KEY_1..10 in your .env or environment")
 
+# Misconception generation: concurrent Gemini batches per job (also capped by the key count)
+MISCONCEPTION_MAX_PARALLEL_BATCHES = int(os.environ.get('MISCONCEPTION_MAX_PARALLEL_BATCHES', 4))
+
 # LangChain configuration
 LANGCHAIN_TRACING_V2 = os.environ.get('LANGCHAIN_TRACING_V2', 'false')
 LANGCHAIN_API_KEY = os.environ.get('LANGCHAIN_API_KEY', '')
@@ -421,6 +448,42 @@ REDIS_PORT = os.environ.get('REDIS_PORT', '6379')
 REDIS_DB = os.environ.get('REDIS_DB', '0')
 REDIS_URL = os.environ.get('REDIS_URL', f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}')
 
+# Shared cache (SQL agent cache, hot read endpoints). Uses the same Redis
+# connection pool as utils/redis_client; set USE_REDIS_CACHE=False to fall
+# back to per-process memory cache for local development without Redis.
+USE_REDIS_CACHE = os.environ.get('USE_REDIS_CACHE', 'True') == 'True'
+if USE_REDIS_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'neet_app.utils.cache.SharedPoolRedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'neet',
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Buffer in-test time-tracking batches in Redis and flush them periodically
+# (flush_time_tracking_buffer_task). When disabled, batches are applied directly.
+TIME_TRACKING_BUFFER_ENABLED = os.environ.get('TIME_TRACKING_BUFFER_ENABLED', 'True') == 'True'
+
+# Record live test-session heartbeats in Redis sorted sets; persist_heartbeats_task
+# bulk-writes the latest value to TestSession.last_heartbeat.
+LIVE_PRESENCE_REDIS_ENABLED = os.environ.get('LIVE_PRESENCE_REDIS_ENABLED', 'True') == 'True'
+
+# Request profiler (neet_app.utils.profiler): requests carrying a signed X-Profile-Token
+# header, plus a sampled fraction of all requests, are profiled into a capped Redis list
+# that platform admins view under /api/platform-admin/profiles/.
+REQUEST_PROFILER_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILER_SAMPLE_RATE', 0.0))
+REQUEST_PROFILER_BUFFER_SIZE = int(os.environ.get('REQUEST_PROFILER_BUFFER_SIZE', 200))
+REQUEST_PROFILER_TOKEN_MAX_AGE = int(os.environ.get('REQUEST_PROFILER_TOKEN_MAX_AGE', 3600))
+REQUEST_PROFILER_REDIS_BUFFER = os.environ.get('REQUEST_PROFILER_REDIS_BUFFER', 'True') == 'True'
+
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL)
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', REDIS_URL)
 
@@ -438,6 +501,21 @@ CELERY_BEAT_SCHEDULE = {
     #     'schedule': crontab(hour=3, minute=0),
     #     'args': (),
     # },
+    'flush-time-tracking-buffer': {
+        'task': 'neet_app.tasks.flush_time_tracking_buffer_task',
+        'schedule': 15.0,
+        'args': (),
+    },
+    'persist-session-heartbeats': {
+        'task': 'neet_app.tasks.persist_heartbeats_task',
+        'schedule': 30.0,
+        'args': (),
+    },
+    'deliver-pending-notifications': {
+        'task': 'neet_app.tasks.deliver_notifications_task',
+        'schedule': 60.0,
+        'args': (),
+    },
 }
 
 # ----------------------
@@ -67,6 +67,11 @@ EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Apply time-tracking batches directly (no Redis in tests)
+TIME_TRACKING_BUFFER_ENABLED = False
+LIVE_PRESENCE_REDIS_ENABLED = False
+REQUEST_PROFILER_REDIS_BUFFER = False
+
 # Static files for tests
 STATIC_URL = '/static/'
 STATIC_ROOT = None
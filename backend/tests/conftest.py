@@ -28,6 +28,8 @@ from neet_app.models import (
     TestSession, PlatformTest
 )
 
+pytest_plugins = ['tests.query_budget_plugin']
+
 
 @pytest.fixture
 def api_client():
@@ -97,6 +99,16 @@ def disable_sql_agent_init(monkeypatch):
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_topic_taxonomy():
+    """Drop the process-local topic taxonomy so rolled-back topics never leak between tests."""
+    from neet_app.utils.topic_taxonomy import reset_local_taxonomy
+
+    reset_local_taxonomy()
+    yield
+    reset_local_taxonomy()
+
+
 @pytest.fixture
 def sample_topic():
     """Create a sample topic for testing"""
@@ -0,0 +1,80 @@
+"""
+pytest plugin: query-budget regression guard.
+
+Every endpoint declared with neet_app.utils.query_budget.query_budget must have
+a scenario registered here with @budget_scenario(url_name). A scenario is
+called with growing sizes (--query-budget-sizes, default 1,4,8) on the same
+namespace object, adds rows until the endpoint has `size` items to return, and
+returns a zero-argument callable that performs the request.
+
+check_query_budget(url_name) runs the scenario at every size and fails when
+the endpoint exceeds its budget or its query count changes with data size.
+Tests that take the `query_budget_name` argument are parametrized over all
+registered budgets.
+"""
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SCENARIOS = {}
+
+
+def budget_scenario(url_name):
+    def decorator(builder):
+        SCENARIOS[url_name] = builder
+        return builder
+    return decorator
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-budget-sizes', default='1,4,8',
+        help='Comma-separated fixture sizes each query-budget scenario is measured at',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'query_budget: query-count regression checks for budgeted endpoints')
+
+
+def pytest_generate_tests(metafunc):
+    if 'query_budget_name' in metafunc.fixturenames:
+        from neet_app.utils.query_budget import registered_query_budgets
+
+        names = list(registered_query_budgets())
+        metafunc.parametrize('query_budget_name', names, ids=names)
+
+
+@pytest.fixture
+def query_budget_sizes(request):
+    return [int(size) for size in request.config.getoption('--query-budget-sizes').split(',')]
+
+
+@pytest.fixture
+def check_query_budget(request, query_budget_sizes):
+    """Measure a budgeted endpoint at every size; returns {size: query count}."""
+    from neet_app.utils.query_budget import registered_query_budgets
+
+    def check(url_name):
+        budget = registered_query_budgets()[url_name]
+        if url_name not in SCENARIOS:
+            pytest.fail(f'No @budget_scenario for budgeted endpoint {url_name} ({budget.view})')
+
+        ctx = SimpleNamespace(request=request)
+        counts = {}
+        for size in query_budget_sizes:
+            call = SCENARIOS[url_name](ctx, size)
+            with CaptureQueriesContext(connection) as captured:
+                response = call()
+            assert response.status_code == 200, f'{url_name} at size {size}: HTTP {response.status_code}'
+            counts[size] = len(captured.captured_queries)
+
+        detail = ', '.join(f'{size} rows: {count}' for size, count in counts.items())
+        assert max(counts.values()) <= budget.max_queries, \
+            f'{url_name} exceeds its budget of {budget.max_queries} queries ({detail})'
+        assert len(set(counts.values())) == 1, f'{url_name} query count grows with data ({detail})'
+        return counts
+
+    return check
@@ -0,0 +1,174 @@
+"""
+Tests for set-based adaptive selection buckets and database-side sampling
+"""
+import random
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app.models import Question, TestAnswer, TestSession
+from neet_app.views import utils as selection_utils
+from neet_app.views.utils import adaptive_generate_questions_for_topics, sample_question_ids
+
+STUDENT_ID = 'STU25010100001'
+
+
+@pytest.fixture
+def bank(sample_topic):
+    questions = [
+        Question.objects.create(
+            topic=sample_topic, question=f'Adaptive {n}', option_a='a', option_b='b', option_c='c',
+            option_d='d', correct_answer='A', explanation='e',
+        )
+        for n in range(10)
+    ]
+    return sample_topic, questions
+
+
+def _history(questions, answers, completed=True):
+    session = TestSession.objects.create(
+        student_id=STUDENT_ID, selected_topics=[], total_questions=len(answers), start_time=timezone.now(),
+    )
+    for question, (selected, correct) in zip(questions, answers):
+        TestAnswer.objects.create(session=session, question=question, selected_answer=selected, is_correct=correct)
+    TestSession.objects.filter(id=session.id).update(is_completed=completed)
+
+
+def _ratios(settings, new, wrong, correct):
+    settings.NEET_SETTINGS = {
+        **settings.NEET_SETTINGS,
+        'ADAPTIVE_RATIO_NEW': new, 'ADAPTIVE_RATIO_WRONG': wrong, 'ADAPTIVE_RATIO_CORRECT': correct,
+    }
+
+
+def _select(topic, count):
+    return set(adaptive_generate_questions_for_topics([topic.id], count, STUDENT_ID).values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestAdaptiveBuckets:
+
+    def test_buckets_follow_completed_history(self, bank, settings):
+        topic, questions = bank
+        q_correct, q_wrong, q_skipped = questions[:3]
+        _history(questions[:3], [('A', True), ('B', False), (None, None)])
+        # Answers in an unfinished session do not count as history
+        _history(questions[3:4], [('A', True)], completed=False)
+
+        _ratios(settings, 0, 100, 0)
+        assert _select(topic, 2) == {q_wrong.id, q_skipped.id}
+
+        _ratios(settings, 0, 0, 100)
+        assert _select(topic, 1) == {q_correct.id}
+
+        _ratios(settings, 100, 0, 0)
+        assert _select(topic, 7) == {q.id for q in questions[3:]}
+
+    def test_shortages_fall_back_to_other_buckets(self, bank, settings):
+        topic, questions = bank
+        _history(questions[:1], [('B', False)])
+        _ratios(settings, 0, 100, 0)
+
+        selected = _select(topic, 4)
+        assert len(selected) == 4
+        assert questions[0].id in selected
+
+    def test_query_count_independent_of_history_length(self, bank, settings):
+        topic, questions = bank
+        _ratios(settings, 60, 30, 10)
+        _history(questions[:2], [('A', True), ('B', False)])
+        with CaptureQueriesContext(connection) as short_history:
+            _select(topic, 5)
+
+        for _ in range(15):
+            _history(questions[:6], [('A', True), ('B', False)] * 3)
+        with CaptureQueriesContext(connection) as long_history:
+            _select(topic, 5)
+
+        assert len(long_history.captured_queries) == len(short_history.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestSampleQuestionIds:
+
+    def test_large_buckets_sampled_with_pivots(self, bank, monkeypatch, django_assert_max_num_queries):
+        topic, questions = bank
+        monkeypatch.setattr(selection_utils, 'ADAPTIVE_SHUFFLE_LIMIT', 3)
+        pool = Question.objects.filter(topic=topic)
+
+        # size probe + bounds + at most two probes per run of 5
+        with django_assert_max_num_queries(6):
+            sampled = sample_question_ids(pool, 7)
+        assert len(sampled) == len(set(sampled)) == 7
+        assert set(sampled) <= {q.id for q in questions}
+
+        assert sorted(sample_question_ids(pool, 50)) == sorted(q.id for q in questions)
+
+    def test_pivot_samples_are_spread_not_runs(self, sample_topic, monkeypatch):
+        Question.objects.bulk_create([
+            Question(topic=sample_topic, question=f'Spread {n}', option_a='a', option_b='b', option_c='c',
+                     option_d='d', correct_answer='A', explanation='e')
+            for n in range(500)
+        ])
+        ids = sorted(Question.objects.filter(topic=sample_topic).values_list('id', flat=True))
+        monkeypatch.setattr(selection_utils, 'ADAPTIVE_SHUFFLE_LIMIT', 50)
+        monkeypatch.setattr(selection_utils, 'random', random.Random(7))
+        pool = Question.objects.filter(topic=sample_topic)
+
+        neighbours = 0
+        low_decile = 0
+        for _ in range(40):
+            sampled = sorted(sample_question_ids(pool, 5))
+            assert len(set(sampled)) == 5
+            neighbours += sum(1 for a, b in zip(sampled, sampled[1:]) if b == a + 1)
+            low_decile += sum(1 for question_id in sampled if question_id < ids[50])
+
+        # Runs of five would give 4 neighbouring pairs per sample (160); uniform draws ~3
+        assert neighbours <= 8
+        # ~10% of 200 draws should fall in the lowest tenth of the bank
+        assert 5 <= low_decile <= 40
+
+    def test_pivot_samples_are_uniform_over_gapped_ids(self, sample_topic, monkeypatch):
+        def make(prefix):
+            return Question.objects.bulk_create([
+                Question(topic=sample_topic, question=f'{prefix} {n}', option_a='a', option_b='b', option_c='c',
+                         option_d='d', correct_answer='A', explanation='e')
+                for n in range(300)
+            ])
+        low = make('Low')
+        # Skip a large stretch of ids so the bank is two dense blocks far apart
+        Question.objects.bulk_create([
+            Question(topic=sample_topic, question=f'Gap {n}', option_a='a', option_b='b', option_c='c',
+                     option_d='d', correct_answer='A', explanation='e')
+            for n in range(3000)
+        ])
+        Question.objects.filter(question__startswith='Gap ').delete()
+        high = make('High')
+        low_ids = {question.id for question in Question.objects.filter(question__startswith='Low ')}
+        high_start = min(Question.objects.filter(question__startswith='High ').values_list('id', flat=True))
+        assert len(low) == len(high) == 300 and high_start - max(low_ids) > 3000
+        monkeypatch.setattr(selection_utils, 'ADAPTIVE_SHUFFLE_LIMIT', 50)
+        monkeypatch.setattr(selection_utils, 'random', random.Random(11))
+        pool = Question.objects.filter(topic=sample_topic)
+
+        in_low = 0
+        neighbours = 0
+        for _ in range(40):
+            sampled = sorted(sample_question_ids(pool, 5))
+            assert len(set(sampled)) == 5
+            in_low += sum(1 for question_id in sampled if question_id in low_ids)
+            neighbours += sum(1 for a, b in zip(sampled, sampled[1:]) if b == a + 1)
+
+        # Half the bank is in each block; an id-range pivot lands almost every pick at the
+        # start of the upper block instead
+        assert 70 <= in_low <= 130
+        assert neighbours <= 8
+
+    def test_small_buckets_shuffled_in_sql(self, bank):
+        topic, questions = bank
+        assert len(sample_question_ids(Question.objects.filter(topic=topic), 4)) == 4
+        assert sample_question_ids(Question.objects.filter(topic=topic), 0) == []
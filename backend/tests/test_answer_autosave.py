@@ -0,0 +1,107 @@
+"""
+Tests for sequence-ordered answer autosave
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app.models import Question, TestAnswer, TestSession
+
+AUTOSAVE_URL = '/api/test-answers/autosave/'
+
+
+@pytest.fixture
+def autosave_session(authenticated_client, sample_topic):
+    session = TestSession.objects.create(
+        student_id=authenticated_client.student_profile.student_id,
+        selected_topics=[sample_topic.id],
+        total_questions=3,
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    questions = [
+        Question.objects.create(
+            topic=sample_topic, question=f'Q{n}', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_answer='A', explanation='e'
+        )
+        for n in range(3)
+    ]
+    return session, questions
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestAnswerAutosave:
+
+    def test_batch_is_one_upsert(self, authenticated_client, autosave_session):
+        session, questions = autosave_session
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(AUTOSAVE_URL, {
+                'session_id': session.id,
+                'seq': 1,
+                'answers': [
+                    {'question_id': questions[0].id, 'selected_answer': 'A'},
+                    {'question_id': questions[1].id, 'selected_answer': 'B', 'marked_for_review': True},
+                    {'question_id': questions[2].id, 'selected_answer': None},
+                ],
+            }, format='json')
+        assert response.status_code == 200
+        assert response.data['applied'] == sorted(q.id for q in questions)
+        writes = [q for q in ctx.captured_queries if q['sql'].lstrip().startswith(('INSERT', 'UPDATE'))]
+        assert len(writes) == 1
+
+        answers = {a.question_id: a for a in TestAnswer.objects.filter(session=session)}
+        assert answers[questions[0].id].is_correct is True
+        assert answers[questions[0].id].answered_at is not None
+        assert answers[questions[1].id].is_correct is False
+        assert answers[questions[1].id].marked_for_review is True
+        assert answers[questions[2].id].answered_at is None
+
+    def test_stale_deltas_are_dropped(self, authenticated_client, autosave_session):
+        session, questions = autosave_session
+        question_id = questions[0].id
+        authenticated_client.post(AUTOSAVE_URL, {
+            'session_id': session.id,
+            'answers': [{'question_id': question_id, 'seq': 5, 'selected_answer': 'C'}],
+        }, format='json')
+        first_answered_at = TestAnswer.objects.get(session=session, question_id=question_id).answered_at
+
+        # Delayed retry of an older click arrives after the newer one
+        response = authenticated_client.post(AUTOSAVE_URL, {
+            'session_id': session.id,
+            'answers': [{'question_id': question_id, 'seq': 3, 'selected_answer': 'A'}],
+        }, format='json')
+        assert response.data['stale'] == [question_id]
+        answer = TestAnswer.objects.get(session=session, question_id=question_id)
+        assert (answer.selected_answer, answer.client_seq) == ('C', 5)
+
+        # Within a batch the highest seq wins regardless of order
+        response = authenticated_client.post(AUTOSAVE_URL, {
+            'session_id': session.id,
+            'answers': [
+                {'question_id': question_id, 'seq': 9, 'selected_answer': 'A'},
+                {'question_id': question_id, 'seq': 7, 'selected_answer': 'D'},
+            ],
+        }, format='json')
+        assert response.data['applied'] == [question_id]
+        answer.refresh_from_db()
+        assert (answer.selected_answer, answer.is_correct, answer.client_seq) == ('A', True, 9)
+        assert answer.answered_at == first_answered_at
+
+    def test_rejects_missing_seq_and_completed_session(self, authenticated_client, autosave_session):
+        session, questions = autosave_session
+        response = authenticated_client.post(AUTOSAVE_URL, {
+            'session_id': session.id,
+            'answers': [{'question_id': questions[0].id, 'selected_answer': 'A'}],
+        }, format='json')
+        assert response.status_code == 400
+
+        TestSession.objects.filter(id=session.id).update(is_completed=True)
+        response = authenticated_client.post(AUTOSAVE_URL, {
+            'session_id': session.id,
+            'seq': 1,
+            'answers': [{'question_id': questions[0].id, 'selected_answer': 'A'}],
+        }, format='json')
+        assert response.status_code == 422
+        assert not TestAnswer.objects.filter(session=session).exists()
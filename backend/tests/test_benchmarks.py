@@ -0,0 +1,76 @@
+"""
+Tests for the test-lifecycle benchmark suite
+"""
+import pytest
+
+from neet_app import signals
+from neet_app.benchmarks import (
+    DatasetSpec, compare_results, load_results, run_lifecycle_benchmark, seed_dataset, write_results
+)
+from neet_app.benchmarks.harness import percentile
+from neet_app.models import Question, TestAnswer, TestSession, Topic
+
+SCENARIOS = {
+    'test_start', 'test_start_adaptive', 'autosave', 'time_log_batch', 'submit',
+    'compute_results_task', 'dashboard_analytics', 'dashboard_comprehensive',
+}
+
+TINY = dict(students=2, questions=120, topics_per_subject=3, history_depth=1, history_questions=10)
+
+
+def _results(p95, queries, dataset=None):
+    return {'dataset': dataset or {'seed': 1},
+            'scenarios': {'submit': {'p95_ms': p95, 'queries_p50': queries}}}
+
+
+@pytest.mark.unit
+def test_percentile_is_nearest_rank():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile([7.0], 95) == 7.0
+
+
+@pytest.mark.unit
+def test_compare_flags_latency_and_query_regressions():
+    baseline = _results(100.0, 10)
+    assert compare_results(baseline, _results(115.0, 10)) == []
+    assert [r['metric'] for r in compare_results(baseline, _results(130.0, 11))] == ['p95_ms', 'queries_p50']
+    assert compare_results(baseline, _results(100.0, 10, dataset={'seed': 2}))[0]['metric'] == 'dataset'
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestLifecycleBenchmark:
+
+    def test_dataset_is_reproducible(self):
+        first = seed_dataset(DatasetSpec(seed=7, **TINY))
+        keys = list(Question.objects.order_by('id').values_list('correct_answer', flat=True))
+        history = list(TestAnswer.objects.order_by('id').values_list('selected_answer', flat=True))
+        assert len(keys) == 120 and len(history) == 20
+        assert TestSession.objects.filter(is_completed=True).count() == 2
+
+        Topic.objects.all().delete()
+        TestSession.objects.all().delete()
+        first.spec.students = 0
+        seed_dataset(first.spec)
+        assert list(Question.objects.order_by('id').values_list('correct_answer', flat=True)) == keys
+
+    def test_run_reports_every_scenario(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(signals, '_processed_sessions', set())
+
+        results = run_lifecycle_benchmark(DatasetSpec(**TINY), iterations=2, question_count=10,
+                                          autosave_batch=5, warmup=0)
+
+        assert set(results['scenarios']) == SCENARIOS
+        for name, row in results['scenarios'].items():
+            assert row['p50_ms'] <= row['p95_ms'] <= row['max_ms'], name
+            assert row['queries_p50'] > 0, name
+        assert results['scenarios']['autosave']['samples'] == 4
+        assert results['scenarios']['submit']['outcomes'] == {'200': 2}
+        assert results['scenarios']['test_start']['outcomes'] == {'201': 1}
+        assert results['stub_calls'] == {'llm': 0, 'tts': 0}
+
+        path = write_results(results, tmp_path / 'run.json')
+        assert load_results(path) == results
+        assert compare_results(results, load_results(path)) == []
@@ -0,0 +1,127 @@
+"""
+Tests for the cache-aside layer and its model-driven invalidation
+"""
+import pytest
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import override_settings
+
+from neet_app.models import PlatformTest, Topic
+from neet_app.utils.cache import cache_aside, invalidate_cache_tags
+
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cache-layer-tests',
+    }
+}
+
+
+@pytest.fixture
+def locmem_cache():
+    with override_settings(CACHES=LOCMEM_CACHE):
+        cache.clear()
+        yield cache
+        cache.clear()
+
+
+@pytest.mark.unit
+class TestCacheAside:
+
+    def test_hit_miss_and_tag_invalidation(self, locmem_cache):
+        calls = []
+
+        @cache_aside('tests:square', tags=['squares'])
+        def square(n):
+            calls.append(n)
+            return n * n
+
+        assert square(3) == 9
+        assert square(3) == 9
+        assert square(4) == 16
+        assert calls == [3, 4]
+
+        invalidate_cache_tags('squares')
+        assert square(3) == 9
+        assert calls == [3, 4, 3]
+
+    def test_callable_tags_scope_invalidation(self, locmem_cache):
+        calls = []
+
+        @cache_aside('tests:per_student', tags=lambda student_id: [f'student:{student_id}'])
+        def load(student_id):
+            calls.append(student_id)
+            return {'student': student_id}
+
+        load('A')
+        load('B')
+        invalidate_cache_tags('student:A')
+        load('A')
+        load('B')
+        assert calls == ['A', 'B', 'A']
+
+    def test_none_results_are_cached(self, locmem_cache):
+        calls = []
+
+        @cache_aside('tests:none', tags=['none'])
+        def lookup():
+            calls.append(1)
+            return None
+
+        assert lookup() is None
+        assert lookup() is None
+        assert calls == [1]
+
+    def test_cache_errors_fall_through(self, locmem_cache):
+        @cache_aside('tests:broken', tags=['broken'])
+        def compute():
+            return 'fresh'
+
+        with patch('neet_app.utils.cache.cache.get_many', side_effect=ConnectionError('redis down')):
+            assert compute() == 'fresh'
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestCachedEndpointsInvalidation:
+
+    def test_topic_catalog_invalidated_on_save(self, locmem_cache, sample_topic):
+        from neet_app.views.platform_test_views import get_topic_catalog
+
+        assert [t['id'] for t in get_topic_catalog()] == [sample_topic.id]
+
+        Topic.objects.create(name='Optics', subject='Physics', chapter='Ray Optics')
+        assert len(get_topic_catalog()) == 2
+
+    def test_platform_test_list_invalidated_on_save(self, authenticated_client, locmem_cache, sample_platform_test):
+        response = authenticated_client.get('/api/platform-tests/available/')
+        assert response.status_code == 200
+        assert response.data['total_tests'] == 1
+
+        PlatformTest.objects.create(
+            test_name='Second Test',
+            test_code='SECOND_TEST_001',
+            selected_topics=sample_platform_test.selected_topics,
+            total_questions=5,
+            time_limit=60,
+            is_active=True,
+        )
+        response = authenticated_client.get('/api/platform-tests/available/')
+        assert response.data['total_tests'] == 2
+
+        sample_platform_test.is_active = False
+        sample_platform_test.save()
+        response = authenticated_client.get('/api/platform-tests/available/')
+        assert response.data['total_tests'] == 1
+
+    def test_platform_test_detail_cached_lookup(self, authenticated_client, locmem_cache, sample_platform_test):
+        url = f'/api/platform-tests/{sample_platform_test.id}/'
+        assert authenticated_client.get(url).status_code == 200
+
+        PlatformTest.objects.filter(id=sample_platform_test.id).update(is_active=False)
+        # queryset.update() skips signals, so the cached entry is still served
+        assert authenticated_client.get(url).status_code == 200
+
+        invalidate_cache_tags('platform_tests')
+        assert authenticated_client.get(url).status_code == 404
@@ -575,6 +575,63 @@ class TestChatStatistics:
         assert stats['totalMessagesSent'] == 0
 
 
+@pytest.mark.chat
+@pytest.mark.unit
+class TestChatSessionListing:
+    """Test the denormalized session summary and keyset-paginated listing"""
+
+    @pytest.mark.django_db
+    def test_messages_maintain_session_summary(self, sample_chat_session, sample_chat_messages):
+        """Test that saving messages updates the session's count and last message"""
+        session = ChatSession.objects.get(id=sample_chat_session.id)
+        bot_msg = sample_chat_messages[1]
+
+        assert session.message_count == 2
+        assert session.last_message_at == bot_msg.created_at
+        assert session.updated_at == bot_msg.created_at
+        assert session.last_message_preview == bot_msg.message_content
+
+        ChatMessage.objects.create(chat_session=session, message_type='user', message_content='x' * 150)
+        session.refresh_from_db()
+        assert session.message_count == 3
+        assert session.last_message_preview == 'x' * 100 + '...'
+
+    @pytest.mark.django_db
+    def test_backfill_matches_live_summary(self, sample_chat_session, sample_chat_messages):
+        """Test that the migration backfill reproduces what ChatMessage.save() maintains"""
+        from importlib import import_module
+        from django.apps import apps
+
+        migration = import_module('neet_app.migrations.0048_chat_session_message_summary')
+        expected = ChatSession.objects.values('message_count', 'last_message_at', 'last_message_preview').get()
+        ChatSession.objects.update(message_count=0, last_message_at=None, last_message_preview=None)
+
+        migration.backfill_message_summary(apps, None)
+
+        assert ChatSession.objects.values('message_count', 'last_message_at', 'last_message_preview').get() == expected
+
+    @pytest.mark.django_db
+    def test_list_pages_by_cursor_most_recent_first(self, authenticated_client):
+        """Test that the listing walks every session exactly once via cursor links"""
+        student_id = authenticated_client.student_profile.student_id
+        for n in range(5):
+            chat = ChatSession.objects.create(student_id=student_id, chat_session_id=f'cursor-chat-{n}')
+            ChatMessage.objects.create(chat_session=chat, message_type='user', message_content=f'question {n}')
+
+        seen = []
+        url = '/api/chat-sessions/?page_size=2'
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data['results']) <= 2
+            seen.extend(row['chatSessionId'] for row in data['results'])
+            url = data['next']
+
+        assert seen == [f'cursor-chat-{n}' for n in reversed(range(5))]
+        assert response.json()['results'][-1]['lastMessage'] == 'question 0'
+
+
 @pytest.mark.chat
 @pytest.mark.unit
 class TestChatbotServiceContract:
@@ -0,0 +1,162 @@
+"""
+Tests for incremental per-test cohort aggregates and the institution cohort endpoint
+"""
+import json
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from neet_app import tasks
+from neet_app.institution_auth import generate_institution_admin_tokens
+from neet_app.models import (
+    Institution, InstitutionAdmin, PlatformTest, Question, TestAnswer, TestCohortSummary,
+    TestQuestionCohortStat, TestSession, Topic
+)
+from neet_app.services.cohort_analytics_service import rebuild_test_cohort, record_session_in_cohort
+
+# Per student: answers to (q0, q1, q2); q0 is answered correctly only by the strongest students
+RESPONSES = [
+    ['A', 'A', 'A'],   # 12
+    ['A', 'A', None],  # 8
+    ['B', 'A', 'B'],   # 2
+    ['B', None, 'B'],  # -2
+]
+
+
+@pytest.fixture
+def cohort_test(sample_topic):
+    institution = Institution.objects.create(name='Cohort Inst', code='COH01')
+    admin = InstitutionAdmin.objects.create(username='cohort_admin', password_hash='x', institution=institution)
+    botany = Topic.objects.create(name='Plant Cells', subject='Botany', icon='b')
+    test = PlatformTest.objects.create(
+        test_name='Cohort Mock', test_code='COH01_MOCK', time_limit=60, total_questions=3,
+        selected_topics=[sample_topic.id, botany.id], institution=institution, is_institution_test=True,
+    )
+    questions = [
+        Question.objects.create(
+            topic=topic, question=f'Q{n}', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_answer='A', explanation='e',
+        )
+        for n, topic in enumerate([sample_topic, sample_topic, botany])
+    ]
+
+    sessions = []
+    for n, answers in enumerate(RESPONSES):
+        session = TestSession.objects.create(
+            student_id=f'STU2501010000{n}', platform_test=test, test_type='platform',
+            selected_topics=[sample_topic.id], total_questions=3, time_limit=60,
+            start_time=timezone.now(), total_time_taken=100 * (n + 1),
+        )
+        for question, selected in zip(questions, answers):
+            TestAnswer.objects.create(
+                session=session, question=question, selected_answer=selected,
+                is_correct=(selected == 'A') if selected else None, time_taken=10,
+            )
+        TestSession.objects.filter(id=session.id).update(is_completed=True)
+        sessions.append(session)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+    return test, questions, sessions, client
+
+
+def _summary_snapshot(test):
+    summary = TestCohortSummary.objects.get(platform_test=test)
+    stats = {
+        s.question_id: (s.attempts, s.correct, s.unanswered, s.score_sum, s.correct_score_sum)
+        for s in TestQuestionCohortStat.objects.filter(platform_test=test)
+    }
+    return (summary.sessions, summary.score_sum, summary.score_sq_sum, summary.score_histogram), stats
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestCohortAnalytics:
+
+    def test_scoring_folds_sessions_incrementally_once(self, cohort_test, django_capture_on_commit_callbacks):
+        test, questions, sessions, _ = cohort_test
+
+        for session in sessions:
+            session.refresh_from_db()
+            with django_capture_on_commit_callbacks(execute=True):
+                session.calculate_and_update_subject_scores(only_if_missing=True)
+
+        summary = TestCohortSummary.objects.get(platform_test=test)
+        assert summary.sessions == 4
+        assert summary.max_score == 12
+        assert summary.score_sum == 20
+        assert (summary.score_min, summary.score_max) == (-2, 12)
+        assert summary.score_histogram == {'9': 1, '6': 1, '1': 1, '0': 1}
+        assert summary.time_sum == 1000
+
+        # Re-delivery is a no-op
+        assert record_session_in_cohort(sessions[0].id) is False
+        assert TestCohortSummary.objects.get(platform_test=test).sessions == 4
+
+        incremental = _summary_snapshot(test)
+        assert rebuild_test_cohort(test.id) == 4
+        assert _summary_snapshot(test) == incremental
+
+    def test_cohort_endpoint_serves_indices_from_summary_tables(
+        self, cohort_test, django_assert_max_num_queries
+    ):
+        test, questions, sessions, client = cohort_test
+        # No aggregates yet: the first request backfills them (Celery runs eagerly in tests)
+        response = client.get(f'/api/institution-admin/analytics/tests/{test.id}/cohort/')
+        assert response.status_code == 200
+
+        with django_assert_max_num_queries(5):
+            response = client.get(f'/api/institution-admin/analytics/tests/{test.id}/cohort/')
+        body = json.loads(response.content)
+
+        assert body['summary']['sessions'] == 4
+        assert body['summary']['mean_score'] == 5.0
+        assert [band['count'] for band in body['score_distribution']] == [1, 1, 0, 0, 0, 0, 1, 0, 0, 1]
+
+        by_id = {q['question_id']: q for q in body['questions']}
+        assert by_id[questions[0].id]['difficulty_index'] == 0.5
+        assert by_id[questions[1].id]['difficulty_index'] == 0.75
+        # Only the strongest students got q0 right -> strongly positive discrimination
+        assert by_id[questions[0].id]['discrimination_index'] > by_id[questions[1].id]['discrimination_index'] > 0
+
+        topics = {t['topic_name']: t for t in body['topics']}
+        assert topics['Plant Cells']['attempts'] == 4
+        assert topics['Plant Cells']['accuracy'] == 25.0
+        assert topics['Plant Cells']['unanswered_rate'] == 25.0
+
+    def test_cohort_endpoint_scoped_to_institution(self, cohort_test):
+        test, _, _, _ = cohort_test
+        other = Institution.objects.create(name='Other', code='OTH01')
+        admin = InstitutionAdmin.objects.create(username='other_admin', password_hash='x', institution=other)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+
+        response = client.get(f'/api/institution-admin/analytics/tests/{test.id}/cohort/')
+        assert response.status_code == 404
+
+    def test_polling_while_building_queues_one_rebuild_and_never_rebuilds_inline(self, cohort_test, monkeypatch, settings):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        test, _, _, client = cohort_test
+        url = f'/api/institution-admin/analytics/tests/{test.id}/cohort/'
+        queued = []
+        monkeypatch.setattr(tasks.rebuild_test_cohort_task, 'delay', queued.append)
+
+        for _ in range(3):
+            response = client.get(url)
+            assert response.status_code == 202
+        assert queued == [test.id]
+
+        # Broker down: still 202, nothing folded in the request, and a later poll retries
+        from django.core.cache import cache
+        cache.clear()
+
+        def unreachable(test_id):
+            raise ConnectionError('broker down')
+
+        monkeypatch.setattr(tasks.rebuild_test_cohort_task, 'delay', unreachable)
+        assert client.get(url).status_code == 202
+        assert not TestCohortSummary.objects.filter(platform_test=test).exists()
+        monkeypatch.setattr(tasks.rebuild_test_cohort_task, 'delay', queued.append)
+        assert client.get(url).status_code == 202
+        assert queued == [test.id, test.id]
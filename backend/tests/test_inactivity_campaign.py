@@ -0,0 +1,84 @@
+"""
+Tests for the set-based inactivity reminder campaign
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from neet_app import notifications
+from neet_app.models import Notification, StudentProfile, TestSession
+from neet_app.services.inactivity_campaign_service import inactive_students, queue_inactivity_campaign
+
+
+def _student(n, **extra):
+    return StudentProfile.objects.create(
+        student_id=f'STU2501010000{n}', full_name=f'Campaign Student {n}', email=f'campaign{n}@example.com',
+        phone_number=f'900000000{n}', date_of_birth='2005-01-01', **extra,
+    )
+
+
+def _completed(student, days_ago):
+    ended = timezone.now() - timedelta(days=days_ago)
+    session = TestSession.objects.create(
+        student_id=student.student_id, selected_topics=[], total_questions=1, start_time=ended,
+    )
+    TestSession.objects.filter(id=session.id).update(is_completed=True, end_time=ended)
+    return ended
+
+
+@pytest.fixture
+def cohort():
+    recent, lapsed, never = _student(1), _student(2), _student(3)
+    _student(4, is_active=False)
+    _completed(recent, 1)
+    _completed(lapsed, 20)
+    last = _completed(lapsed, 9)
+    # An unfinished session does not count as activity
+    TestSession.objects.create(
+        student_id=lapsed.student_id, selected_topics=[], total_questions=1, start_time=timezone.now(),
+    )
+    return {'lapsed': (lapsed, last), 'never': never}
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestInactivityCampaign:
+
+    def test_cohort_selected_in_one_query(self, cohort, django_assert_num_queries):
+        lapsed, last = cohort['lapsed']
+        with django_assert_num_queries(1):
+            students = {s.student_id: s.last_test_date for s in inactive_students(days=5)}
+        assert students == {lapsed.student_id: last, cohort['never'].student_id: None}
+
+    def test_already_reminded_students_are_skipped(self, cohort):
+        notifications.queue_inactivity_reminder(cohort['never'])
+        assert [s.student_id for s in inactive_students(days=5)] == [cohort['lapsed'][0].student_id]
+
+    def test_campaign_queues_rate_limited_chunks(self, cohort, settings, django_capture_on_commit_callbacks):
+        settings.INACTIVITY_REMINDER_RATE_PER_MINUTE = 60
+        now = timezone.now()
+        with django_capture_on_commit_callbacks() as callbacks:
+            result = queue_inactivity_campaign(days=5, now=now, chunk_size=1)
+
+        assert result == {'queued': 2, 'chunks': 2, 'spread_minutes': 0.0}
+        assert len(callbacks) == 2
+        rows = list(Notification.objects.filter(notification_type='inactivity').order_by('next_attempt_at'))
+        assert [r.user_id for r in rows] == sorted([cohort['lapsed'][0].student_id, cohort['never'].student_id])
+        # One chunk per second at 60/minute
+        assert [r.next_attempt_at - now for r in rows] == [timedelta(0), timedelta(seconds=1)]
+        assert rows[0].payload['last_test_date'] == cohort['lapsed'][1].isoformat()
+
+        # Only the first slot is due now
+        assert notifications.deliver_notifications([r.id for r in rows])['claimed'] == 1
+
+        # Re-running the same day queues nothing new
+        assert queue_inactivity_campaign(days=5, now=now)['queued'] == 0
+
+    def test_command_reports_queued_reminders(self, cohort):
+        out = StringIO()
+        call_command('send_inactivity_reminders', '--days', '5', '--limit', '1', stdout=out)
+        assert 'Queued 1 inactivity reminders' in out.getvalue()
+        assert Notification.objects.filter(notification_type='inactivity').count() == 1
@@ -0,0 +1,112 @@
+"""
+Tests for token-budgeted insight prompt payloads
+"""
+import json
+
+import pytest
+
+from neet_app.services import insight_prompt_builder as builder
+from neet_app.services.zone_insights_service import FOCUS_ZONE_PROMPT
+
+
+def _question(qid, selected='B', misconception=None, text=None, options=None, is_correct=False):
+    return {
+        'question_id': qid,
+        'question': text if text is not None else f'Question {qid} about vectors and motion',
+        'options': options or {'A': f'a{qid}', 'B': f'b{qid}', 'C': f'c{qid}', 'D': f'd{qid}'},
+        'correct_answer': 'A',
+        'selected_answer': selected,
+        'is_correct': is_correct,
+        'misconception': misconception,
+    }
+
+
+@pytest.mark.unit
+class TestInsightPromptBuilder:
+
+    def test_ranking_prefers_misconceptions_under_tight_budget(self):
+        topics = [
+            {'topic_name': 'Kinematics', 'questions': [
+                _question(1, selected=None),
+                _question(2),
+                _question(3, misconception='Confused velocity with acceleration'),
+            ]},
+        ]
+        one_question = builder.estimate_tokens(builder.compact_json(_question(3, misconception='x' * 34))) + 20
+        fitted = builder.fit_topics(topics, budget=one_question)
+
+        assert [q['question_id'] for q in fitted[0]['questions']] == [3]
+
+        # A generous budget keeps everything in the original order
+        fitted = builder.fit_topics(topics, budget=10_000)
+        assert [q['question_id'] for q in fitted[0]['questions']] == [1, 2, 3]
+
+    def test_truncates_and_dedupes_shared_stems_and_options(self):
+        passage = 'Read the passage. ' * 60
+        shared_options = {'A': 'Both A and R true', 'B': 'A true, R false', 'C': 'A false', 'D': 'Both false'}
+        topics = [{'topic_name': 'Cells', 'questions': [
+            _question(10, text=passage, options=shared_options),
+            _question(11, text=passage, options=shared_options),
+        ]}]
+
+        questions = builder.fit_topics(topics, budget=10_000)[0]['questions']
+
+        assert len(questions[0]['question']) == builder.MAX_QUESTION_CHARS
+        assert questions[0]['question'].endswith(builder.TRUNCATION_MARK)
+        assert questions[1]['question'] == 'same as Q10'
+        assert questions[0]['options'] == shared_options
+        assert questions[1]['options'] == 'same as Q10'
+
+    def test_budget_applies_per_subject_and_keeps_test_nesting(self):
+        def subject(offset):
+            return {'topics': [{'topic_name': f'T{offset}', 'tests': [
+                {'test_name': 'Mock 1', 'test_id': offset, 'questions': [_question(offset + n) for n in range(40)]},
+            ]}]}
+
+        payload = {'Physics': subject(100), 'Botany': subject(200)}
+        budget = 600
+        fitted = builder.fit_subject_payload(payload, budget=budget)
+
+        for name in ('Physics', 'Botany'):
+            test = fitted[name]['topics'][0]['tests'][0]
+            assert test['test_name'] == 'Mock 1'
+            assert 0 < len(test['questions']) < 40
+            assert builder.estimate_tokens(builder.compact_json(fitted[name])) <= budget + 20
+
+    def test_prompt_is_compact_and_token_count_recorded(self, settings):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        payload = {'Physics': {'topics': [{'topic_name': 'Optics', 'questions': [_question(1)]}]}}
+
+        prompt = builder.build_insight_prompt('focus_zone', FOCUS_ZONE_PROMPT, 'data_json', payload)
+        builder.build_insight_prompt('focus_zone', FOCUS_ZONE_PROMPT, 'data_json', payload)
+
+        assert builder.compact_json(payload) in prompt
+        assert json.dumps(payload, indent=2) not in prompt
+        stats = builder.get_prompt_token_stats('focus_zone')
+        assert stats['calls'] == 2
+        assert stats['max_tokens'] == builder.estimate_tokens(prompt)
+        assert stats['tokens'] == 2 * builder.estimate_tokens(prompt)
+
+    def test_token_counters_do_not_lose_concurrent_updates(self, settings, monkeypatch):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from django.core.cache import cache
+
+        class SlowReads:
+            # Widen the window between a read and the following write, as a network round trip would
+            def __getattr__(self, attr):
+                return getattr(cache, attr)
+
+            def get(self, *args, **kwargs):
+                value = cache.get(*args, **kwargs)
+                time.sleep(0.001)
+                return value
+
+        monkeypatch.setattr(builder, 'cache', SlowReads())
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda tokens: builder.record_prompt_tokens('checkpoints', tokens), range(1, 201)))
+
+        stats = builder.get_prompt_token_stats('checkpoints')
+        assert (stats['calls'], stats['tokens']) == (200, sum(range(1, 201)))
+        assert 0 < stats['max_tokens'] <= 200  # best effort
@@ -0,0 +1,117 @@
+"""
+Query-count regression tests for student/institution test listings.
+Listing endpoints must not issue one query per listed test.
+"""
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from neet_app.institution_auth import generate_institution_admin_tokens
+from neet_app.models import (
+    Institution, InstitutionAdmin, PlatformTest, PreviousYearQuestionPaper, TestSession
+)
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response
+
+
+def _create_platform_tests(topic, count, institution=None, offset=0):
+    return [
+        PlatformTest.objects.create(
+            test_name=f'Listing Test {offset + i}',
+            test_code=f'LISTING_TEST_{offset + i:03d}',
+            selected_topics=[topic.id],
+            total_questions=10,
+            time_limit=60,
+            is_active=True,
+            institution=institution,
+            is_institution_test=institution is not None,
+        )
+        for i in range(count)
+    ]
+
+
+def _create_session(student_id, topic, **kwargs):
+    defaults = dict(
+        student_id=student_id,
+        selected_topics=[topic.id],
+        total_questions=10,
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    defaults.update(kwargs)
+    return TestSession.objects.create(**defaults)
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestListingQueryCounts:
+
+    def test_platform_test_listing_is_constant(self, authenticated_client, sample_topic):
+        student_id = authenticated_client.student_profile.student_id
+        first = _create_platform_tests(sample_topic, 1)
+        _create_session(student_id, sample_topic, test_type='platform', platform_test=first[0])
+        baseline, _ = _count_queries(authenticated_client, '/api/platform-tests/available/')
+
+        more = _create_platform_tests(sample_topic, 4, offset=1)
+        _create_session(student_id, sample_topic, test_type='platform', platform_test=more[0])
+        _create_session(student_id, sample_topic, test_type='platform', platform_test=more[1])
+        TestSession.objects.filter(platform_test=more[1]).update(is_completed=True)
+
+        queries, response = _count_queries(authenticated_client, '/api/platform-tests/available/')
+        assert queries == baseline
+
+        flags = {t['id']: (t['has_completed'], t['has_active_session']) for t in response.data['open_tests']}
+        assert flags[first[0].id] == (False, True)
+        assert flags[more[0].id] == (False, True)
+        assert flags[more[1].id] == (True, False)
+        assert flags[more[2].id] == (False, False)
+
+    def test_pyq_listing_is_constant(self, authenticated_client, sample_topic):
+        student_id = authenticated_client.student_profile.student_id
+        pyqs = [
+            PreviousYearQuestionPaper.objects.create(name=f'PYQ {i}', source_filename=f'pyq_{i}.xlsx')
+            for i in range(4)
+        ]
+        _create_session(student_id, sample_topic, test_type='pyq', selected_topics=[pyqs[0].id])
+        baseline, _ = _count_queries(authenticated_client, '/api/pyqs/')
+
+        for _ in range(2):
+            _create_session(student_id, sample_topic, test_type='pyq', selected_topics=[pyqs[1].id])
+        PreviousYearQuestionPaper.objects.create(name='PYQ extra', source_filename='extra.xlsx')
+
+        queries, response = _count_queries(authenticated_client, '/api/pyqs/')
+        assert queries == baseline
+
+        counts = {p['id']: p['attempt_count'] for p in response.data['pyqs']}
+        assert counts[pyqs[0].id] == 1
+        assert counts[pyqs[1].id] == 2
+        assert counts[pyqs[2].id] == 0
+
+    def test_institution_admin_listing_is_constant(self, sample_topic, sample_student_profile):
+        institution = Institution.objects.create(name='Listing Institute', code='LIST01')
+        admin = InstitutionAdmin.objects.create(username='listing_admin', password_hash='x', institution=institution)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+
+        tests = _create_platform_tests(sample_topic, 1, institution=institution)
+        baseline, _ = _count_queries(client, '/api/institution-admin/tests/')
+
+        tests += _create_platform_tests(sample_topic, 3, institution=institution, offset=1)
+        for _ in range(3):
+            _create_session(sample_student_profile.student_id, sample_topic, test_type='platform', platform_test=tests[2])
+
+        queries, response = _count_queries(client, '/api/institution-admin/tests/')
+        assert queries == baseline
+
+        counts = {t['id']: t['attempts_count'] for t in json.loads(response.content)['tests']}
+        assert counts[tests[2].id] == 3
+        assert counts[tests[0].id] == 0
@@ -0,0 +1,219 @@
+"""
+Tests for Redis-backed live session presence and admin live metrics
+"""
+import json
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.utils import timezone
+
+from neet_app.models import PlatformTest, TestSession
+from neet_app.services import live_presence_service
+from neet_app.services.live_presence_service import get_live_counts, persist_heartbeats, record_heartbeat
+
+
+class SortedSetRedis:
+    """In-memory stand-in for the handful of sorted-set commands presence uses."""
+
+    def __init__(self):
+        self.zsets = {}
+        self.strings = {}
+
+    @staticmethod
+    def _bound(value, default):
+        if value in ('+inf', '-inf'):
+            return float(value), False
+        if isinstance(value, str) and value.startswith('('):
+            return float(value[1:]), True
+        return float(value if value is not None else default), False
+
+    def _in_range(self, score, low, high):
+        lo, lo_open = self._bound(low, '-inf')
+        hi, hi_open = self._bound(high, '+inf')
+        return (score > lo if lo_open else score >= lo) and (score < hi if hi_open else score <= hi)
+
+    def zadd(self, key, mapping, gt=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not gt or float(score) > zset.get(str(member), float('-inf')):
+                zset[str(member)] = float(score)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(str(member))
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(str(member), None)
+
+    def zcount(self, key, low, high):
+        return sum(1 for s in self.zsets.get(key, {}).values() if self._in_range(s, low, high))
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        items = sorted(
+            ((m, s) for m, s in self.zsets.get(key, {}).items() if self._in_range(s, low, high)),
+            key=lambda item: item[1],
+        )
+        return items if withscores else [m for m, _ in items]
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, s in zset.items() if self._in_range(s, low, high)]:
+            del zset[member]
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value):
+        self.strings[key] = str(value)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.client, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [fn(*args, **kwargs) for fn, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def presence_redis(monkeypatch, settings):
+    fake = SortedSetRedis()
+    settings.LIVE_PRESENCE_REDIS_ENABLED = True
+    monkeypatch.setattr(live_presence_service, '_client', lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def live_sessions(sample_student_profile, sample_topic):
+    platform_test = PlatformTest.objects.create(
+        test_name='Live Test', test_code='LIVE_TEST_001', selected_topics=[sample_topic.id],
+        total_questions=10, time_limit=60,
+    )
+
+    def make(**kwargs):
+        return TestSession.objects.create(
+            student_id=sample_student_profile.student_id, selected_topics=[sample_topic.id],
+            total_questions=10, time_limit=60, start_time=timezone.now(), **kwargs
+        )
+
+    return platform_test, [
+        make(test_type='platform', platform_test=platform_test),
+        make(test_type='platform', platform_test=platform_test),
+        make(test_type='custom'),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestLivePresence:
+
+    def test_live_counts_from_sorted_sets(self, presence_redis, live_sessions):
+        platform_test, sessions = live_sessions
+        now = time.time()
+        # sessions[1]'s last heartbeat is outside the window, so it is not live
+        record_heartbeat(sessions[1], now=now - 600)
+        record_heartbeat(sessions[0], now=now - 10)
+        record_heartbeat(sessions[2], now=now - 10)
+        # A delayed older ping does not move presence backwards
+        record_heartbeat(sessions[0], now=now - 300)
+
+        counts = get_live_counts(now=now)
+        assert counts['taking_count'] == 2
+        assert counts['concurrent_count'] == 1
+        assert counts['active_custom_sessions'] == 1
+        assert counts['live_tests'] == {str(platform_test.id): 1, 'custom': 1}
+
+    def test_persist_writes_latest_heartbeat_in_bulk(self, presence_redis, live_sessions, django_assert_max_num_queries):
+        _, sessions = live_sessions
+        now = time.time()
+        for session in sessions:
+            record_heartbeat(session, now=now - 5)
+
+        with django_assert_max_num_queries(1):
+            assert persist_heartbeats(now=now) == 3
+
+        for session in sessions:
+            session.refresh_from_db()
+            assert session.is_active is True
+            assert abs(session.last_heartbeat.timestamp() - (now - 5)) < 1
+
+        # Nothing new since the watermark
+        assert persist_heartbeats(now=now + 1) == 0
+
+    def test_heartbeat_view_skips_row_write(self, presence_redis, live_sessions, django_assert_num_queries):
+        _, sessions = live_sessions
+        admin = get_user_model().objects.create_superuser('presence_admin', 'admin@example.com', 'x')
+        client = Client()
+        client.force_login(admin)
+        url = f'/api/platform-admin/api/sessions/{sessions[0].id}/heartbeat/'
+
+        response = client.post(url)
+        assert response.status_code == 200
+        sessions[0].refresh_from_db()
+        assert sessions[0].last_heartbeat is None
+        assert presence_redis.zcount(live_presence_service.SESSIONS_KEY, '-inf', '+inf') == 1
+
+        metrics = json.loads(client.get('/api/platform-admin/api/metrics/').content)
+        assert metrics['taking_count'] == 1
+        assert metrics['concurrent_count'] == 1
+
+    def test_quit_and_submit_clear_presence(self, presence_redis, live_sessions, authenticated_client):
+        platform_test, sessions = live_sessions
+        now = time.time()
+        record_heartbeat(sessions[0], now=now - 20)
+        record_heartbeat(sessions[2], now=now - 10)
+
+        response = authenticated_client.post(f'/api/test-sessions/{sessions[2].id}/quit/')
+        assert response.status_code == 200
+        counts = get_live_counts(now=now)
+        assert counts['taking_count'] == 1
+        assert counts['active_custom_sessions'] == 0
+        # The student is still live through sessions[0], at that session's heartbeat
+        assert counts['concurrent_count'] == 1
+        assert presence_redis.zscore(live_presence_service.STUDENTS_KEY, sessions[0].student_id) == now - 20
+
+        response = authenticated_client.post(f'/api/test-sessions/{sessions[0].id}/submit/')
+        assert response.status_code == 200
+        counts = get_live_counts(now=now)
+        assert (counts['taking_count'], counts['concurrent_count'], counts['live_tests']) == (0, 0, {})
+
+    def test_persist_does_not_revive_completed_sessions(self, presence_redis, live_sessions):
+        _, sessions = live_sessions
+        now = time.time()
+        for session in sessions:
+            record_heartbeat(session, now=now - 5)
+        TestSession.objects.filter(id=sessions[0].id).update(is_completed=True, is_active=False)
+
+        assert persist_heartbeats(now=now) == 2
+        sessions[0].refresh_from_db()
+        assert sessions[0].is_active is False and sessions[0].last_heartbeat is None
+
+    def test_late_heartbeat_does_not_revive_cleared_session(self, presence_redis, live_sessions, authenticated_client):
+        _, sessions = live_sessions
+        record_heartbeat(sessions[0], now=time.time() - 10)
+        response = authenticated_client.post(f'/api/test-sessions/{sessions[0].id}/submit/')
+        assert response.status_code == 200
+
+        sessions[0].refresh_from_db()
+        assert record_heartbeat(sessions[0]) is True
+        admin = get_user_model().objects.create_superuser('late_admin', 'late@example.com', 'x')
+        client = Client()
+        client.force_login(admin)
+        response = client.post(f'/api/platform-admin/api/sessions/{sessions[0].id}/heartbeat/')
+        assert response.status_code == 200
+
+        counts = get_live_counts()
+        assert (counts['taking_count'], counts['concurrent_count'], counts['live_tests']) == (0, 0, {})
+        sessions[0].refresh_from_db()
+        assert sessions[0].is_active is False
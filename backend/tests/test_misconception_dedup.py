@@ -0,0 +1,105 @@
+"""
+Tests for fingerprint-based misconception reuse and batched generation
+"""
+import json
+import re
+
+import pytest
+
+from neet_app.models import Institution, PlatformTest, Question
+from neet_app.services import misconception_service
+
+
+def _question(topic, text, institution=None, test_name=None, correct='A', misconceptions=None, **options):
+    return Question.objects.create(
+        topic=topic, question=text,
+        option_a=options.get('a', 'one'), option_b=options.get('b', 'two'),
+        option_c=options.get('c', 'three'), option_d=options.get('d', 'four'),
+        correct_answer=correct, explanation='e', misconceptions=misconceptions,
+        institution=institution, institution_test_name=test_name, exam_type='neet',
+    )
+
+
+class FakeGemini:
+    prompts = []
+
+    def __init__(self):
+        self.model_name = 'fake'
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt):
+        FakeGemini.prompts.append(prompt)
+        ids = [int(qid) for qid in re.findall(r'Question ID: (\d+)', prompt)]
+        return json.dumps([
+            {'question_id': qid, 'misconceptions': {'option_a': '', 'option_b': f'generated {qid}'}}
+            for qid in ids
+        ])
+
+
+@pytest.fixture
+def institution_test(sample_topic):
+    institution = Institution.objects.create(name='Inst', code='INST1', exam_types=['neet'])
+    test = PlatformTest.objects.create(
+        test_name='Mock A', test_code='INST1_MOCK_A', time_limit=60, total_questions=5,
+        selected_topics=[sample_topic.id], institution=institution, is_institution_test=True, exam_type='neet',
+    )
+    return institution, test
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestMisconceptionDedup:
+
+    def test_fingerprint_ignores_case_and_spacing(self, sample_topic):
+        q1 = _question(sample_topic, 'What is  the unit of Force?')
+        q2 = _question(sample_topic, 'what is the unit of force?', test_name='Other')
+        q3 = _question(sample_topic, 'What is the unit of work?')
+        assert q1.content_fingerprint and q1.content_fingerprint == q2.content_fingerprint
+        assert q3.content_fingerprint != q1.content_fingerprint
+
+        q3.question = 'What is  the unit of Force?'
+        q3.save(update_fields=['question'])
+        q3.refresh_from_db()
+        assert q3.content_fingerprint == q1.content_fingerprint
+
+    def test_known_fingerprints_are_copied_and_rest_batched(self, sample_topic, institution_test, monkeypatch):
+        institution, test = institution_test
+        donor = _question(sample_topic, 'Shared   stem', misconceptions={'option_b': 'known'})
+        # Same content but a different key: stored misconceptions do not apply
+        _question(sample_topic, 'Rekeyed stem', correct='B', test_name='Old', misconceptions={'option_a': 'x'})
+
+        shared = _question(sample_topic, 'shared stem', institution, 'Mock A')
+        rekeyed = _question(sample_topic, 'Rekeyed stem', institution, 'Mock A')
+        fresh = [_question(sample_topic, f'Fresh {n}', institution, 'Mock A') for n in range(3)]
+        twin = _question(sample_topic, 'FRESH  0', institution, 'Mock A')
+
+        Question.objects.filter(id=shared.id).update(content_fingerprint=None)  # pre-fingerprint row
+        FakeGemini.prompts = []
+        monkeypatch.setattr(misconception_service, 'GeminiClient', FakeGemini)
+
+        result = misconception_service.generate_misconceptions_for_test(test.id, batch_size=2)
+
+        assert result['success'] is True
+        assert result['total_questions'] == 6
+        assert result['reused'] == 1
+        assert result['generated'] == 5
+        assert result['processed'] == 6 and result['failed'] == 0
+
+        # 4 distinct unseen questions (rekeyed + 3 fresh; twin shares fresh[0]) -> 2 batches of 2
+        assert len(FakeGemini.prompts) == 2
+        sent = {int(qid) for p in FakeGemini.prompts for qid in re.findall(r'Question ID: (\d+)', p)}
+        assert sent == {rekeyed.id} | {q.id for q in fresh}
+
+        shared.refresh_from_db()
+        twin.refresh_from_db()
+        assert shared.misconceptions == donor.misconceptions
+        assert shared.content_fingerprint == donor.content_fingerprint
+        assert twin.misconceptions == {'option_a': '', 'option_b': f'generated {fresh[0].id}'}
+
+        # Re-running finds everything analysed and makes no LLM calls
+        FakeGemini.prompts = []
+        again = misconception_service.generate_misconceptions_for_test(test.id, batch_size=2)
+        assert again['processed'] == 6 and again['generated'] == 0
+        assert FakeGemini.prompts == []
@@ -0,0 +1,160 @@
+"""
+Tests for batched, resumable misconception generation jobs
+"""
+import json
+import re
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from neet_app.institution_auth import generate_institution_admin_tokens
+from neet_app.models import (
+    Institution, InstitutionAdmin, MisconceptionBatch, PlatformTest, Question, Topic
+)
+from neet_app.services import misconception_service
+from neet_app.tasks import generate_misconceptions_task
+
+
+class FlakyGemini:
+    """Answers every question, except for subjects listed in `failing`."""
+    failing = set()
+    keys_used = []
+
+    def __init__(self):
+        self.model_name = 'fake'
+
+    def use_api_key(self, index):
+        FlakyGemini.keys_used.append(index)
+
+    def is_available(self):
+        return True
+
+    def generate_response(self, prompt):
+        subjects = set(re.findall(r'Subject: (\w+)', prompt))
+        if subjects & FlakyGemini.failing:
+            return ''
+        return json.dumps([
+            {'question_id': int(qid), 'misconceptions': {'option_a': '', 'option_b': f'm{qid}'}}
+            for qid in re.findall(r'Question ID: (\d+)', prompt)
+        ])
+
+
+@pytest.fixture
+def job_setup(monkeypatch, settings):
+    settings.GEMINI_API_KEYS = ['k1', 'k2', 'k3']
+    settings.MISCONCEPTION_MAX_PARALLEL_BATCHES = 2
+    FlakyGemini.failing = {'Chemistry'}
+    FlakyGemini.keys_used = []
+    monkeypatch.setattr(misconception_service, 'GeminiClient', FlakyGemini)
+
+    institution = Institution.objects.create(name='Inst', code='JOBS1', exam_types=['neet'])
+    admin = InstitutionAdmin.objects.create(username='jobs_admin', password_hash='x', institution=institution)
+    physics = Topic.objects.create(name='Optics', subject='Physics', icon='p')
+    chemistry = Topic.objects.create(name='Alkanes', subject='Chemistry', icon='c')
+    test = PlatformTest.objects.create(
+        test_name='Mock J', test_code='JOBS1_MOCK_J', time_limit=60, total_questions=7,
+        selected_topics=[physics.id, chemistry.id], institution=institution,
+        is_institution_test=True, exam_type='neet',
+    )
+    for n in range(7):
+        Question.objects.create(
+            topic=physics if n < 4 else chemistry, question=f'Question {n}',
+            option_a='1', option_b='2', option_c='3', option_d='4', correct_answer='A', explanation='e',
+            institution=institution, institution_test_name='Mock J', exam_type='neet',
+        )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+    return test, client
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestMisconceptionJobs:
+
+    def test_parallelism_bounded_by_setting_and_key_pool(self, settings):
+        settings.GEMINI_API_KEYS = ['k1', 'k2', 'k3']
+        settings.MISCONCEPTION_MAX_PARALLEL_BATCHES = 8
+        assert misconception_service.max_parallel_batches() == 3
+        settings.GEMINI_API_KEYS = []
+        assert misconception_service.max_parallel_batches() == 1
+
+    def test_failed_batches_persist_progress_and_resume(self, job_setup):
+        test, client = job_setup
+
+        job = misconception_service.start_misconception_job(test.id, batch_size=2)
+
+        batches = list(MisconceptionBatch.objects.filter(job=job).order_by('sequence'))
+        assert [(b.subject, b.status) for b in batches] == [
+            ('Physics', 'completed'), ('Physics', 'completed'),
+            ('Chemistry', 'failed'), ('Chemistry', 'failed'),
+        ]
+        # Each batch starts on its own key of the pool
+        assert sorted(FlakyGemini.keys_used) == [0, 1, 2, 3]
+        assert Question.objects.filter(topic__subject='Physics', misconceptions__isnull=False).count() == 4
+        test.refresh_from_db()
+        assert test.misconception_generation_status == 'failed'
+
+        response = client.get(f'/api/institution-admin/tests/{test.id}/')
+        progress = json.loads(response.content)['misconception_progress']
+        assert progress['status'] == 'partial'
+        assert progress['subjects']['Physics']['completed_batches'] == 2
+        assert progress['subjects']['Physics']['processed'] == 4
+        assert progress['subjects']['Chemistry']['failed_batches'] == 2
+        assert progress['subjects']['Chemistry']['questions'] == 3
+
+        # Resume retries only the failed Chemistry batches
+        FlakyGemini.failing = set()
+        FlakyGemini.keys_used = []
+        response = client.post(f'/api/institution-admin/tests/{test.id}/resume-misconceptions/')
+        body = json.loads(response.content)
+        assert response.status_code == 200
+        assert body['retried_batches'] == 2
+        assert sorted(FlakyGemini.keys_used) == [2, 3]
+        assert body['misconception_progress']['status'] == 'completed'
+
+        assert list(MisconceptionBatch.objects.filter(job=job).values_list('attempts', flat=True).order_by('sequence')) == [1, 1, 2, 2]
+        assert not Question.objects.filter(institution_test_name='Mock J', misconceptions__isnull=True).exists()
+        test.refresh_from_db()
+        assert test.misconception_generation_status == 'completed'
+        assert test.misconception_generated_at is not None
+
+        response = client.post(f'/api/institution-admin/tests/{test.id}/resume-misconceptions/')
+        assert response.status_code == 409
+
+    def test_task_runs_job_to_completion(self, job_setup):
+        test, _ = job_setup
+        FlakyGemini.failing = set()
+
+        result = generate_misconceptions_task(test.id)
+
+        assert result['status'] == 'completed'
+        assert result['processed'] == 7 and result['generated'] == 7
+        test.refresh_from_db()
+        assert test.misconception_generation_status == 'completed'
+
+    def test_freshly_claimed_batch_on_old_job_is_not_retried(self, job_setup, monkeypatch):
+        test, _ = job_setup
+        job = misconception_service.start_misconception_job(test.id, batch_size=2)
+        last = MisconceptionBatch.objects.filter(job=job).order_by('-sequence').first()
+        MisconceptionBatch.objects.filter(id=last.id).update(status='completed')
+        # Planned (and last touched) long before the retry below
+        MisconceptionBatch.objects.filter(job=job).update(updated_at=timezone.now() - timedelta(hours=2))
+
+        FlakyGemini.failing = set()
+        nested = []
+        answer = FlakyGemini.generate_response
+
+        def resume_while_running(self, prompt):
+            # Another admin hits resume while the retried batch is in flight
+            nested.append(misconception_service.resume_misconception_job(test.id))
+            return answer(self, prompt)
+
+        monkeypatch.setattr(FlakyGemini, 'generate_response', resume_while_running)
+        result = misconception_service.resume_misconception_job(test.id)
+
+        assert result['retried'] == 1
+        assert nested == [{'job_id': job.id, 'retried': 0}]
+        assert MisconceptionBatch.objects.filter(job=job, attempts=2).count() == 1
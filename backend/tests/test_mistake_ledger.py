@@ -0,0 +1,140 @@
+"""
+Tests for the per-student mistake ledger behind repeated-mistake generation
+"""
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app import signals
+from neet_app.models import PlatformTest, Question, StudentMistakeLedger, TestAnswer, TestSession, Topic
+from neet_app.services import mistake_ledger_service, zone_insights_service
+from neet_app.services.ai.gemini_client import GeminiClient
+from neet_app.services.mistake_ledger_service import (
+    build_repeated_mistakes_corpus, compact_ledger, record_session_mistakes
+)
+from neet_app.services.zone_insights_service import extract_repeated_mistakes_data
+from neet_app.utils.topic_taxonomy import get_topic_taxonomy
+
+
+@pytest.fixture
+def ledger_topics():
+    return (
+        Topic.objects.create(name='Kinematics', subject='Physics', icon='p'),
+        Topic.objects.create(name='Optics', subject='Physics', icon='p'),
+    )
+
+
+def _completed_platform_test(student_id, topics, answers, days_ago=0, n=0):
+    platform_test = PlatformTest.objects.create(
+        test_name=f'Mock {n}', test_code=f'LEDGER_MOCK_{n:03d}', selected_topics=[t.id for t in topics],
+        total_questions=len(answers), time_limit=60,
+    )
+    session = TestSession.objects.create(
+        student_id=student_id, selected_topics=[t.id for t in topics], total_questions=len(answers),
+        time_limit=60, start_time=timezone.now(), test_type='platform', platform_test=platform_test,
+    )
+    session.update_subject_classification()
+    session.is_completed = True
+    session.end_time = timezone.now() - timedelta(days=days_ago)
+    session.save()
+    for i, (topic, selected, is_correct) in enumerate(answers):
+        question = Question.objects.create(
+            topic=topic, question=f'T{n} Q{i}', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_answer='A', explanation='e', misconceptions={'option_b': f'Misread units {i}'},
+        )
+        TestAnswer.objects.create(session=session, question=question, selected_answer=selected, is_correct=is_correct)
+    return session
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestMistakeLedger:
+
+    def test_record_is_idempotent_and_skips_non_mistakes(self, sample_student_profile, ledger_topics):
+        kinematics, optics = ledger_topics
+        session = _completed_platform_test(sample_student_profile.student_id, ledger_topics, [
+            (kinematics, 'B', False), (kinematics, 'A', True), (optics, None, None), (optics, 'C', False),
+        ])
+
+        assert record_session_mistakes(session.id) == 2
+        record_session_mistakes(session.id)
+        entries = StudentMistakeLedger.objects.filter(student_id=sample_student_profile.student_id)
+        assert entries.count() == 2
+        assert set(entries.values_list('subject', flat=True)) == {'Physics'}
+        assert entries.get(topic_id=kinematics.id).misconception == 'Misread units 0'
+
+    def test_compaction_bounds_by_recency_and_topic(self, sample_student_profile, ledger_topics, monkeypatch):
+        monkeypatch.setattr(mistake_ledger_service, 'LEDGER_MAX_PER_TOPIC', 2)
+        kinematics, optics = ledger_topics
+        student_id = sample_student_profile.student_id
+        sessions = [
+            _completed_platform_test(student_id, ledger_topics, [(kinematics, 'B', False)] * 2, days_ago=d, n=n)
+            for n, d in enumerate([1, 2, 400])
+        ]
+        sessions.append(_completed_platform_test(student_id, ledger_topics, [(optics, 'B', False)], days_ago=3, n=3))
+        for session in sessions:
+            record_session_mistakes(session.id, compact=False)
+        assert StudentMistakeLedger.objects.filter(student_id=student_id).count() == 7
+
+        compact_ledger(student_id)
+        kept = StudentMistakeLedger.objects.filter(student_id=student_id)
+        # The 400-day-old test is gone; kinematics keeps its 2 newest entries
+        assert set(kept.values_list('test_session_id', flat=True)) == {sessions[0].id, sessions[3].id}
+        assert kept.filter(topic_id=kinematics.id).count() == 2
+
+    def test_corpus_is_capped_and_constant_queries(self, sample_student_profile, ledger_topics, monkeypatch):
+        monkeypatch.setattr(mistake_ledger_service, 'LEDGER_TESTS_PER_TOPIC', 2)
+        monkeypatch.setattr(mistake_ledger_service, 'LEDGER_QUESTIONS_PER_TEST', 1)
+        kinematics, optics = ledger_topics
+        student_id = sample_student_profile.student_id
+        for n in range(4):
+            _completed_platform_test(student_id, ledger_topics, [
+                (kinematics, 'B', False), (kinematics, 'B', False), (optics, 'B', False) if n == 0 else (optics, 'A', True),
+            ], days_ago=n, n=n)
+
+        # Empty ledger is backfilled from history on first use
+        data = extract_repeated_mistakes_data(student_id)
+        topics = data['Physics']['topics']
+        assert [t['topic_name'] for t in topics] == ['Kinematics', 'Optics']
+        assert [t['test_name'] for t in topics[0]['tests']] == ['Mock 0', 'Mock 1']
+        assert all(len(t['questions']) == 1 for t in topics[0]['tests'])
+
+        get_topic_taxonomy()
+        with CaptureQueriesContext(connection) as ctx:
+            build_repeated_mistakes_corpus(student_id)
+        assert len(ctx.captured_queries) == 3
+
+    def test_sync_fallback_pipeline_records_later_sessions(
+        self, authenticated_client, ledger_topics, settings, monkeypatch
+    ):
+        kinematics, optics = ledger_topics
+        student_id = authenticated_client.student_profile.student_id
+        first = _completed_platform_test(student_id, ledger_topics, [(kinematics, 'B', False)], days_ago=1, n=0)
+        record_session_mistakes(first.id)
+
+        second = _completed_platform_test(student_id, ledger_topics, [(optics, 'B', False)], n=1)
+        TestSession.objects.filter(id=second.id).update(is_completed=False, end_time=None)
+
+        class InlineThread:
+            def __init__(self, target, args=(), **kwargs):
+                self.target, self.args = target, args
+
+            def start(self):
+                self.target(*self.args)
+
+        # DEBUG forces the fallback thread; run it inline and keep the LLM out of it
+        settings.DEBUG = True
+        monkeypatch.setattr('threading.Thread', InlineThread)
+        monkeypatch.setattr(signals, '_processed_sessions', set())
+        monkeypatch.setattr(zone_insights_service, 'generate_focus_zone', lambda sid: None)
+        monkeypatch.setattr(GeminiClient, 'is_available', lambda self: False)
+
+        response = authenticated_client.post(f'/api/test-sessions/{second.id}/submit/')
+        assert response.status_code == 200
+
+        assert StudentMistakeLedger.objects.filter(test_session_id=second.id).count() == 1
+        topics = extract_repeated_mistakes_data(student_id)['Physics']['topics']
+        assert {t['topic_name'] for t in topics} == {'Kinematics', 'Optics'}
@@ -0,0 +1,143 @@
+"""
+Tests for the Notification outbox: queued dispatch, batched delivery and retry backoff
+"""
+import smtplib
+from datetime import timedelta
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+
+from neet_app import notifications, tasks
+from neet_app.models import Notification, StudentProfile
+
+
+def _student(n):
+    return StudentProfile.objects.create(
+        student_id=f'STU2501010000{n}', full_name=f'Outbox Student {n}', email=f'outbox{n}@example.com',
+        phone_number=f'900000000{n}', date_of_birth='2005-01-01',
+    )
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that counts connections, rejects chosen recipients and can hit a time limit."""
+    opened = 0
+    reject = set()
+    time_limit_after = None
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        if any(set(m.to) & self.reject for m in messages):
+            raise smtplib.SMTPRecipientsRefused({})
+        if self.time_limit_after is not None and len(mail.outbox) >= self.time_limit_after:
+            raise SoftTimeLimitExceeded()
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def flaky_connection(monkeypatch):
+    FlakyBackend.opened = 0
+    FlakyBackend.reject = set()
+    FlakyBackend.time_limit_after = None
+    monkeypatch.setattr(notifications.emailer, 'get_mail_connection', lambda: FlakyBackend())
+    return FlakyBackend
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestNotificationOutbox:
+
+    def test_dispatch_queues_row_and_delivers_after_commit(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            student = _student(1)
+
+        welcome = Notification.objects.get(user=student, notification_type='welcome')
+        assert welcome.status == 'pending'
+        assert welcome.to_email == student.email and welcome.body_text
+        # Nothing is sent from the saving thread
+        assert mail.outbox == []
+
+        for callback in callbacks:
+            callback()
+        welcome.refresh_from_db()
+        assert (welcome.status, welcome.attempts) == ('sent', 1)
+        assert [m.to for m in mail.outbox] == [[student.email]]
+
+    def test_repeated_dispatch_is_deduplicated(self):
+        student = _student(1)
+        results = {'session_id': 42, 'correct_answers': 3}
+        assert notifications.dispatch_test_result_email(student, results) is True
+        assert notifications.dispatch_test_result_email(student, results) is False
+        assert Notification.objects.filter(notification_type='test_result').count() == 1
+
+    def test_broker_outage_leaves_row_pending(self, monkeypatch, django_capture_on_commit_callbacks):
+        def unreachable(*args, **kwargs):
+            raise ConnectionError('broker down')
+
+        monkeypatch.setattr(tasks.deliver_notifications_task, 'delay', unreachable)
+        with django_capture_on_commit_callbacks(execute=True):
+            student = _student(1)
+
+        assert Notification.objects.get(user=student).status == 'pending'
+        assert mail.outbox == []
+
+    def test_batch_shares_one_connection(self, flaky_connection, settings):
+        settings.NOTIFICATION_BATCH_SIZE = 10
+        students = [_student(n) for n in range(1, 4)]
+
+        stats = notifications.deliver_notifications()
+
+        assert stats == {'claimed': 3, 'sent': 3, 'retried': 0, 'failed': 0}
+        assert flaky_connection.opened == 1
+        assert sorted(m.to[0] for m in mail.outbox) == sorted(s.email for s in students)
+        assert set(Notification.objects.values_list('status', flat=True)) == {'sent'}
+
+    def test_failures_back_off_then_fail(self, flaky_connection, settings):
+        settings.NOTIFICATION_MAX_ATTEMPTS = 2
+        settings.NOTIFICATION_RETRY_BASE_SECONDS = 60
+        good, bad = _student(1), _student(2)
+        flaky_connection.reject = {bad.email}
+
+        assert notifications.deliver_notifications() == {'claimed': 2, 'sent': 1, 'retried': 1, 'failed': 0}
+        row = Notification.objects.get(user=bad)
+        assert (row.status, row.attempts) == ('pending', 1)
+        assert row.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        assert Notification.objects.get(user=good).status == 'sent'
+
+        # Not due yet, so the next run claims nothing
+        assert notifications.deliver_notifications()['claimed'] == 0
+
+        Notification.objects.filter(id=row.id).update(next_attempt_at=timezone.now())
+        assert notifications.deliver_notifications()['failed'] == 1
+        row.refresh_from_db()
+        assert (row.status, row.attempts) == ('failed', 2)
+        assert row.error
+
+    def test_expired_claim_is_reclaimed(self):
+        student = _student(1)
+        Notification.objects.filter(user=student).update(
+            status='sending', next_attempt_at=timezone.now() - timedelta(seconds=1),
+        )
+        assert tasks.deliver_notifications_task.delay().get()['sent'] == 1
+
+    def test_time_limit_keeps_sent_rows_and_releases_the_rest(self, flaky_connection, settings):
+        settings.NOTIFICATION_BATCH_SIZE = 10
+        for n in range(1, 4):
+            _student(n)
+        flaky_connection.time_limit_after = 1
+
+        with pytest.raises(SoftTimeLimitExceeded):
+            notifications.deliver_notifications()
+
+        rows = list(Notification.objects.values_list('status', 'attempts'))
+        # The delivered row is already marked sent; unsent claims are due again and uncounted
+        assert sorted(rows) == [('pending', 0), ('pending', 0), ('sent', 1)]
+        assert len(mail.outbox) == 1
+
+        flaky_connection.time_limit_after = None
+        assert notifications.deliver_notifications()['sent'] == 2
+        assert len(mail.outbox) == 3
@@ -0,0 +1,173 @@
+"""
+Query budgets: every budgeted endpoint stays within its budget and does not
+scale with data size (see tests/query_budget_plugin.py), plus the DEBUG
+query-count response headers.
+"""
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from neet_app.institution_auth import generate_institution_admin_tokens
+from neet_app.middleware import QueryCountMiddleware
+from neet_app.models import (
+    ChatMessage, ChatSession, Institution, InstitutionAdmin, PlatformTest, TestAnswer, TestSession,
+    TestSubjectZoneInsight, Topic
+)
+from neet_app.utils import query_budget as query_budget_module
+from neet_app.utils.query_budget import query_budget, register_query_budget, registered_query_budgets
+
+from .query_budget_plugin import SCENARIOS, budget_scenario
+
+
+def _platform_test(n):
+    return PlatformTest.objects.create(
+        test_name=f'Budget Test {n}', test_code=f'BUDGET_{n:03d}', selected_topics=[],
+        total_questions=2, time_limit=60, is_active=True,
+    )
+
+
+def _grow_sessions(ctx, size, student_id, completed=True, with_answers=False, insights=False):
+    """Add sessions (every other one a platform test) until the student has `size` of them."""
+    ctx.sessions = getattr(ctx, 'sessions', [])
+    if not hasattr(ctx, 'topic'):
+        ctx.topic = ctx.request.getfixturevalue('sample_topic')
+        ctx.questions = ctx.request.getfixturevalue('sample_questions')
+    while len(ctx.sessions) < size:
+        n = len(ctx.sessions)
+        platform_test = _platform_test(n) if n % 2 else None
+        session = TestSession.objects.create(
+            student_id=student_id, selected_topics=[ctx.topic.id], total_questions=2, time_limit=60,
+            start_time=timezone.now(), test_type='platform' if platform_test else 'custom',
+            platform_test=platform_test,
+        )
+        TestSession.objects.filter(id=session.id).update(is_completed=completed, end_time=timezone.now())
+        if with_answers:
+            TestAnswer.objects.bulk_create([
+                TestAnswer(session=session, question=ctx.questions[0], selected_answer='A', is_correct=True),
+                TestAnswer(session=session, question=ctx.questions[1], selected_answer=None),
+            ])
+        if insights:
+            TestSubjectZoneInsight.objects.create(
+                student_id=student_id, test_session=session, mark=4, total_mark=8,
+            )
+        ctx.sessions.append(session)
+
+
+@budget_scenario('test-session-list')
+def session_list(ctx, size):
+    client = ctx.request.getfixturevalue('authenticated_client')
+    _grow_sessions(ctx, size, client.student_profile.student_id, completed=False)
+    return lambda: client.get('/api/test-sessions/')
+
+
+@budget_scenario('chat-session-list')
+def chat_session_list(ctx, size):
+    client = ctx.request.getfixturevalue('authenticated_client')
+    ctx.chats = getattr(ctx, 'chats', [])
+    while len(ctx.chats) < size:
+        chat = ChatSession.objects.create(
+            student_id=client.student_profile.student_id, chat_session_id=f'budget-chat-{len(ctx.chats)}',
+        )
+        ChatMessage.objects.create(chat_session=chat, message_type='user', message_content='Explain osmosis')
+        ChatMessage.objects.create(chat_session=chat, message_type='bot', message_content='Osmosis is...')
+        ctx.chats.append(chat)
+    return lambda: client.get('/api/chat-sessions/')
+
+
+@budget_scenario('zone-insights-tests')
+def zone_insight_tests(ctx, size):
+    client = ctx.request.getfixturevalue('authenticated_client')
+    _grow_sessions(ctx, size, client.student_profile.student_id, with_answers=True)
+    return lambda: client.get('/api/zone-insights/tests/')
+
+
+@budget_scenario('list-available-platform-tests')
+def available_platform_tests(ctx, size):
+    client = ctx.request.getfixturevalue('authenticated_client')
+    ctx.tests = getattr(ctx, 'tests', [])
+    while len(ctx.tests) < size:
+        ctx.tests.append(_platform_test(len(ctx.tests)))
+    return lambda: client.get('/api/platform-tests/available/')
+
+
+@budget_scenario('institution-admin-student-performance')
+def student_performance(ctx, size):
+    student = ctx.request.getfixturevalue('sample_student_profile')
+    if not hasattr(ctx, 'admin_client'):
+        institution = Institution.objects.create(name='Budget Institute', code='BUDGET01')
+        admin = InstitutionAdmin.objects.create(username='budget_admin', password_hash='x', institution=institution)
+        ctx.admin_client = APIClient()
+        ctx.admin_client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+    _grow_sessions(ctx, size, student.student_id, insights=True)
+    url = f'/api/institution-admin/analytics/students/{student.student_id}/performance/'
+    return lambda: ctx.admin_client.get(url)
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget
+@pytest.mark.integration
+def test_endpoint_stays_within_query_budget(query_budget_name, check_query_budget):
+    check_query_budget(query_budget_name)
+
+
+@pytest.mark.unit
+class TestQueryBudgetRegistry:
+
+    def test_every_budget_has_a_scenario(self):
+        budgets = registered_query_budgets()
+        assert set(budgets) <= set(SCENARIOS)
+        assert 'test-session-list' in budgets
+
+    def test_conflicting_budgets_are_rejected(self, monkeypatch):
+        monkeypatch.setattr(query_budget_module, '_budgets', dict(query_budget_module._budgets))
+        register_query_budget('budget-test-endpoint', 3)
+
+        @query_budget('budget-test-endpoint', 3)
+        def view(request):
+            return HttpResponse()
+
+        assert registered_query_budgets()['budget-test-endpoint'].view.endswith('.view')
+        with pytest.raises(ValueError):
+            register_query_budget('budget-test-endpoint', 5)
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestQueryCountMiddleware:
+
+    def _request(self, path):
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        return request
+
+    def test_debug_responses_report_queries(self):
+        def view(request):
+            list(Topic.objects.all())
+            Topic.objects.count()
+            return HttpResponse()
+
+        with override_settings(DEBUG=True):
+            response = QueryCountMiddleware(view)(self._request('/api/test-sessions/'))
+
+        assert response['X-Query-Count'] == '2'
+        assert float(response['X-Query-Time-Ms']) >= 0
+        assert response['X-Query-Budget'] == str(registered_query_budgets()['test-session-list'].max_queries)
+
+    def test_overrun_is_logged(self, caplog):
+        def view(request):
+            for _ in range(5):
+                Topic.objects.count()
+            return HttpResponse()
+
+        with override_settings(DEBUG=True), caplog.at_level('WARNING', logger='neet_app.middleware'):
+            QueryCountMiddleware(view)(self._request('/api/zone-insights/tests/'))
+        assert 'Query budget exceeded for zone-insights-tests' in caplog.text
+
+    def test_disabled_outside_debug(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        with override_settings(DEBUG=False), pytest.raises(MiddlewareNotUsed):
+            QueryCountMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,59 @@
+"""
+Tests for the maintained Question.has_images flag and the text-only selection indexes
+"""
+import pytest
+from django.db import connection, transaction
+
+from neet_app.models import Question
+from neet_app.views.utils import exclude_questions_with_images
+
+
+def _question(topic, text, **images):
+    return Question.objects.create(
+        topic=topic, question=text, option_a='a', option_b='b', option_c='c', option_d='d',
+        correct_answer='A', explanation='e', **images,
+    )
+
+
+def _plan(queryset):
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestQuestionImageFlag:
+
+    def test_flag_follows_image_fields(self, sample_topic):
+        plain = _question(sample_topic, 'plain')
+        pictured = _question(sample_topic, 'pictured', option_c_image='data:image/png;base64,AAAA')
+        blank = _question(sample_topic, 'blank images', question_image='', explanation_image=None)
+        assert (plain.has_images, pictured.has_images, blank.has_images) == (False, True, False)
+
+        # Partial saves (e.g. the JSON image update path) keep the stored flag in step
+        plain.explanation_image = 'iVBORw0KGgo='
+        plain.save(update_fields=['explanation_image'])
+        pictured.option_c_image = None
+        pictured.save(update_fields=['option_c_image'])
+        plain.refresh_from_db()
+        pictured.refresh_from_db()
+        assert plain.has_images is True
+        assert pictured.has_images is False
+
+    def test_text_only_pool_excludes_flagged_questions(self, sample_topic):
+        kept = _question(sample_topic, 'kept')
+        _question(sample_topic, 'dropped', question_image='iVBORw0KGgo=')
+
+        pool = exclude_questions_with_images(Question.objects.filter(topic_id__in=[sample_topic.id]))
+        assert list(pool.values_list('id', flat=True)) == [kept.id]
+
+    def test_selection_filters_use_partial_indexes(self, sample_topic):
+        topic_pool = exclude_questions_with_images(Question.objects.filter(topic_id__in=[sample_topic.id]))
+        assert 'questions_text_only_topic_idx' in _plan(topic_pool.values('id'))
+
+        qod_pool = Question.objects.filter(institution__isnull=True, has_images=False).exclude(id__in=[1, 2])
+        assert 'questions_text_only_inst_idx' in _plan(qod_pool.values('id'))
@@ -0,0 +1,91 @@
+"""
+Tests for test-taking question payload profiles (skeleton / full / review)
+"""
+import pytest
+from django.utils import timezone
+
+from neet_app.models import TestSession, TestAnswer
+
+
+@pytest.fixture
+def session_with_questions(authenticated_client, sample_questions):
+    """Active session with TestAnswer rows for all sample questions; first question has an image"""
+    sample_questions[0].question_image = 'iVBORw0KGgoAAAANSUhEUg=='
+    sample_questions[0].save(update_fields=['question_image'])
+
+    session = TestSession.objects.create(
+        student_id=authenticated_client.student_profile.student_id,
+        selected_topics=[sample_questions[0].topic.id],
+        question_count=len(sample_questions),
+        total_questions=len(sample_questions),
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    for question in sample_questions:
+        TestAnswer.objects.create(session=session, question=question)
+    return session
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestQuestionPayloadProfiles:
+
+    def test_retrieve_defaults_to_full_profile(self, authenticated_client, session_with_questions):
+        response = authenticated_client.get(f'/api/test-sessions/{session_with_questions.id}/')
+
+        assert response.status_code == 200
+        first = response.data['questions'][0]
+        assert first['question_image'] == 'iVBORw0KGgoAAAANSUhEUg=='
+        assert 'correct_answer' not in first
+
+    def test_skeleton_profile_references_images(self, authenticated_client, session_with_questions, sample_questions):
+        response = authenticated_client.get(
+            f'/api/test-sessions/{session_with_questions.id}/', {'profile': 'skeleton'}
+        )
+
+        assert response.status_code == 200
+        questions = response.data['questions']
+        assert [q['id'] for q in questions] == [q.id for q in sample_questions]
+        assert 'question_image' not in questions[0]
+        assert questions[0]['image_refs'] == ['question_image']
+        assert questions[1]['image_refs'] == []
+
+    def test_review_profile_requires_completed_session(self, authenticated_client, session_with_questions):
+        url = f'/api/test-sessions/{session_with_questions.id}/'
+        response = authenticated_client.get(url, {'profile': 'review'})
+        assert response.status_code == 400
+
+        TestSession.objects.filter(id=session_with_questions.id).update(is_completed=True)
+        response = authenticated_client.get(url, {'profile': 'review'})
+        assert response.status_code == 200
+        assert response.data['questions'][0]['correct_answer'] == 'A'
+
+    def test_invalid_profile_rejected(self, authenticated_client, session_with_questions):
+        response = authenticated_client.get(
+            f'/api/test-sessions/{session_with_questions.id}/', {'profile': 'everything'}
+        )
+        assert response.status_code == 400
+
+    def test_paged_questions(self, authenticated_client, session_with_questions, sample_questions):
+        response = authenticated_client.get(
+            f'/api/test-sessions/{session_with_questions.id}/questions/',
+            {'profile': 'skeleton', 'offset': 2, 'limit': 2}
+        )
+
+        assert response.status_code == 200
+        assert response.data['total'] == len(sample_questions)
+        assert [q['id'] for q in response.data['questions']] == [q.id for q in sample_questions[2:4]]
+
+    def test_question_images_scoped_to_session(self, authenticated_client, session_with_questions, sample_questions):
+        url = f'/api/test-sessions/{session_with_questions.id}/questions/{sample_questions[0].id}/'
+        response = authenticated_client.get(url)
+
+        assert response.status_code == 200
+        assert response.data['question_image'] == 'iVBORw0KGgoAAAANSUhEUg=='
+        # explanation image is withheld until the session is completed
+        assert 'explanation_image' not in response.data
+
+        response = authenticated_client.get(
+            f'/api/test-sessions/{session_with_questions.id}/questions/999999/'
+        )
+        assert response.status_code == 404
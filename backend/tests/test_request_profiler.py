@@ -0,0 +1,117 @@
+"""
+Tests for the opt-in request profiler middleware and its platform-admin views
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+
+from neet_app.middleware import RequestProfilerMiddleware
+from neet_app.models import Topic
+from neet_app.utils import profiler
+
+
+class ProfiledLocMemCache(profiler.ProfiledCacheMixin, LocMemCache):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    profiler.clear_reports()
+    yield
+    profiler.clear_reports()
+
+
+@pytest.fixture
+def cache():
+    return ProfiledLocMemCache('profiler-tests', {})
+
+
+def _view(cache):
+    def view(request):
+        cache.set('warm', 1)
+        cache.get('warm')
+        cache.get('cold')
+        cache.get_many(['warm', 'cold', 'colder'])
+        list(Topic.objects.all())
+        Topic.objects.count()
+        with profiler.external_timer('llm'):
+            pass
+        return HttpResponse('ok')
+    return view
+
+
+def _request(**headers):
+    return RequestFactory().get('/api/topics/', **headers)
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestRequestProfiler:
+
+    def test_requests_without_opt_in_are_not_profiled(self, cache):
+        response = RequestProfilerMiddleware(_view(cache))(_request())
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert profiler.recent_reports() == []
+
+    def test_signed_header_records_report(self, cache):
+        token = profiler.issue_profile_token('ops')
+        response = RequestProfilerMiddleware(_view(cache))(_request(HTTP_X_PROFILE_TOKEN=token))
+
+        [report] = profiler.recent_reports()
+        assert response['X-Profile-Id'] == report['id']
+        assert (report['method'], report['path'], report['status'], report['trigger']) == (
+            'GET', '/api/topics/', 200, 'header')
+        assert report['db']['queries'] == 2
+        assert len(report['db']['slowest']) == 2
+        assert report['cache'] == {'hits': 2, 'misses': 3}
+        assert report['external']['llm']['calls'] == 1
+        assert 'view' in str(report['calls'])
+        assert profiler.get_report(report['id']) == report
+
+    def test_forged_or_expired_token_is_ignored(self, cache, settings):
+        middleware = RequestProfilerMiddleware(_view(cache))
+        middleware(_request(HTTP_X_PROFILE_TOKEN='ops:forged:signature'))
+        settings.REQUEST_PROFILER_TOKEN_MAX_AGE = -1
+        middleware(_request(HTTP_X_PROFILE_TOKEN=profiler.issue_profile_token('ops')))
+        assert profiler.recent_reports() == []
+
+    def test_sampled_requests_and_ring_buffer_cap(self, cache, settings):
+        settings.REQUEST_PROFILER_SAMPLE_RATE = 1.0
+        settings.REQUEST_PROFILER_BUFFER_SIZE = 3
+        middleware = RequestProfilerMiddleware(_view(cache))
+        responses = [middleware(_request()) for _ in range(5)]
+
+        reports = profiler.recent_reports()
+        assert len(reports) == 3
+        assert {r['trigger'] for r in reports} == {'sampled'}
+        # Sampled requests do not advertise their profile id
+        assert all('X-Profile-Id' not in r for r in responses)
+
+    def test_cache_counts_only_while_profiling(self, cache):
+        cache.get('anything')
+        result, report = profiler.profile_call(cache.get, 'anything', 'fallback')
+        assert result == 'fallback'
+        assert report['cache'] == {'hits': 0, 'misses': 1}
+
+    def test_platform_admins_view_reports(self, cache):
+        RequestProfilerMiddleware(_view(cache))(_request(HTTP_X_PROFILE_TOKEN=profiler.issue_profile_token('ops')))
+        [report] = profiler.recent_reports()
+
+        client = Client()
+        client.force_login(get_user_model().objects.create_user('student_like', 'u@example.com', 'x'))
+        assert client.get('/api/platform-admin/api/profiles/').status_code == 302
+
+        client.force_login(get_user_model().objects.create_superuser('profile_admin', 'a@example.com', 'x'))
+        listing = client.get('/api/platform-admin/api/profiles/').json()['results']
+        assert [r['id'] for r in listing] == [report['id']]
+        assert 'calls' not in listing[0]
+        assert client.get('/api/platform-admin/api/profiles/', {'id': report['id']}).json()['calls']
+
+        page = client.get(f'/api/platform-admin/profiles/{report["id"]}/')
+        assert page.status_code == 200 and b'/api/topics/' in page.content
+        issued = client.post('/api/platform-admin/profiles/', {'action': 'token'})
+        token = issued.context['issued_token']
+        assert profiler.verify_profile_token(token) == 'profile_admin'
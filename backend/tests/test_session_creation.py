@@ -0,0 +1,87 @@
+"""
+Tests for single-pass custom/random test session creation
+"""
+import pytest
+
+from neet_app import signals
+from neet_app.models import Question, TestAnswer, TestSession, Topic
+from neet_app.views import utils as selection_utils
+
+
+@pytest.fixture
+def selection_calls(monkeypatch):
+    """Record the question_count of every selection/exclusion run behind session creation."""
+    calls = {'topics': [], 'random': [], 'recent': 0}
+    topics_fn = selection_utils.generate_questions_for_topics
+    random_fn = selection_utils.generate_random_questions_from_database
+    recent_fn = TestSession.get_recent_question_ids_for_student
+
+    def topics(selected_topics, question_count=None, **kwargs):
+        calls['topics'].append(question_count)
+        return topics_fn(selected_topics, question_count, **kwargs)
+
+    def random_questions(question_count, **kwargs):
+        calls['random'].append(question_count)
+        return random_fn(question_count, **kwargs)
+
+    def recent(student_id, *args, **kwargs):
+        calls['recent'] += 1
+        return recent_fn(student_id, *args, **kwargs)
+
+    monkeypatch.setattr(selection_utils, 'generate_questions_for_topics', topics)
+    monkeypatch.setattr(selection_utils, 'generate_random_questions_from_database', random_questions)
+    monkeypatch.setattr(TestSession, 'get_recent_question_ids_for_student', staticmethod(recent))
+    # Session ids are reused across tests; start with a clean classification guard
+    monkeypatch.setattr(signals, '_processed_sessions', set())
+    return calls
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestSingleSelectionPass:
+
+    def test_topic_test_selects_once_with_final_count(self, authenticated_client, sample_topic,
+                                                      sample_questions, selection_calls):
+        response = authenticated_client.post('/api/test-sessions/', {
+            'selected_topics': [sample_topic.id], 'question_count': 3, 'time_limit': 60,
+        }, format='json')
+
+        assert response.status_code == 201
+        assert selection_calls['topics'] == [3]
+        assert selection_calls['recent'] == 1
+
+        session = TestSession.objects.get(id=response.json()['id'])
+        assert session.total_questions == 3
+        assert TestAnswer.objects.filter(session=session).count() == 3
+        assert session.chemistry_topics == [sample_topic.name]
+
+    def test_insufficient_pool_fails_before_selecting_or_saving(self, authenticated_client, sample_topic,
+                                                               sample_questions, selection_calls):
+        response = authenticated_client.post('/api/test-sessions/', {
+            'selected_topics': [sample_topic.id], 'question_count': 8, 'time_limit': 60,
+        }, format='json')
+
+        assert response.status_code == 400
+        assert selection_calls['topics'] == []
+        assert not TestSession.objects.exists()
+
+    def test_random_test_shrinks_to_pool_and_classifies_drawn_topics(self, authenticated_client, sample_topic,
+                                                                     sample_questions, selection_calls):
+        physics = Topic.objects.create(name='Optics', subject='Physics', icon='p')
+        Question.objects.create(
+            topic=physics, question='Lens power?', option_a='1', option_b='2', option_c='3', option_d='4',
+            correct_answer='A', explanation='e',
+        )
+
+        response = authenticated_client.post('/api/test-sessions/', {
+            'test_type': 'random', 'selected_topics': [], 'question_count': 10, 'time_limit': 10,
+        }, format='json')
+
+        assert response.status_code == 201
+        assert selection_calls['random'] == [6]
+        session = TestSession.objects.get(id=response.json()['id'])
+        assert session.question_count == 6 and session.total_questions == 6
+        assert sorted(session.selected_topics) == sorted([sample_topic.id, physics.id])
+        assert session.physics_topics == [physics.name]
+        assert session.chemistry_topics == [sample_topic.name]
+        assert TestAnswer.objects.filter(session=session).count() == 6
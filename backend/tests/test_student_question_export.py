@@ -0,0 +1,164 @@
+"""
+Tests for the student question export (JSON, streamed NDJSON/CSV, async XLSX)
+"""
+import csv
+import io
+import json
+
+import pytest
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from neet_app.institution_auth import generate_institution_admin_tokens
+from neet_app.models import (
+    Institution, InstitutionAdmin, PlatformTest, Question, StudentProfile, TestAnswer, TestSession,
+    TestSubjectZoneInsight
+)
+from neet_app.services import student_question_export
+
+STUDENT_ID = 'STU25010100001'
+
+
+@pytest.fixture
+def export_setup(sample_topic, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    institution = Institution.objects.create(name='Export Inst', code='EXP01')
+    admin = InstitutionAdmin.objects.create(username='export_admin', password_hash='x', institution=institution)
+    student = StudentProfile.objects.create(
+        student_id=STUDENT_ID, full_name='Export Student', email='export@example.com',
+        phone_number='9000000001', date_of_birth='2005-01-01',
+    )
+    test = PlatformTest.objects.create(
+        test_name='Export Mock', test_code='EXP01_MOCK', time_limit=60, total_questions=3,
+        selected_topics=[sample_topic.id], institution=institution, is_institution_test=True,
+    )
+    questions = [
+        Question.objects.create(
+            topic=sample_topic, question=f'Export Q{n}', option_a='a', option_b='b', option_c='c',
+            option_d='d', correct_answer='A', explanation='e', misconceptions={'option_b': f'mistake {n}'},
+        )
+        for n in range(3)
+    ]
+    sessions = []
+    for answers in (['A', 'B', None], ['B', 'A', 'A']):
+        session = TestSession.objects.create(
+            student_id=STUDENT_ID, platform_test=test, test_type='platform',
+            selected_topics=[sample_topic.id], total_questions=3, time_limit=60, start_time=timezone.now(),
+        )
+        for question, selected in zip(questions, answers):
+            TestAnswer.objects.create(
+                session=session, question=question, selected_answer=selected,
+                is_correct=(selected == 'A') if selected else None, time_taken=12,
+            )
+        TestSession.objects.filter(id=session.id).update(is_completed=True)
+        sessions.append(session)
+    TestSubjectZoneInsight.objects.create(student=student, test_session=sessions[0], mark=3, total_mark=12)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_institution_admin_tokens(admin)['access']}")
+    return sessions, client
+
+
+def _download(client, sessions, **body):
+    return client.post(
+        f'/api/institution-admin/analytics/students/{STUDENT_ID}/download/',
+        data=json.dumps({'session_ids': [s.id for s in sessions], **body}),
+        content_type='application/json',
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestStudentQuestionExport:
+
+    def test_json_format_keeps_grouped_document(self, export_setup):
+        sessions, client = export_setup
+        response = _download(client, sessions, question_types=['wrong', 'skipped'])
+
+        assert response.status_code == 200
+        body = json.loads(response.content)
+        assert body['total'] == 3
+        first, second = body['questions_by_test']
+        assert (first['mark'], first['total_mark']) == (3, 12)
+        assert [(q['question_number'], q['student_answer'], q['misconception']) for q in first['questions']] == [
+            (1, 'B', 'mistake 1'), (2, None, None),
+        ]
+        assert second['mark'] is None
+        assert [q['question_text'] for q in second['questions']] == ['Export Q0']
+
+    def test_ndjson_streams_typed_lines(self, export_setup, django_assert_max_num_queries):
+        sessions, client = export_setup
+        with django_assert_max_num_queries(5):
+            response = _download(client, sessions, format='ndjson')
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert [line['type'] for line in lines] == ['student'] + (['session'] + ['question'] * 3) * 2
+        assert lines[0]['full_name'] == 'Export Student'
+        assert lines[1]['session_id'] == sessions[0].id and lines[1]['mark'] == 3
+        assert [line['question_number'] for line in lines[6:]] == [1, 2, 3]
+        assert all(line['session_id'] == sessions[1].id for line in lines[6:])
+
+    def test_csv_streams_one_row_per_question(self, export_setup):
+        sessions, client = export_setup
+        response = _download(client, sessions, format='csv', question_types=['correct'])
+
+        assert response.streaming
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert [(int(r['session_id']), r['question_text']) for r in rows] == [
+            (sessions[0].id, 'Export Q0'), (sessions[1].id, 'Export Q1'), (sessions[1].id, 'Export Q2'),
+        ]
+        assert rows[0]['test_name'] == 'Export Mock'
+
+    def test_answers_are_read_in_cursor_chunks(self, export_setup, settings, django_assert_max_num_queries):
+        sessions, _ = export_setup
+        settings.STUDENT_EXPORT_CHUNK_SIZE = 2
+        headers = student_question_export.load_sessions(STUDENT_ID, [s.id for s in sessions])
+
+        rows = student_question_export.iter_csv(headers, student_question_export.DEFAULT_QUESTION_TYPES)
+        # Nothing is fetched until the stream is consumed; answers then come from a chunked cursor
+        with django_assert_max_num_queries(0):
+            next(rows)
+        assert len(list(rows)) == 6
+
+    def test_xlsx_is_generated_async_and_fetched_by_id(self, export_setup):
+        sessions, client = export_setup
+        response = _download(client, sessions, format='xlsx')
+
+        assert response.status_code == 202
+        export_id = json.loads(response.content)['export_id']
+
+        response = client.get(f'/api/institution-admin/analytics/exports/{export_id}/')
+        assert response.status_code == 200
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        assert rows[0] == tuple(student_question_export.EXPORT_COLUMNS)
+        assert len(rows) == 7
+
+        assert client.get(f'/api/institution-admin/analytics/exports/{"0" * 32}/').status_code == 404
+
+    def test_xlsx_not_built_inline_when_broker_down(self, export_setup, monkeypatch, tmp_path):
+        from neet_app.tasks import export_student_questions_task
+
+        def broker_down(*args, **kwargs):
+            raise ConnectionError('broker unavailable')
+
+        monkeypatch.setattr(export_student_questions_task, 'delay', broker_down)
+        monkeypatch.setattr(
+            student_question_export, 'write_xlsx_export',
+            lambda *args: pytest.fail('workbook built in the request thread'),
+        )
+        sessions, client = export_setup
+        response = _download(client, sessions, format='xlsx')
+
+        assert response.status_code == 503
+        assert json.loads(response.content)['error'] == 'EXPORT_UNAVAILABLE'
+        assert not [path for path in tmp_path.rglob('*') if path.is_file()]
+
+    def test_unknown_format_rejected(self, export_setup):
+        sessions, client = export_setup
+        response = _download(client, sessions, format='pdf')
+        assert response.status_code == 400
+        assert json.loads(response.content)['error'] == 'INVALID_INPUT'
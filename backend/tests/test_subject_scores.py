@@ -0,0 +1,79 @@
+"""
+Tests for aggregate subject scoring and its durable idempotency marker
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app.models import Question, TestAnswer, TestSession, Topic
+from neet_app.tasks import schedule_subject_scores
+
+
+def _question(topic, n):
+    return Question.objects.create(
+        topic=topic, question=f'Q{n}', option_a='a', option_b='b', option_c='c', option_d='d',
+        correct_answer='A', explanation='e'
+    )
+
+
+@pytest.fixture
+def scored_session(sample_student_profile):
+    physics = Topic.objects.create(name='Kinematics', subject='Physics', icon='p')
+    chemistry = Topic.objects.create(name='Alcohols', subject='Chemistry', icon='c')
+    session = TestSession.objects.create(
+        student_id=sample_student_profile.student_id,
+        selected_topics=[physics.id, chemistry.id],
+        total_questions=4,
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    # Physics: 2 correct, 1 wrong -> (8 - 1) / 12; Chemistry: 1 unanswered -> 0
+    for n, (topic, is_correct) in enumerate([
+        (physics, True), (physics, True), (physics, False), (chemistry, None),
+    ]):
+        TestAnswer.objects.create(session=session, question=_question(topic, n), is_correct=is_correct)
+    TestSession.objects.filter(id=session.id).update(is_completed=True)
+    session.refresh_from_db()
+    return session
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestSubjectScores:
+
+    def test_scores_use_single_aggregate_query(self, scored_session):
+        with CaptureQueriesContext(connection) as ctx:
+            scores, stats = scored_session.compute_subject_scores()
+        assert len(ctx.captured_queries) == 1
+
+        assert scores['physics_score'] == 58.33
+        assert scores['chemistry_score'] == 0
+        assert scores['botany_score'] is None
+        assert stats['physics'] == {'correct': 2, 'wrong': 1, 'unanswered': 0, 'total_questions': 3}
+        assert stats['chemistry']['unanswered'] == 1
+
+    def test_marker_makes_scoring_idempotent(self, scored_session):
+        assert scored_session.calculate_and_update_subject_scores(only_if_missing=True) is not None
+        scored_session.refresh_from_db()
+        marker = scored_session.subject_scores_computed_at
+        assert marker is not None
+        assert scored_session.physics_score == 58.33
+
+        # A stale instance (marker not loaded) must not overwrite persisted scores
+        stale = TestSession.objects.defer('subject_scores_computed_at').get(id=scored_session.id)
+        stale.subject_scores_computed_at = None
+        assert stale.calculate_and_update_subject_scores(only_if_missing=True) is None
+        scored_session.refresh_from_db()
+        assert scored_session.subject_scores_computed_at == marker
+
+    def test_scheduled_after_commit(self, scored_session, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            schedule_subject_scores(scored_session.id)
+            scored_session.refresh_from_db()
+            assert scored_session.subject_scores_computed_at is None
+
+        assert len(callbacks) == 1
+        scored_session.refresh_from_db()
+        assert scored_session.subject_scores_computed_at is not None
+        assert scored_session.physics_score == 58.33
@@ -0,0 +1,117 @@
+"""
+Tests for batched time-tracking telemetry and its atomic increments
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from neet_app.models import Question, StudentProfile, TestAnswer, TestSession
+from neet_app.services.time_tracking_service import apply_visit_increments, coalesce_visit_events
+
+
+@pytest.fixture
+def tracked_session(authenticated_client, sample_topic):
+    session = TestSession.objects.create(
+        student_id=authenticated_client.student_profile.student_id,
+        selected_topics=[sample_topic.id],
+        total_questions=3,
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    questions = [
+        Question.objects.create(
+            topic=sample_topic, question=f'Q{n}', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_answer='A', explanation='e'
+        )
+        for n in range(3)
+    ]
+    return session, questions
+
+
+@pytest.mark.unit
+def test_coalesce_visit_events():
+    increments, rejected = coalesce_visit_events([
+        {'question_id': 1, 'time_spent': 10, 'visit_end_time': '2026-01-01T10:05:00Z'},
+        {'question_id': '1', 'time_spent': 5, 'visit_end_time': '2026-01-01T10:00:00Z'},
+        {'question_id': 2, 'time_spent': -3},
+        {'time_spent': 4},
+    ])
+    assert list(increments) == [1]
+    assert increments[1].time_spent == 15
+    assert increments[1].visits == 2
+    assert increments[1].first_seen.minute == 0
+    assert len(rejected) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestTimeTrackingBatch:
+
+    def test_batch_applies_increments(self, authenticated_client, tracked_session):
+        session, questions = tracked_session
+        TestAnswer.objects.create(session=session, question=questions[0], time_taken=7, visit_count=1)
+
+        response = authenticated_client.post('/api/time-tracking/log_time_batch/', {
+            'session_id': session.id,
+            'events': [
+                {'question_id': questions[0].id, 'time_spent': 3},
+                {'question_id': questions[1].id, 'time_spent': 20},
+                {'question_id': questions[1].id, 'time_spent': 5},
+                {'question_id': 999999, 'time_spent': 4},
+                {'question_id': questions[2].id, 'time_spent': 'x'},
+            ],
+        }, format='json')
+        assert response.status_code == 200
+        assert response.data['accepted'] == 4
+        assert response.data['skippedQuestionIds'] == [999999]
+        assert response.data['buffered'] is False
+
+        first = TestAnswer.objects.get(session=session, question=questions[0])
+        second = TestAnswer.objects.get(session=session, question=questions[1])
+        assert (first.time_taken, first.visit_count) == (10, 2)
+        assert (second.time_taken, second.visit_count) == (25, 2)
+        assert second.answered_at is not None
+        session.refresh_from_db()
+        assert session.total_time_taken == 28
+
+    def test_statement_count_independent_of_batch_size(self, tracked_session):
+        session, questions = tracked_session
+        increments, _ = coalesce_visit_events(
+            [{'question_id': q.id, 'time_spent': 2} for q in questions] * 10
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            apply_visit_increments(session.id, increments)
+        # existing lookup, question check, bulk insert, answer UPDATE, session UPDATE (+ savepoint)
+        writes = [q for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        assert len(writes) == 3
+        assert set(TestAnswer.objects.filter(session=session).values_list('visit_count', flat=True)) == {10}
+
+    def test_single_log_time_keeps_response_shape(self, authenticated_client, tracked_session):
+        session, questions = tracked_session
+        url = '/api/time-tracking/log_time/'
+        payload = {'session_id': session.id, 'question_id': questions[0].id, 'time_spent': 12}
+        authenticated_client.post(url, payload, format='json')
+        response = authenticated_client.post(url, payload, format='json')
+        assert response.status_code == 200
+        assert response.data['totalTime'] == 24
+        assert response.data['visitCount'] == 2
+
+        missing = authenticated_client.post(url, {**payload, 'question_id': 999999}, format='json')
+        assert missing.status_code == 404
+
+    def test_rejects_other_students_session(self, tracked_session):
+        session, questions = tracked_session
+        other = StudentProfile.objects.create(
+            student_id='STU25010100002', full_name='Other Student', email='other@example.com',
+            phone_number='1234567891', date_of_birth='2000-01-01'
+        )
+        client = APIClient()
+        client.force_authenticate(user=other)
+        response = client.post('/api/time-tracking/log_time_batch/', {
+            'session_id': session.id,
+            'events': [{'question_id': questions[0].id, 'time_spent': 1}],
+        }, format='json')
+        assert response.status_code == 404
@@ -0,0 +1,120 @@
+"""
+Tests for the process-local, version-stamped topic taxonomy
+"""
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app.models import CacheVersion, TestSession, Topic
+from neet_app.utils import topic_taxonomy
+from neet_app.utils.topic_taxonomy import (
+    TAXONOMY_VERSION_KEY, get_topic_taxonomy, normalize_subject_bucket
+)
+from neet_app.utils.topic_utils import classify_topics_by_subject
+
+
+@pytest.fixture
+def taxonomy_topics():
+    return [
+        Topic.objects.create(name='Kinematics', subject='Physics', icon='p', chapter='Motion'),
+        Topic.objects.create(name='Alcohols', subject='Chemistry', icon='c', chapter='Organic'),
+        Topic.objects.create(name='Plant Anatomy', subject='Plant Biology', icon='b', chapter='Anatomy'),
+        Topic.objects.create(name='Human Physiology', subject='Zoology', icon='z', chapter='Physiology'),
+    ]
+
+
+@pytest.mark.unit
+def test_normalize_subject_bucket():
+    assert normalize_subject_bucket('Physics') == 'physics'
+    assert normalize_subject_bucket('Plant Biology') == 'botany'
+    assert normalize_subject_bucket('Animal Biology') == 'zoology'
+    assert normalize_subject_bucket('Biochemistry') == 'chemistry'
+    assert normalize_subject_bucket('English') is None
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestTopicTaxonomy:
+
+    def test_lookups_are_served_from_memory(self, taxonomy_topics):
+        taxonomy = get_topic_taxonomy()
+        with CaptureQueriesContext(connection) as ctx:
+            again = get_topic_taxonomy()
+            assert again is taxonomy
+            assert again.ids_for_names(['Alcohols']) == [taxonomy_topics[1].id]
+            assert again.ids_for_subject('Zoology') == [taxonomy_topics[3].id]
+            assert again.get(str(taxonomy_topics[0].id)).chapter == 'Motion'
+        assert len(ctx.captured_queries) == 0
+
+    def test_topic_save_invalidates(self, taxonomy_topics):
+        version = get_topic_taxonomy().version
+        Topic.objects.create(name='Optics', subject='Physics', icon='p', chapter='Ray Optics')
+
+        taxonomy = get_topic_taxonomy()
+        assert taxonomy.version > version
+        assert taxonomy.ids_for_names(['Optics'])
+
+    def test_version_bump_from_other_process_is_picked_up(self, taxonomy_topics, monkeypatch):
+        stale = get_topic_taxonomy()
+        # Simulate another worker changing topics: only the DB counter moves
+        CacheVersion.bump(TAXONOMY_VERSION_KEY)
+        assert get_topic_taxonomy() is stale
+
+        monkeypatch.setattr(topic_taxonomy, 'VERSION_CHECK_INTERVAL', 0)
+        assert get_topic_taxonomy().version == CacheVersion.get_version(TAXONOMY_VERSION_KEY)
+
+    def test_session_subject_classification(self, taxonomy_topics, sample_student_profile):
+        session = TestSession.objects.create(
+            student_id=sample_student_profile.student_id,
+            selected_topics=[str(t.id) for t in taxonomy_topics],
+            total_questions=4,
+            time_limit=60,
+            start_time=timezone.now(),
+        )
+        get_topic_taxonomy()
+        with CaptureQueriesContext(connection) as ctx:
+            session.update_subject_classification()
+        assert len(ctx.captured_queries) == 0
+
+        assert session.physics_topics == ['Kinematics']
+        assert session.chemistry_topics == ['Alcohols']
+        assert session.botany_topics == ['Plant Anatomy']
+        assert session.zoology_topics == ['Human Physiology']
+        assert session.biology_topics == []
+
+    def test_topic_created_by_another_worker_is_classified(self, taxonomy_topics, sample_student_profile):
+        stale = get_topic_taxonomy()
+        optics = Topic.objects.create(name='Optics', subject='Physics', icon='p', chapter='Ray Optics')
+        # Another worker created the topic; this process still holds a fresh-looking old snapshot
+        topic_taxonomy._state.update(taxonomy=stale, checked_at=time.monotonic())
+
+        session = TestSession.objects.create(
+            student_id=sample_student_profile.student_id,
+            selected_topics=[str(taxonomy_topics[0].id), str(optics.id)],
+            total_questions=2,
+            time_limit=60,
+            start_time=timezone.now(),
+        )
+        session.update_subject_classification()
+        assert session.physics_topics == ['Kinematics', 'Optics']
+        assert get_topic_taxonomy() is not stale
+
+    def test_unknown_ids_reload_only_once(self, taxonomy_topics):
+        get_topic_taxonomy(topic_ids=[999999])
+        with CaptureQueriesContext(connection) as ctx:
+            taxonomy = get_topic_taxonomy(topic_ids=[taxonomy_topics[0].id, 999999], names=['Kinematics'])
+        assert len(ctx.captured_queries) == 0
+        assert taxonomy.classify_by_bucket([taxonomy_topics[0].id, 999999])['physics'] == ['Kinematics']
+
+    def test_keyword_classification_is_memoized_and_copied(self, taxonomy_topics):
+        first = classify_topics_by_subject()
+        assert 'Alcohols' in first['Chemistry']
+        first['Chemistry'].append('Mutated')
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = classify_topics_by_subject()
+        assert len(ctx.captured_queries) == 0
+        assert 'Mutated' not in second['Chemistry']
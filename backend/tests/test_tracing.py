@@ -0,0 +1,75 @@
+"""
+Tests for the Sentry traces sampler and the span helpers
+"""
+import logging
+
+import pytest
+
+from neet_app.utils import tracing
+
+
+def _request(path, method='GET'):
+    return {'wsgi_environ': {'PATH_INFO': path, 'REQUEST_METHOD': method}, 'transaction_context': {}}
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACES_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(tracing, 'HOT_TRACES_SAMPLE_RATE', 0.0)
+    monkeypatch.setattr(tracing, '_budget', tracing._TokenBucket(2))
+
+
+@pytest.mark.unit
+class TestTracesSampler:
+
+    def test_routes_are_classified(self):
+        assert tracing.classify(_request('/api/test-answers/autosave/')) == 'hot'
+        assert tracing.classify(_request('/api/time-tracking/log-time-batch/')) == 'hot'
+        assert tracing.classify(_request('/api/chat-sessions/abc/send-message/')) == 'slow'
+        assert tracing.classify(_request('/api/test-sessions/12/submit/')) == 'slow'
+        assert tracing.classify(_request('/static/app.js')) == 'ignored'
+        assert tracing.classify(_request('/api/topics/', method='OPTIONS')) == 'ignored'
+        assert tracing.classify(_request('/api/topics/')) == 'default'
+        assert tracing.classify({'celery_job': {'task': 'neet_app.tasks.generate_insights_task'}}) == 'slow'
+        assert tracing.classify({'celery_job': {'task': 'neet_app.tasks.persist_heartbeats_task'}}) == 'hot'
+
+    def test_rates_follow_route_class(self, rates):
+        assert tracing.traces_sampler(_request('/api/test-answers/autosave/')) == 0.0
+        assert tracing.traces_sampler(_request('/static/app.js')) == 0.0
+        assert tracing.traces_sampler(_request('/api/insights/cache/')) == 1.0
+
+    def test_budget_caps_sampled_volume_but_not_slow_routes(self, rates):
+        decisions = [tracing.traces_sampler(_request('/api/topics/')) for _ in range(10)]
+        assert decisions.count(1.0) == 2
+        assert tracing.traces_sampler(_request('/api/chat-sessions/abc/send-message/')) == 1.0
+
+    def test_parent_decision_is_kept(self, rates):
+        assert tracing.traces_sampler({**_request('/api/test-answers/autosave/'), 'parent_sampled': True}) == 1.0
+        assert tracing.traces_sampler({**_request('/api/chatbot/statistics/'), 'parent_sampled': False}) == 0.0
+
+
+@pytest.mark.unit
+class TestSpans:
+
+    def test_untraced_code_creates_no_spans(self, monkeypatch):
+        def fail(**kwargs):
+            raise AssertionError('span started outside a transaction')
+
+        monkeypatch.setattr(tracing.sentry_sdk, 'start_span', fail)
+
+        @tracing.traced('selection')
+        def pick(n):
+            return list(range(n))
+
+        with tracing.span('scoring', 'evaluate', session_id=1) as current:
+            assert current is None
+        assert pick(3) == [0, 1, 2]
+        assert pick.__name__ == 'pick'
+
+    def test_disabled_debug_logging_skips_topic_lookups(self):
+        from neet_app.services.selection_engine import _LazyTopicNames
+
+        logger = logging.getLogger('neet_app.services.selection_engine')
+        assert not logger.isEnabledFor(logging.DEBUG)
+        # No django_db mark: any topic lookup here would raise
+        logger.debug('topics: %s', _LazyTopicNames([1, 2, 3]))
@@ -0,0 +1,91 @@
+"""
+Tests for the single-pass answer view behind focus-zone and checkpoint extraction
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from neet_app.models import Question, TestAnswer, TestSession, TestSubjectZoneInsight, Topic
+from neet_app.services.zone_insights_service import (
+    SessionAnswerView, compute_and_store_zone_insights, extract_correct_questions,
+    extract_focus_zone_data, extract_wrong_and_skipped_questions
+)
+from neet_app.utils.topic_taxonomy import get_topic_taxonomy
+
+
+@pytest.fixture
+def insight_session(sample_student_profile):
+    physics = Topic.objects.create(name='Kinematics', subject='Physics', icon='p')
+    chemistry = Topic.objects.create(name='Alcohols', subject='Chemistry', icon='c')
+    session = TestSession.objects.create(
+        student_id=sample_student_profile.student_id,
+        selected_topics=[physics.id, chemistry.id],
+        total_questions=5,
+        time_limit=60,
+        start_time=timezone.now(),
+    )
+    session.update_subject_classification()
+    session.save()
+
+    answers = [
+        # topic, selected, correct?, seconds
+        (physics, 'A', True, 30),
+        (physics, 'B', False, 40),
+        (physics, None, None, 12),
+        (chemistry, 'A', True, 20),
+        (chemistry, 'A', True, 25),
+    ]
+    for n, (topic, selected, is_correct, seconds) in enumerate(answers):
+        question = Question.objects.create(
+            topic=topic, question=f'Q{n}', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_answer='A', explanation='e', misconceptions={'option_b': 'Mixed up units'},
+            question_image='x' * 1000,
+        )
+        TestAnswer.objects.create(
+            session=session, question=question, selected_answer=selected,
+            is_correct=is_correct, time_taken=seconds,
+        )
+    get_topic_taxonomy()
+    return session
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestSessionAnswerView:
+
+    def test_view_loads_in_two_queries_without_images(self, insight_session):
+        with CaptureQueriesContext(connection) as ctx:
+            view = SessionAnswerView.load(insight_session.id)
+            extract_focus_zone_data(insight_session.id, view=view)
+            for subject in view.subjects:
+                extract_wrong_and_skipped_questions(insight_session.id, subject, view=view)
+                extract_correct_questions(insight_session.id, subject, view=view)
+        assert len(ctx.captured_queries) == 2
+        assert 'question_image' not in ctx.captured_queries[1]['sql']
+        assert view.subjects == ['Physics', 'Chemistry']
+
+    def test_extractors_group_by_subject(self, insight_session):
+        view = SessionAnswerView.load(insight_session.id)
+
+        focus = extract_focus_zone_data(insight_session.id, view=view)
+        assert list(focus) == ['Physics']
+        questions = focus['Physics']['topics'][0]['questions']
+        assert [q['selected_answer'] for q in questions] == ['B', None]
+        assert questions[0]['misconception'] == 'Mixed up units'
+
+        physics = extract_wrong_and_skipped_questions(insight_session.id, 'Physics', view=view)['topics'][0]
+        assert (physics['topic'], physics['accuracy'], physics['no_of_questions']) == ('Kinematics', 0.33, 3)
+        assert physics['avg_time'] == 26.0
+
+        chemistry = extract_correct_questions(insight_session.id, 'Chemistry', view=view)['topics'][0]
+        assert chemistry['no_of_questions'] == 2
+
+    def test_zone_insights_use_view(self, insight_session):
+        results = compute_and_store_zone_insights(insight_session.id)
+        assert results['Physics']['subject_data']['incorrect_answers'] == 1
+        assert results['Chemistry']['mark'] == 8
+
+        insight = TestSubjectZoneInsight.objects.get(test_session=insight_session)
+        assert insight.total_mark == 20
+        assert insight.mark == 11